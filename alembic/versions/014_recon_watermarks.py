@@ -0,0 +1,53 @@
+"""Add company scoping and watermarks for incremental reconciliation
+
+Revision ID: 014_recon_watermarks
+Revises: 013_privacy_and_labels
+Create Date: 2025-10-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_recon_watermarks'
+down_revision = '013_privacy_and_labels'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add company_id columns, change-tracking indexes and watermark table."""
+    
+    # company_id may already exist on databases created by the legacy
+    # app/db/migrations chain (002_multi_tenant)
+    inspector = sa.inspect(op.get_bind())
+    for table in ('transactions', 'journal_entries'):
+        columns = {c['name'] for c in inspector.get_columns(table)}
+        if 'company_id' not in columns:
+            op.add_column(table, sa.Column('company_id', sa.String(255), nullable=True))
+    
+    op.create_index(
+        'idx_transactions_company_created',
+        'transactions',
+        ['company_id', 'created_at']
+    )
+    op.create_index(
+        'idx_journal_entries_company_updated',
+        'journal_entries',
+        ['company_id', 'updated_at']
+    )
+    
+    op.create_table(
+        'reconciliation_watermarks',
+        sa.Column('company_id', sa.String(255), primary_key=True),
+        sa.Column('txn_created_at', sa.DateTime(), nullable=True),
+        sa.Column('je_updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_run_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_full_rebuild_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    """Remove watermark table and change-tracking indexes."""
+    op.drop_table('reconciliation_watermarks')
+    op.drop_index('idx_journal_entries_company_updated', table_name='journal_entries')
+    op.drop_index('idx_transactions_company_created', table_name='transactions')
@@ -0,0 +1,50 @@
+"""Add per-day drift histogram sketches
+
+Revision ID: 015_drift_sketches
+Revises: 014_recon_watermarks
+Create Date: 2025-10-21
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_drift_sketches'
+down_revision = '014_recon_watermarks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create drift_sketches and the pending backfill of existing transactions."""
+    op.create_table(
+        'drift_sketches',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('company_id', sa.String(255), nullable=False, server_default=''),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('feature', sa.String(50), nullable=False),
+        sa.Column('counts', sa.JSON(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('company_id', 'day', 'feature', name='uq_drift_sketches_company_day_feature'),
+    )
+    op.create_index('idx_drift_sketches_feature_day', 'drift_sketches', ['feature', 'day'])
+    
+    # Ingestion sketches transactions from now on; older ones are added
+    # by the first drift check (app/ml/drift_sketches.py backfill())
+    backfills = op.create_table(
+        'drift_sketch_backfills',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('cutoff', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('recorded', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.bulk_insert(backfills, [{'id': 1, 'cutoff': datetime.utcnow(), 'recorded': 0}])
+
+
+def downgrade():
+    """Drop drift_sketches and drift_sketch_backfills."""
+    op.drop_table('drift_sketch_backfills')
+    op.drop_index('idx_drift_sketches_feature_day', table_name='drift_sketches')
+    op.drop_table('drift_sketches')
@@ -0,0 +1,80 @@
+"""Add normalized journal entry lines
+
+Revision ID: 016_journal_entry_lines
+Revises: 015_drift_sketches
+Create Date: 2025-10-22
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016_journal_entry_lines'
+down_revision = '015_drift_sketches'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def upgrade():
+    """Create journal_entry_lines and backfill it from journal_entries.lines."""
+    lines_table = op.create_table(
+        'journal_entry_lines',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('je_id', sa.String(255), sa.ForeignKey('journal_entries.je_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('line_no', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.String(255), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('account', sa.String(255), nullable=False),
+        sa.Column('debit_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('credit_cents', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.create_index('idx_je_lines_je', 'journal_entry_lines', ['je_id'])
+    op.create_index('idx_je_lines_company_status_date', 'journal_entry_lines', ['company_id', 'status', 'date'])
+    op.create_index('idx_je_lines_account', 'journal_entry_lines', ['account'])
+
+    # Backfill in keyset-paginated chunks
+    entries = sa.table(
+        'journal_entries',
+        sa.column('je_id', sa.String),
+        sa.column('date', sa.DateTime),
+        sa.column('lines', sa.JSON),
+        sa.column('status', sa.String),
+        sa.column('company_id', sa.String),
+    )
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(entries).order_by(entries.c.je_id).limit(BACKFILL_CHUNK_SIZE)
+        if last_id is not None:
+            query = query.where(entries.c.je_id > last_id)
+        batch = bind.execute(query).fetchall()
+        if not batch:
+            break
+
+        rows = [
+            {
+                'je_id': je.je_id,
+                'line_no': line_no,
+                'company_id': je.company_id,
+                'date': je.date,
+                'status': je.status,
+                'account': line.get('account', ''),
+                'debit_cents': int(round(float(line.get('debit') or 0) * 100)),
+                'credit_cents': int(round(float(line.get('credit') or 0) * 100)),
+            }
+            for je in batch
+            for line_no, line in enumerate(je.lines or [])
+        ]
+        if rows:
+            op.bulk_insert(lines_table, rows)
+        last_id = batch[-1].je_id
+
+
+def downgrade():
+    """Drop journal_entry_lines."""
+    op.drop_index('idx_je_lines_account', table_name='journal_entry_lines')
+    op.drop_index('idx_je_lines_company_status_date', table_name='journal_entry_lines')
+    op.drop_index('idx_je_lines_je', table_name='journal_entry_lines')
+    op.drop_table('journal_entry_lines')
@@ -0,0 +1,74 @@
+"""Add daily account balance snapshots
+
+Revision ID: 017_account_balances_daily
+Revises: 016_journal_entry_lines
+Create Date: 2025-10-23
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017_account_balances_daily'
+down_revision = '016_journal_entry_lines'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create account_balances_daily and backfill it from journal_entry_lines."""
+    balances_table = op.create_table(
+        'account_balances_daily',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('company_id', sa.String(255), nullable=False, server_default=''),
+        sa.Column('account', sa.String(255), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('debit_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('credit_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('company_id', 'account', 'day', name='uq_account_balances_daily'),
+    )
+
+    # Backfill: posted line totals per (company, account, day), accumulated
+    lines = sa.table(
+        'journal_entry_lines',
+        sa.column('company_id', sa.String),
+        sa.column('account', sa.String),
+        sa.column('date', sa.DateTime),
+        sa.column('status', sa.String),
+        sa.column('debit_cents', sa.BigInteger),
+        sa.column('credit_cents', sa.BigInteger),
+    )
+    company = sa.func.coalesce(lines.c.company_id, '')
+    day = sa.func.date(lines.c.date)
+    query = (
+        sa.select(company, lines.c.account, day,
+                  sa.func.sum(lines.c.debit_cents), sa.func.sum(lines.c.credit_cents))
+        .where(lines.c.status == 'posted')
+        .group_by(company, lines.c.account, day)
+        .order_by(company, lines.c.account, day)
+    )
+
+    rows = []
+    running = {}
+    for company_id, account, line_day, debit, credit in op.get_bind().execute(query):
+        prev_debit, prev_credit = running.get((company_id, account), (0, 0))
+        total = (prev_debit + int(debit or 0), prev_credit + int(credit or 0))
+        running[(company_id, account)] = total
+        if isinstance(line_day, str):
+            line_day = date.fromisoformat(line_day)
+        rows.append({
+            'company_id': company_id,
+            'account': account,
+            'day': line_day,
+            'debit_cents': total[0],
+            'credit_cents': total[1],
+        })
+    if rows:
+        op.bulk_insert(balances_table, rows)
+
+
+def downgrade():
+    """Drop account_balances_daily."""
+    op.drop_table('account_balances_daily')
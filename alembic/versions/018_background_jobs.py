@@ -0,0 +1,51 @@
+"""Add durable background job table
+
+Revision ID: 018_background_jobs
+Revises: 017_account_balances_daily
+Create Date: 2025-10-24
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_background_jobs'
+down_revision = '017_account_balances_daily'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create background_jobs with claim and per-company indexes."""
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.String(64), primary_key=True),
+        sa.Column('task', sa.String(255), nullable=False),
+        sa.Column('args', sa.JSON(), nullable=False),
+        sa.Column('kwargs', sa.JSON(), nullable=False),
+        sa.Column('meta', sa.JSON(), nullable=False),
+        sa.Column('company_id', sa.String(255), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('timeout', sa.Integer(), nullable=False, server_default='600'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('worker_id', sa.String(100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_background_jobs_claim', 'background_jobs', ['status', 'priority', 'available_at'])
+    op.create_index('idx_background_jobs_company_created', 'background_jobs', ['company_id', 'created_at'])
+
+
+def downgrade():
+    """Drop background_jobs."""
+    op.drop_index('idx_background_jobs_company_created', table_name='background_jobs')
+    op.drop_index('idx_background_jobs_claim', table_name='background_jobs')
+    op.drop_table('background_jobs')
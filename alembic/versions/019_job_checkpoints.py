@@ -0,0 +1,32 @@
+"""Add job checkpoints for resumable chunked jobs
+
+Revision ID: 019_job_checkpoints
+Revises: 018_background_jobs
+Create Date: 2025-10-25
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019_job_checkpoints'
+down_revision = '018_background_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create job_checkpoints."""
+    op.create_table(
+        'job_checkpoints',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('job_id', sa.String(64), nullable=False),
+        sa.Column('key', sa.String(100), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('job_id', 'key', name='uq_job_checkpoints_job_key'),
+    )
+
+
+def downgrade():
+    """Drop job_checkpoints."""
+    op.drop_table('job_checkpoints')
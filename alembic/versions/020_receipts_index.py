@@ -0,0 +1,52 @@
+"""Add receipts index table and receipt field values and tenants
+
+Revision ID: 020_receipts_index
+Revises: 019_job_checkpoints
+Create Date: 2025-10-26
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020_receipts_index'
+down_revision = '019_job_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create receipts and add receipt_fields.value and tenant_id."""
+    op.create_table(
+        'receipts',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('tenant_id', sa.String(255), nullable=False),
+        sa.Column('receipt_id', sa.String(255), nullable=False),
+        sa.Column('filename', sa.String(255), nullable=True),
+        sa.Column('file_path', sa.String(1024), nullable=True),
+        sa.Column('vendor', sa.String(255), nullable=True),
+        sa.Column('vendor_key', sa.String(255), nullable=True),
+        sa.Column('receipt_date', sa.Date(), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('total', sa.Float(), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('extracted_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('tenant_id', 'receipt_id', name='uq_receipts_tenant_receipt'),
+    )
+    op.create_index('idx_receipts_tenant_date', 'receipts', ['tenant_id', 'receipt_date', 'id'])
+    op.create_index('idx_receipts_tenant_vendor', 'receipts', ['tenant_id', 'vendor_key'])
+    op.create_index('idx_receipts_tenant_amount', 'receipts', ['tenant_id', 'amount'])
+
+    op.add_column('receipt_fields', sa.Column('value', sa.String(255), nullable=True))
+    op.add_column('receipt_fields', sa.Column('tenant_id', sa.String(255), nullable=True))
+    op.create_index('idx_receipt_fields_tenant_receipt', 'receipt_fields', ['tenant_id', 'receipt_id'])
+
+
+def downgrade():
+    """Drop receipts and receipt_fields.value and tenant_id."""
+    op.drop_index('idx_receipt_fields_tenant_receipt', 'receipt_fields')
+    op.drop_column('receipt_fields', 'tenant_id')
+    op.drop_column('receipt_fields', 'value')
+    op.drop_index('idx_receipts_tenant_amount', 'receipts')
+    op.drop_index('idx_receipts_tenant_vendor', 'receipts')
+    op.drop_index('idx_receipts_tenant_date', 'receipts')
+    op.drop_table('receipts')
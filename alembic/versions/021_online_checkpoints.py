@@ -0,0 +1,43 @@
+"""Add online training checkpoints
+
+Revision ID: 021_online_checkpoints
+Revises: 020_receipts_index
+Create Date: 2025-10-27
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '021_online_checkpoints'
+down_revision = '020_receipts_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create online_training_checkpoints and move online rows out of model_training_logs."""
+    op.create_table(
+        'online_training_checkpoints',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('model_name', sa.String(255), nullable=False),
+        sa.Column('mode', sa.String(20), nullable=False),
+        sa.Column('version', sa.String(255), nullable=False),
+        sa.Column('base_version', sa.String(255), nullable=True),
+        sa.Column('watermark_at', sa.DateTime(), nullable=False),
+        sa.Column('watermark_id', sa.String(255), nullable=False),
+        sa.Column('records_used', sa.Integer(), nullable=False),
+        sa.Column('metrics', sa.JSON(), nullable=True),
+        sa.Column('training_duration_sec', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('idx_online_training_checkpoints_model', 'online_training_checkpoints', ['model_name', 'id'])
+
+    # Online checkpoints were logged as training runs; they are shadow
+    # candidates, not trained production models (the next run rebuilds)
+    op.execute("DELETE FROM model_training_logs WHERE model_name = 'classifier_online'")
+
+
+def downgrade():
+    """Drop online_training_checkpoints."""
+    op.drop_index('idx_online_training_checkpoints_model', table_name='online_training_checkpoints')
+    op.drop_table('online_training_checkpoints')
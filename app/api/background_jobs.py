@@ -8,9 +8,11 @@ Endpoints:
 ---------
 - POST /api/jobs/categorize - Start AI categorization job
 - POST /api/jobs/ocr - Start OCR processing job
+- POST /api/jobs/ocr/batch - Start batch OCR job for many receipts
 - POST /api/jobs/export-qbo - Start QuickBooks export job
 - POST /api/jobs/bulk-approve - Start bulk approval job
 - GET /api/jobs/{job_id} - Get job status
+- GET /api/jobs/{job_id}/events - Stream job status changes (server-sent events)
 - GET /api/jobs/company/{company_id} - List company jobs
 
 All jobs return immediately with a job_id that can be polled for progress.
@@ -18,21 +20,27 @@ All jobs return immediately with a job_id that can be polled for progress.
 import logging
 import hashlib
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
 
 from app.db.session import get_db
 from app.auth.security import get_current_user
+from app.worker.progress import job_events
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/jobs", tags=["background-jobs"])
 
-# Try to import queue (simple or Redis)
+# Try to import queue (durable when configured, else simple, else Redis)
 try:
-    from app.worker.simple_queue import enqueue_job, get_job_status, get_company_jobs
+    if settings.JOB_QUEUE_BACKEND == "durable":
+        from app.worker.durable_queue import enqueue_job, get_job_status, get_company_jobs
+    else:
+        from app.worker.simple_queue import enqueue_job, get_job_status, get_company_jobs
     QUEUE_AVAILABLE = True
 except ImportError:
     try:
@@ -47,12 +55,15 @@ except ImportError:
 # Request/Response Models
 # ============================================================================
 
+# Receipts accepted per batch OCR job
+MAX_OCR_BATCH = 1000
+
 class CategorizeRequest(BaseModel):
     """Request to categorize transactions."""
     company_id: str
     tenant_id: str
     transaction_ids: Optional[List[str]] = None
-    limit: int = 100
+    limit: Optional[int] = 100  # None: all uncategorized transactions (processed in chunks)
 
 
 class OCRRequest(BaseModel):
@@ -62,6 +73,19 @@ class OCRRequest(BaseModel):
     file_path: str
 
 
+class OCRReceipt(BaseModel):
+    """Receipt in a batch OCR request."""
+    receipt_id: str
+    file_path: str
+    tenant_id: Optional[str] = None  # Defaults to the request's company_id
+
+
+class OCRBatchRequest(BaseModel):
+    """Request to OCR many receipts in one job."""
+    company_id: str
+    receipts: List[OCRReceipt] = Field(..., min_length=1, max_length=MAX_OCR_BATCH)
+
+
 class ExportQBORequest(BaseModel):
     """Request to export to QuickBooks."""
     company_id: str
@@ -136,7 +160,7 @@ async def start_categorization_job(
         return JobResponse(
             job_id=job_id,
             status="pending",
-            message=f"Categorization job started. Poll /api/jobs/{job_id} for progress."
+            message=f"Categorization job started. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
         )
         
     except Exception as e:
@@ -188,7 +212,7 @@ async def start_ocr_job(
         return JobResponse(
             job_id=job_id,
             status="pending",
-            message=f"OCR job started. Poll /api/jobs/{job_id} for progress."
+            message=f"OCR job started. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
         )
         
     except Exception as e:
@@ -196,6 +220,56 @@ async def start_ocr_job(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/ocr/batch", response_model=JobResponse)
+async def start_ocr_batch_job(
+    request: OCRBatchRequest,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Start one OCR job for a batch of receipts.
+    
+    Receipts are OCR'd in parallel on the OCR process pool; receipts
+    processed before are served from the token cache.
+    
+    Returns immediately with job_id to poll for progress.
+    """
+    if not QUEUE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Background jobs not available"
+        )
+    
+    try:
+        from app.worker.background_tasks import process_receipts_ocr_task
+        
+        job_id = enqueue_job(
+            process_receipts_ocr_task,
+            kwargs={
+                "company_id": request.company_id,
+                "receipts": [receipt.model_dump() for receipt in request.receipts]
+            },
+            meta={
+                "company_id": request.company_id,
+                "user_id": current_user.user_id,
+                "operation": "ocr_batch",
+                "receipts": len(request.receipts)
+            }
+        )
+        
+        logger.info(f"Started batch OCR job {job_id} for {len(request.receipts)} receipts")
+        
+        return JobResponse(
+            job_id=job_id,
+            status="pending",
+            message=f"Batch OCR job started for {len(request.receipts)} receipts. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to start batch OCR job: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/export-qbo", response_model=JobResponse)
 async def start_export_qbo_job(
     request: ExportQBORequest,
@@ -242,7 +316,7 @@ async def start_export_qbo_job(
         return JobResponse(
             job_id=job_id,
             status="pending",
-            message=f"QBO export job started. Poll /api/jobs/{job_id} for progress."
+            message=f"QBO export job started. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
         )
         
     except Exception as e:
@@ -295,7 +369,7 @@ async def start_bulk_approve_job(
         return JobResponse(
             job_id=job_id,
             status="pending",
-            message=f"Bulk approval job started. Poll /api/jobs/{job_id} for progress."
+            message=f"Bulk approval job started. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
         )
         
     except Exception as e:
@@ -335,6 +409,32 @@ async def get_job_status_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream job status changes as server-sent events.
+    
+    Sends a ``progress`` event (same payload as GET /api/jobs/{job_id},
+    including ``details`` with throughput and ETA) whenever the status
+    changes, and a final ``done`` event when the job finishes. Replaces
+    polling GET /api/jobs/{job_id}; works with every queue backend.
+    """
+    if not QUEUE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Background jobs not available"
+        )
+    
+    return StreamingResponse(
+        job_events(get_job_status, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/company/{company_id}")
 async def get_company_jobs_endpoint(
     company_id: str,
@@ -434,7 +534,7 @@ async def upload_and_categorize(
         return JobResponse(
             job_id=job_id,
             status="pending",
-            message=f"File uploaded. Categorization job started. Poll /api/jobs/{job_id} for progress."
+            message=f"File uploaded. Categorization job started. Poll /api/jobs/{job_id} or stream /api/jobs/{job_id}/events for progress."
         )
         
     except Exception as e:
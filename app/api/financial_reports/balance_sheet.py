@@ -2,8 +2,8 @@
 from datetime import date
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.db.models import JournalEntryDB
+from app.db.account_balances import balances_as_of
+from app.db.journal_lines import from_cents
 
 
 def generate_balance_sheet(
@@ -24,61 +24,43 @@ def generate_balance_sheet(
     Returns:
         Balance sheet data structure
     """
-    # Get all posted journal entries up to the date
-    jes = db.query(JournalEntryDB).filter(
-        and_(
-            JournalEntryDB.company_id == company_id,
-            JournalEntryDB.status == "posted",
-            JournalEntryDB.date <= as_of_date
-        )
-    ).all()
+    # Per-account balances through the date from the daily balance snapshots
+    totals = balances_as_of(db, company_id, as_of_date)
     
-    # Calculate account balances
     assets = {}
     liabilities = {}
     equity = {}
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            account_num = account.split()[0] if ' ' in account else account
-            
-            # Assets (1xxx) - debits increase
-            if account_num.startswith('1'):
-                if account not in assets:
-                    assets[account] = 0.0
-                assets[account] += line['debit'] - line['credit']
-            
-            # Liabilities (2xxx) - credits increase
-            elif account_num.startswith('2'):
-                if account not in liabilities:
-                    liabilities[account] = 0.0
-                liabilities[account] += line['credit'] - line['debit']
-            
-            # Equity (3xxx) - credits increase
-            elif account_num.startswith('3'):
-                if account not in equity:
-                    equity[account] = 0.0
-                equity[account] += line['credit'] - line['debit']
-    
-    # Calculate retained earnings (net income from revenue & expenses)
+    # Retained earnings (net income from revenue & expenses)
     # This would normally be calculated from prior periods, but for now
     # we'll calculate it from the current period P&L
     revenue = 0.0
     expenses = 0.0
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            account_num = account.split()[0] if ' ' in account else account
-            
-            # Revenue (8xxx)
-            if account_num.startswith('8'):
-                revenue += line['credit'] - line['debit']
-            
-            # Expenses (5xxx, 6xxx, 7xxx)
-            elif account_num.startswith(('5', '6', '7')):
-                expenses += line['debit'] - line['credit']
+    for account, (debit_cents, credit_cents) in totals.items():
+        account_num = account.split()[0] if ' ' in account else account
+        debit_balance = from_cents(debit_cents - credit_cents)
+        credit_balance = from_cents(credit_cents - debit_cents)
+        
+        # Assets (1xxx) - debits increase
+        if account_num.startswith('1'):
+            assets[account] = debit_balance
+        
+        # Liabilities (2xxx) - credits increase
+        elif account_num.startswith('2'):
+            liabilities[account] = credit_balance
+        
+        # Equity (3xxx) - credits increase
+        elif account_num.startswith('3'):
+            equity[account] = credit_balance
+        
+        # Revenue (8xxx)
+        elif account_num.startswith('8'):
+            revenue += credit_balance
+        
+        # Expenses (5xxx, 6xxx, 7xxx)
+        elif account_num.startswith(('5', '6', '7')):
+            expenses += debit_balance
     
     net_income = revenue - expenses
     
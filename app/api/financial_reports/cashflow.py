@@ -1,9 +1,9 @@
 """Cash Flow Statement generation (indirect method)."""
-from datetime import date
+from datetime import date, timedelta
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.db.models import JournalEntryDB
+from app.db.account_balances import balances_as_of, period_totals
+from app.db.journal_lines import from_cents
 from app.api.financial_reports.pnl import generate_pnl
 
 
@@ -33,27 +33,18 @@ def generate_cashflow(
     pnl = generate_pnl(db, company_id, start_date, end_date)
     net_income = pnl['net_income']
     
-    # Get journal entries for the period
-    jes = db.query(JournalEntryDB).filter(
-        and_(
-            JournalEntryDB.company_id == company_id,
-            JournalEntryDB.status == "posted",
-            JournalEntryDB.date >= start_date,
-            JournalEntryDB.date <= end_date
-        )
-    ).all()
+    # Per-account totals for the period from the daily balance snapshots
+    totals = period_totals(db, company_id, start_date, end_date)
     
     # Calculate adjustments (non-cash items)
     depreciation_amortization = 0.0
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            account_lower = account.lower()
-            
-            # Identify depreciation/amortization
-            if 'depreciation' in account_lower or 'amortization' in account_lower:
-                depreciation_amortization += line['debit'] - line['credit']
+    for account, (debit_cents, credit_cents) in totals.items():
+        account_lower = account.lower()
+        
+        # Identify depreciation/amortization
+        if 'depreciation' in account_lower or 'amortization' in account_lower:
+            depreciation_amortization += from_cents(debit_cents - credit_cents)
     
     # Working capital changes (simplified)
     # In a full implementation, we'd calculate ΔAR, ΔAP, ΔInventory, etc.
@@ -135,30 +126,15 @@ def _get_cash_balance(
         Cash balance
     """
     if before:
-        jes = db.query(JournalEntryDB).filter(
-            and_(
-                JournalEntryDB.company_id == company_id,
-                JournalEntryDB.status == "posted",
-                JournalEntryDB.date < as_of_date
-            )
-        ).all()
+        totals = balances_as_of(db, company_id, as_of_date - timedelta(days=1))
     else:
-        jes = db.query(JournalEntryDB).filter(
-            and_(
-                JournalEntryDB.company_id == company_id,
-                JournalEntryDB.status == "posted",
-                JournalEntryDB.date <= as_of_date
-            )
-        ).all()
+        totals = balances_as_of(db, company_id, as_of_date)
     
     cash_balance = 0.0
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            # Cash accounts typically start with 1000
-            if 'Cash' in account or account.startswith('1000'):
-                cash_balance += line['debit'] - line['credit']
+    for account, (debit_cents, credit_cents) in totals.items():
+        # Cash accounts typically start with 1000
+        if 'Cash' in account or account.startswith('1000'):
+            cash_balance += from_cents(debit_cents - credit_cents)
     
     return cash_balance
-
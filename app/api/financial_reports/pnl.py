@@ -2,8 +2,8 @@
 from datetime import date, datetime
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.db.models import JournalEntryDB
+from app.db.account_balances import period_totals
+from app.db.journal_lines import from_cents
 
 
 def generate_pnl(
@@ -24,36 +24,22 @@ def generate_pnl(
     Returns:
         P&L data structure
     """
-    # Get posted journal entries
-    jes = db.query(JournalEntryDB).filter(
-        and_(
-            JournalEntryDB.company_id == company_id,
-            JournalEntryDB.status == "posted",
-            JournalEntryDB.date >= start_date,
-            JournalEntryDB.date <= end_date
-        )
-    ).all()
+    # Per-account totals for the period from the daily balance snapshots
+    totals = period_totals(db, company_id, start_date, end_date)
     
-    # Calculate account balances
     revenue = {}
     expenses = {}
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            account_num = account.split()[0] if ' ' in account else account
-            
-            # Revenue accounts (8xxx) - credits increase revenue
-            if account_num.startswith('8'):
-                if account not in revenue:
-                    revenue[account] = 0.0
-                revenue[account] += line['credit'] - line['debit']
-            
-            # Expense accounts (5xxx, 6xxx, 7xxx) - debits increase expenses
-            elif account_num.startswith(('5', '6', '7')):
-                if account not in expenses:
-                    expenses[account] = 0.0
-                expenses[account] += line['debit'] - line['credit']
+    for account, (debit_cents, credit_cents) in totals.items():
+        account_num = account.split()[0] if ' ' in account else account
+        
+        # Revenue accounts (8xxx) - credits increase revenue
+        if account_num.startswith('8'):
+            revenue[account] = from_cents(credit_cents - debit_cents)
+        
+        # Expense accounts (5xxx, 6xxx, 7xxx) - debits increase expenses
+        elif account_num.startswith(('5', '6', '7')):
+            expenses[account] = from_cents(debit_cents - credit_cents)
     
     total_revenue = sum(revenue.values())
     total_expenses = sum(expenses.values())
@@ -21,6 +21,7 @@ from pydantic import BaseModel, EmailStr
 import uuid
 
 from app.db.session import get_db
+from app.ingestion.extraction_cache import PARSER_VERSIONS, extraction_cache
 from app.models.free_tool import FreeUploadDB, FreeLeadDB, ConsentLogDB
 
 router = APIRouter(prefix="/api/free/categorizer", tags=["free-categorizer"])
@@ -30,6 +31,14 @@ FREE_MAX_FILE_MB = int(os.getenv("FREE_MAX_FILE_MB", "10"))
 FREE_RETENTION_HOURS = int(os.getenv("FREE_RETENTION_HOURS", "24"))
 ADMIN_PURGE_TOKEN = os.getenv("ADMIN_PURGE_TOKEN", "")
 
+# Upload parser per sniffed MIME type (extraction cache lookups)
+MIME_PARSERS = {
+    'text/csv': 'csv',
+    'application/x-ofx': 'ofx',
+    'application/vnd.intu.qfx': 'ofx',
+    'application/pdf': 'pdf',
+}
+
 
 class UploadResponse(BaseModel):
     """Upload response"""
@@ -130,6 +139,11 @@ async def upload_file(
     # File hash
     file_hash = hashlib.sha256(content).hexdigest()
     
+    # Same file parsed before: report its row count without parsing again
+    parser = MIME_PARSERS.get(mime)
+    cached_rows = extraction_cache.get(file_hash, parser, PARSER_VERSIONS[parser]) if parser else None
+    row_count = len(cached_rows) if cached_rows is not None else None
+    
     # Calculate expiration
     expires_at = datetime.utcnow() + timedelta(hours=FREE_RETENTION_HOURS)
     
@@ -151,12 +165,13 @@ async def upload_file(
         size_bytes=size_bytes,
         mime_type=mime,
         source_ext=file.filename.split('.')[-1] if file.filename else "unknown",
+        row_count=row_count,
         consent_training=consent_training,
         consent_ts=datetime.utcnow() if consent_training else None,
         ip_hash=ip_hash,
         file_hash=file_hash,
         retention_scope='ephemeral',
-        metadata={"original_mime": file.content_type}
+        metadata={"original_mime": file.content_type, "extraction_cache_hit": cached_rows is not None}
     )
     
     db.add(upload_record)
@@ -179,7 +194,8 @@ async def upload_file(
         uploadId=upload_id,
         filename=file.filename or "unknown",
         size_bytes=size_bytes,
-        mime_type=mime
+        mime_type=mime,
+        row_count=row_count
     )
 
 
@@ -21,12 +21,13 @@ from app.vendor_knowledge.embeddings import vendor_kb
 from app.llm.categorize_post import llm_categorizer
 from app.recon.matcher import ReconciliationMatcher
 from app.exporters.csv_export import (
-    export_journal_entries_csv,
-    export_reconciliation_csv,
-    export_general_ledger_csv,
-    export_trial_balance_csv
+    iter_journal_entries_csv,
+    iter_reconciliation_csv,
+    iter_general_ledger_csv,
+    iter_trial_balance_csv
 )
 from app.exporters.quickbooks_export import QuickBooksExporter, XeroExporter
+from app.exporters.streaming import session_chunks, streaming_export
 from app.importers.quickbooks_import import QuickBooksImporter, XeroImporter
 from app.api import auth as auth_router
 from app.api.financial_reports.pnl import generate_pnl
@@ -35,7 +36,6 @@ from app.api.financial_reports.cashflow import generate_cashflow
 from app.api.financial_reports.automation_metrics import get_automation_metrics, get_automation_trend
 from app.auth.security import get_company_id_from_token, require_role, get_current_user
 from config.settings import settings
-from io import StringIO
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +49,12 @@ app = FastAPI(
     servers=[{"url": "https://api.ai-bookkeeper.app", "description": "Production"}]
 )
 
+
+@app.on_event("shutdown")
+def save_vendor_knowledge():
+    """Persist unsaved vendor knowledge namespaces."""
+    vendor_kb.save()
+
 # ============================================================================
 # CORS Configuration
 # ============================================================================
@@ -622,10 +628,51 @@ async def root():
     }
 
 
+def _store_uploaded_transactions(db: Session, transactions: List, tenant_id: Optional[str]) -> int:
+    """
+    Upsert parsed statement transactions and sketch the new ones for drift.
+    
+    Re-uploading a statement (same txn_ids) updates the stored rows without
+    counting them again in the drift sketches.
+    
+    Returns:
+        Number of newly inserted transactions
+    """
+    from app.ml import drift_sketches
+    
+    seen = {
+        txn_id for (txn_id,) in db.query(TransactionDB.txn_id).filter(
+            TransactionDB.txn_id.in_([txn.txn_id for txn in transactions])
+        )
+    }
+    
+    ingested = []
+    for txn in transactions:
+        db_txn = TransactionDB(
+            txn_id=txn.txn_id,
+            date=datetime.strptime(txn.date, "%Y-%m-%d").date(),
+            amount=txn.amount,
+            currency=txn.currency,
+            description=txn.description,
+            counterparty=txn.counterparty,
+            raw=txn.raw,
+            doc_ids=txn.doc_ids
+        )
+        if txn.txn_id not in seen:
+            seen.add(txn.txn_id)
+            db_txn.company_id = tenant_id
+            ingested.append(db_txn)
+        db.merge(db_txn)
+    
+    drift_sketches.record_transactions(db, ingested, company_id=tenant_id)
+    return len(ingested)
+
+
 @app.post("/api/upload")
 async def upload_statement(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
 ):
     """
     Upload Bank Statement - Multi-Format Transaction Ingestion
@@ -643,13 +690,15 @@ async def upload_statement(
     Flow:
         1. Save uploaded file temporarily
         2. Detect format from file extension
-        3. Parse transactions using format-specific parser
+        3. Parse transactions using format-specific parser, unless the same
+           file (SHA-256) was already parsed by this parser version
         4. Save transactions to database
         5. Return parsed transaction list
     
     Args:
         file: Uploaded file (multipart/form-data)
         db: Database session (injected)
+        current_user: Authenticated user, if any (new rows get their tenant)
     
     Returns:
         {
@@ -674,36 +723,36 @@ async def upload_statement(
         f.write(content)
     
     try:
+        from app.ingestion.extraction_cache import PARSER_VERSIONS, extraction_cache, transaction_rows
+        
         # Parse based on file extension
         if file.filename.endswith('.csv'):
-            transactions = parse_csv_statement(temp_path)
+            parser, parse = "csv", lambda: parse_csv_statement(temp_path)
         elif file.filename.endswith('.ofx'):
             from app.ingest.ofx_parser import parse_ofx_statement
-            transactions = parse_ofx_statement(temp_path)
+            parser, parse = "ofx", lambda: parse_ofx_statement(temp_path)
         elif file.filename.endswith('.pdf'):
             from app.ingest.pdf_bank_parser import parse_pdf_statement
-            transactions = parse_pdf_statement(temp_path)
+            parser, parse = "pdf", lambda: parse_pdf_statement(temp_path)
         else:
             raise HTTPException(status_code=400, detail="Unsupported file format")
         
-        # Save transactions to database
-        for txn in transactions:
-            db_txn = TransactionDB(
-                txn_id=txn.txn_id,
-                date=datetime.strptime(txn.date, "%Y-%m-%d").date(),
-                amount=txn.amount,
-                currency=txn.currency,
-                description=txn.description,
-                counterparty=txn.counterparty,
-                raw=txn.raw,
-                doc_ids=txn.doc_ids
-            )
-            db.merge(db_txn)
+        # Re-uploaded files skip parsing (and PDF text/OCR extraction) entirely
+        rows, cache_hit = extraction_cache.get_or_extract(
+            content, parser, PARSER_VERSIONS[parser], lambda: transaction_rows(parse())
+        )
+        transactions = [Transaction(**row) for row in rows]
         
+        tenant_ids = current_user.tenant_ids if hasattr(current_user, 'tenant_ids') else []
+        tenant_id = tenant_ids[0] if isinstance(tenant_ids, list) and tenant_ids else None
+        
+        # Save transactions to database
+        _store_uploaded_transactions(db, transactions, tenant_id)
         db.commit()
         
         return {
             "message": f"Uploaded and parsed {len(transactions)} transactions",
+            "cache_hit": cache_hit,
             "transactions": [txn.model_dump() for txn in transactions]
         }
     
@@ -836,6 +885,9 @@ async def propose_journal_entries(
         return {"message": "No transactions to process", "proposed": []}
     
     proposed_jes = []
+    txns = []
+    llm_results = []
+    llm_pending = []  # (position, similar) for transactions needing the LLM
     
     for db_txn in db_txns:
         # Convert to Pydantic model
@@ -858,28 +910,37 @@ async def propose_journal_entries(
         if rule_match and rule_match.get('matched') and rule_match.get('confidence', 0) >= 0.9:
             # High confidence rule match
             logger.info(f"  ✓ Matched by rule: {rule_match['account']}")
-            llm_result = _create_simple_je_from_rule(txn, rule_match)
+            llm_results.append(_create_simple_je_from_rule(txn, rule_match))
         else:
             # Tier 2: Check embeddings memory
             similar = vendor_kb.find_similar(
                 txn.counterparty or "",
                 txn.description,
-                n_results=3
+                n_results=3,
+                namespace=tenant_id
             )
             
-            historical_mappings = []
             if similar:
                 logger.info(f"  ✓ Found {len(similar)} similar transactions")
-                historical_mappings = similar
             
-            # Tier 3: LLM
-            logger.info(f"  → Using LLM categorization")
-            llm_result = llm_categorizer.categorize_transaction(
-                txn,
-                CHART_OF_ACCOUNTS,
-                historical_mappings
-            )
+            llm_pending.append((len(txns), similar or []))
+            llm_results.append(None)
         
+        txns.append(txn)
+    
+    # Tier 3: LLM, batched and concurrent (cached vendors skip the model)
+    if llm_pending:
+        logger.info(f"  → Using LLM categorization for {len(llm_pending)} transactions")
+        batch_results = await llm_categorizer.categorize_batch_async(
+            [txns[pos] for pos, _ in llm_pending],
+            CHART_OF_ACCOUNTS,
+            [similar for _, similar in llm_pending],
+            namespace=tenant_id
+        )
+        for (pos, _), llm_result in zip(llm_pending, batch_results):
+            llm_results[pos] = llm_result
+    
+    for txn, llm_result in zip(txns, llm_results):
         # Create JournalEntry
         je = llm_categorizer.create_journal_entry(txn, llm_result)
         
@@ -964,21 +1025,98 @@ def _create_simple_je_from_rule(txn: Transaction, rule_match: dict) -> dict:
     }
 
 
+@app.post("/api/post/propose/bulk")
+async def propose_journal_entries_bulk(
+    request: Request,
+    response: Response,
+    txn_ids: Optional[List[str]] = None,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Propose journal entries for large transaction sets.
+
+    Same waterfall as /api/post/propose (rules -> ML -> LLM), run over
+    chunks of transactions with one rules pass, one ML batch call and one
+    batched LLM call per chunk, and bulk inserts for the journal entries.
+    Entries are not returned; review them via /api/review.
+
+    Args:
+        txn_ids: Optional list of transaction IDs (default: all unprocessed)
+        stream: Stream NDJSON progress events instead of waiting for the summary
+
+    Returns:
+        {"event": "done", "proposed", "by_method", "review_needed", "elapsed_seconds"}
+        (the last line of the stream when stream=true)
+    """
+    import json
+    from fastapi.responses import StreamingResponse
+    from app.decision.bulk_propose import BulkProposer
+    from app.middleware.entitlements import check_entitlements, add_quota_headers, log_usage
+    from app.ml.classifier import get_classifier
+
+    entitlements = await check_entitlements(request, current_user, db, enforce_quota=True)
+
+    tenant_ids = current_user.tenant_ids if hasattr(current_user, 'tenant_ids') else []
+    tenant_id = tenant_ids[0] if isinstance(tenant_ids, list) and tenant_ids else None
+
+    proposer = BulkProposer(
+        db,
+        CHART_OF_ACCOUNTS,
+        rules_engine=rules_engine,
+        classifier=get_classifier(),
+        llm_categorizer=llm_categorizer,
+        knowledge_base=vendor_kb,
+        namespace=tenant_id
+    )
+
+    async def events():
+        async for event in proposer.run(txn_ids):
+            if event["event"] == "done" and tenant_id and event["proposed"]:
+                log_usage(tenant_id, "propose", event["proposed"], db)
+            yield event
+
+    add_quota_headers(response, entitlements)
+
+    if stream:
+        async def ndjson():
+            async for event in events():
+                yield json.dumps(event) + "\n"
+
+        return StreamingResponse(
+            ndjson(),
+            media_type="application/x-ndjson",
+            headers=dict(response.headers)
+        )
+
+    summary = None
+    async for event in events():
+        summary = event
+
+    return summary
+
+
 @app.post("/api/post/approve")
 async def approve_journal_entries(
     je_ids: List[str],
     action: str = "approve",  # approve or post
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
 ):
     """
     Approve or post journal entries.
     
     - approve: Mark as approved
-    - post: Mark as posted and add to vendor knowledge
+    - post: Mark as posted and add to vendor knowledge (the tenant's
+      namespace, the same one /api/post/propose reads)
     """
     if action not in ["approve", "post"]:
         raise HTTPException(status_code=400, detail="Action must be 'approve' or 'post'")
     
+    tenant_ids = current_user.tenant_ids if hasattr(current_user, 'tenant_ids') else []
+    tenant_id = tenant_ids[0] if isinstance(tenant_ids, list) and tenant_ids else None
+    
     jes = db.query(JournalEntryDB).filter(JournalEntryDB.je_id.in_(je_ids)).all()
     
     if not jes:
@@ -1013,7 +1151,8 @@ async def approve_journal_entries(
                                 description=txn.description,
                                 account=line['account'],
                                 category="",
-                                txn_id=txn.txn_id
+                                txn_id=txn.txn_id,
+                                namespace=tenant_id
                             )
                             break
         
@@ -1022,6 +1161,10 @@ async def approve_journal_entries(
     
     db.commit()
     
+    if action == "post":
+        # Persist new history so it survives restarts (index backend)
+        vendor_kb.save()
+    
     return {
         "message": f"{action.capitalize()}d {len(updated)} journal entries",
         "updated": updated
@@ -1216,14 +1359,32 @@ async def get_chart_of_accounts():
 
 
 @app.post("/api/reconcile/run")
-async def run_reconciliation(db: Session = Depends(get_db)):
+async def run_reconciliation(
+    mode: str = "greedy",
+    company_id: Optional[str] = None,
+    full_rebuild: bool = False,
+    db: Session = Depends(get_db)
+):
     """
     Run reconciliation to match transactions with journal entries.
     
+    Query params:
+    - mode: "greedy" (first match wins) or "optimal" (best assignment for ties)
+    - company_id: Reconcile one company incrementally (only rows changed
+      since its last run); omit to rebuild everything
+    - full_rebuild: With company_id, discard that company's matches and
+      rebuild them from scratch
+    
     Returns reconciliation results and statistics.
     """
+    if mode not in ("greedy", "optimal"):
+        raise HTTPException(status_code=400, detail="mode must be 'greedy' or 'optimal'")
+    
     matcher = ReconciliationMatcher(db)
-    results = matcher.reconcile_all()
+    if company_id and not full_rebuild:
+        results = matcher.reconcile_incremental(company_id, mode=mode)
+    else:
+        results = matcher.reconcile_all(mode=mode, company_id=company_id)
     
     return results
 
@@ -1301,35 +1462,36 @@ async def review_page(request: Request, db: Session = Depends(get_db)):
     })
 
 
+def _export_date(value: Optional[str], name: str) -> Optional[str]:
+    """Validate an export date (YYYY-MM-DD) before the response starts streaming."""
+    if value:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"{name} must be a date (YYYY-MM-DD)")
+    return value
+
+
+# Export bodies stream after the handler returns, so each reads through
+# its own session (session_chunks), not the request's Depends(get_db) one.
+
 @app.get("/api/export/journal-entries")
-async def export_jes(status: Optional[str] = None, db: Session = Depends(get_db)):
-    """Export journal entries to CSV."""
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    export_journal_entries_csv(db, output, status)
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=journal_entries_{datetime.now().strftime('%Y%m%d')}.csv"}
+async def export_jes(status: Optional[str] = None, gzip: bool = False):
+    """Export journal entries to CSV (streamed; gzip=true for a .csv.gz download)."""
+    return streaming_export(
+        session_chunks(lambda db: iter_journal_entries_csv(db, status)),
+        f"journal_entries_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
 @app.get("/api/export/reconciliation")
-async def export_recon(db: Session = Depends(get_db)):
-    """Export reconciliation results to CSV."""
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    export_reconciliation_csv(db, output)
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=reconciliation_{datetime.now().strftime('%Y%m%d')}.csv"}
+async def export_recon(gzip: bool = False):
+    """Export reconciliation results to CSV (streamed)."""
+    return streaming_export(
+        session_chunks(iter_reconciliation_csv),
+        f"reconciliation_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
@@ -1337,83 +1499,62 @@ async def export_recon(db: Session = Depends(get_db)):
 async def export_gl(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db)
+    gzip: bool = False
 ):
-    """Export general ledger to CSV."""
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    export_general_ledger_csv(db, output, start_date, end_date)
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=general_ledger_{datetime.now().strftime('%Y%m%d')}.csv"}
+    """Export general ledger to CSV (streamed)."""
+    start_date = _export_date(start_date, "start_date")
+    end_date = _export_date(end_date, "end_date")
+    return streaming_export(
+        session_chunks(lambda db: iter_general_ledger_csv(db, start_date, end_date)),
+        f"general_ledger_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
 @app.get("/api/export/trial-balance")
-async def export_tb(as_of_date: Optional[str] = None, db: Session = Depends(get_db)):
+async def export_tb(as_of_date: Optional[str] = None, gzip: bool = False):
     """Export trial balance to CSV."""
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    export_trial_balance_csv(db, output, as_of_date)
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=trial_balance_{datetime.now().strftime('%Y%m%d')}.csv"}
+    as_of_date = _export_date(as_of_date, "as_of_date")
+    return streaming_export(
+        session_chunks(lambda db: iter_trial_balance_csv(db, as_of_date)),
+        f"trial_balance_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
 @app.post("/api/export/quickbooks")
-async def export_quickbooks(format: str = "iif", status: str = "posted", db: Session = Depends(get_db)):
+async def export_quickbooks(format: str = "iif", status: str = "posted", gzip: bool = False):
     """
-    Export journal entries to QuickBooks format.
+    Export journal entries to QuickBooks format (streamed).
     
     Args:
         format: Export format ('iif' for QuickBooks Desktop, 'csv' for QBO)
         status: Filter by status (posted, approved)
+        gzip: Compress the download
     """
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    
     if format == "iif":
-        QuickBooksExporter.export_to_iif(db, output, status)
-        media_type = "text/plain"
-        filename = f"quickbooks_export_{datetime.now().strftime('%Y%m%d')}.iif"
-    else:
-        # For now, use same as Xero CSV format
-        XeroExporter.export_to_csv(db, output, status)
-        media_type = "text/csv"
-        filename = f"quickbooks_export_{datetime.now().strftime('%Y%m%d')}.csv"
-    
-    output.seek(0)
+        return streaming_export(
+            session_chunks(lambda db: QuickBooksExporter.iter_iif(db, status)),
+            f"quickbooks_export_{datetime.now().strftime('%Y%m%d')}.iif",
+            media_type="text/plain",
+            gzip=gzip
+        )
     
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    # For now, use same as Xero CSV format
+    return streaming_export(
+        session_chunks(lambda db: XeroExporter.iter_csv(db, status)),
+        f"quickbooks_export_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
 @app.post("/api/export/xero")
-async def export_xero(status: str = "posted", db: Session = Depends(get_db)):
-    """Export journal entries to Xero CSV format."""
-    from fastapi.responses import StreamingResponse
-    
-    output = StringIO()
-    XeroExporter.export_to_csv(db, output, status)
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=xero_export_{datetime.now().strftime('%Y%m%d')}.csv"}
+async def export_xero(status: str = "posted", gzip: bool = False):
+    """Export journal entries to Xero CSV format (streamed)."""
+    return streaming_export(
+        session_chunks(lambda db: XeroExporter.iter_csv(db, status)),
+        f"xero_export_{datetime.now().strftime('%Y%m%d')}.csv",
+        gzip=gzip
     )
 
 
@@ -1517,6 +1658,13 @@ async def get_trend(
     return get_automation_trend(db, company_id, days)
 
 
+@app.get("/api/ingestion/extraction-cache/stats")
+async def get_extraction_cache_stats():
+    """Extraction cache hit/miss counters (per parser) since process start."""
+    from app.ingestion.extraction_cache import extraction_cache
+    return extraction_cache.stats()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
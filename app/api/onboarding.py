@@ -24,6 +24,7 @@ import random
 
 from app.db.session import get_db
 from app.db.models import TransactionDB, CompanyDB
+from app.ml import drift_sketches
 from app.auth.security import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -130,6 +131,7 @@ async def seed_demo_data(
         db.add(txn)
         transactions.append(txn)
     
+    drift_sketches.record_transactions(db, transactions)
     db.commit()
     
     logger.info(f"Created {len(transactions)} demo transactions")
@@ -6,95 +6,129 @@ Endpoints for receipt listing and bounding box overlays.
 import logging
 import glob
 import os
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.db.models import ReceiptFieldDB
+from app.db.models import ReceiptDB, ReceiptFieldDB
 from app.ocr.parser import extract_with_bboxes
+from app.ocr.receipt_index import field_rows_from_bboxes, upsert_receipts
 
 
 router = APIRouter(prefix="/api/receipts", tags=["receipts"])
 logger = logging.getLogger(__name__)
 
+MAX_PAGE_SIZE = 200
+
 
 @router.get("/")
 async def list_receipts(
     tenant_id: Optional[str] = None,
+    vendor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """
-    List available receipts.
-    
-    Returns basic receipt metadata for UI listing.
+    List indexed receipts, newest first (undated receipts last).
+    
+    Reads the receipts index written at ingest (app/ocr/receipt_index.py);
+    nothing is extracted per request. Run scripts/index_receipts.py to
+    backfill receipts ingested before the index existed.
+    
+    Args:
+        tenant_id: Only this tenant's receipts
+        vendor: Case-insensitive vendor substring
+        date_from: Earliest receipt date (inclusive)
+        date_to: Latest receipt date (inclusive)
+        min_amount: Smallest amount (inclusive)
+        max_amount: Largest amount (inclusive)
+        limit: Page size (max 200)
+        offset: Receipts to skip
+    
+    Returns:
+        Page of receipts, with the total number of matches
     """
-    # In production, query from receipts table
-    # For now, list from fixtures
-    
-    base_path = "tests/fixtures/receipts_pdf"
+    query = db.query(ReceiptDB)
     if tenant_id:
-        pattern = f"{base_path}/{tenant_id}/*.pdf"
-    else:
-        pattern = f"{base_path}/*/*.pdf"
-    
-    pdf_files = glob.glob(pattern)
-    
-    receipts = []
-    for pdf_path in pdf_files[:50]:  # Limit to 50 for performance
-        parts = pdf_path.split('/')
-        tenant = parts[-2]
-        filename = os.path.basename(pdf_path)
-        receipt_id = filename.replace('.pdf', '').replace('receipt_', '')
-        
-        # Try to extract basic info
-        txt_path = pdf_path.replace('receipts_pdf', 'receipts').replace('.pdf', '.txt')
-        vendor = "Unknown"
-        date = None
-        amount = None
-        
-        if os.path.exists(txt_path):
-            try:
-                fields = extract_with_bboxes(txt_path)
-                vendor = fields.get('vendor', {}).get('value', 'Unknown')
-                date = fields.get('date', {}).get('value')
-                amount = fields.get('amount', {}).get('value') or fields.get('total', {}).get('value')
-            except:
-                pass
-        
-        receipts.append({
-            "id": receipt_id,
-            "tenant_id": tenant,
-            "vendor": vendor,
-            "date": date,
-            "amount": amount,
-            "filename": filename
-        })
-    
-    return {"receipts": receipts, "count": len(receipts)}
+        query = query.filter(ReceiptDB.tenant_id == tenant_id)
+    if vendor:
+        query = query.filter(ReceiptDB.vendor_key.contains(vendor.lower(), autoescape=True))
+    if date_from:
+        query = query.filter(ReceiptDB.receipt_date >= date_from)
+    if date_to:
+        query = query.filter(ReceiptDB.receipt_date <= date_to)
+    if min_amount is not None:
+        query = query.filter(ReceiptDB.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(ReceiptDB.amount <= max_amount)
+    
+    total = query.count()
+    rows = query.order_by(
+        ReceiptDB.receipt_date.desc().nulls_last(), ReceiptDB.id.desc()
+    ).offset(offset).limit(limit).all()
+    
+    receipts = [
+        {
+            "id": row.receipt_id,
+            "tenant_id": row.tenant_id,
+            "vendor": row.vendor or "Unknown",
+            "date": row.receipt_date.isoformat() if row.receipt_date else None,
+            "amount": row.amount,
+            "filename": row.filename
+        }
+        for row in rows
+    ]
+    
+    return {
+        "receipts": receipts,
+        "count": len(receipts),
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
 
 
 @router.get("/{receipt_id}/fields")
 async def get_receipt_fields(
     receipt_id: str,
+    tenant_id: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Get bounding boxes for receipt fields.
     
-    Returns field overlays with normalized coordinates (0-1).
+    Returns field overlays with normalized coordinates (0-1). Receipt IDs
+    repeat across tenants, so fields are read for one tenant: tenant_id,
+    or the receipt's tenant in the index when only one tenant has it.
     """
-    # Check if already in DB
-    fields_db = db.query(ReceiptFieldDB).filter_by(
-        receipt_id=receipt_id
+    if tenant_id is None:
+        tenants = [t for (t,) in db.query(ReceiptDB.tenant_id).filter(
+            ReceiptDB.receipt_id == receipt_id
+        ).limit(2)]
+        if len(tenants) == 1:
+            tenant_id = tenants[0]
+    
+    # Check if already in DB (tenant_id None matches unscoped legacy rows)
+    fields_db = db.query(ReceiptFieldDB).filter(
+        ReceiptFieldDB.tenant_id == tenant_id,
+        ReceiptFieldDB.receipt_id == receipt_id
     ).all()
     
     if fields_db:
         return {
             "receipt_id": receipt_id,
+            "tenant_id": tenant_id,
             "fields": [
                 {
                     "name": f.field,
+                    "value": f.value,
                     "bbox": {
                         "x": f.x,
                         "y": f.y,
@@ -110,50 +144,37 @@ async def get_receipt_fields(
     
     # Extract from receipt text
     # Find receipt file in fixtures
-    receipt_pattern = f"tests/fixtures/receipts/**/receipt_{receipt_id}.txt"
-    txt_files = glob.glob(receipt_pattern, recursive=True)
-    
-    if not txt_files:
-        # Try without receipt_ prefix
-        receipt_pattern = f"tests/fixtures/receipts/**/{receipt_id}.txt"
-        txt_files = glob.glob(receipt_pattern, recursive=True)
+    txt_path = _find_fixture("tests/fixtures/receipts", tenant_id, receipt_id, "txt")
     
-    if not txt_files:
+    if not txt_path:
         logger.warning(f"Receipt not found: {receipt_id}")
-        return {"receipt_id": receipt_id, "fields": []}
-    
-    txt_path = txt_files[0]
+        return {"receipt_id": receipt_id, "tenant_id": tenant_id, "fields": []}
     
     # Extract with bboxes
     try:
         result = extract_with_bboxes(txt_path)
     except Exception as e:
         logger.error(f"Error extracting bboxes for {receipt_id}: {e}")
-        return {"receipt_id": receipt_id, "fields": [], "error": str(e)}
-    
-    # Store in DB for caching
-    for field_name, data in result.items():
-        bbox = data["bbox"]
-        field_db = ReceiptFieldDB(
-            receipt_id=receipt_id,
-            field=field_name,
-            page=bbox["page"],
-            x=bbox["x"],
-            y=bbox["y"],
-            w=bbox["w"],
-            h=bbox["h"],
-            confidence=data.get("confidence", 0.85)
-        )
-        db.add(field_db)
+        return {"receipt_id": receipt_id, "tenant_id": tenant_id, "fields": [], "error": str(e)}
     
+    # Index the receipt so later reads (and listings) skip extraction
+    tenant_id = os.path.basename(os.path.dirname(txt_path))
     try:
+        upsert_receipts(db, [{
+            "tenant_id": tenant_id,
+            "receipt_id": receipt_id,
+            "filename": os.path.basename(txt_path).replace('.txt', '.pdf'),
+            "file_path": txt_path,
+            "fields": field_rows_from_bboxes(result)
+        }])
         db.commit()
     except Exception as e:
-        logger.warning(f"Could not cache bboxes for {receipt_id}: {e}")
+        logger.warning(f"Could not index receipt {receipt_id}: {e}")
         db.rollback()
     
     return {
         "receipt_id": receipt_id,
+        "tenant_id": tenant_id,
         "fields": [
             {
                 "name": name,
@@ -166,8 +187,18 @@ async def get_receipt_fields(
     }
 
 
+def _find_fixture(root: str, tenant_id: Optional[str], receipt_id: str, ext: str) -> Optional[str]:
+    """Fixture file for a receipt (<root>/<tenant>/[receipt_]<id>.<ext>), if any."""
+    tenant_dir = tenant_id or "**"
+    for name in (f"receipt_{receipt_id}", receipt_id):
+        matches = sorted(glob.glob(f"{root}/{tenant_dir}/{name}.{ext}", recursive=True))
+        if matches:
+            return matches[0]
+    return None
+
+
 @router.get("/{receipt_id}/pdf")
-async def get_receipt_pdf(receipt_id: str):
+async def get_receipt_pdf(receipt_id: str, tenant_id: Optional[str] = None):
     """
     Serve receipt PDF for viewing.
     
@@ -176,18 +207,13 @@ async def get_receipt_pdf(receipt_id: str):
     from fastapi.responses import FileResponse
     
     # Find PDF in fixtures
-    pdf_pattern = f"tests/fixtures/receipts_pdf/**/receipt_{receipt_id}.pdf"
-    pdf_files = glob.glob(pdf_pattern, recursive=True)
-    
-    if not pdf_files:
-        pdf_pattern = f"tests/fixtures/receipts_pdf/**/{receipt_id}.pdf"
-        pdf_files = glob.glob(pdf_pattern, recursive=True)
+    pdf_path = _find_fixture("tests/fixtures/receipts_pdf", tenant_id, receipt_id, "pdf")
     
-    if not pdf_files:
+    if not pdf_path:
         raise HTTPException(status_code=404, detail="Receipt PDF not found")
     
     return FileResponse(
-        pdf_files[0],
+        pdf_path,
         media_type="application/pdf",
         filename=f"receipt_{receipt_id}.pdf"
     )
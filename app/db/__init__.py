@@ -1,2 +1,5 @@
 """Database package."""
 
+# Keep JournalEntryLineDB in sync with JournalEntryDB.lines on every flush
+# (registers a Session listener; models.py must not import it back)
+from app.db import journal_lines  # noqa: E402,F401
@@ -0,0 +1,241 @@
+"""
+Daily cumulative account balance snapshots for financial reports.
+
+AccountBalanceDailyDB holds, per (company, account, day with posted
+activity), the debit and credit totals of every posted journal line dated
+on or before that day. A balance as of any date is the nearest snapshot at
+or before it, so reports cost O(accounts) regardless of ledger age, and a
+period total is the difference of two such balances.
+
+Snapshots are maintained from journal_entry_lines changes by
+app/db/journal_lines.py (same flush, Core statements only). A backdated
+posting shifts every later snapshot of its account with one UPDATE.
+Writers of one account are serialized for the rest of their transaction
+(see _lock_account), so a new snapshot never starts from a cumulative row
+that a concurrent backdated posting is about to shift.
+"""
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import AccountBalanceDailyDB, JournalEntryLineDB
+
+logger = logging.getLogger(__name__)
+
+# Only posted lines count towards reported balances
+POSTED = 'posted'
+
+# (company_id, account, day) -> (debit_cents, credit_cents)
+Deltas = Dict[Tuple[str, str, date], Tuple[int, int]]
+
+
+def _day(value: Any) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def line_deltas(rows: Iterable[Any], sign: int = 1) -> Deltas:
+    """
+    Aggregate journal line rows into per-(company, account, day) deltas.
+
+    Args:
+        rows: Line rows (dicts or row objects) with company_id, account,
+            date, status, debit_cents and credit_cents
+        sign: 1 to add the lines, -1 to remove them
+
+    Returns:
+        Deltas for posted lines only
+    """
+    deltas: Dict[Tuple[str, str, date], list] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        get = row.get if isinstance(row, dict) else lambda k: getattr(row, k)
+        if get('status') != POSTED:
+            continue
+        key = (get('company_id') or '', get('account'), _day(get('date')))
+        deltas[key][0] += sign * get('debit_cents')
+        deltas[key][1] += sign * get('credit_cents')
+    return {key: (d, c) for key, (d, c) in deltas.items() if d or c}
+
+
+def merge_deltas(*parts: Deltas) -> Deltas:
+    """Sum several delta maps, dropping entries that cancel out."""
+    merged: Dict[Tuple[str, str, date], list] = defaultdict(lambda: [0, 0])
+    for part in parts:
+        for key, (debit, credit) in part.items():
+            merged[key][0] += debit
+            merged[key][1] += credit
+    return {key: (d, c) for key, (d, c) in merged.items() if d or c}
+
+
+def _lock_account(db: Session, company_id: str, account: str) -> None:
+    """
+    Hold an account's snapshots against concurrent writers until commit.
+
+    PostgreSQL takes a transaction-scoped advisory lock (a row lock would
+    miss an account with no snapshot yet); SQLite needs none, as the
+    first UPDATE in apply_deltas takes its database write lock.
+    """
+    if db.get_bind().dialect.name != 'postgresql':
+        return
+    digest = hashlib.sha256(f"account_balances:{company_id}:{account}".encode()).digest()
+    db.execute(select(func.pg_advisory_xact_lock(int.from_bytes(digest[:8], 'big', signed=True))))
+
+
+def apply_deltas(db: Session, deltas: Deltas) -> None:
+    """
+    Shift cumulative snapshots by the given deltas (caller commits).
+
+    Uses Core statements so it is safe inside a flush event. Accounts are
+    locked in sorted order so concurrent writers cannot deadlock each other.
+    """
+    table = AccountBalanceDailyDB
+    for (company_id, account, day), (debit, credit) in sorted(deltas.items()):
+        _lock_account(db, company_id, account)
+        same_account = and_(table.company_id == company_id, table.account == account)
+
+        def shift(days) -> int:
+            return db.execute(
+                update(table)
+                .where(same_account, days)
+                .values(
+                    debit_cents=table.debit_cents + debit,
+                    credit_cents=table.credit_cents + credit,
+                    updated_at=datetime.utcnow(),
+                )
+            ).rowcount
+
+        # Write before reading, so the previous snapshot below is current
+        shift(table.day > day)
+        if shift(table.day == day):
+            continue
+
+        previous = db.execute(
+            select(table.debit_cents, table.credit_cents)
+            .where(same_account, table.day < day)
+            .order_by(table.day.desc())
+            .limit(1)
+        ).first()
+        db.execute(insert(table).values(
+            company_id=company_id,
+            account=account,
+            day=day,
+            debit_cents=(previous.debit_cents if previous else 0) + debit,
+            credit_cents=(previous.credit_cents if previous else 0) + credit,
+            updated_at=datetime.utcnow(),
+        ))
+
+
+def rebuild_balances(db: Session, company_id: Optional[str] = None) -> int:
+    """
+    Rebuild snapshots from journal_entry_lines (commits).
+
+    Args:
+        db: Database session
+        company_id: Only rebuild this company (default: all)
+
+    Returns:
+        Number of snapshot rows written
+    """
+    table = AccountBalanceDailyDB
+    lines = JournalEntryLineDB
+
+    wipe = delete(table)
+    if company_id is not None:
+        wipe = wipe.where(table.company_id == company_id)
+    db.execute(wipe)
+
+    company = func.coalesce(lines.company_id, '')
+    day = func.date(lines.date)
+    query = db.query(
+        company,
+        lines.account,
+        day,
+        func.sum(lines.debit_cents),
+        func.sum(lines.credit_cents),
+    ).filter(lines.status == POSTED)
+    if company_id is not None:
+        query = query.filter(company == company_id)
+    query = query.group_by(company, lines.account, day).order_by(company, lines.account, day)
+
+    rows = []
+    running: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    now = datetime.utcnow()
+    for company_key, account, line_day, debit, credit in query:
+        prev_debit, prev_credit = running.get((company_key, account), (0, 0))
+        total = (prev_debit + int(debit or 0), prev_credit + int(credit or 0))
+        running[(company_key, account)] = total
+        if isinstance(line_day, str):
+            line_day = date.fromisoformat(line_day)
+        rows.append({
+            'company_id': company_key,
+            'account': account,
+            'day': line_day,
+            'debit_cents': total[0],
+            'credit_cents': total[1],
+            'updated_at': now,
+        })
+
+    if rows:
+        db.execute(insert(table), rows)
+    db.commit()
+    logger.info(f"Rebuilt {len(rows)} account balance snapshots")
+    return len(rows)
+
+
+def balances_as_of(db: Session, company_id: Optional[str], as_of: date) -> Dict[str, Tuple[int, int]]:
+    """
+    Cumulative debit and credit cents per account through as_of (inclusive).
+
+    Args:
+        db: Database session
+        company_id: Company (None or '' = entries without a company)
+        as_of: Last day included
+
+    Returns:
+        Dict of account -> (debit_cents, credit_cents), ordered by account
+    """
+    table = AccountBalanceDailyDB
+    company = company_id or ''
+
+    latest = (
+        select(table.account, func.max(table.day).label('day'))
+        .where(table.company_id == company, table.day <= as_of)
+        .group_by(table.account)
+        .subquery()
+    )
+    query = (
+        select(table.account, table.debit_cents, table.credit_cents)
+        .join(latest, and_(table.account == latest.c.account, table.day == latest.c.day))
+        .where(table.company_id == company)
+        .order_by(table.account)
+    )
+
+    return {account: (int(debit), int(credit)) for account, debit, credit in db.execute(query)}
+
+
+def period_totals(
+    db: Session,
+    company_id: Optional[str],
+    start: Optional[date],
+    end: date
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Debit and credit cents per account for start..end (inclusive).
+
+    Computed as balances_as_of(end) minus balances_as_of(start - 1 day).
+    """
+    closing = balances_as_of(db, company_id, end)
+    if start is None:
+        return closing
+
+    opening = balances_as_of(db, company_id, start - timedelta(days=1))
+    totals = {}
+    for account, (debit, credit) in closing.items():
+        open_debit, open_credit = opening.get(account, (0, 0))
+        if debit != open_debit or credit != open_credit:
+            totals[account] = (debit - open_debit, credit - open_credit)
+    return totals
@@ -0,0 +1,275 @@
+"""
+Journal entry line projection and SQL-side aggregation.
+
+JournalEntryDB.lines (JSON) remains the source of truth. Every flush that
+adds, changes or deletes a journal entry rewrites that entry's rows in
+journal_entry_lines, so reports can aggregate with GROUP BY account instead
+of loading and re-summing every entry in Python. The same flush shifts
+the daily balance snapshots in app/db/account_balances.py.
+
+Bulk writes bypass ORM flush events; callers using bulk_insert_mappings or
+query().delete() on journal entries must call insert_lines_for_mappings /
+delete_lines themselves (both keep the snapshots in sync).
+"""
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db import account_balances
+from app.db.models import JournalEntryDB, JournalEntryLineDB
+
+logger = logging.getLogger(__name__)
+
+# Changes to these JournalEntryDB attributes require rewriting its lines
+SYNCED_ATTRIBUTES = ('lines', 'status', 'date', 'company_id')
+
+REBUILD_CHUNK_SIZE = 5000
+
+
+def to_cents(amount: Any) -> int:
+    """Convert a line amount to integer cents."""
+    return int(round(float(amount or 0) * 100))
+
+
+def from_cents(cents: Optional[int]) -> float:
+    """Convert integer cents back to a float amount."""
+    return (cents or 0) / 100.0
+
+
+def line_rows(
+    je_id: str,
+    lines: Optional[Sequence[Dict[str, Any]]],
+    date_value: Any,
+    status: str,
+    company_id: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Line table rows for one journal entry."""
+    return [
+        {
+            'je_id': je_id,
+            'line_no': line_no,
+            'company_id': company_id,
+            'date': date_value,
+            'status': status,
+            'account': line.get('account', ''),
+            'debit_cents': to_cents(line.get('debit')),
+            'credit_cents': to_cents(line.get('credit')),
+        }
+        for line_no, line in enumerate(lines or [])
+    ]
+
+
+def _entry_rows(je: JournalEntryDB) -> List[Dict[str, Any]]:
+    return line_rows(je.je_id, je.lines, je.date, je.status, je.company_id)
+
+
+def _lines_changed(je: JournalEntryDB) -> bool:
+    attrs = inspect(je).attrs
+    return any(attrs[name].history.has_changes() for name in SYNCED_ATTRIBUTES)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_lines(session: Session, flush_context) -> None:
+    """Rewrite line rows for journal entries touched by this flush."""
+    new = [o for o in session.new if isinstance(o, JournalEntryDB)]
+    changed = [o for o in session.dirty if isinstance(o, JournalEntryDB) and _lines_changed(o)]
+    deleted = [o for o in session.deleted if isinstance(o, JournalEntryDB)]
+
+    if not (new or changed or deleted):
+        return
+
+    removed = _delete_lines(session, [je.je_id for je in changed]) if changed else {}
+    if deleted:
+        # Line rows may already be gone (ON DELETE CASCADE), so undo from the entries
+        delete_ids = [je.je_id for je in deleted]
+        for start in range(0, len(delete_ids), REBUILD_CHUNK_SIZE):
+            session.execute(delete(JournalEntryLineDB).where(
+                JournalEntryLineDB.je_id.in_(delete_ids[start:start + REBUILD_CHUNK_SIZE])
+            ))
+        removed = account_balances.merge_deltas(removed, account_balances.line_deltas(
+            [row for je in deleted for row in _entry_rows(je)], sign=-1
+        ))
+
+    rows = [row for je in new + changed for row in _entry_rows(je)]
+    if rows:
+        session.execute(insert(JournalEntryLineDB), rows)
+
+    account_balances.apply_deltas(
+        session, account_balances.merge_deltas(removed, account_balances.line_deltas(rows))
+    )
+
+
+def insert_lines_for_mappings(db: Session, mappings: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert line rows for journal entries written with bulk_insert_mappings.
+
+    Args:
+        db: Database session (same transaction as the entries)
+        mappings: JournalEntryDB mappings (je_id, lines, date, status, company_id)
+
+    Returns:
+        Number of line rows inserted
+    """
+    rows = [
+        row
+        for m in mappings
+        for row in line_rows(m['je_id'], m.get('lines'), m.get('date'),
+                             m.get('status', 'proposed'), m.get('company_id'))
+    ]
+    if rows:
+        db.execute(insert(JournalEntryLineDB), rows)
+        account_balances.apply_deltas(db, account_balances.line_deltas(rows))
+    return len(rows)
+
+
+def _delete_lines(db: Session, je_ids: Sequence[str]) -> 'account_balances.Deltas':
+    """Delete line rows; returns the balance deltas that undo them."""
+    removed = {}
+    for start in range(0, len(je_ids), REBUILD_CHUNK_SIZE):
+        chunk = je_ids[start:start + REBUILD_CHUNK_SIZE]
+        posted = db.execute(
+            select(
+                JournalEntryLineDB.company_id,
+                JournalEntryLineDB.account,
+                JournalEntryLineDB.date,
+                JournalEntryLineDB.status,
+                JournalEntryLineDB.debit_cents,
+                JournalEntryLineDB.credit_cents,
+            ).where(
+                JournalEntryLineDB.je_id.in_(chunk),
+                JournalEntryLineDB.status == account_balances.POSTED
+            )
+        )
+        removed = account_balances.merge_deltas(
+            removed, account_balances.line_deltas(posted, sign=-1)
+        )
+        db.execute(delete(JournalEntryLineDB).where(JournalEntryLineDB.je_id.in_(chunk)))
+    return removed
+
+
+def delete_lines(db: Session, je_ids: Sequence[str]) -> None:
+    """Delete line rows for the given journal entries."""
+    account_balances.apply_deltas(db, _delete_lines(db, je_ids))
+
+
+def rebuild_lines(db: Session, chunk_size: int = REBUILD_CHUNK_SIZE) -> int:
+    """
+    Rebuild journal_entry_lines and the balance snapshots from
+    journal_entries (commits).
+
+    Returns:
+        Number of line rows written
+    """
+    db.execute(delete(JournalEntryLineDB))
+
+    query = db.query(
+        JournalEntryDB.je_id,
+        JournalEntryDB.lines,
+        JournalEntryDB.date,
+        JournalEntryDB.status,
+        JournalEntryDB.company_id,
+    ).order_by(JournalEntryDB.je_id).yield_per(chunk_size)
+
+    written = 0
+    rows: List[Dict[str, Any]] = []
+    for je in query:
+        rows.extend(line_rows(je.je_id, je.lines, je.date, je.status, je.company_id))
+        if len(rows) >= chunk_size:
+            db.execute(insert(JournalEntryLineDB), rows)
+            written += len(rows)
+            rows = []
+    if rows:
+        db.execute(insert(JournalEntryLineDB), rows)
+        written += len(rows)
+
+    db.commit()
+    logger.info(f"Rebuilt {written} journal entry lines")
+    account_balances.rebuild_balances(db)
+    return written
+
+
+def _filtered(
+    query,
+    company_id: Optional[str],
+    statuses: Sequence[str],
+    start: Optional[date],
+    end: Optional[date],
+    before: Optional[date]
+):
+    query = query.filter(JournalEntryLineDB.status.in_(list(statuses)))
+    if company_id:
+        query = query.filter(JournalEntryLineDB.company_id == company_id)
+    if start is not None:
+        query = query.filter(JournalEntryLineDB.date >= start)
+    if end is not None:
+        query = query.filter(JournalEntryLineDB.date <= end)
+    if before is not None:
+        query = query.filter(JournalEntryLineDB.date < before)
+    return query
+
+
+def account_totals(
+    db: Session,
+    company_id: Optional[str] = None,
+    statuses: Sequence[str] = ('posted',),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    before: Optional[date] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Debit and credit totals per account, aggregated in the database.
+
+    Args:
+        db: Database session
+        company_id: Company filter (default: all companies)
+        statuses: Journal entry statuses to include
+        start: First entry date (inclusive)
+        end: Last entry date (inclusive)
+        before: Only entries dated strictly before this date
+
+    Returns:
+        Dict of account -> (debit_cents, credit_cents), ordered by account
+    """
+    query = _filtered(
+        db.query(
+            JournalEntryLineDB.account,
+            func.coalesce(func.sum(JournalEntryLineDB.debit_cents), 0),
+            func.coalesce(func.sum(JournalEntryLineDB.credit_cents), 0),
+        ),
+        company_id, statuses, start, end, before
+    ).group_by(JournalEntryLineDB.account).order_by(JournalEntryLineDB.account)
+
+    return {account: (int(debit), int(credit)) for account, debit, credit in query}
+
+
+def iter_ledger_lines(
+    db: Session,
+    company_id: Optional[str] = None,
+    statuses: Sequence[str] = ('posted',),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    chunk_size: int = REBUILD_CHUNK_SIZE
+):
+    """
+    Stream ledger lines in (date, je_id, line_no) order with the entry memo.
+
+    Yields rows with date, je_id, account, debit_cents, credit_cents, memo.
+    """
+    query = _filtered(
+        db.query(
+            JournalEntryLineDB.date,
+            JournalEntryLineDB.je_id,
+            JournalEntryLineDB.account,
+            JournalEntryLineDB.debit_cents,
+            JournalEntryLineDB.credit_cents,
+            JournalEntryDB.memo,
+        ).join(JournalEntryDB, JournalEntryDB.je_id == JournalEntryLineDB.je_id),
+        company_id, statuses, start, end, None
+    ).order_by(
+        JournalEntryLineDB.date, JournalEntryLineDB.je_id, JournalEntryLineDB.line_no
+    )
+
+    return query.yield_per(chunk_size)
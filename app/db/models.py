@@ -15,23 +15,25 @@ Architecture:
 
 Model Categories:
 ----------------
-1. Core Bookkeeping:  TransactionDB, JournalEntryDB, ReconciliationDB
+1. Core Bookkeeping:  TransactionDB, JournalEntryDB, JournalEntryLineDB, AccountBalanceDailyDB,
+                      ReconciliationDB
 2. Multi-tenancy:     TenantSettingsDB, UserDB, UserTenantDB
 3. Billing:           BillingSubscriptionDB, BillingEventDB, EntitlementDB
 4. Usage Tracking:    UsageMonthlyDB, UsageDailyDB, LLMCallLogDB
 5. Integrations:      QBOTokenDB, XeroMappingDB, QBOExportLogDB
-6. ML/AI:             ModelTrainingLogDB, ModelRetrainEventDB
+6. ML/AI:             ModelTrainingLogDB, ModelRetrainEventDB, DriftSketchDB
 7. Rules Engine:      RuleVersionDB, RuleCandidateDB
 8. Compliance:        DecisionAuditLogDB, ConsentLogDB, LabelEventDB
 9. Notifications:     TenantNotificationDB, NotificationLogDB
-10. Receipt OCR:      ReceiptFieldDB
+10. Receipt OCR:      ReceiptFieldDB, ReceiptDB
+11. Background Jobs:  BackgroundJobDB, JobCheckpointDB
 
 Database Support:
 ----------------
 - Primary: PostgreSQL (production on Neon)
 - Fallback: SQLite (local development only)
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, Index, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, Boolean, Text, JSON, Index, ForeignKey, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -266,8 +268,10 @@ class ReceiptFieldDB(Base):
     __tablename__ = 'receipt_fields'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String(255), nullable=True)  # Receipt IDs repeat across tenants
     receipt_id = Column(String(255), nullable=False)
     field = Column(String(50), nullable=False)  # date, amount, vendor, total
+    value = Column(String(255), nullable=True)  # Extracted value as text
     page = Column(Integer, nullable=False, server_default='0')
     x = Column(Float, nullable=False)  # Normalized 0-1
     y = Column(Float, nullable=False)  # Normalized 0-1
@@ -278,10 +282,41 @@ class ReceiptFieldDB(Base):
     
     __table_args__ = (
         Index('idx_receipt_fields_receipt', 'receipt_id'),
+        Index('idx_receipt_fields_tenant_receipt', 'tenant_id', 'receipt_id'),
         Index('idx_receipt_fields_field', 'field'),
     )
 
 
+class ReceiptDB(Base):
+    """
+    One row per indexed receipt, with its extracted summary fields.
+    
+    Written once at ingest (app/ocr/receipt_index.py) so listing is an
+    indexed, paginated query instead of re-extracting every receipt.
+    """
+    __tablename__ = 'receipts'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String(255), nullable=False)
+    receipt_id = Column(String(255), nullable=False)
+    filename = Column(String(255), nullable=True)
+    file_path = Column(String(1024), nullable=True)
+    vendor = Column(String(255), nullable=True)
+    vendor_key = Column(String(255), nullable=True)  # Lowercased vendor for filtering
+    receipt_date = Column(Date, nullable=True)
+    amount = Column(Float, nullable=True)  # Amount shown in listings (total when no amount)
+    total = Column(Float, nullable=True)
+    confidence = Column(Float, nullable=True)
+    extracted_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'receipt_id', name='uq_receipts_tenant_receipt'),
+        Index('idx_receipts_tenant_date', 'tenant_id', 'receipt_date', 'id'),
+        Index('idx_receipts_tenant_vendor', 'tenant_id', 'vendor_key'),
+        Index('idx_receipts_tenant_amount', 'tenant_id', 'amount'),
+    )
+
+
 class XeroMappingDB(Base):
     """Xero account mapping: internal → Xero (Sprint 11.2)."""
     __tablename__ = 'xero_account_mappings'
@@ -340,6 +375,7 @@ class TransactionDB(Base):
     - currency: ISO currency code (default: USD)
     - description: Merchant description from bank
     - counterparty: Vendor/customer name (extracted or normalized)
+    - company_id: Owning company/tenant
     - raw: Original transaction text from bank statement
     - doc_ids: Array of receipt/document IDs attached to transaction
     
@@ -367,6 +403,7 @@ class TransactionDB(Base):
     currency = Column(String(10), nullable=False, default='USD')
     description = Column(Text, nullable=True)
     counterparty = Column(String(255), nullable=True)
+    company_id = Column(String(255), nullable=True)
     raw = Column(Text, nullable=True)
     doc_ids = Column(JSON, nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -374,6 +411,7 @@ class TransactionDB(Base):
     __table_args__ = (
         Index('idx_transactions_date', 'date'),
         Index('idx_transactions_counterparty', 'counterparty'),
+        Index('idx_transactions_company_created', 'company_id', 'created_at'),
     )
 
 
@@ -397,6 +435,7 @@ class JournalEntryDB(Base):
     - date: Accounting date for the entry
     - lines: JSON array of debits/credits [{account, debit, credit}, ...]
     - source_txn_id: Links to originating bank transaction
+    - company_id: Owning company/tenant
     - memo: Description or notes about the entry
     - confidence: AI confidence score (0-1) for auto-categorization
     - status: Lifecycle state (proposed → approved → posted)
@@ -433,6 +472,7 @@ class JournalEntryDB(Base):
     date = Column(DateTime, nullable=False)
     lines = Column(JSON, nullable=False)  # List of {account, debit, credit}
     source_txn_id = Column(String(255), nullable=True)
+    company_id = Column(String(255), nullable=True)
     memo = Column(Text, nullable=True)
     confidence = Column(Float, nullable=True)
     status = Column(String(50), nullable=False, default='proposed')  # proposed, approved, posted
@@ -444,6 +484,57 @@ class JournalEntryDB(Base):
         Index('idx_journal_entries_date', 'date'),
         Index('idx_journal_entries_status', 'status'),
         Index('idx_journal_entries_source_txn', 'source_txn_id'),
+        Index('idx_journal_entries_company_updated', 'company_id', 'updated_at'),
+    )
+
+
+class JournalEntryLineDB(Base):
+    """
+    Journal entry lines projected from JournalEntryDB.lines.
+    
+    One typed row per line (amounts in integer cents) so reports can
+    aggregate with GROUP BY in the database. Kept in sync on flush by
+    app/db/journal_lines.py; JournalEntryDB.lines stays the source of truth.
+    """
+    __tablename__ = 'journal_entry_lines'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    je_id = Column(String(255), ForeignKey('journal_entries.je_id', ondelete='CASCADE'), nullable=False)
+    line_no = Column(Integer, nullable=False)
+    company_id = Column(String(255), nullable=True)
+    date = Column(DateTime, nullable=False)  # copied from the journal entry
+    status = Column(String(50), nullable=False)  # copied from the journal entry
+    account = Column(String(255), nullable=False)
+    debit_cents = Column(BigInteger, nullable=False, default=0)
+    credit_cents = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_je_lines_je', 'je_id'),
+        Index('idx_je_lines_company_status_date', 'company_id', 'status', 'date'),
+        Index('idx_je_lines_account', 'account'),
+    )
+
+
+class AccountBalanceDailyDB(Base):
+    """
+    Cumulative posted debit/credit per company, account and day.
+    
+    One row per day with posted activity, holding totals through that day,
+    so a balance as of any date is a single indexed lookup. Maintained with
+    JournalEntryLineDB (see app/db/account_balances.py).
+    """
+    __tablename__ = 'account_balances_daily'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    company_id = Column(String(255), nullable=False, default='')  # '' = no company
+    account = Column(String(255), nullable=False)
+    day = Column(Date, nullable=False)
+    debit_cents = Column(BigInteger, nullable=False, default=0)  # cumulative through day
+    credit_cents = Column(BigInteger, nullable=False, default=0)  # cumulative through day
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('company_id', 'account', 'day', name='uq_account_balances_daily'),
     )
 
 
@@ -463,6 +554,17 @@ class ReconciliationDB(Base):
     )
 
 
+class ReconciliationWatermarkDB(Base):
+    """Per-company high-water marks for incremental reconciliation."""
+    __tablename__ = 'reconciliation_watermarks'
+    
+    company_id = Column(String(255), primary_key=True)
+    txn_created_at = Column(DateTime, nullable=True)  # newest TransactionDB.created_at seen
+    je_updated_at = Column(DateTime, nullable=True)  # newest JournalEntryDB.updated_at seen
+    last_run_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_full_rebuild_at = Column(DateTime, nullable=True)
+
+
 class ModelTrainingLogDB(Base):
     """
     ML Model Training Log - AI Performance Tracking
@@ -532,6 +634,33 @@ class ModelTrainingLogDB(Base):
     )
 
 
+class OnlineTrainingCheckpointDB(Base):
+    """
+    Checkpoints of the incremental (online) classifier candidate.
+    
+    Kept apart from model_training_logs: a checkpoint is a shadow candidate
+    that may never be promoted, so it must not become the drift baseline
+    or "latest model" (see app/ml/online_trainer.py).
+    """
+    __tablename__ = 'online_training_checkpoints'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    model_name = Column(String(255), nullable=False)
+    mode = Column(String(20), nullable=False)  # incremental, rebuild
+    version = Column(String(255), nullable=False)  # ModelRegistry version
+    base_version = Column(String(255), nullable=True)
+    watermark_at = Column(DateTime, nullable=False)  # updated_at of the last feedback row
+    watermark_id = Column(String(255), nullable=False)  # je_id of the last feedback row
+    records_used = Column(Integer, nullable=False)
+    metrics = Column(JSON, nullable=True)  # held-out metrics
+    training_duration_sec = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_online_training_checkpoints_model', 'model_name', 'id'),
+    )
+
+
 class ModelRetrainEventDB(Base):
     """Log of auto-retraining events (Sprint 7)."""
     __tablename__ = 'model_retrain_events'
@@ -550,6 +679,45 @@ class ModelRetrainEventDB(Base):
     )
 
 
+class DriftSketchDB(Base):
+    """
+    Fixed-bin feature histograms per company, ingestion day and feature.
+    
+    Updated when transactions are ingested; drift checks sum these rows
+    instead of scanning transactions (see app/ml/drift_sketches.py).
+    """
+    __tablename__ = 'drift_sketches'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    company_id = Column(String(255), nullable=False, default='')  # '' = no company
+    day = Column(Date, nullable=False)  # ingestion day (UTC)
+    feature = Column(String(50), nullable=False)  # amount, vendor
+    counts = Column(JSON, nullable=False)  # one count per bin
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('company_id', 'day', 'feature', name='uq_drift_sketches_company_day_feature'),
+        Index('idx_drift_sketches_feature_day', 'feature', 'day'),
+    )
+
+
+class DriftSketchBackfillDB(Base):
+    """
+    One-off backfill of drift sketches from pre-existing transactions.
+    
+    Transactions created before ``cutoff`` predate live sketching and are
+    added once by app/ml/drift_sketches.py backfill(); ``completed_at`` is
+    set in the same transaction, so the backfill never runs twice.
+    """
+    __tablename__ = 'drift_sketch_backfills'
+    
+    id = Column(Integer, primary_key=True)  # single row, id = 1
+    cutoff = Column(DateTime, nullable=False)  # TransactionDB.created_at < cutoff is backfilled
+    completed_at = Column(DateTime, nullable=True)
+    recorded = Column(Integer, nullable=False, default=0)
+
+
 class RuleVersionDB(Base):
     """Version history for adaptive rules (Sprint 8)."""
     __tablename__ = 'rule_versions'
@@ -870,6 +1038,63 @@ class LabelEventDB(Base):
     )
 
 
+class BackgroundJobDB(Base):
+    """
+    Durable background job (app/worker/durable_queue.py).
+    
+    Workers claim pending rows by priority; a running job's lease expires
+    after its visibility timeout so a crashed worker's job is retried.
+    """
+    __tablename__ = 'background_jobs'
+    
+    id = Column(String(64), primary_key=True)  # job_<hex>
+    task = Column(String(255), nullable=False)  # module:qualname of the task function
+    args = Column(JSON, nullable=False, default=list)
+    kwargs = Column(JSON, nullable=False, default=dict)
+    meta = Column(JSON, nullable=False, default=dict)
+    company_id = Column(String(255), nullable=True)  # copied from meta for the company index
+    priority = Column(Integer, nullable=False, default=1)  # 0=high, 1=default, 2=low
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, complete, failed, cancelled
+    progress = Column(Integer, nullable=False, default=0)
+    message = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    timeout = Column(Integer, nullable=False, default=600)  # visibility timeout (seconds)
+    available_at = Column(DateTime, nullable=False, server_default=func.now())
+    lease_expires_at = Column(DateTime, nullable=True)
+    worker_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_background_jobs_claim', 'status', 'priority', 'available_at'),
+        Index('idx_background_jobs_company_created', 'company_id', 'created_at'),
+    )
+
+
+class JobCheckpointDB(Base):
+    """
+    Resumable progress of a chunked job (e.g. bulk categorization).
+    
+    Written in the same transaction as the work it records, so a retried
+    job skips exactly the chunks that were committed.
+    """
+    __tablename__ = 'job_checkpoints'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(64), nullable=False)
+    key = Column(String(100), nullable=False)  # 'plan', 'chunk:00042'
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('job_id', 'key', name='uq_job_checkpoints_job_key'),
+    )
+
+
 # Import other models as needed for completeness
 Transaction = TransactionDB
 JournalEntry = JournalEntryDB
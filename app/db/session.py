@@ -15,7 +15,8 @@ Key Components:
 Connection Pooling:
 ------------------
 - PostgreSQL: Uses QueuePool with configurable size (default: 5 connections)
-- SQLite: Uses NullPool (no pooling needed for file-based DB)
+- SQLite: Uses NullPool (no pooling needed for file-based DB), WAL journal
+  mode and a busy timeout so multiple worker processes can share the file
 
 Session Lifecycle:
 -----------------
@@ -37,7 +38,7 @@ In background tasks:
         db.query(Model).update(...)
         # Auto-commits on success, rolls back on error
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool, QueuePool
 from contextlib import contextmanager
@@ -92,6 +93,16 @@ elif "sqlite" in settings.database_url:
 # ============================================================================
 engine = create_engine(settings.database_url, **engine_kwargs)
 
+if "sqlite" in settings.database_url:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed while a durable-queue worker writes;
+        # busy_timeout waits for the write lock instead of failing immediately
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 # ============================================================================
 # Session Factory - Creates New Database Sessions
 # ============================================================================
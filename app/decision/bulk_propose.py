@@ -0,0 +1,313 @@
+"""
+Bulk journal entry proposals.
+
+Processes large sets of unprocessed transactions in columnar chunks
+instead of one transaction at a time:
+
+1. Rules for the whole chunk through the compiled rule index
+2. ML classifier with one predict_batch call for what rules left over
+3. Batched, cached LLM categorization only for the residue
+4. Journal entries written with one bulk insert per chunk
+
+``BulkProposer.run`` is an async generator of progress events so the API
+can stream them back while the chunks are processed.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.db import journal_lines
+from app.db.models import JournalEntryDB, TransactionDB
+from app.llm.categorize_post import build_categorization_result
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Transactions per chunk (one rules pass, ML call and bulk insert each)
+PROPOSE_CHUNK_SIZE = 2000
+
+# Rule matches below this confidence fall through to ML/LLM (as in /api/post/propose)
+RULE_MIN_CONFIDENCE = 0.9
+
+
+@dataclass
+class TransactionColumns:
+    """A chunk of transactions as parallel columns."""
+    txn_ids: List[str] = field(default_factory=list)
+    dates: List[datetime] = field(default_factory=list)
+    amounts: List[float] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+    counterparties: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.txn_ids)
+
+    def payload(self, i: int) -> Dict[str, Any]:
+        """Row i as the dict shape the categorizers accept."""
+        txn_date = self.dates[i]
+        return {
+            "txn_id": self.txn_ids[i],
+            "date": txn_date.strftime("%Y-%m-%d") if isinstance(txn_date, (date, datetime)) else str(txn_date),
+            "amount": self.amounts[i],
+            "description": self.descriptions[i],
+            "counterparty": self.counterparties[i],
+        }
+
+
+class BulkProposer:
+    """Chunked rules -> ML -> LLM proposal pipeline with bulk inserts."""
+
+    def __init__(
+        self,
+        db: Session,
+        chart_of_accounts: List[str],
+        rules_engine=None,
+        classifier=None,
+        llm_categorizer=None,
+        knowledge_base=None,
+        namespace: Optional[str] = None,
+        chunk_size: int = PROPOSE_CHUNK_SIZE,
+        ml_threshold: Optional[float] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            db: Database session
+            chart_of_accounts: Accounts the LLM may choose from
+            rules_engine: RulesEngine (tier skipped if None)
+            classifier: MLClassifier (tier skipped if None or not loaded)
+            llm_categorizer: LLMCategorizer for the residue (fallback if None)
+            knowledge_base: VendorKnowledgeBase for LLM hints (optional)
+            namespace: Tenant namespace for knowledge base lookups
+            chunk_size: Transactions per chunk
+            ml_threshold: Minimum ML probability (default ML_CONFIDENCE_THRESHOLD)
+        """
+        self.db = db
+        self.chart_of_accounts = chart_of_accounts
+        self.rules_engine = rules_engine
+        self.classifier = classifier
+        self.llm_categorizer = llm_categorizer
+        self.knowledge_base = knowledge_base
+        self.namespace = namespace
+        self.chunk_size = chunk_size
+        self.ml_threshold = settings.ML_CONFIDENCE_THRESHOLD if ml_threshold is None else ml_threshold
+
+    def _pending_query(self, txn_ids: Optional[List[str]]):
+        query = self.db.query(
+            TransactionDB.txn_id,
+            TransactionDB.date,
+            TransactionDB.amount,
+            TransactionDB.description,
+            TransactionDB.counterparty,
+        )
+        if txn_ids:
+            return query.filter(TransactionDB.txn_id.in_(txn_ids))
+        # Unprocessed: no JE references the transaction yet
+        return query.filter(
+            ~exists().where(JournalEntryDB.source_txn_id == TransactionDB.txn_id)
+        )
+
+    def count_pending(self, txn_ids: Optional[List[str]] = None) -> int:
+        """Number of transactions run() would process."""
+        return self._pending_query(txn_ids).count()
+
+    def _load_chunk(self, txn_ids: Optional[List[str]], after: Optional[str]) -> TransactionColumns:
+        """Next chunk in txn_id order (keyset pagination)."""
+        query = self._pending_query(txn_ids)
+        if after is not None:
+            query = query.filter(TransactionDB.txn_id > after)
+
+        columns = TransactionColumns()
+        for row in query.order_by(TransactionDB.txn_id).limit(self.chunk_size):
+            columns.txn_ids.append(row.txn_id)
+            columns.dates.append(row.date)
+            columns.amounts.append(row.amount)
+            columns.descriptions.append(row.description or "")
+            columns.counterparties.append(row.counterparty or "")
+        return columns
+
+    async def run(self, txn_ids: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Propose journal entries for all pending transactions.
+
+        Args:
+            txn_ids: Transactions to process (default: all unprocessed)
+
+        Yields:
+            {"event": "progress", "stage", "processed", "total"} per stage
+            and chunk, then one {"event": "done", ...} summary
+        """
+        start = time.time()
+        total = self.count_pending(txn_ids)
+        processed = 0
+        by_method = {"rules": 0, "ml": 0, "llm": 0}
+        review_needed = 0
+        after = None
+
+        logger.info(f"Bulk propose: {total} transactions")
+
+        while True:
+            columns = self._load_chunk(txn_ids, after)
+            if not len(columns):
+                break
+            after = columns.txn_ids[-1]
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(columns)
+            methods: List[Optional[str]] = [None] * len(columns)
+
+            self._apply_rules(columns, results, methods)
+            yield self._progress("rules", processed, total)
+
+            self._apply_ml(columns, results, methods)
+            yield self._progress("ml", processed, total)
+
+            await self._apply_llm(columns, results, methods)
+            yield self._progress("llm", processed, total)
+
+            rows = self._journal_entry_rows(columns, results)
+            self.db.bulk_insert_mappings(JournalEntryDB, rows)
+            journal_lines.insert_lines_for_mappings(self.db, rows)
+            self.db.commit()
+
+            processed += len(columns)
+            review_needed += sum(row["needs_review"] for row in rows)
+            for method in methods:
+                by_method[method] += 1
+            yield self._progress("write", processed, total)
+
+        yield {
+            "event": "done",
+            "proposed": processed,
+            "by_method": by_method,
+            "review_needed": review_needed,
+            "elapsed_seconds": round(time.time() - start, 3),
+        }
+
+    @staticmethod
+    def _progress(stage: str, processed: int, total: int) -> Dict[str, Any]:
+        return {"event": "progress", "stage": stage, "processed": processed, "total": total}
+
+    def _apply_rules(self, columns: TransactionColumns, results, methods) -> None:
+        """Tier 1: rules for the whole chunk."""
+        if self.rules_engine is None:
+            return
+
+        txns = [
+            SimpleNamespace(
+                txn_id=columns.txn_ids[i],
+                description=columns.descriptions[i],
+                counterparty=columns.counterparties[i],
+                amount=columns.amounts[i],
+            )
+            for i in range(len(columns))
+        ]
+        matches = self.rules_engine.batch_match(txns)
+
+        for i, txn_id in enumerate(columns.txn_ids):
+            match = matches.get(txn_id)
+            if match and match.get('matched') and match.get('confidence', 0) >= RULE_MIN_CONFIDENCE:
+                results[i] = build_categorization_result(columns.payload(i), {
+                    "account": match['account'],
+                    "confidence": match.get('confidence', 1.0),
+                    "needs_review": False,
+                    "rationale": match.get('rationale', 'Matched by rules engine'),
+                })
+                methods[i] = "rules"
+
+    def _apply_ml(self, columns: TransactionColumns, results, methods) -> None:
+        """Tier 2: one predict_batch call for everything rules left over."""
+        if self.classifier is None or not self.classifier.is_loaded:
+            return
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return
+
+        predictions = self.classifier.predict_batch(
+            [
+                {
+                    'description': columns.descriptions[i],
+                    'counterparty': columns.counterparties[i],
+                    'amount': columns.amounts[i],
+                    'date': columns.dates[i],
+                }
+                for i in pending
+            ],
+            k=1
+        )
+        for i, top in zip(pending, predictions):
+            if top and top[0]['probability'] >= self.ml_threshold:
+                probability = top[0]['probability']
+                results[i] = build_categorization_result(columns.payload(i), {
+                    "account": top[0]['account'],
+                    "confidence": probability,
+                    "needs_review": False,
+                    "rationale": f"ML classifier (probability: {probability:.2%})",
+                })
+                methods[i] = "ml"
+
+    async def _apply_llm(self, columns: TransactionColumns, results, methods) -> None:
+        """Tier 3: batched LLM categorization for the residue."""
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return
+
+        payloads = [columns.payload(i) for i in pending]
+        hints = [
+            self.knowledge_base.find_similar(
+                p["counterparty"], p["description"], n_results=3, namespace=self.namespace
+            ) if self.knowledge_base is not None else []
+            for p in payloads
+        ]
+
+        if self.llm_categorizer is not None:
+            llm_results = await self.llm_categorizer.categorize_batch_async(
+                payloads, self.chart_of_accounts, hints, namespace=self.namespace
+            )
+        else:
+            llm_results = [
+                build_categorization_result(p, {
+                    "account": "8000 Sales Revenue" if p["amount"] > 0 else "6999 Miscellaneous Expense",
+                    "confidence": 0.3,
+                    "needs_review": True,
+                    "rationale": "Fallback: LLM unavailable or failed",
+                })
+                for p in payloads
+            ]
+
+        for i, result in zip(pending, llm_results):
+            results[i] = result
+            methods[i] = "llm"
+
+    def _journal_entry_rows(self, columns: TransactionColumns, results) -> List[Dict[str, Any]]:
+        """Insert mappings for JournalEntryDB (same review rules as create_journal_entry)."""
+        rows = []
+        for i, result in enumerate(results):
+            confidence = result.get('confidence', 0.0)
+            needs_review = result.get('needs_review', False) or confidence < settings.confidence_threshold
+            memo = result.get('rationale', '')
+
+            # Force human review for large amounts
+            if abs(columns.amounts[i]) > settings.large_amount_threshold:
+                needs_review = True
+                memo = f"LARGE AMOUNT (>${settings.large_amount_threshold}). " + (memo or "")
+
+            rows.append({
+                "je_id": f"je_{uuid.uuid4().hex[:16]}",
+                "date": columns.dates[i],
+                "lines": result['journal_entry']['lines'],
+                "source_txn_id": columns.txn_ids[i],
+                "memo": memo,
+                "confidence": confidence,
+                "status": "proposed",
+                "needs_review": 1 if needs_review else 0,
+            })
+        return rows
@@ -8,7 +8,7 @@ Routing logic:
 4. Human Review (if all fail or low confidence)
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime, date
 from pathlib import Path
 
@@ -126,15 +126,9 @@ class DecisionEngine:
             if rules_engine:
                 try:
                     match = rules_engine.match_transaction(transaction_obj)
-                    if match and match.get('account'):
-                        self.stats['rules_matches'] += 1
-                        return {
-                            'account': match['account'],
-                            'confidence': match.get('confidence', 1.0),
-                            'method': 'rules',
-                            'needs_review': False,
-                            'rationale': match.get('rationale', f"Matched rule: {match.get('rule_name', 'unknown')}")
-                        }
+                    decision = self._rules_decision(match)
+                    if decision:
+                        return decision
                 except Exception as e:
                     logger.error(f"Rules engine error: {e}")
         
@@ -152,30 +146,126 @@ class DecisionEngine:
                         date=datetime.strptime(str(date), '%Y-%m-%d') if isinstance(date, str) else date
                     )
                     
-                    if probability >= self.ml_threshold:
-                        self.stats['ml_matches'] += 1
-                        return {
-                            'account': account,
-                            'confidence': probability,
-                            'method': 'ml',
-                            'needs_review': False,
-                            'rationale': f"ML classifier (probability: {probability:.2%})"
-                        }
-                    elif probability >= 0.70:
-                        # Medium confidence - suggest but require review
-                        return {
-                            'account': account,
-                            'confidence': probability,
-                            'method': 'ml_review',
-                            'needs_review': True,
-                            'rationale': f"ML classifier (probability: {probability:.2%}, below threshold)"
-                        }
+                    decision = self._ml_decision(account, probability)
+                    if decision:
+                        return decision
                 except Exception as e:
                     logger.error(f"ML classifier error: {e}")
         
         # ====================================================================
-        # STEP 3: Try LLM
+        # STEP 3/4: LLM, then manual review
         # ====================================================================
+        return self._llm_or_fallback(transaction_obj, amount)
+    
+    def categorize_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Categorize many transactions with the same routing as categorize().
+        
+        Rules run through the compiled rule index in one pass, and every
+        transaction the rules leave over goes to the ML classifier in a
+        single predict_batch call; only the residue reaches LLM/fallback.
+        
+        Args:
+            transactions: Dicts with amount, description, counterparty, date
+            
+        Returns:
+            One decision dict per transaction, in input order
+        """
+        from app.db.models import Transaction
+        
+        transaction_objs = [
+            Transaction(
+                txn_id=str(i),
+                date=t['date'].strftime('%Y-%m-%d') if isinstance(t['date'], (datetime, date)) else str(t['date']),
+                amount=t['amount'],
+                description=t['description'],
+                counterparty=t.get('counterparty'),
+                currency="USD",
+                raw={}
+            )
+            for i, t in enumerate(transactions)
+        ]
+        decisions: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+        
+        # STEP 1: Rules, one pass over the batch
+        if self.use_rules:
+            rules_engine = self._get_rules_engine()
+            if rules_engine:
+                try:
+                    matches = rules_engine.batch_match(transaction_objs)
+                    for i, txn in enumerate(transaction_objs):
+                        decisions[i] = self._rules_decision(matches.get(txn.txn_id))
+                except Exception as e:
+                    logger.error(f"Rules engine error: {e}")
+        
+        # STEP 2: ML, one vectorized call for everything still undecided
+        pending = [i for i, d in enumerate(decisions) if d is None]
+        if self.use_ml and pending:
+            ml_classifier = self._get_ml_classifier()
+            if ml_classifier and ml_classifier.is_loaded:
+                try:
+                    predictions = ml_classifier.predict_batch(
+                        [
+                            {
+                                'description': transactions[i]['description'],
+                                'counterparty': transactions[i].get('counterparty') or "",
+                                'amount': transactions[i]['amount'],
+                                'date': transactions[i]['date'],
+                            }
+                            for i in pending
+                        ],
+                        k=1
+                    )
+                    for i, top in zip(pending, predictions):
+                        if top:
+                            decisions[i] = self._ml_decision(top[0]['account'], top[0]['probability'])
+                except Exception as e:
+                    logger.error(f"ML classifier error: {e}")
+        
+        # STEP 3/4: LLM, then manual review for the residue
+        for i, decision in enumerate(decisions):
+            if decision is None:
+                decisions[i] = self._llm_or_fallback(transaction_objs[i], transactions[i]['amount'])
+        
+        return decisions
+    
+    def _rules_decision(self, match: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Turn a rules engine match into a decision (None if unusable)."""
+        if match and match.get('account'):
+            self.stats['rules_matches'] += 1
+            return {
+                'account': match['account'],
+                'confidence': match.get('confidence', 1.0),
+                'method': 'rules',
+                'needs_review': False,
+                'rationale': match.get('rationale', f"Matched rule: {match.get('rule_name', 'unknown')}")
+            }
+        return None
+    
+    def _ml_decision(self, account: str, probability: float) -> Optional[Dict[str, Any]]:
+        """Turn an ML prediction into a decision (None if below review floor)."""
+        if probability >= self.ml_threshold:
+            self.stats['ml_matches'] += 1
+            return {
+                'account': account,
+                'confidence': probability,
+                'method': 'ml',
+                'needs_review': False,
+                'rationale': f"ML classifier (probability: {probability:.2%})"
+            }
+        elif probability >= 0.70:
+            # Medium confidence - suggest but require review
+            return {
+                'account': account,
+                'confidence': probability,
+                'method': 'ml_review',
+                'needs_review': True,
+                'rationale': f"ML classifier (probability: {probability:.2%}, below threshold)"
+            }
+        return None
+    
+    def _llm_or_fallback(self, transaction, amount: float) -> Dict[str, Any]:
+        """LLM categorization, falling back to manual review."""
         if self.use_llm:
             llm = self._get_llm_categorizer()
             if llm:
@@ -1,29 +1,36 @@
 """CSV export functionality for journal entries and reconciliation results."""
-import csv
-from typing import List, TextIO
+from typing import Iterator, TextIO
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db.models import JournalEntryDB, TransactionDB, ReconciliationDB
+from app.db.journal_lines import account_totals, from_cents, iter_ledger_lines
+from app.exporters.streaming import FETCH_SIZE, ChunkWriter, write_chunks
 
 
-def export_journal_entries_csv(db: Session, output_file: TextIO, status: str = None):
+def iter_journal_entries_csv(db: Session, status: str = None) -> Iterator[str]:
     """
-    Export journal entries to CSV format.
+    Stream journal entries as CSV text chunks (server-side cursor).
     
     Args:
         db: Database session
-        output_file: File-like object to write to
         status: Optional filter by status (proposed, approved, posted)
     """
-    # Query journal entries
-    query = db.query(JournalEntryDB)
+    query = db.query(
+        JournalEntryDB.je_id,
+        JournalEntryDB.date,
+        JournalEntryDB.lines,
+        JournalEntryDB.status,
+        JournalEntryDB.source_txn_id,
+        JournalEntryDB.memo,
+        JournalEntryDB.confidence
+    )
     if status:
         query = query.filter(JournalEntryDB.status == status)
     
-    jes = query.order_by(JournalEntryDB.date).all()
+    jes = query.order_by(JournalEntryDB.date, JournalEntryDB.je_id).yield_per(FETCH_SIZE)
     
     # Write CSV header
-    writer = csv.writer(output_file)
+    writer = ChunkWriter()
     writer.writerow([
         "JE ID",
         "Date",
@@ -50,21 +57,42 @@ def export_journal_entries_csv(db: Session, output_file: TextIO, status: str = N
                 je.memo or "",
                 f"{je.confidence:.2f}"
             ])
+        if writer.ready():
+            yield writer.drain()
+    
+    yield writer.drain()
 
 
-def export_reconciliation_csv(db: Session, output_file: TextIO):
+def export_journal_entries_csv(db: Session, output_file: TextIO, status: str = None):
     """
-    Export reconciliation results to CSV format.
+    Export journal entries to CSV format.
     
     Args:
         db: Database session
         output_file: File-like object to write to
+        status: Optional filter by status (proposed, approved, posted)
     """
-    # Query reconciliations
-    recons = db.query(ReconciliationDB).order_by(ReconciliationDB.created_at).all()
+    write_chunks(iter_journal_entries_csv(db, status), output_file)
+
+
+def iter_reconciliation_csv(db: Session) -> Iterator[str]:
+    """Stream reconciliation results as CSV text chunks (server-side cursor)."""
+    # One joined query instead of a transaction lookup per reconciliation
+    recons = db.query(
+        ReconciliationDB.txn_id,
+        ReconciliationDB.je_id,
+        ReconciliationDB.match_type,
+        ReconciliationDB.match_score,
+        ReconciliationDB.created_at,
+        TransactionDB.date,
+        TransactionDB.amount,
+        TransactionDB.description
+    ).outerjoin(
+        TransactionDB, TransactionDB.txn_id == ReconciliationDB.txn_id
+    ).order_by(ReconciliationDB.created_at).yield_per(FETCH_SIZE)
     
     # Write CSV header
-    writer = csv.writer(output_file)
+    writer = ChunkWriter()
     writer.writerow([
         "Transaction ID",
         "Journal Entry ID",
@@ -78,42 +106,52 @@ def export_reconciliation_csv(db: Session, output_file: TextIO):
     
     # Write reconciliation records
     for recon in recons:
-        txn = db.query(TransactionDB).filter(TransactionDB.txn_id == recon.txn_id).first()
-        
         writer.writerow([
             recon.txn_id,
             recon.je_id,
             recon.match_type,
             f"{recon.match_score:.2f}",
-            txn.date.strftime("%Y-%m-%d") if txn else "",
-            f"{txn.amount:.2f}" if txn else "",
-            txn.description if txn else "",
+            recon.date.strftime("%Y-%m-%d") if recon.date else "",
+            f"{recon.amount:.2f}" if recon.amount is not None else "",
+            recon.description or "",
             recon.created_at.strftime("%Y-%m-%d %H:%M:%S") if recon.created_at else ""
         ])
+        if writer.ready():
+            yield writer.drain()
+    
+    yield writer.drain()
 
 
-def export_general_ledger_csv(db: Session, output_file: TextIO, start_date: str = None, end_date: str = None):
+def export_reconciliation_csv(db: Session, output_file: TextIO):
     """
-    Export general ledger (all posted journal entries) to CSV.
+    Export reconciliation results to CSV format.
     
     Args:
         db: Database session
         output_file: File-like object to write to
+    """
+    write_chunks(iter_reconciliation_csv(db), output_file)
+
+
+def iter_general_ledger_csv(db: Session, start_date: str = None, end_date: str = None) -> Iterator[str]:
+    """
+    Stream the general ledger (posted journal lines) as CSV text chunks.
+    
+    Args:
+        db: Database session
         start_date: Optional start date (YYYY-MM-DD)
         end_date: Optional end date (YYYY-MM-DD)
     """
-    # Query posted journal entries
-    query = db.query(JournalEntryDB).filter(JournalEntryDB.status == "posted")
-    
-    if start_date:
-        query = query.filter(JournalEntryDB.date >= datetime.strptime(start_date, "%Y-%m-%d").date())
-    if end_date:
-        query = query.filter(JournalEntryDB.date <= datetime.strptime(end_date, "%Y-%m-%d").date())
-    
-    jes = query.order_by(JournalEntryDB.date, JournalEntryDB.je_id).all()
+    # Stream posted journal lines from the lines table in ledger order
+    lines = iter_ledger_lines(
+        db,
+        start=datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None,
+        end=datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None,
+        chunk_size=FETCH_SIZE
+    )
     
     # Write CSV header
-    writer = csv.writer(output_file)
+    writer = ChunkWriter()
     writer.writerow([
         "Date",
         "JE ID",
@@ -124,49 +162,50 @@ def export_general_ledger_csv(db: Session, output_file: TextIO, start_date: str
     ])
     
     # Write ledger entries
-    for je in jes:
-        for line in je.lines:
-            writer.writerow([
-                je.date.strftime("%Y-%m-%d"),
-                je.je_id,
-                line['account'],
-                f"{line['debit']:.2f}",
-                f"{line['credit']:.2f}",
-                je.memo or ""
-            ])
+    for line in lines:
+        writer.writerow([
+            line.date.strftime("%Y-%m-%d"),
+            line.je_id,
+            line.account,
+            f"{from_cents(line.debit_cents):.2f}",
+            f"{from_cents(line.credit_cents):.2f}",
+            line.memo or ""
+        ])
+        if writer.ready():
+            yield writer.drain()
+    
+    yield writer.drain()
 
 
-def export_trial_balance_csv(db: Session, output_file: TextIO, as_of_date: str = None):
+def export_general_ledger_csv(db: Session, output_file: TextIO, start_date: str = None, end_date: str = None):
     """
-    Export trial balance (account balances) to CSV.
+    Export general ledger (all posted journal entries) to CSV.
     
     Args:
         db: Database session
         output_file: File-like object to write to
-        as_of_date: Optional date (YYYY-MM-DD) for balance calculation
+        start_date: Optional start date (YYYY-MM-DD)
+        end_date: Optional end date (YYYY-MM-DD)
     """
-    # Query posted journal entries
-    query = db.query(JournalEntryDB).filter(JournalEntryDB.status == "posted")
-    
-    if as_of_date:
-        query = query.filter(JournalEntryDB.date <= datetime.strptime(as_of_date, "%Y-%m-%d").date())
-    
-    jes = query.all()
-    
-    # Calculate balances by account
-    account_balances = {}
+    write_chunks(iter_general_ledger_csv(db, start_date, end_date), output_file)
+
+
+def iter_trial_balance_csv(db: Session, as_of_date: str = None) -> Iterator[str]:
+    """
+    Trial balance (account balances) as CSV text chunks.
     
-    for je in jes:
-        for line in je.lines:
-            account = line['account']
-            if account not in account_balances:
-                account_balances[account] = {'debit': 0.0, 'credit': 0.0}
-            
-            account_balances[account]['debit'] += line['debit']
-            account_balances[account]['credit'] += line['credit']
+    Args:
+        db: Database session
+        as_of_date: Optional date (YYYY-MM-DD) for balance calculation
+    """
+    # Debit/credit totals per account for posted entries (one GROUP BY query)
+    account_balances = account_totals(
+        db,
+        end=datetime.strptime(as_of_date, "%Y-%m-%d").date() if as_of_date else None
+    )
     
     # Write CSV header
-    writer = csv.writer(output_file)
+    writer = ChunkWriter()
     writer.writerow([
         "Account",
         "Total Debits",
@@ -174,30 +213,40 @@ def export_trial_balance_csv(db: Session, output_file: TextIO, as_of_date: str =
         "Balance (Debit - Credit)"
     ])
     
-    # Write balances
-    total_debits = 0.0
-    total_credits = 0.0
+    # Write balances (summed in cents so totals are exact)
+    total_debits = 0
+    total_credits = 0
     
-    for account in sorted(account_balances.keys()):
-        bal = account_balances[account]
-        balance = bal['debit'] - bal['credit']
-        
+    for account, (debit_cents, credit_cents) in account_balances.items():
         writer.writerow([
             account,
-            f"{bal['debit']:.2f}",
-            f"{bal['credit']:.2f}",
-            f"{balance:.2f}"
+            f"{from_cents(debit_cents):.2f}",
+            f"{from_cents(credit_cents):.2f}",
+            f"{from_cents(debit_cents - credit_cents):.2f}"
         ])
         
-        total_debits += bal['debit']
-        total_credits += bal['credit']
+        total_debits += debit_cents
+        total_credits += credit_cents
     
     # Write totals
     writer.writerow([])
     writer.writerow([
         "TOTALS",
-        f"{total_debits:.2f}",
-        f"{total_credits:.2f}",
-        f"{total_debits - total_credits:.2f}"
+        f"{from_cents(total_debits):.2f}",
+        f"{from_cents(total_credits):.2f}",
+        f"{from_cents(total_debits - total_credits):.2f}"
     ])
+    
+    yield writer.drain()
 
+
+def export_trial_balance_csv(db: Session, output_file: TextIO, as_of_date: str = None):
+    """
+    Export trial balance (account balances) to CSV.
+    
+    Args:
+        db: Database session
+        output_file: File-like object to write to
+        as_of_date: Optional date (YYYY-MM-DD) for balance calculation
+    """
+    write_chunks(iter_trial_balance_csv(db, as_of_date), output_file)
@@ -1,9 +1,22 @@
 """QuickBooks Online (QBO) and Xero export functionality."""
-import csv
-from typing import List, Dict, Any, TextIO
-from datetime import datetime
+from typing import Dict, Iterator, TextIO
 from sqlalchemy.orm import Session
 from app.db.models import JournalEntryDB
+from app.exporters.streaming import FETCH_SIZE, ChunkWriter, write_chunks
+
+
+def _journal_entry_rows(db: Session, status: str):
+    """Journal entry columns needed by the file exporters, in date order (server-side cursor)."""
+    query = db.query(
+        JournalEntryDB.je_id,
+        JournalEntryDB.date,
+        JournalEntryDB.lines,
+        JournalEntryDB.memo
+    )
+    if status:
+        query = query.filter(JournalEntryDB.status == status)
+    
+    return query.order_by(JournalEntryDB.date, JournalEntryDB.je_id).yield_per(FETCH_SIZE)
 
 
 class QuickBooksExporter:
@@ -48,52 +61,59 @@ class QuickBooksExporter:
         }
     
     @staticmethod
-    def export_to_iif(db: Session, output_file: TextIO, status: str = "posted"):
+    def iter_iif(db: Session, status: str = "posted") -> Iterator[str]:
         """
-        Export journal entries to QuickBooks IIF format.
-        
-        IIF format is a tab-delimited text file that QuickBooks can import.
+        Stream journal entries as QuickBooks IIF text chunks (server-side cursor).
         
         Args:
             db: Database session
-            output_file: File object to write to
             status: Filter by status (posted, approved)
         """
-        # Query journal entries
-        query = db.query(JournalEntryDB)
-        if status:
-            query = query.filter(JournalEntryDB.status == status)
-        
-        jes = query.order_by(JournalEntryDB.date).all()
-        
-        if not jes:
-            return
-        
-        # Write IIF header
-        output_file.write("!TRNS\tTRNSID\tTRNSTYPE\tDATE\tACCNT\tAMOUNT\tMEMO\n")
-        output_file.write("!SPL\tSPLID\tTRNSTYPE\tDATE\tACCNT\tAMOUNT\tMEMO\n")
-        output_file.write("!ENDTRNS\n")
+        jes = _journal_entry_rows(db, status)
+        writer = ChunkWriter()
         
-        # Write transactions
+        # Write transactions (header only once there is at least one entry)
         for je in jes:
+            if writer.rows_written == 0:
+                writer.write("!TRNS\tTRNSID\tTRNSTYPE\tDATE\tACCNT\tAMOUNT\tMEMO\n")
+                writer.write("!SPL\tSPLID\tTRNSTYPE\tDATE\tACCNT\tAMOUNT\tMEMO\n")
+                writer.write("!ENDTRNS\n")
+            
             date_str = je.date.strftime("%m/%d/%Y")
             memo = (je.memo or "")[:100]  # Truncate long memos
             
             # First line is the main transaction
             first_line = True
-            total_amount = sum(line['debit'] - line['credit'] for line in je.lines)
             
             for line in je.lines:
                 qbo_account = QuickBooksExporter.map_account_to_qbo(line['account'])
                 amount = line['debit'] - line['credit']
                 
                 if first_line:
-                    output_file.write(f"TRNS\t{je.je_id}\tGENERAL JOURNAL\t{date_str}\t{qbo_account['account_name']}\t{amount:.2f}\t{memo}\n")
+                    writer.write(f"TRNS\t{je.je_id}\tGENERAL JOURNAL\t{date_str}\t{qbo_account['account_name']}\t{amount:.2f}\t{memo}\n")
                     first_line = False
                 else:
-                    output_file.write(f"SPL\t{je.je_id}\tGENERAL JOURNAL\t{date_str}\t{qbo_account['account_name']}\t{amount:.2f}\t{memo}\n")
+                    writer.write(f"SPL\t{je.je_id}\tGENERAL JOURNAL\t{date_str}\t{qbo_account['account_name']}\t{amount:.2f}\t{memo}\n")
             
-            output_file.write("ENDTRNS\n")
+            writer.write("ENDTRNS\n")
+            if writer.ready():
+                yield writer.drain()
+        
+        yield writer.drain()
+    
+    @staticmethod
+    def export_to_iif(db: Session, output_file: TextIO, status: str = "posted"):
+        """
+        Export journal entries to QuickBooks IIF format.
+        
+        IIF format is a tab-delimited text file that QuickBooks can import.
+        
+        Args:
+            db: Database session
+            output_file: File object to write to
+            status: Filter by status (posted, approved)
+        """
+        write_chunks(QuickBooksExporter.iter_iif(db, status), output_file)
 
 
 class XeroExporter:
@@ -112,26 +132,20 @@ class XeroExporter:
         }
     
     @staticmethod
-    def export_to_csv(db: Session, output_file: TextIO, status: str = "posted"):
+    def iter_csv(db: Session, status: str = "posted") -> Iterator[str]:
         """
-        Export journal entries to Xero CSV format.
+        Stream journal entries as Xero CSV text chunks (server-side cursor).
         
         Xero format: Journal Number, Date, Account Code, Account Name, Description, Debit, Credit
         
         Args:
             db: Database session
-            output_file: File object to write to
             status: Filter by status
         """
-        # Query journal entries
-        query = db.query(JournalEntryDB)
-        if status:
-            query = query.filter(JournalEntryDB.status == status)
-        
-        jes = query.order_by(JournalEntryDB.date).all()
+        jes = _journal_entry_rows(db, status)
         
         # Write CSV
-        writer = csv.writer(output_file)
+        writer = ChunkWriter()
         writer.writerow([
             "*JournalNumber",
             "*Date",
@@ -166,6 +180,22 @@ class XeroExporter:
                     "",  # Tracking category 1
                     ""   # Tracking option 1
                 ])
+            if writer.ready():
+                yield writer.drain()
+        
+        yield writer.drain()
+    
+    @staticmethod
+    def export_to_csv(db: Session, output_file: TextIO, status: str = "posted"):
+        """
+        Export journal entries to Xero CSV format.
+        
+        Args:
+            db: Database session
+            output_file: File object to write to
+            status: Filter by status
+        """
+        write_chunks(XeroExporter.iter_csv(db, status), output_file)
 
 
 def export_to_quickbooks_iif(db: Session, file_path: str, status: str = "posted"):
@@ -0,0 +1,126 @@
+"""
+Streaming helpers for file exports.
+
+Exporters produce text in chunks (a few hundred rows each) from
+server-side cursors; these helpers turn those chunks into an HTTP
+response, optionally gzip-compressed, without ever holding the whole
+file in memory.
+
+The response body runs after the route returns, when the request's
+Depends(get_db) session is already closed (FastAPI >= 0.106), so export
+routes read through session_chunks(), which owns its session.
+"""
+import csv
+import zlib
+from io import StringIO
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+# Rows written to the buffer before a chunk is yielded
+ROWS_PER_CHUNK = 500
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 2000
+
+
+class ChunkWriter:
+    """
+    CSV/text writer over a reusable buffer.
+
+    Call ``ready()`` after each row; when it returns True, yield ``drain()``.
+    """
+
+    def __init__(self, rows_per_chunk: int = ROWS_PER_CHUNK, **csv_kwargs):
+        self.buffer = StringIO()
+        self.csv = csv.writer(self.buffer, **csv_kwargs)
+        self.rows_per_chunk = rows_per_chunk
+        self.rows_written = 0
+        self._pending = 0
+
+    def writerow(self, row) -> None:
+        self.csv.writerow(row)
+        self._pending += 1
+        self.rows_written += 1
+
+    def write(self, text: str) -> None:
+        self.buffer.write(text)
+        self._pending += 1
+        self.rows_written += 1
+
+    def ready(self) -> bool:
+        return self._pending >= self.rows_per_chunk
+
+    def drain(self) -> str:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        self._pending = 0
+        return text
+
+
+def write_chunks(chunks: Iterable[str], output_file) -> None:
+    """Write text chunks to a file-like object."""
+    for chunk in chunks:
+        output_file.write(chunk)
+
+
+def session_chunks(
+    make_chunks: Callable[[Session], Iterable[str]],
+    session_factory: Callable[[], Session] = None
+) -> Iterator[str]:
+    """
+    Stream chunks from a dedicated session, closed when the stream ends.
+
+    Args:
+        make_chunks: Builds the chunk generator from a session
+        session_factory: Session factory (default: app.db.session.SessionLocal)
+    """
+    if session_factory is None:
+        from app.db.session import SessionLocal
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        yield from make_chunks(db)
+    finally:
+        db.close()
+
+
+def gzip_chunks(chunks: Iterable[str], encoding: str = "utf-8") -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_export(chunks: Iterable[str], filename: str, media_type: str = "text/csv", gzip: bool = False):
+    """
+    Build a StreamingResponse for an export.
+
+    Args:
+        chunks: Text chunks (lazily generated)
+        filename: Download filename
+        media_type: Content type of the uncompressed file
+        gzip: Compress the stream and serve ``<filename>.gz``
+
+    Returns:
+        StreamingResponse
+    """
+    from fastapi.responses import StreamingResponse
+
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+        )
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -22,8 +22,13 @@ class IngestionConfig(BaseModel):
     
     # Row limits
     MAX_CSV_ROWS: int = Field(default=100000, description="Max rows per CSV")
+    MAX_CSV_STREAM_ROWS: int = Field(default=5000000, description="Max rows per streamed CSV")
     MAX_TRANSACTIONS_PER_FILE: int = Field(default=100000, description="Max transactions")
     
+    # CSV streaming
+    CSV_SNIFF_BYTES: int = Field(default=65536, description="Prefix size used to detect the delimiter")
+    CSV_STREAM_CHUNK_SIZE: int = Field(default=5000, description="Transactions per streamed chunk")
+    
     # Accepted MIME types
     ACCEPTED_TYPES: List[str] = Field(default=[
         "text/csv",
@@ -58,7 +63,40 @@ class IngestionConfig(BaseModel):
     
     TESSERACT_LANG: str = Field(default="eng", description="Tesseract language")
     
-    OCR_DPI: int = Field(default=300, description="DPI for OCR preprocessing")
+    OCR_DPI: int = Field(
+        default=int(os.getenv("OCR_DPI", "300")),
+        description="DPI PDF pages are rendered at for OCR"
+    )
+    
+    # Batch OCR (app/ocr/batch.py)
+    OCR_WORKERS: int = Field(
+        default=int(os.getenv("OCR_WORKERS", "0")),
+        description="Processes running OCR on pages/receipts (0 = one per CPU, 1 = serial)"
+    )
+    OCR_TOKEN_CACHE_PREFIX: str = Field(
+        default=os.getenv("OCR_TOKEN_CACHE_PREFIX", "cache/ocr_tokens"),
+        description="Artifact path prefix for OCR tokens cached by image hash"
+    )
+    
+    # PDF page-parallel extraction
+    PDF_PAGE_WORKERS: int = Field(
+        default=int(os.getenv("PDF_PAGE_WORKERS", "0")),
+        description="Processes extracting PDF page tables (0 = one per CPU, 1 = serial)"
+    )
+    PDF_PARALLEL_MIN_PAGES: int = Field(
+        default=8,
+        description="Pages below which tables are extracted serially in-process"
+    )
+    
+    # Extraction cache (content-addressed by file SHA-256 + parser version)
+    EXTRACTION_CACHE_ENABLED: bool = Field(
+        default=os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true",
+        description="Reuse parsed transactions for re-uploaded files"
+    )
+    EXTRACTION_CACHE_PREFIX: str = Field(
+        default=os.getenv("EXTRACTION_CACHE_PREFIX", "cache/extractions"),
+        description="Artifact path prefix for cached extractions"
+    )
     
     # Timeouts (in seconds)
     PDF_EXTRACTION_TIMEOUT: int = Field(default=120, description="Timeout for PDF extraction")
@@ -9,16 +9,22 @@ import hashlib
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import String
 
 from app.ingestion.config import config
 from app.ingestion.schemas import CanonicalTransaction
 
 logger = logging.getLogger(__name__)
 
+# Fingerprints per IN (...) lookup; Postgres sends each chunk as one array
+LOOKUP_CHUNK_SIZE = 1000
+POSTGRES_LOOKUP_CHUNK_SIZE = 50000
+
 
 def generate_fingerprint(
     account_id: str,
@@ -97,36 +103,108 @@ def check_duplicate(
         return None
 
 
+def find_existing_fingerprints(
+    db: Session,
+    tenant_id: UUID,
+    fingerprints: Iterable[str]
+) -> Dict[str, UUID]:
+    """
+    Resolve many fingerprints against the database at once.
+    
+    Fingerprints are looked up in chunks with ``fingerprint IN (...)``; on
+    PostgreSQL each chunk is bound as a single array parameter
+    (``fingerprint = ANY(:fingerprints)``) so large chunks stay one
+    statement with one parameter.
+    
+    Args:
+        db: Database session
+        tenant_id: Tenant ID
+        fingerprints: Fingerprints to look up
+    
+    Returns:
+        Mapping of fingerprint to existing transaction ID (only found ones)
+    """
+    unique_fps = list(dict.fromkeys(fingerprints))
+    if not unique_fps:
+        return {}
+    
+    try:
+        from app.ingestion.models import Transaction
+        
+        is_postgres = db.get_bind().dialect.name == 'postgresql'
+        chunk_size = POSTGRES_LOOKUP_CHUNK_SIZE if is_postgres else LOOKUP_CHUNK_SIZE
+        existing: Dict[str, UUID] = {}
+        
+        for start in range(0, len(unique_fps), chunk_size):
+            chunk = unique_fps[start:start + chunk_size]
+            if is_postgres:
+                fingerprint_filter = Transaction.fingerprint == any_(
+                    bindparam('fingerprints', value=chunk, type_=ARRAY(String))
+                )
+            else:
+                fingerprint_filter = Transaction.fingerprint.in_(chunk)
+            
+            rows = (
+                db.query(Transaction.fingerprint, Transaction.id)
+                .filter(
+                    and_(
+                        Transaction.tenant_id == tenant_id,
+                        fingerprint_filter
+                    )
+                )
+                .all()
+            )
+            for fingerprint, txn_id in rows:
+                existing.setdefault(fingerprint, txn_id)
+        
+        return existing
+    
+    except Exception as e:
+        logger.error(f"Error checking duplicates: {e}")
+        return {}
+
+
 def deduplicate_batch(
     db: Session,
     tenant_id: UUID,
-    transactions: List[CanonicalTransaction]
+    transactions: List[CanonicalTransaction],
+    seen_fingerprints: Optional[Set[str]] = None
 ) -> Tuple[List[CanonicalTransaction], List[CanonicalTransaction], int]:
     """
     Deduplicate a batch of transactions.
     
+    All fingerprints are computed up front and resolved against the
+    database with find_existing_fingerprints, so a batch costs a few
+    queries rather than one per transaction.
+    
     Args:
         db: Database session
         tenant_id: Tenant ID
         transactions: List of canonical transactions
+        seen_fingerprints: Fingerprints of unique transactions from earlier
+            batches of the same upload (updated in place)
     
     Returns:
         Tuple of (unique_transactions, duplicate_transactions, existing_duplicates_count)
     """
-    unique = []
-    duplicates = []
-    existing_count = 0
-    seen_fingerprints = set()
-    
-    for txn in transactions:
-        # Generate fingerprint
-        fingerprint = generate_fingerprint(
+    fingerprints = [
+        generate_fingerprint(
             account_id=txn.account_id,
             post_date=txn.post_date,
             amount=txn.amount,
             description=txn.description
         )
-        
+        for txn in transactions
+    ]
+    existing = find_existing_fingerprints(db, tenant_id, fingerprints)
+    
+    unique = []
+    duplicates = []
+    existing_count = 0
+    if seen_fingerprints is None:
+        seen_fingerprints = set()
+    
+    for txn, fingerprint in zip(transactions, fingerprints):
         # Check if duplicate within this batch
         if fingerprint in seen_fingerprints:
             duplicates.append(txn)
@@ -134,12 +212,8 @@ def deduplicate_batch(
             continue
         
         # Check if duplicate in database
-        existing_id = check_duplicate(db, tenant_id, fingerprint)
-        if existing_id:
-            # Mark as duplicate of existing
-            txn_dict = txn.dict()
-            txn_dict['duplicate_of'] = existing_id
-            duplicates.append(CanonicalTransaction(**txn_dict))
+        if fingerprint in existing:
+            duplicates.append(txn)
             existing_count += 1
             logger.debug(f"Database duplicate detected: {txn.description[:50]}")
             continue
@@ -157,6 +231,32 @@ def deduplicate_batch(
     return unique, duplicates, existing_count
 
 
+def deduplicate_stream(
+    db: Session,
+    tenant_id: UUID,
+    chunks: Iterable[List[CanonicalTransaction]]
+) -> Iterator[Tuple[List[CanonicalTransaction], List[CanonicalTransaction], int]]:
+    """
+    Deduplicate a stream of transaction chunks (e.g. CSVNormalizer.iter_chunks).
+    
+    Each chunk is resolved with one bulk lookup and yielded before the next
+    chunk is read; only fingerprints are kept across chunks, so the split
+    matches deduplicate_batch over the concatenated stream.
+    
+    Args:
+        db: Database session
+        tenant_id: Tenant ID
+        chunks: Iterable of transaction lists
+    
+    Yields:
+        (unique_transactions, duplicate_transactions, existing_duplicates_count)
+        per chunk
+    """
+    seen_fingerprints: Set[str] = set()
+    for chunk in chunks:
+        yield deduplicate_batch(db, tenant_id, chunk, seen_fingerprints=seen_fingerprints)
+
+
 def get_duplicate_transactions(
     db: Session,
     tenant_id: UUID,
@@ -0,0 +1,198 @@
+"""
+PDF Page Engine
+===============
+
+Opens a PDF once and shares its parsed pages between template feature
+extraction and table parsing.
+
+Table extraction dominates the cost of text PDFs and pages are
+independent, so for multi-page statements the remaining pages are
+fanned out across a process pool. Each worker opens the document once
+for a contiguous batch of pages; results are merged back in page order.
+Per-page timings are kept for ExtractionResult.metadata.
+"""
+
+import atexit
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pdfplumber
+    HAS_PDFPLUMBER = True
+except ImportError:
+    HAS_PDFPLUMBER = False
+
+from app.ingestion.config import config
+from app.ingestion.utils.text_features import features_from_pdfplumber
+
+logger = logging.getLogger(__name__)
+
+# A table: rows of cell strings (None for empty cells)
+Table = List[List[Optional[str]]]
+
+# Batches per worker: smaller batches balance uneven pages, larger ones open the PDF less often
+BATCHES_PER_WORKER = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _find_tables(page) -> Tuple[List[Table], Optional[tuple]]:
+    """Tables of a page and the bounding box of the first one (one table search)."""
+    found = page.find_tables()
+    return [table.extract() for table in found], (found[0].bbox if found else None)
+
+
+def extract_page_batch(pdf_path: str, page_numbers: List[int]) -> List[Tuple[int, List[Table], float]]:
+    """
+    Extract tables from a batch of pages (runs in a worker process).
+
+    Args:
+        pdf_path: Path to the PDF
+        page_numbers: Zero-based page numbers
+
+    Returns:
+        (page_number, tables, elapsed_ms) per page
+    """
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            start = time.perf_counter()
+            tables, _ = _find_tables(pdf.pages[page_number])
+            results.append((page_number, tables, (time.perf_counter() - start) * 1000))
+            # Cached page objects hold every character; drop them as we go
+            pdf.pages[page_number].flush_cache()
+    return results
+
+
+def default_workers() -> int:
+    """Configured page workers (0 means one per CPU)."""
+    return config.PDF_PAGE_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool, created on first use (spawn: no inherited locks/threads)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Stop the shared page worker pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class PDFPageEngine:
+    """
+    One open PDF whose page tables are extracted once and shared.
+
+    Usage:
+        with PDFPageEngine(path) as doc:
+            features = doc.features()
+            for tables in doc.all_page_tables():
+                ...
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        workers: Optional[int] = None,
+        min_parallel_pages: Optional[int] = None
+    ):
+        """
+        Args:
+            pdf_path: Path to the PDF
+            workers: Worker processes for table extraction (default: PDF_PAGE_WORKERS)
+            min_parallel_pages: Fewer pages are extracted serially (default: PDF_PARALLEL_MIN_PAGES)
+        """
+        self.pdf_path = Path(pdf_path)
+        self.workers = workers or default_workers()
+        self.min_parallel_pages = (
+            config.PDF_PARALLEL_MIN_PAGES if min_parallel_pages is None else min_parallel_pages
+        )
+        self.pdf = None
+        self.page_timings_ms: Dict[int, float] = {}
+        self.parallel_workers = 0
+        self._tables: Dict[int, List[Table]] = {}
+        self._bboxes: Dict[int, Optional[tuple]] = {}
+
+    def __enter__(self) -> "PDFPageEngine":
+        self.pdf = pdfplumber.open(self.pdf_path)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.pdf.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def page_tables(self, page_number: int) -> List[Table]:
+        """Tables of one page, extracted from the open document on first use."""
+        if page_number not in self._tables:
+            start = time.perf_counter()
+            self._tables[page_number], self._bboxes[page_number] = _find_tables(self.pdf.pages[page_number])
+            self.page_timings_ms[page_number] = (time.perf_counter() - start) * 1000
+        return self._tables[page_number]
+
+    def features(self) -> Dict:
+        """Template matching features, reusing the first page's tables."""
+        if self.page_count == 0:
+            return features_from_pdfplumber(self.pdf)
+        tables = self.page_tables(0)
+        return features_from_pdfplumber(self.pdf, first_page_tables=tables, first_table_bbox=self._bboxes[0])
+
+    def all_page_tables(self) -> List[List[Table]]:
+        """
+        Tables of every page, in page order.
+
+        Pages not extracted yet go to the process pool when there are at
+        least ``min_parallel_pages`` of them and more than one worker;
+        otherwise they are read from the already open document.
+        """
+        remaining = [n for n in range(self.page_count) if n not in self._tables]
+
+        if self.workers > 1 and len(remaining) >= self.min_parallel_pages:
+            self._extract_parallel(remaining)
+        else:
+            for page_number in remaining:
+                self.page_tables(page_number)
+
+        return [self._tables[n] for n in range(self.page_count)]
+
+    def timings(self) -> List[float]:
+        """Per-page table extraction time in ms, in page order."""
+        return [round(self.page_timings_ms.get(n, 0.0), 1) for n in range(self.page_count)]
+
+    def _extract_parallel(self, page_numbers: List[int]) -> None:
+        workers = min(self.workers, len(page_numbers))
+        size = math.ceil(len(page_numbers) / (workers * BATCHES_PER_WORKER))
+        batches = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+        pool = _get_pool(self.workers)
+        futures = [pool.submit(extract_page_batch, str(self.pdf_path), batch) for batch in batches]
+        for future in futures:
+            for page_number, tables, elapsed_ms in future.result():
+                self._tables[page_number] = tables
+                self.page_timings_ms[page_number] = elapsed_ms
+
+        self.parallel_workers = workers
+        logger.info(f"Extracted {len(page_numbers)} PDF pages in {len(batches)} batches on {workers} workers")
@@ -0,0 +1,179 @@
+"""
+Extraction Cache
+================
+
+Content-addressed cache of parsed statements. Users often re-upload the
+same file (or overlapping months); a hit returns the stored transactions
+without re-running CSV/OFX parsing, PDF table extraction or OCR.
+
+Keys are the file's SHA-256 plus the parser name and parser version:
+
+    {EXTRACTION_CACHE_PREFIX}/{parser}/{version}/{sha[:2]}/{sha}.json.gz
+
+Bumping a parser version (or, for template PDFs, editing any bank
+template, see TemplateRegistry.fingerprint) changes the path, so stale
+entries are never read. Entries are gzip-compressed JSON stored through
+app/storage/artifacts.py (local disk or S3).
+
+Usage:
+------
+```python
+rows, hit = extraction_cache.get_or_extract(
+    content, "csv", PARSER_VERSIONS["csv"], lambda: parse_rows(path)
+)
+```
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.ingestion.config import config
+from app.storage.artifacts import artifact_location, read_artifact, write_artifact
+
+logger = logging.getLogger(__name__)
+
+# Bump when a parser's output changes; old entries are then ignored
+PARSER_VERSIONS = {
+    "csv": "1",
+    "ofx": "1",
+    "pdf": "1",           # app/ingest/pdf_bank_parser.py (text + OCR)
+    "pdf_template": "1",  # app/ingestion/extract/pdf_template.py (+ template fingerprint)
+}
+
+
+# Attributes of parsed app.db.models.Transaction objects kept in cache entries
+TRANSACTION_FIELDS = ("txn_id", "date", "amount", "currency", "description", "counterparty", "raw", "doc_ids")
+
+
+def transaction_rows(transactions) -> list:
+    """Parsed transactions as JSON-friendly dicts (for put())."""
+    return [{name: getattr(txn, name, None) for name in TRANSACTION_FIELDS} for txn in transactions]
+
+
+def content_sha256(content: bytes) -> str:
+    """SHA-256 hex digest of file content."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_sha256(path, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Parsed-statement cache on top of the artifact store.
+
+    Tracks hits, misses, writes and errors per parser for ``stats()``.
+    """
+
+    def __init__(self, prefix: Optional[str] = None, enabled: Optional[bool] = None):
+        self.prefix = (prefix or config.EXTRACTION_CACHE_PREFIX).rstrip("/")
+        self.enabled = config.EXTRACTION_CACHE_ENABLED if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def path(self, sha256: str, parser: str, version: str) -> str:
+        """Artifact path of an entry."""
+        return f"{self.prefix}/{parser}/{version}/{sha256[:2]}/{sha256}.json.gz"
+
+    def get(self, sha256: str, parser: str, version: str) -> Optional[Any]:
+        """
+        Cached extraction for a file, or None.
+
+        Args:
+            sha256: File content SHA-256
+            parser: Parser name (key of PARSER_VERSIONS)
+            version: Parser version (including template fingerprint if any)
+
+        Returns:
+            The JSON payload stored by put()
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            blob = read_artifact(artifact_location(self.path(sha256, parser, version)), missing_ok=True)
+            payload = json.loads(gzip.decompress(blob)) if blob is not None else None
+        except Exception as e:
+            logger.warning(f"Extraction cache read failed for {sha256[:12]} ({parser}): {e}")
+            self._count(parser, "errors")
+            payload = None
+
+        self._count(parser, "hits" if payload is not None else "misses")
+        return payload
+
+    def put(self, sha256: str, parser: str, version: str, payload: Any) -> None:
+        """Store an extraction (JSON-serializable); failures are logged, never raised."""
+        if not self.enabled:
+            return
+
+        try:
+            blob = gzip.compress(json.dumps(payload, default=str).encode(), compresslevel=6)
+            write_artifact(self.path(sha256, parser, version), blob, content_type="application/gzip")
+            self._count(parser, "writes")
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed for {sha256[:12]} ({parser}): {e}")
+            self._count(parser, "errors")
+
+    def get_or_extract(
+        self,
+        content: bytes,
+        parser: str,
+        version: str,
+        extract: Callable[[], Any]
+    ) -> Tuple[Any, bool]:
+        """
+        Cached payload for ``content``, else ``extract()`` stored for next time.
+
+        Returns:
+            (payload, hit)
+        """
+        sha256 = content_sha256(content)
+        cached = self.get(sha256, parser, version)
+        if cached is not None:
+            logger.info(f"Extraction cache hit: {sha256[:12]} ({parser} v{version})")
+            return cached, True
+
+        payload = extract()
+        self.put(sha256, parser, version, payload)
+        return payload, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per parser and overall, with hit rate."""
+        with self._lock:
+            parsers = {name: dict(counts) for name, counts in self._counters.items()}
+
+        totals = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+        for counts in parsers.values():
+            for name in totals:
+                totals[name] += counts.get(name, 0)
+        lookups = totals["hits"] + totals["misses"]
+
+        return {
+            "enabled": self.enabled,
+            **totals,
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+            "parsers": parsers,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+    def _count(self, parser: str, name: str) -> None:
+        with self._lock:
+            counts = self._counters.setdefault(parser, {"hits": 0, "misses": 0, "writes": 0, "errors": 0})
+            counts[name] += 1
+
+
+# Global cache instance
+extraction_cache = ExtractionCache()
@@ -1,8 +1,8 @@
 """Normalizers for converting various formats to canonical schema."""
 
-from app.ingestion.normalize.csv_normalizer import CSVNormalizer, normalize_csv
+from app.ingestion.normalize.csv_normalizer import CSVNormalizer, normalize_csv, normalize_csv_chunks
 
-__all__ = ["CSVNormalizer", "normalize_csv"]
+__all__ = ["CSVNormalizer", "normalize_csv", "normalize_csv_chunks"]
 
 
 
@@ -4,14 +4,19 @@ CSV Normalizer
 
 Parse and normalize CSV bank statements to canonical transaction schema.
 Auto-detects delimiter, encoding, headers, and locale.
+
+Files are read as a stream: encoding and delimiter are sniffed from a
+prefix, then rows are parsed one at a time, so iter_transactions() and
+iter_chunks() use bounded memory regardless of file size. The row limit
+is checked before the first transaction is yielded (MAX_CSV_ROWS for
+normalize(), MAX_CSV_STREAM_ROWS when streaming).
 """
 
 import csv
 import logging
 from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
-from typing import List, Dict, Any, Tuple, Optional
-from io import StringIO
+from typing import List, Dict, Any, Tuple, Optional, Iterator
 import chardet
 
 from app.ingestion.config import config
@@ -26,6 +31,9 @@ from app.ingestion.schemas import CanonicalTransaction
 
 logger = logging.getLogger(__name__)
 
+# Characters read per block when counting lines for the row limit
+ROW_COUNT_BLOCK_CHARS = 1 << 20
+
 
 # Common CSV header mappings (case-insensitive)
 HEADER_MAPPINGS = {
@@ -96,6 +104,7 @@ class CSVNormalizer:
         self.header_map = {}
         self.date_format = None
         self.has_separate_debit_credit = False
+        self.row_errors: List[Dict[str, Any]] = []
         
     def _detect_encoding(self) -> str:
         """Detect file encoding."""
@@ -292,74 +301,153 @@ class CSVNormalizer:
         """
         logger.info(f"Normalizing CSV: {self.file_path}")
         
-        # Read file
+        transactions = list(self.iter_transactions(account_hint, max_rows=config.MAX_CSV_ROWS))
+        
+        logger.info(f"Parsed {len(transactions)} transactions from CSV")
+        
+        return transactions
+    
+    def iter_chunks(
+        self,
+        account_hint: Optional[str] = None,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[List[CanonicalTransaction]]:
+        """
+        Stream canonical transactions in lists of at most chunk_size.
+        
+        Args:
+            account_hint: Optional account number hint
+            chunk_size: Transactions per chunk (default from config)
+        
+        Yields:
+            Lists of canonical transactions
+        """
+        chunk_size = chunk_size or config.CSV_STREAM_CHUNK_SIZE
+        chunk = []
+        
+        for txn in self.iter_transactions(account_hint):
+            chunk.append(txn)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        
+        if chunk:
+            yield chunk
+    
+    def _count_rows(self, f, limit: int) -> int:
+        """
+        Count data rows from the start of the file.
+        
+        Newlines give a cheap upper bound; rows are only counted exactly
+        (quoted fields may span lines) when that bound exceeds limit.
+        
+        Returns:
+            The exact row count if above limit, else an upper bound
+        """
+        lines = 0
+        for block in iter(lambda: f.read(ROW_COUNT_BLOCK_CHARS), ''):
+            # Line breaks: \n, \r\n or bare \r (a \r\n split across blocks counts twice)
+            lines += block.count('\n') + block.count('\r') - block.count('\r\n')
+        if lines <= limit:
+            return lines
+        
+        f.seek(0)
+        return sum(1 for row in csv.reader(f, delimiter=self.delimiter) if row) - 1
+    
+    def iter_transactions(
+        self,
+        account_hint: Optional[str] = None,
+        max_rows: Optional[int] = None
+    ) -> Iterator[CanonicalTransaction]:
+        """
+        Stream canonical transactions from the CSV file.
+        
+        The delimiter is detected from the first CSV_SNIFF_BYTES of the
+        file and the row limit is checked before anything is yielded;
+        rows are then read and parsed one at a time. Rows that fail to
+        parse are recorded in self.row_errors and skipped.
+        
+        Args:
+            account_hint: Optional account number hint
+            max_rows: Row limit (default: config.MAX_CSV_STREAM_ROWS)
+        
+        Yields:
+            Canonical transactions in file order
+        
+        Raises:
+            TooManyRowsError: Before the first transaction, if the file
+                has more than max_rows rows
+        """
+        max_rows = max_rows or config.MAX_CSV_STREAM_ROWS
+        self.row_errors = []
+        
         try:
-            with open(self.file_path, 'r', encoding=self.encoding, errors='replace') as f:
-                content = f.read()
+            f = open(self.file_path, 'r', encoding=self.encoding, errors='replace', newline='')
         except Exception as e:
             raise ParseFailedError("csv", f"Failed to read file: {e}")
         
-        # Detect delimiter
-        lines = content.split('\n')
-        self.delimiter = self._detect_delimiter(lines)
-        
-        # Parse CSV
-        try:
-            reader = csv.DictReader(
-                StringIO(content),
-                delimiter=self.delimiter
-            )
-            
-            self.headers = reader.fieldnames or []
-            if not self.headers:
-                raise ParseFailedError("csv", "No headers found")
-            
-            # Map headers
-            self.header_map = self._map_headers(self.headers)
-            
-            # Validate required fields
-            if 'post_date' not in self.header_map:
-                raise MissingRequiredFieldError('post_date or date')
+        with f:
+            # Detect delimiter from a prefix (drop the last, possibly partial, line)
+            prefix = f.read(config.CSV_SNIFF_BYTES)
+            lines = prefix.splitlines()
+            if len(prefix) == config.CSV_SNIFF_BYTES and len(lines) > 1:
+                lines = lines[:-1]
+            self.delimiter = self._detect_delimiter(lines)
+            f.seek(0)
             
-            if 'description' not in self.header_map:
-                raise MissingRequiredFieldError('description or memo')
-            
-            if 'amount' not in self.header_map and not self.has_separate_debit_credit:
-                raise MissingRequiredFieldError('amount or debit/credit columns')
-            
-            # Parse rows
-            transactions = []
-            row_count = 0
-            
-            for row in reader:
-                row_count += 1
+            # Parse CSV
+            try:
+                # Check the row limit up front, so a caller never half-ingests a file
+                row_count = self._count_rows(f, max_rows)
+                if row_count > max_rows:
+                    raise TooManyRowsError(row_count, max_rows)
+                f.seek(0)
                 
-                # Check row limit
-                if row_count > config.MAX_CSV_ROWS:
-                    raise TooManyRowsError(row_count, config.MAX_CSV_ROWS)
+                reader = csv.DictReader(f, delimiter=self.delimiter)
                 
-                # Skip empty rows
-                if not any(row.values()):
-                    continue
+                self.headers = reader.fieldnames or []
+                if not self.headers:
+                    raise ParseFailedError("csv", "No headers found")
                 
-                try:
-                    txn = self._parse_row(row, account_hint)
+                # Map headers
+                self.header_map = self._map_headers(self.headers)
+                
+                # Validate required fields
+                if 'post_date' not in self.header_map:
+                    raise MissingRequiredFieldError('post_date or date')
+                
+                if 'description' not in self.header_map:
+                    raise MissingRequiredFieldError('description or memo')
+                
+                if 'amount' not in self.header_map and not self.has_separate_debit_credit:
+                    raise MissingRequiredFieldError('amount or debit/credit columns')
+                
+                # Parse rows
+                row_count = 0
+                
+                for row in reader:
+                    row_count += 1
+                    
+                    # Skip empty rows
+                    if not any(row.values()):
+                        continue
+                    
+                    try:
+                        txn = self._parse_row(row, account_hint)
+                    except Exception as e:
+                        logger.warning(f"Failed to parse row {row_count}: {e}")
+                        self.row_errors.append({'row': row_count, 'error': str(e)})
+                        continue
+                    
                     if txn:
-                        transactions.append(txn)
-                except Exception as e:
-                    logger.warning(f"Failed to parse row {row_count}: {e}")
-                    continue
-            
-            logger.info(f"Parsed {len(transactions)} transactions from CSV")
+                        yield txn
             
-            return transactions
-        
-        except csv.Error as e:
-            raise ParseFailedError("csv", f"CSV parsing error: {e}")
-        except Exception as e:
-            if isinstance(e, (ParseFailedError, MissingRequiredFieldError, TooManyRowsError)):
-                raise
-            raise ParseFailedError("csv", f"Unexpected error: {e}")
+            except csv.Error as e:
+                raise ParseFailedError("csv", f"CSV parsing error: {e}")
+            except Exception as e:
+                if isinstance(e, (ParseFailedError, MissingRequiredFieldError, TooManyRowsError)):
+                    raise
+                raise ParseFailedError("csv", f"Unexpected error: {e}")
     
     def _parse_row(self, row: Dict[str, str], account_hint: Optional[str]) -> Optional[CanonicalTransaction]:
         """
@@ -480,4 +568,23 @@ def normalize_csv(
     return normalizer.normalize(account_hint=account_hint)
 
 
-
+def normalize_csv_chunks(
+    file_path: str,
+    account_hint: Optional[str] = None,
+    encoding: Optional[str] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[List[CanonicalTransaction]]:
+    """
+    Convenience function to stream a CSV file in chunks.
+    
+    Args:
+        file_path: Path to CSV file
+        account_hint: Optional account number hint
+        encoding: Optional encoding
+        chunk_size: Transactions per chunk (default from config)
+    
+    Yields:
+        Lists of canonical transactions
+    """
+    normalizer = CSVNormalizer(file_path, encoding=encoding)
+    yield from normalizer.iter_chunks(account_hint=account_hint, chunk_size=chunk_size)
@@ -4,34 +4,99 @@ Transaction Reconciliation and Guards
 
 Validate transaction data integrity with balance checks, date sequences,
 period consistency, and totals sanity checks.
+
+reconcile_transactions converts the batch to columns once
+(TransactionColumns: NumPy dates, float amounts/balances), sorts it once
+and derives every check from that single ordering. The individual check_*
+functions accept either a list of transactions or TransactionColumns.
 """
 
 import logging
+from collections import Counter
+from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
+
+import numpy as np
 
 from app.ingestion.config import config
 from app.ingestion.schemas import CanonicalTransaction, ReconciliationResult
 
 logger = logging.getLogger(__name__)
 
+# Date sequence guards
+MAX_GAP_DAYS = 90
+MAX_AGE_DAYS = 365 * 10
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass
+class TransactionColumns:
+    """
+    Column-oriented view of a transaction batch.
+    
+    Decimals are converted to float once; missing balances are NaN.
+    """
+    post_dates: np.ndarray  # datetime64[D]
+    amounts: np.ndarray  # float64
+    balances: np.ndarray  # float64, NaN where missing
+    account_ids: np.ndarray  # object
+    
+    @classmethod
+    def from_transactions(cls, transactions: List[CanonicalTransaction]) -> "TransactionColumns":
+        """Build columns from canonical transactions."""
+        n = len(transactions)
+        return cls(
+            post_dates=(
+                np.fromiter((t.post_date.toordinal() for t in transactions), dtype=np.int64, count=n)
+                - _EPOCH_ORDINAL
+            ).astype('datetime64[D]'),
+            amounts=np.fromiter((float(t.amount) for t in transactions), dtype=float, count=n),
+            balances=np.fromiter(
+                (float(t.balance) if t.balance is not None else np.nan for t in transactions),
+                dtype=float, count=n
+            ),
+            account_ids=np.fromiter((t.account_id for t in transactions), dtype=object, count=n),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.amounts)
+    
+    def date_order(self) -> np.ndarray:
+        """Indices that stably sort the batch by post date."""
+        return np.argsort(self.post_dates, kind='stable')
+
+
+Batch = Union[List[CanonicalTransaction], TransactionColumns]
+
+
+def _as_columns(transactions: Batch) -> TransactionColumns:
+    if isinstance(transactions, TransactionColumns):
+        return transactions
+    return TransactionColumns.from_transactions(transactions)
+
+
+def _to_date(value: np.datetime64) -> date:
+    return value.astype('datetime64[D]').astype(object)
+
 
 def reconcile_transactions(
-    transactions: List[CanonicalTransaction],
+    transactions: Batch,
     strict: bool = True
 ) -> ReconciliationResult:
     """
     Run all reconciliation checks on a batch of transactions.
     
     Args:
-        transactions: List of canonical transactions
+        transactions: List of canonical transactions or TransactionColumns
         strict: If True, any failure marks overall as failed
     
     Returns:
         ReconciliationResult with pass/fail and details
     """
-    if not transactions:
+    if len(transactions) == 0:
         return ReconciliationResult(
             passed=True,
             checks=[],
@@ -39,12 +104,16 @@ def reconcile_transactions(
             warnings=["No transactions to reconcile"]
         )
     
+    # Convert and sort once for all checks
+    columns = _as_columns(transactions)
+    order = columns.date_order()
+    
     checks = []
     errors = []
     warnings = []
     
     # Run individual checks
-    balance_pass, balance_details = check_running_balance(transactions)
+    balance_pass, balance_details = _check_running_balance(columns, order)
     checks.append({
         "name": "running_balance",
         "passed": balance_pass,
@@ -53,7 +122,7 @@ def reconcile_transactions(
     if not balance_pass:
         errors.extend(balance_details.get('errors', []))
     
-    date_pass, date_details = check_date_sequence(transactions)
+    date_pass, date_details = _check_date_sequence(columns, order)
     checks.append({
         "name": "date_sequence",
         "passed": date_pass,
@@ -62,7 +131,7 @@ def reconcile_transactions(
     if not date_pass:
         warnings.extend(date_details.get('warnings', []))
     
-    period_pass, period_details = check_period_consistency(transactions)
+    period_pass, period_details = _check_period_consistency(columns, order)
     checks.append({
         "name": "period_consistency",
         "passed": period_pass,
@@ -71,7 +140,7 @@ def reconcile_transactions(
     if not period_pass:
         warnings.extend(period_details.get('warnings', []))
     
-    totals_pass, totals_details = check_totals_sanity(transactions)
+    totals_pass, totals_details = _check_totals_sanity(columns)
     checks.append({
         "name": "totals_sanity",
         "passed": totals_pass,
@@ -81,7 +150,7 @@ def reconcile_transactions(
         warnings.extend(totals_details.get('warnings', []))
     
     # Check for multi-account splits
-    split_detected, split_details = detect_multi_account(transactions)
+    split_detected, split_details = _detect_multi_account(columns.account_ids.tolist())
     if split_detected:
         warnings.append(f"Multiple accounts detected: {split_details['accounts']}")
     
@@ -105,7 +174,7 @@ def reconcile_transactions(
 
 
 def check_running_balance(
-    transactions: List[CanonicalTransaction],
+    transactions: Batch,
     tolerance: float = None
 ) -> Tuple[bool, Dict[str, Any]]:
     """
@@ -115,49 +184,53 @@ def check_running_balance(
     plus the transaction amount (within tolerance).
     
     Args:
-        transactions: List of transactions (should be date-ordered)
+        transactions: List of transactions or TransactionColumns
         tolerance: Balance tolerance in currency units (default from config)
     
     Returns:
         Tuple of (passed, details_dict)
     """
+    columns = _as_columns(transactions)
+    return _check_running_balance(columns, columns.date_order(), tolerance)
+
+
+def _check_running_balance(
+    columns: TransactionColumns,
+    order: np.ndarray,
+    tolerance: float = None
+) -> Tuple[bool, Dict[str, Any]]:
     if tolerance is None:
         tolerance = config.BALANCE_TOLERANCE
     
-    # Filter transactions that have balance information
-    with_balance = [t for t in transactions if t.balance is not None]
+    # Date-ordered transactions that have balance information
+    with_balance = order[~np.isnan(columns.balances[order])]
     
-    if not with_balance:
+    if len(with_balance) == 0:
         return True, {
             "message": "No balance information to validate",
             "validated_count": 0
         }
     
-    # Sort by post_date
-    sorted_txns = sorted(with_balance, key=lambda t: t.post_date)
-    
-    errors = []
-    validated = 0
-    
-    for i in range(1, len(sorted_txns)):
-        prev = sorted_txns[i - 1]
-        curr = sorted_txns[i]
-        
-        # Calculate expected balance
-        expected_balance = float(prev.balance) + float(curr.amount)
-        actual_balance = float(curr.balance)
-        
-        # Check if within tolerance
-        difference = abs(expected_balance - actual_balance)
-        
-        if difference > tolerance:
-            errors.append(
-                f"Balance mismatch on {curr.post_date}: "
-                f"expected {expected_balance:.2f}, got {actual_balance:.2f} "
-                f"(diff: {difference:.2f})"
-            )
-        else:
-            validated += 1
+    balances = columns.balances[with_balance]
+    
+    # Expected balance = previous balance + current amount
+    expected = balances[:-1] + columns.amounts[with_balance[1:]]
+    actual = balances[1:]
+    difference = np.abs(expected - actual)
+    mismatched = np.flatnonzero(difference > tolerance)
+    
+    errors = [
+        f"Balance mismatch on {day}: "
+        f"expected {exp:.2f}, got {act:.2f} "
+        f"(diff: {diff:.2f})"
+        for day, exp, act, diff in zip(
+            np.datetime_as_string(columns.post_dates[with_balance[mismatched + 1]], unit='D').tolist(),
+            expected[mismatched].tolist(),
+            actual[mismatched].tolist(),
+            difference[mismatched].tolist()
+        )
+    ]
+    validated = len(difference) - len(mismatched)
     
     passed = len(errors) == 0
     
@@ -170,67 +243,59 @@ def check_running_balance(
 
 
 def check_date_sequence(
-    transactions: List[CanonicalTransaction]
+    transactions: Batch
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Check that transaction dates are in reasonable sequence.
     
     Warnings for:
-    - Dates not monotonically increasing
     - Large gaps between transactions
     - Future dates
+    - Very old dates
     
     Args:
-        transactions: List of transactions
+        transactions: List of transactions or TransactionColumns
     
     Returns:
         Tuple of (passed, details_dict)
     """
-    if len(transactions) < 2:
+    columns = _as_columns(transactions)
+    return _check_date_sequence(columns, columns.date_order())
+
+
+def _check_date_sequence(
+    columns: TransactionColumns,
+    order: np.ndarray
+) -> Tuple[bool, Dict[str, Any]]:
+    if len(columns) < 2:
         return True, {"message": "Not enough transactions for sequence check"}
     
-    sorted_txns = sorted(transactions, key=lambda t: t.post_date)
+    sorted_dates = columns.post_dates[order]
     
     warnings = []
     today = date.today()
     
     # Check for future dates
-    future_dates = [t for t in sorted_txns if t.post_date > today]
-    if future_dates:
+    future_count = int(np.count_nonzero(sorted_dates > np.datetime64(today, 'D')))
+    if future_count:
         warnings.append(
-            f"{len(future_dates)} transaction(s) with future dates"
+            f"{future_count} transaction(s) with future dates"
         )
     
-    # Check for non-monotonic dates (if pre-sorted)
-    non_monotonic = 0
-    for i in range(1, len(sorted_txns)):
-        if sorted_txns[i].post_date < sorted_txns[i-1].post_date:
-            non_monotonic += 1
-    
-    if non_monotonic > 0:
-        warnings.append(f"{non_monotonic} out-of-sequence date(s)")
+    # Dates are sorted, so they are never out of sequence here
     
     # Check for large gaps
-    max_gap_days = 90  # 90 days
-    large_gaps = []
-    
-    for i in range(1, len(sorted_txns)):
-        gap = (sorted_txns[i].post_date - sorted_txns[i-1].post_date).days
-        if gap > max_gap_days:
-            large_gaps.append({
-                "from": str(sorted_txns[i-1].post_date),
-                "to": str(sorted_txns[i].post_date),
-                "gap_days": gap
-            })
+    gaps = np.diff(sorted_dates).astype(int)
+    large_gap_idx = np.flatnonzero(gaps > MAX_GAP_DAYS)
     
-    if large_gaps:
-        warnings.append(f"{len(large_gaps)} gap(s) over {max_gap_days} days")
+    if len(large_gap_idx):
+        warnings.append(f"{len(large_gap_idx)} gap(s) over {MAX_GAP_DAYS} days")
     
     # Check for very old dates (>10 years)
-    ten_years_ago = today - timedelta(days=365*10)
-    very_old = [t for t in sorted_txns if t.post_date < ten_years_ago]
-    if very_old:
-        warnings.append(f"{len(very_old)} transaction(s) older than 10 years")
+    ten_years_ago = today - timedelta(days=MAX_AGE_DAYS)
+    very_old_count = int(np.count_nonzero(sorted_dates < np.datetime64(ten_years_ago, 'D')))
+    if very_old_count:
+        warnings.append(f"{very_old_count} transaction(s) older than 10 years")
     
     # Pass if no critical issues (future dates are warnings, not failures)
     passed = len(warnings) == 0 or all('future' not in w for w in warnings)
@@ -238,41 +303,53 @@ def check_date_sequence(
     return passed, {
         "warnings": warnings,
         "date_range": {
-            "earliest": str(sorted_txns[0].post_date),
-            "latest": str(sorted_txns[-1].post_date)
+            "earliest": str(_to_date(sorted_dates[0])),
+            "latest": str(_to_date(sorted_dates[-1]))
         },
-        "large_gaps": large_gaps[:5]  # Report first 5 large gaps
+        "large_gaps": [  # Report first 5 large gaps
+            {
+                "from": str(_to_date(sorted_dates[i])),
+                "to": str(_to_date(sorted_dates[i + 1])),
+                "gap_days": int(gaps[i])
+            }
+            for i in large_gap_idx[:5]
+        ]
     }
 
 
 def check_period_consistency(
-    transactions: List[CanonicalTransaction]
+    transactions: Batch
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Check that transactions span a consistent period.
     
     Args:
-        transactions: List of transactions
+        transactions: List of transactions or TransactionColumns
     
     Returns:
         Tuple of (passed, details_dict)
     """
-    if not transactions:
+    if len(transactions) == 0:
         return True, {"message": "No transactions"}
     
-    sorted_txns = sorted(transactions, key=lambda t: t.post_date)
-    
-    earliest = sorted_txns[0].post_date
-    latest = sorted_txns[-1].post_date
-    span_days = (latest - earliest).days
+    columns = _as_columns(transactions)
+    return _check_period_consistency(columns, columns.date_order())
+
+
+def _check_period_consistency(
+    columns: TransactionColumns,
+    order: np.ndarray
+) -> Tuple[bool, Dict[str, Any]]:
+    count = len(columns)
+    span_days = int((columns.post_dates[order[-1]] - columns.post_dates[order[0]]).astype(int))
     
     warnings = []
     
     # Check for very short periods with many transactions
-    if span_days < 7 and len(transactions) > 100:
+    if span_days < 7 and count > 100:
         warnings.append(
             f"Unusually high transaction density: "
-            f"{len(transactions)} transactions in {span_days} days"
+            f"{count} transactions in {span_days} days"
         )
     
     # Check for very long periods
@@ -284,7 +361,7 @@ def check_period_consistency(
     
     # Check transaction distribution
     if span_days > 0:
-        avg_per_day = len(transactions) / span_days
+        avg_per_day = count / span_days
         if avg_per_day > 50:
             warnings.append(
                 f"Very high transaction rate: {avg_per_day:.1f} per day"
@@ -294,31 +371,37 @@ def check_period_consistency(
     
     return passed, {
         "span_days": span_days,
-        "transaction_count": len(transactions),
+        "transaction_count": count,
         "warnings": warnings
     }
 
 
 def check_totals_sanity(
-    transactions: List[CanonicalTransaction]
+    transactions: Batch
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Check that transaction totals are reasonable.
     
     Args:
-        transactions: List of transactions
+        transactions: List of transactions or TransactionColumns
     
     Returns:
         Tuple of (passed, details_dict)
     """
-    if not transactions:
+    if len(transactions) == 0:
         return True, {"message": "No transactions"}
     
+    return _check_totals_sanity(_as_columns(transactions))
+
+
+def _check_totals_sanity(columns: TransactionColumns) -> Tuple[bool, Dict[str, Any]]:
     warnings = []
+    amounts = columns.amounts
     
-    # Calculate totals
-    total_debits = sum(float(t.amount) for t in transactions if float(t.amount) < 0)
-    total_credits = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
+    # Calculate totals (builtin sum over floats keeps results identical
+    # to summing the transactions one by one)
+    total_debits = sum(amounts[amounts < 0].tolist())
+    total_credits = sum(amounts[amounts > 0].tolist())
     net_change = total_debits + total_credits
     
     # Check if all transactions are one-sided (all debits or all credits)
@@ -341,12 +424,11 @@ def check_totals_sanity(
         warnings.append("Unusually large transaction totals")
     
     # Check average transaction size
-    if transactions:
-        avg_amount = abs(sum(float(t.amount) for t in transactions) / len(transactions))
-        if avg_amount > 1_000_000:  # Average > $1M
-            warnings.append(f"Very high average transaction: ${avg_amount:,.2f}")
-        elif avg_amount < 0.01:  # Average < 1 cent
-            warnings.append(f"Very low average transaction: ${avg_amount:.4f}")
+    avg_amount = abs(sum(amounts.tolist()) / len(amounts))
+    if avg_amount > 1_000_000:  # Average > $1M
+        warnings.append(f"Very high average transaction: ${avg_amount:,.2f}")
+    elif avg_amount < 0.01:  # Average < 1 cent
+        warnings.append(f"Very low average transaction: ${avg_amount:.4f}")
     
     passed = len(warnings) == 0
     
@@ -354,28 +436,34 @@ def check_totals_sanity(
         "total_debits": total_debits,
         "total_credits": total_credits,
         "net_change": net_change,
-        "transaction_count": len(transactions),
+        "transaction_count": len(amounts),
         "warnings": warnings
     }
 
 
 def detect_multi_account(
-    transactions: List[CanonicalTransaction]
+    transactions: Batch
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Detect if transactions span multiple accounts.
     
     Args:
-        transactions: List of transactions
+        transactions: List of transactions or TransactionColumns
     
     Returns:
         Tuple of (has_multiple_accounts, details_dict)
     """
-    if not transactions:
+    if isinstance(transactions, TransactionColumns):
+        return _detect_multi_account(transactions.account_ids.tolist())
+    return _detect_multi_account([t.account_id for t in transactions])
+
+
+def _detect_multi_account(account_ids: List[str]) -> Tuple[bool, Dict[str, Any]]:
+    if not account_ids:
         return False, {}
     
     # Get unique accounts
-    accounts = set(t.account_id for t in transactions if t.account_id)
+    accounts = set(a for a in account_ids if a)
     
     if len(accounts) <= 1:
         return False, {
@@ -383,11 +471,12 @@ def detect_multi_account(
             "accounts": list(accounts)
         }
     
-    # Count transactions per account
-    account_counts = {}
-    for txn in transactions:
-        if txn.account_id:
-            account_counts[txn.account_id] = account_counts.get(txn.account_id, 0) + 1
+    # Count transactions per account (in order of first appearance)
+    account_counts = {
+        account_id: count
+        for account_id, count in Counter(account_ids).items()
+        if account_id
+    }
     
     return True, {
         "account_count": len(accounts),
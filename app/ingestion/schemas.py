@@ -25,7 +25,7 @@ class CanonicalTransaction(BaseModel):
     amount: Decimal = Field(..., description="Signed amount (negative=debit, positive=credit)")
     balance: Optional[Decimal] = Field(None, description="Running balance after transaction")
     currency: constr(min_length=3, max_length=3) = Field(default="USD", description="ISO 4217 currency code")
-    source: Literal["pdf", "csv", "ofx", "ocr", "image"] = Field(..., description="Extraction source")
+    source: Literal["pdf", "csv", "ofx", "ocr", "image", "camt", "mt940", "bai2"] = Field(..., description="Extraction source")
     source_confidence: condecimal(ge=0, le=1) = Field(..., description="Extraction confidence (0.0-1.0)")
     
     # Optional metadata
@@ -9,18 +9,28 @@ Parsers for international banking standards:
 - OFX: Open Financial Exchange (SGML/XML)
 
 All parsers return List[CanonicalTransaction] for uniform processing.
+The iter_* variants yield the same transactions incrementally with
+bounded memory, for large files (see stream.py).
 """
 
-from app.ingestion.standards.camt_parser import parse_camt
-from app.ingestion.standards.mt940_parser import parse_mt940
-from app.ingestion.standards.bai2_parser import parse_bai2
-from app.ingestion.standards.ofx_parser import parse_ofx
+from app.ingestion.standards.camt_parser import iter_camt, parse_camt
+from app.ingestion.standards.mt940_parser import iter_mt940, parse_mt940
+from app.ingestion.standards.bai2_parser import iter_bai2, parse_bai2
+from app.ingestion.standards.ofx_parser import iter_ofx, parse_ofx
+from app.ingestion.standards.stream import STREAM_PARSERS, iter_standard, iter_standard_chunks
 
 __all__ = [
     "parse_camt",
     "parse_mt940",
     "parse_bai2",
     "parse_ofx",
+    "iter_camt",
+    "iter_mt940",
+    "iter_bai2",
+    "iter_ofx",
+    "STREAM_PARSERS",
+    "iter_standard",
+    "iter_standard_chunks",
 ]
 
 
@@ -14,13 +14,18 @@ Record Types:
   99 - File Trailer
 """
 
+import logging
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from app.ingestion.schemas import CanonicalTransaction
 
+logger = logging.getLogger(__name__)
+
+# Bank-issued structured statements: no extraction uncertainty
+SOURCE_CONFIDENCE = Decimal("0.95")
 
 def parse_bai2(file_path: Path) -> List[CanonicalTransaction]:
     """
@@ -32,43 +37,69 @@ def parse_bai2(file_path: Path) -> List[CanonicalTransaction]:
     Returns:
         List of CanonicalTransaction objects
     """
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
+    return list(iter_bai2(file_path))
+
+
+def iter_bai2(file_path: Path) -> Iterator[CanonicalTransaction]:
+    """
+    Stream canonical transactions from a BAI2 file.
+    
+    Records are read one line at a time. A 16 record is held until the
+    next record so that 88 continuation records can be appended to it.
     
-    transactions = []
+    Args:
+        file_path: Path to BAI2 text file
+        
+    Yields:
+        CanonicalTransaction objects in file order
+    """
     current_account = None
     current_currency = "USD"
     current_date = datetime.now().date()
+    pending = None  # 16 record awaiting continuations
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        record_type = line[:2]
-        
-        if record_type == "02":  # Group Header
-            # Extract date from position 12-17 (YYMMDD)
-            parts = line.split(',')
-            if len(parts) >= 4:
-                date_str = parts[3]
-                if len(date_str) == 6:
-                    current_date = _parse_bai2_date(date_str)
-        
-        elif record_type == "03":  # Account Identifier
-            # Format: 03,account_number,currency,type_code,...
-            parts = line.split(',')
-            if len(parts) >= 3:
-                current_account = parts[1]
-                currency_str = parts[2]
-                current_currency = currency_str if len(currency_str) == 3 else "USD"
-        
-        elif record_type == "16":  # Transaction Detail
-            txn = _parse_bai2_transaction(line, current_currency, current_account, current_date)
-            if txn:
-                transactions.append(txn)
-    
-    return transactions
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+            
+            record_type = line[:2]
+            
+            if record_type == "88":  # Continuation of the previous record
+                if pending is not None:
+                    pending = pending.rstrip('/') + ',' + line[3:]
+                continue
+            
+            if pending is not None:
+                txn = _parse_bai2_transaction(pending, current_currency, current_account, current_date)
+                pending = None
+                if txn:
+                    yield txn
+            
+            if record_type == "02":  # Group Header
+                # Extract date from position 12-17 (YYMMDD)
+                parts = line.split(',')
+                if len(parts) >= 4:
+                    date_str = parts[3]
+                    if len(date_str) == 6:
+                        current_date = _parse_bai2_date(date_str)
+            
+            elif record_type == "03":  # Account Identifier
+                # Format: 03,account_number,currency,type_code,...
+                parts = line.split(',')
+                if len(parts) >= 3:
+                    current_account = parts[1]
+                    currency_str = parts[2]
+                    current_currency = currency_str if len(currency_str) == 3 else "USD"
+            
+            elif record_type == "16":  # Transaction Detail
+                pending = line
+    
+    if pending is not None:
+        txn = _parse_bai2_transaction(pending, current_currency, current_account, current_date)
+        if txn:
+            yield txn
 
 
 def _parse_bai2_date(date_str: str) -> datetime.date:
@@ -130,10 +161,13 @@ def _parse_bai2_transaction(line: str, currency: str, account: str, post_date: d
     reference = customer_ref or bank_ref
     
     return CanonicalTransaction(
+        account_id=account or "unknown",
         post_date=post_date,
         description=description,
         amount=float(amount),
         currency=currency,
+        source="bai2",
+        source_confidence=SOURCE_CONFIDENCE,
         reference=reference,
         metadata={
             "source_format": "bai2",
@@ -146,7 +180,6 @@ def _parse_bai2_transaction(line: str, currency: str, account: str, post_date: d
 # Example usage
 if __name__ == "__main__":
     import sys
-    from decimal import InvalidOperation
     if len(sys.argv) > 1:
         result = parse_bai2(Path(sys.argv[1]))
         print(f"Parsed {len(result)} transactions")
@@ -18,11 +18,20 @@ Key tags:
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+import logging
 import re
 
 from app.ingestion.schemas import CanonicalTransaction
 
+logger = logging.getLogger(__name__)
+
+# Bank-issued structured statements: no extraction uncertainty
+SOURCE_CONFIDENCE = Decimal("0.95")
+
+# Start of a tag line, e.g. ":61:" or ":60F:"
+TAG_LINE = re.compile(r'^:(\d{2}[A-Z]?):(.*)$')
+
 
 def parse_mt940(file_path: Path) -> List[CanonicalTransaction]:
     """
@@ -34,82 +43,89 @@ def parse_mt940(file_path: Path) -> List[CanonicalTransaction]:
     Returns:
         List of CanonicalTransaction objects
     """
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    transactions = []
-    
-    # Split into records (each record starts with :20:)
-    records = re.split(r'(?=:20:)', content)
-    
-    for record in records:
-        if not record.strip():
-            continue
-        
-        txns = _parse_record(record)
-        transactions.extend(txns)
-    
-    return transactions
+    return list(iter_mt940(file_path))
 
 
-def _parse_record(record: str) -> List[CanonicalTransaction]:
-    """Parse a single MT940 record."""
-    transactions = []
+def iter_mt940(file_path: Path) -> Iterator[CanonicalTransaction]:
+    """
+    Stream canonical transactions from an MT940 file.
     
-    # Extract tags
-    tags = _extract_tags(record)
+    The file is read line by line. Each :61: statement line is held
+    until the next tag so its :86: information (if any) becomes the
+    description, then yielded; continuation lines are appended to the
+    current tag. The account is the record's :25: and the currency comes
+    from its :60F:/:60M: opening balance.
     
-    # Opening balance (for reference, not a transaction)
-    opening_balance = _parse_balance_tag(tags.get('60F', ''))
-    currency = opening_balance[1] if opening_balance else 'USD'
+    Args:
+        file_path: Path to MT940 text file
+        
+    Yields:
+        CanonicalTransaction objects in file order
+    """
+    currency = 'USD'
+    account_id = 'unknown'
+    tag, value = None, []
+    pending = None  # :61: line awaiting its :86:
     
-    # Parse each :61: tag (statement line)
-    for tag_61 in tags.get_all('61'):
-        try:
-            txn = _parse_statement_line(tag_61, currency, tags)
-            if txn:
-                transactions.append(txn)
-        except Exception as e:
-            print(f"Warning: Failed to parse :61: line: {e}")
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in _tag_lines(f):
+            if line is None:
+                next_tag, next_value = None, None
+            else:
+                match = TAG_LINE.match(line)
+                if not match:
+                    # Continuation of the current tag
+                    if tag:
+                        value.append(line)
+                    continue
+                next_tag, next_value = match.group(1), match.group(2)
+            
+            # Current tag is complete
+            if tag == '25':
+                account_id = ''.join(value) or 'unknown'
+            elif tag in ('60F', '60M'):
+                opening_balance = _parse_balance_tag(''.join(value))
+                currency = opening_balance[1] if opening_balance else 'USD'
+            elif tag == '61':
+                pending = '\n'.join(value)
+            elif tag == '86' and pending is not None:
+                txn = _statement_line(pending, account_id, currency, ' '.join(value))
+                pending = None
+                if txn:
+                    yield txn
+            
+            if pending is not None and next_tag != '86':
+                # :61: without information
+                txn = _statement_line(pending, account_id, currency, None)
+                pending = None
+                if txn:
+                    yield txn
+            
+            if next_tag == '20':
+                currency, account_id = 'USD', 'unknown'
+            tag, value = next_tag, ([next_value.strip()] if next_value is not None else [])
+
+
+def _tag_lines(f) -> Iterator[Optional[str]]:
+    """Stripped content lines, without SWIFT block wrappers, then None at EOF."""
+    for raw in f:
+        line = raw.strip()
+        if not line or line.startswith('{') or line in ('-', '-}'):
             continue
-    
-    return transactions
-
+        yield line
+    yield None
 
-class TagDict:
-    """Dict-like container that supports multiple values per key."""
-    def __init__(self):
-        self.data = {}
-    
-    def add(self, key: str, value: str):
-        if key not in self.data:
-            self.data[key] = []
-        self.data[key].append(value)
-    
-    def get(self, key: str, default='') -> str:
-        values = self.data.get(key, [])
-        return values[0] if values else default
-    
-    def get_all(self, key: str) -> List[str]:
-        return self.data.get(key, [])
 
-
-def _extract_tags(record: str) -> TagDict:
-    """Extract all :XX: tags from record."""
-    tags = TagDict()
-    
-    # Pattern: :TAG:VALUE (may span multiple lines until next tag)
-    pattern = r':(\d{2,3}):((?:(?!:\d{2,3}:).)+)'
-    
-    for match in re.finditer(pattern, record, re.DOTALL):
-        tag = match.group(1)
-        value = match.group(2).strip()
-        tags.add(tag, value)
-    
-    return tags
+def _statement_line(line_61: str, account_id: str, currency: str, info: Optional[str]) -> Optional[CanonicalTransaction]:
+    """Parse a :61: line, logging (not raising) malformed ones."""
+    try:
+        return _parse_statement_line(line_61, account_id, currency, info)
+    except Exception as e:
+        logger.warning(f"Failed to parse MT940 :61: line: {e}")
+        return None
 
 
-def _parse_statement_line(line_61: str, currency: str, tags: TagDict) -> Optional[CanonicalTransaction]:
+def _parse_statement_line(line_61: str, account_id: str, currency: str, info: Optional[str]) -> Optional[CanonicalTransaction]:
     """
     Parse :61: statement line.
     
@@ -146,18 +162,17 @@ def _parse_statement_line(line_61: str, currency: str, tags: TagDict) -> Optiona
     ref_match = re.search(r'//(.+)', line_61)
     reference = ref_match.group(1) if ref_match else None
     
-    # Try to get description from following :86: tag
-    description = "MT940 Transaction"
-    tag_86_list = tags.get_all('86')
-    if tag_86_list:
-        # Simple heuristic: use first :86: after this :61:
-        description = tag_86_list[0][:100]  # Truncate long descriptions
+    # Description from the :86: tag following this :61:
+    description = info[:100] if info else "MT940 Transaction"  # Truncate long descriptions
     
     return CanonicalTransaction(
+        account_id=account_id,
         post_date=post_date,
         description=description,
         amount=float(amount),
         currency=currency,
+        source="mt940",
+        source_confidence=SOURCE_CONFIDENCE,
         reference=reference,
         metadata={
             "source_format": "mt940",
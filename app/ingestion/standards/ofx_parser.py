@@ -17,15 +17,28 @@ Key elements:
 - MEMO: Additional description
 """
 
+import itertools
+import logging
 import re
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from app.ingestion.schemas import CanonicalTransaction
 
+logger = logging.getLogger(__name__)
+
+# Structured export, same base confidence as the OFX normalizer
+SOURCE_CONFIDENCE = Decimal("0.92")
+
+# Account aggregates whose ACCTID identifies the statement account
+ACCOUNT_TAGS = ('BANKACCTFROM', 'CCACCTFROM', 'INVACCTFROM')
+
+# Bare "&" in SGML values (e.g. "AT&T") that would break the XML parser
+BARE_AMPERSAND = re.compile(r'&(?!(?:amp|lt|gt|quot|apos|#\d+);)')
+
 
 def parse_ofx(file_path: Path) -> List[CanonicalTransaction]:
     """
@@ -37,95 +50,157 @@ def parse_ofx(file_path: Path) -> List[CanonicalTransaction]:
     Returns:
         List of CanonicalTransaction objects
     """
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
+    return list(iter_ofx(file_path))
+
+
+def iter_ofx(file_path: Path) -> Iterator[CanonicalTransaction]:
+    """
+    Stream canonical transactions from an OFX file.
     
-    # Detect if XML or SGML
-    is_xml = content.strip().startswith('<?xml')
+    Lines are fed to an incremental XML parser (SGML lines are closed on
+    the fly, see _sgml_to_xml_lines); each STMTTRN is converted when its
+    end tag arrives and then detached, so memory stays bounded by one
+    transaction. The currency is the enclosing statement's CURDEF and the
+    account its BANKACCTFROM/CCACCTFROM ACCTID.
     
-    if not is_xml:
-        # Convert SGML to XML
-        content = _sgml_to_xml(content)
+    Args:
+        file_path: Path to OFX file
+        
+    Yields:
+        CanonicalTransaction objects in file order
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack: List[ET.Element] = []
+    in_stmttrn = False
+    currency = "USD"
+    account_id = "unknown"
     
-    # Parse XML
-    try:
-        root = ET.fromstring(content)
-    except ET.ParseError as e:
-        # Try wrapping in root element
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = _content_lines(f)
+        first = next(lines, None)
+        if first is None:
+            return
+        
+        # Detect if XML or SGML
+        is_xml = first.startswith('<?xml')
+        source = itertools.chain([first], lines)
+        if not is_xml:
+            # Convert SGML to XML
+            source = _sgml_to_xml_lines(source)
+        
         try:
-            content = f"<OFX>{content}</OFX>"
-            root = ET.fromstring(content)
-        except ET.ParseError:
-            print(f"Error parsing OFX: {e}")
-            return []
-    
-    transactions = []
-    
-    # Find all STMTTRN (statement transaction) elements
-    for stmttrn in root.findall('.//STMTTRN'):
-        txn = _parse_stmttrn(stmttrn)
-        if txn:
-            transactions.append(txn)
-    
-    return transactions
+            for line in source:
+                parser.feed(line + '\n')
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        if elem.tag == 'STMTTRN':
+                            in_stmttrn = True
+                        stack.append(elem)
+                        continue
+                    
+                    stack.pop()
+                    if in_stmttrn and elem.tag != 'STMTTRN':
+                        continue
+                    if elem.tag == 'CURDEF' and elem.text:
+                        currency = elem.text.strip()
+                    elif elem.tag == 'ACCTID' and elem.text and stack and stack[-1].tag in ACCOUNT_TAGS:
+                        account_id = elem.text.strip()
+                    
+                    if elem.tag == 'STMTTRN':
+                        in_stmttrn = False
+                        txn = _parse_stmttrn(elem, currency, account_id)
+                        if txn:
+                            yield txn
+                    
+                    if stack:
+                        stack[-1].remove(elem)
+            parser.close()
+        except ET.ParseError as e:
+            logger.warning(f"Error parsing OFX {file_path}: {e}")
+
+
+def _content_lines(f) -> Iterator[str]:
+    """Stripped non-empty lines of a file."""
+    for raw in f:
+        line = raw.strip()
+        if line:
+            yield line
 
 
 def _sgml_to_xml(sgml_content: str) -> str:
+    """Convert OFX SGML to XML by closing tags (see _sgml_to_xml_lines)."""
+    return '\n'.join(_sgml_to_xml_lines(sgml_content.split('\n')))
+
+
+def _sgml_to_xml_lines(sgml_lines: Iterable[str]) -> Iterator[str]:
     """
-    Convert OFX SGML to XML by closing tags.
+    Convert OFX SGML to XML by closing tags, one line at a time.
     
     OFX 1.x uses SGML syntax where tags don't need to be closed:
     <TAG>value
     
     Convert to XML:
     <TAG>value</TAG>
+    
+    The OFX 1.x header block (OFXHEADER:100 ...) before the first tag is
+    skipped.
     """
-    lines = []
     tag_stack = []
+    started = False
     
-    for line in sgml_content.split('\n'):
+    for line in sgml_lines:
         line = line.strip()
         
         if not line or line.startswith('<!--'):
             continue
         
+        if not started:
+            if not line.startswith('<'):
+                continue
+            started = True
+        
         # Handle opening tags
         if line.startswith('<') and not line.startswith('</'):
             # Extract tag name
-            tag_match = re.match(r'<([A-Z0-9_]+)>(.*)$', line)
+            tag_match = re.match(r'<([A-Z0-9_.]+)>(.*)$', line)
             if tag_match:
                 tag_name = tag_match.group(1)
-                value = tag_match.group(2).strip()
+                value = BARE_AMPERSAND.sub('&amp;', tag_match.group(2).strip())
                 
-                if value:
+                if value.endswith(f"</{tag_name}>"):
+                    # Already closed on the same line
+                    yield f"<{tag_name}>{value}"
+                elif value:
                     # Tag with value on same line
-                    lines.append(f"<{tag_name}>{value}</{tag_name}>")
+                    yield f"<{tag_name}>{value}</{tag_name}>"
                 else:
                     # Opening tag only
-                    lines.append(f"<{tag_name}>")
+                    yield f"<{tag_name}>"
                     tag_stack.append(tag_name)
             else:
-                lines.append(line)
+                yield line
         
         # Handle closing tags
         elif line.startswith('</'):
             if tag_stack:
                 tag_stack.pop()
-            lines.append(line)
+            yield line
         
         else:
             # Content line
-            lines.append(line)
+            yield BARE_AMPERSAND.sub('&amp;', line)
     
     # Close any remaining open tags
     while tag_stack:
         tag_name = tag_stack.pop()
-        lines.append(f"</{tag_name}>")
-    
-    return '\n'.join(lines)
+        yield f"</{tag_name}>"
 
 
-def _parse_stmttrn(stmttrn: ET.Element) -> Optional[CanonicalTransaction]:
+def _parse_stmttrn(
+    stmttrn: ET.Element,
+    currency: str = "USD",
+    account_id: str = "unknown"
+) -> Optional[CanonicalTransaction]:
     """Parse STMTTRN (statement transaction) element."""
     
     # FITID (unique transaction ID)
@@ -165,31 +240,23 @@ def _parse_stmttrn(stmttrn: ET.Element) -> Optional[CanonicalTransaction]:
     
     description = ' - '.join(description_parts) if description_parts else "OFX Transaction"
     
-    # Currency (search in parent elements or use default)
-    currency = "USD"
-    curdef = stmttrn.find('.//CURDEF')
+    # Currency (transaction override, else the statement's CURDEF)
+    curdef = stmttrn.find('CURRENCY/CURSYM')
     if curdef is not None and curdef.text:
         currency = curdef.text.strip()
-    else:
-        # Try finding in parent STMTRS
-        parent = stmttrn
-        for _ in range(5):  # Search up to 5 levels
-            parent = list(stmttrn.iter())
-            if parent:
-                curdef = parent[0].find('.//CURDEF')
-                if curdef is not None and curdef.text:
-                    currency = curdef.text.strip()
-                    break
     
     # TRNTYPE for additional context
     trntype = stmttrn.find('TRNTYPE')
     trntype_value = trntype.text.strip() if trntype is not None and trntype.text else None
     
     return CanonicalTransaction(
+        account_id=account_id,
         post_date=post_date,
         description=description,
         amount=float(amount),
         currency=currency,
+        source="ofx",
+        source_confidence=SOURCE_CONFIDENCE,
         reference=reference,
         metadata={
             "source_format": "ofx",
@@ -202,7 +269,6 @@ def _parse_stmttrn(stmttrn: ET.Element) -> Optional[CanonicalTransaction]:
 # Example usage
 if __name__ == "__main__":
     import sys
-    from decimal import InvalidOperation
     if len(sys.argv) > 1:
         result = parse_ofx(Path(sys.argv[1]))
         print(f"Parsed {len(result)} transactions")
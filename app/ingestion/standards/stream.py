@@ -0,0 +1,80 @@
+"""
+Streaming Standards Parsing
+===========================
+
+Lazy access to the standards parsers for large files. Each ``iter_*``
+parser yields canonical transactions as entries complete (bounded
+memory); ``iter_standard_chunks`` groups them for chunk consumers such
+as dedupe.deduplicate_stream.
+
+Usage:
+------
+```python
+for unique, dups, existing in deduplicate_stream(
+    db, tenant_id, iter_standard_chunks(path, "camt")
+):
+    ...
+```
+"""
+
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.ingestion.config import config
+from app.ingestion.schemas import CanonicalTransaction
+from app.ingestion.standards.bai2_parser import iter_bai2
+from app.ingestion.standards.camt_parser import iter_camt
+from app.ingestion.standards.mt940_parser import iter_mt940
+from app.ingestion.standards.ofx_parser import iter_ofx
+
+
+STREAM_PARSERS: Dict[str, Callable[[Path], Iterator[CanonicalTransaction]]] = {
+    "camt": iter_camt,
+    "mt940": iter_mt940,
+    "bai2": iter_bai2,
+    "ofx": iter_ofx,
+}
+
+
+def iter_standard(file_path: Path, fmt: str) -> Iterator[CanonicalTransaction]:
+    """
+    Stream canonical transactions from a standards file.
+
+    Args:
+        file_path: Path to the statement file
+        fmt: One of STREAM_PARSERS ("camt", "mt940", "bai2", "ofx")
+
+    Yields:
+        CanonicalTransaction objects in file order
+    """
+    try:
+        parser = STREAM_PARSERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown standards format: {fmt}")
+    return parser(Path(file_path))
+
+
+def iter_standard_chunks(
+    file_path: Path,
+    fmt: str,
+    chunk_size: Optional[int] = None
+) -> Iterator[List[CanonicalTransaction]]:
+    """
+    Stream canonical transactions in lists of at most chunk_size.
+
+    Args:
+        file_path: Path to the statement file
+        fmt: One of STREAM_PARSERS
+        chunk_size: Transactions per chunk (default from config)
+
+    Yields:
+        Lists of canonical transactions
+    """
+    chunk_size = chunk_size or config.CSV_STREAM_CHUNK_SIZE
+    transactions = iter_standard(file_path, fmt)
+    while True:
+        chunk = list(islice(transactions, chunk_size))
+        if not chunk:
+            return
+        yield chunk
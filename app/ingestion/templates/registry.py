@@ -6,6 +6,8 @@ Load, validate, and match bank statement templates.
 """
 
 import re
+import json
+import hashlib
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
@@ -72,6 +74,19 @@ class TemplateRegistry:
         
         logger.info(f"Loaded {len(self.templates)} templates")
     
+    def fingerprint(self) -> str:
+        """
+        Hash of every loaded template's full definition.
+        
+        Changes whenever a template is added, removed or edited, so
+        results cached per template set go stale automatically.
+        """
+        definitions = sorted(
+            json.dumps(template.model_dump(), sort_keys=True, default=str)
+            for template in self.templates
+        )
+        return hashlib.sha256("\n".join(definitions).encode()).hexdigest()[:16]
+    
     def match_pdf(self, features: Dict) -> List[TemplateMatchResult]:
         """
         Match PDF features against all templates.
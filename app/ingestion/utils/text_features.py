@@ -58,6 +58,29 @@ def extract_text_features(pdf_path: Path, max_pages: int = 2) -> Dict[str, Any]:
 
 def _extract_with_pdfplumber(pdf_path: Path, max_pages: int) -> Dict[str, Any]:
     """Extract features using pdfplumber."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return features_from_pdfplumber(pdf)
+
+
+def features_from_pdfplumber(
+    pdf,
+    first_page_tables: Optional[List[List[List[Optional[str]]]]] = None,
+    first_table_bbox: Optional[tuple] = None
+) -> Dict[str, Any]:
+    """
+    Extract features from an already open pdfplumber document.
+    
+    Lets callers that also parse the tables open the document once and
+    pass in the first page's tables instead of extracting them twice.
+    
+    Args:
+        pdf: Open pdfplumber PDF
+        first_page_tables: Tables already extracted from the first page
+        first_table_bbox: Bounding box of the first page's first table
+    
+    Returns:
+        Feature dictionary (see extract_text_features)
+    """
     features = {
         'header_text': '',
         'footer_text': '',
@@ -67,58 +90,59 @@ def _extract_with_pdfplumber(pdf_path: Path, max_pages: int) -> Dict[str, Any]:
         'page_count': 0
     }
     
-    with pdfplumber.open(pdf_path) as pdf:
-        features['page_count'] = len(pdf.pages)
+    features['page_count'] = len(pdf.pages)
+    
+    # Process first page (most informative for templates)
+    if len(pdf.pages) > 0:
+        first_page = pdf.pages[0]
+        page_height = first_page.height
+        page_width = first_page.width
         
-        # Process first page (most informative for templates)
-        if len(pdf.pages) > 0:
-            first_page = pdf.pages[0]
-            page_height = first_page.height
-            page_width = first_page.width
-            
-            # Extract header region (top 20%)
-            header_region = first_page.within_bbox((0, 0, page_width, page_height * 0.20))
-            header_text = header_region.extract_text() or ''
-            features['header_text'] = header_text.strip()
-            
-            # Extract footer region (bottom 15%)
-            footer_region = first_page.within_bbox((0, page_height * 0.85, page_width, page_height))
-            footer_text = footer_region.extract_text() or ''
-            features['footer_text'] = footer_text.strip()
-            
-            # Extract table information
-            tables = first_page.extract_tables()
-            if tables:
-                for table in tables:
-                    if table and len(table) > 0:
-                        # Extract header row
-                        header_row = table[0]
-                        clean_headers = [str(h).strip() if h else '' for h in header_row]
-                        if any(clean_headers):  # Only add if non-empty
-                            features['table_headers'].append(clean_headers)
-                
-                # Try to detect table geometry
-                if tables:
-                    # Find first table
-                    table_bbox = first_page.find_tables()[0].bbox if first_page.find_tables() else None
-                    if table_bbox:
-                        y_top = table_bbox[1]
-                        y_bottom = table_bbox[3]
-                        features['geometry']['table_band'] = [
-                            y_top / page_height,
-                            y_bottom / page_height
-                        ]
-            
-            # Compute text density
-            full_text = first_page.extract_text() or ''
-            area = page_width * page_height
-            features['text_density'] = len(full_text) / area if area > 0 else 0
+        # Extract header region (top 20%)
+        header_region = first_page.within_bbox((0, 0, page_width, page_height * 0.20))
+        header_text = header_region.extract_text() or ''
+        features['header_text'] = header_text.strip()
+        
+        # Extract footer region (bottom 15%)
+        footer_region = first_page.within_bbox((0, page_height * 0.85, page_width, page_height))
+        footer_text = footer_region.extract_text() or ''
+        features['footer_text'] = footer_text.strip()
+        
+        # Extract table information (one table search serves rows and geometry)
+        if first_page_tables is None:
+            found = first_page.find_tables()
+            first_page_tables = [table.extract() for table in found]
+            first_table_bbox = found[0].bbox if found else None
+        
+        tables = first_page_tables
+        if tables:
+            for table in tables:
+                if table and len(table) > 0:
+                    # Extract header row
+                    header_row = table[0]
+                    clean_headers = [str(h).strip() if h else '' for h in header_row]
+                    if any(clean_headers):  # Only add if non-empty
+                        features['table_headers'].append(clean_headers)
             
-            # Add geometry hints
-            features['geometry']['header_band'] = [0.0, 0.20]
-            if 'table_band' not in features['geometry']:
-                # Default table band if not detected
-                features['geometry']['table_band'] = [0.25, 0.80]
+            # Try to detect table geometry from the first table
+            if first_table_bbox:
+                y_top = first_table_bbox[1]
+                y_bottom = first_table_bbox[3]
+                features['geometry']['table_band'] = [
+                    y_top / page_height,
+                    y_bottom / page_height
+                ]
+        
+        # Compute text density
+        full_text = first_page.extract_text() or ''
+        area = page_width * page_height
+        features['text_density'] = len(full_text) / area if area > 0 else 0
+        
+        # Add geometry hints
+        features['geometry']['header_band'] = [0.0, 0.20]
+        if 'table_band' not in features['geometry']:
+            # Default table band if not detected
+            features['geometry']['table_band'] = [0.25, 0.80]
     
     return features
 
@@ -0,0 +1,224 @@
+"""
+Pooled, throttle-aware QuickBooks Online batch client.
+
+Journal entries are created through the QBO batch endpoint
+(``POST /v3/company/{realmId}/batch``), up to QBO_BATCH_SIZE entries per
+request, with at most QBO_MAX_CONCURRENCY requests in flight over one
+pooled ``httpx.AsyncClient``.
+
+Throttling:
+----------
+QBO answers 429 when a realm exceeds its request budget and 5xx on
+transient upstream failures. Both are retried with exponential backoff
+(honouring Retry-After when present) up to QBO_BATCH_MAX_RETRIES times.
+A 5xx can arrive after QBO already created the entries, so every batch
+carries a stable ``requestid`` (QBO's idempotency key, derived from the
+batch contents): a retried request is answered with the original
+outcome instead of creating the entries again.
+401 is raised as QBO_UNAUTHORIZED so the caller can refresh the token,
+but only once every batch has settled: after a 401 no further batches
+are sent, while batches already in flight run to completion and report
+through on_batch. Every key then either has an outcome or was never
+accepted by QBO, so the caller can resend exactly the keys without one.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.integrations.qbo.client import HTTP_TIMEOUT, QBO_BASE
+
+logger = logging.getLogger(__name__)
+
+# QBO accepts at most 30 operations per batch request
+QBO_BATCH_SIZE = min(int(os.getenv("QBO_BATCH_SIZE", "30")), 30)
+QBO_MAX_CONCURRENCY = int(os.getenv("QBO_MAX_CONCURRENCY", "4"))
+QBO_BATCH_MAX_RETRIES = int(os.getenv("QBO_BATCH_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class QBOBatchClient:
+    """
+    Batch journal entry poster over a pooled async HTTP client.
+
+    Use as an async context manager so the connection pool is closed:
+
+        async with QBOBatchClient() as client:
+            results = await client.create_journal_entries(realm_id, token, items)
+    """
+
+    def __init__(
+        self,
+        base_url: str = QBO_BASE,
+        max_concurrency: int = QBO_MAX_CONCURRENCY,
+        batch_size: int = QBO_BATCH_SIZE,
+        max_retries: int = QBO_BATCH_MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sleep=asyncio.sleep
+    ):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._sleep = sleep
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=HTTP_TIMEOUT,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency
+            )
+        )
+
+    async def __aenter__(self) -> "QBOBatchClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+        delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+        return min(delay + random.uniform(0, delay / 2), BACKOFF_MAX_SECONDS)
+
+    @staticmethod
+    def _request_id(realm_id: str, body: Dict[str, Any]) -> str:
+        """Stable requestid for a batch (QBO allows at most 50 characters)."""
+        content = json.dumps([realm_id, body], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()[:40]
+
+    async def _post_batch(
+        self,
+        realm_id: str,
+        access_token: str,
+        items: List[Tuple[str, Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        POST one batch request, retrying on throttling and upstream errors.
+
+        Every attempt sends the same requestid, so QBO deduplicates a retry
+        of a batch it created before failing.
+        """
+        body = {
+            "BatchItemRequest": [
+                {"bId": key, "operation": "create", "JournalEntry": payload}
+                for key, payload in items
+            ]
+        }
+        request_id = self._request_id(realm_id, body)
+
+        for attempt in range(self.max_retries + 1):
+            response = await self._client.post(
+                f"/v3/company/{realm_id}/batch",
+                params={"requestid": request_id},
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "Accept": "application/json",
+                    "Content-Type": "application/json"
+                },
+                json=body
+            )
+
+            if response.status_code == 401:
+                raise Exception("QBO_UNAUTHORIZED")
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    break
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                logger.warning(
+                    f"QBO batch {response.status_code}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                await self._sleep(delay)
+                continue
+
+            if response.status_code >= 400:
+                raise Exception(f"QBO_VALIDATION:batch rejected ({response.status_code})")
+
+            return self._parse(response.json())
+
+        if response.status_code == 429:
+            raise Exception(f"QBO_RATE_LIMITED:{response.headers.get('Retry-After', '60')}")
+        raise Exception("QBO_UPSTREAM")
+
+    @staticmethod
+    def _parse(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for item in data.get("BatchItemResponse", []):
+            if "Fault" in item:
+                error = item["Fault"].get("Error", [{}])[0]
+                results[item["bId"]] = {"error": f"QBO_VALIDATION:{error.get('Message', 'Unknown error')}"}
+            else:
+                journal_entry = item.get("JournalEntry", {})
+                results[item["bId"]] = {
+                    "qbo_doc_id": journal_entry.get("Id"),
+                    "sync_token": journal_entry.get("SyncToken"),
+                    "txn_date": journal_entry.get("TxnDate")
+                }
+        return results
+
+    async def create_journal_entries(
+        self,
+        realm_id: str,
+        access_token: str,
+        items: List[Tuple[str, Dict[str, Any]]],
+        on_batch=None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Create journal entries in batches with bounded concurrency.
+
+        Args:
+            realm_id: QuickBooks company ID
+            access_token: OAuth access token
+            items: (key, QBO journal entry payload) pairs; keys must be unique
+            on_batch: Optional callback(results) after each batch completes
+
+        Returns:
+            Dict of key -> {qbo_doc_id, sync_token, txn_date} or {error}.
+            A batch that fails as a whole reports its error for every key.
+
+        Raises:
+            Exception("QBO_UNAUTHORIZED") if the token was rejected, after
+            all in-flight batches have finished; keys of rejected or unsent
+            batches have no result and were not posted
+        """
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: Dict[str, Dict[str, Any]] = {}
+        unauthorized = asyncio.Event()
+
+        async def run(batch):
+            async with semaphore:
+                if unauthorized.is_set():
+                    return  # Not sent; the caller resends after refreshing
+                try:
+                    batch_results = await self._post_batch(realm_id, access_token, batch)
+                except Exception as e:
+                    if "QBO_UNAUTHORIZED" in str(e):
+                        unauthorized.set()
+                        return
+                    batch_results = {key: {"error": str(e)} for key, _ in batch}
+            for key, _ in batch:
+                batch_results.setdefault(key, {"error": "QBO_VALIDATION:missing batch item response"})
+            results.update(batch_results)
+            if on_batch:
+                on_batch(batch_results)
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        if unauthorized.is_set():
+            raise Exception("QBO_UNAUTHORIZED")
+        return results
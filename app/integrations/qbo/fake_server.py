@@ -0,0 +1,132 @@
+"""
+Local fake QuickBooks Online server for tests and development.
+
+Implements just enough of the QBO v3 API for journal entry exports:
+
+- POST /v3/company/{realm_id}/journalentry
+- POST /v3/company/{realm_id}/batch (create JournalEntry operations)
+
+Unbalanced entries come back as per-item Faults, and the server can be
+told to throttle (429 with Retry-After), fail (503) or reject the token
+(401) for the next N requests, or to create a batch and then answer 500
+(``fail_after_create_next``). Batch requests repeating a ``requestid``
+get the original response back, as in QBO. ``latency`` delays accepted
+batch requests so concurrent requests overlap.
+
+Usage:
+------
+In-process with httpx:
+
+    fake = FakeQBOServer()
+    transport = httpx.ASGITransport(app=fake.app)
+    client = QBOBatchClient(base_url="http://fake-qbo", transport=transport)
+
+Standalone (point QBO_BASE-derived clients at it):
+
+    uvicorn app.integrations.qbo.fake_server:app --port 8099
+"""
+import asyncio
+import itertools
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeQBOServer:
+    """In-memory QBO stand-in with controllable throttling."""
+
+    def __init__(self, access_token: str = None):
+        self.access_token = access_token
+        self.journal_entries: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.throttle_next = 0
+        self.fail_next = 0
+        self.unauthorized_next = 0
+        self.fail_after_create_next = 0
+        self.responses_by_request_id: Dict[str, Dict[str, Any]] = {}
+        self.latency = 0.0
+        self._ids = itertools.count(1)
+        self.app = self._build_app()
+
+    def _create(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        debit = sum(
+            round(float(line["Amount"]), 2) for line in payload.get("Line", [])
+            if line["JournalEntryLineDetail"]["PostingType"] == "Debit"
+        )
+        credit = sum(
+            round(float(line["Amount"]), 2) for line in payload.get("Line", [])
+            if line["JournalEntryLineDetail"]["PostingType"] == "Credit"
+        )
+        if abs(debit - credit) > 0.01:
+            return {"Fault": {"Error": [{"Message": "Transaction must balance", "code": "6000"}], "type": "ValidationFault"}}
+
+        doc_id = str(next(self._ids))
+        entry = {"Id": doc_id, "SyncToken": "0", "TxnDate": payload.get("TxnDate"), **payload}
+        self.journal_entries[doc_id] = entry
+        return {"JournalEntry": entry}
+
+    def _gate(self, request: Request):
+        if self.access_token and request.headers.get("Authorization") != f"Bearer {self.access_token}":
+            return JSONResponse({"Fault": {"Error": [{"Message": "AuthenticationFailed"}]}}, status_code=401)
+        if self.unauthorized_next > 0:
+            self.unauthorized_next -= 1
+            return JSONResponse({"Fault": {"Error": [{"Message": "AuthenticationFailed"}]}}, status_code=401)
+        if self.throttle_next > 0:
+            self.throttle_next -= 1
+            return JSONResponse({"Fault": {"Error": [{"Message": "ThrottleExceeded"}]}},
+                                status_code=429, headers={"Retry-After": "1"})
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            return JSONResponse({"Fault": {"Error": [{"Message": "Service Unavailable"}]}}, status_code=503)
+        return None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake QBO")
+
+        @app.post("/v3/company/{realm_id}/journalentry")
+        async def create_journal_entry(realm_id: str, request: Request):
+            body = await request.json()
+            self.requests.append({"path": "journalentry", "realm_id": realm_id, "size": 1})
+            blocked = self._gate(request)
+            if blocked:
+                return blocked
+            result = self._create(body)
+            if "Fault" in result:
+                return JSONResponse(result, status_code=400)
+            return result
+
+        @app.post("/v3/company/{realm_id}/batch")
+        async def batch(realm_id: str, request: Request):
+            body = await request.json()
+            items = body.get("BatchItemRequest", [])
+            self.requests.append({"path": "batch", "realm_id": realm_id, "size": len(items)})
+            blocked = self._gate(request)
+            if blocked:
+                return blocked
+            if len(items) > 30:
+                return JSONResponse({"Fault": {"Error": [{"Message": "Too many batch items"}]}}, status_code=400)
+            request_id = request.query_params.get("requestid")
+            if request_id in self.responses_by_request_id:
+                return self.responses_by_request_id[request_id]
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = {
+                "BatchItemResponse": [
+                    {"bId": item["bId"], **self._create(item["JournalEntry"])}
+                    for item in items
+                ]
+            }
+            if request_id:
+                self.responses_by_request_id[request_id] = response
+            if self.fail_after_create_next > 0:
+                self.fail_after_create_next -= 1
+                return JSONResponse({"Fault": {"Error": [{"Message": "Internal Server Error"}]}}, status_code=500)
+            return response
+
+        return app
+
+
+# Module-level instance for `uvicorn app.integrations.qbo.fake_server:app`
+fake_server = FakeQBOServer()
+app = fake_server.app
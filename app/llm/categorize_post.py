@@ -1,29 +1,398 @@
 """LLM-powered categorization and posting."""
+import asyncio
+import hashlib
 import json
 import logging
+import re
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 import openai
 from config.settings import settings
 from app.db.models import Transaction, JournalEntry, JournalEntryLine
-from app.llm.prompts import SYSTEM_PROMPT, CATEGORIZATION_FUNCTION, format_categorization_prompt
+from app.llm.prompts import (
+    SYSTEM_PROMPT,
+    CATEGORIZATION_FUNCTION,
+    BATCH_CATEGORIZATION_FUNCTION,
+    format_categorization_prompt,
+    format_batch_categorization_prompt,
+)
 
 logger = logging.getLogger(__name__)
 
+# Fields a cached decision carries (lines are rebuilt per transaction)
+DECISION_FIELDS = ("account", "confidence", "needs_review", "rationale")
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    """Lowercase and keep only letters, so store/terminal numbers don't split vendors."""
+    return " ".join(re.sub(r"[^a-z]+", " ", (text or "").lower()).split())
+
+
+def _transaction_payload(transaction) -> Dict[str, Any]:
+    """Plain dict of the fields prompts and cache keys need."""
+    if hasattr(transaction, "model_dump"):
+        data = transaction.model_dump()
+    elif isinstance(transaction, dict):
+        data = transaction
+    else:
+        data = {
+            field: getattr(transaction, field, None)
+            for field in ("txn_id", "date", "amount", "description", "counterparty")
+        }
+    
+    txn_date = data.get("date")
+    if hasattr(txn_date, "strftime"):
+        txn_date = txn_date.strftime("%Y-%m-%d")
+    
+    return {
+        "txn_id": data.get("txn_id"),
+        "date": txn_date,
+        "amount": data.get("amount") or 0.0,
+        "description": data.get("description") or "",
+        "counterparty": data.get("counterparty") or "",
+    }
+
+
+def build_categorization_result(payload: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a categorization result with a balanced two-line entry.
+    
+    Args:
+        payload: Transaction dict (date, amount)
+        decision: Dict with account, confidence, needs_review, rationale
+        
+    Returns:
+        Dict shaped like LLMCategorizer.categorize_transaction's result
+    """
+    amount = abs(payload["amount"])
+    account = decision["account"]
+    
+    if payload["amount"] > 0:
+        # Revenue
+        lines = [
+            {"account": "1000 Cash at Bank", "debit": amount, "credit": 0.0},
+            {"account": account, "debit": 0.0, "credit": amount}
+        ]
+    else:
+        # Expense
+        lines = [
+            {"account": account, "debit": amount, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": amount}
+        ]
+    
+    return {
+        "account": account,
+        "journal_entry": {
+            "date": payload["date"],
+            "lines": lines
+        },
+        "confidence": decision.get("confidence") or 0.0,
+        "needs_review": bool(decision.get("needs_review")),
+        "rationale": decision.get("rationale") or ""
+    }
+
+
+class CategorizationCache:
+    """
+    Content-addressed LRU cache of LLM categorization decisions.
+    
+    Keys hash the tenant namespace, normalized vendor, normalized
+    description, amount sign, amount band (above or below
+    settings.large_amount_threshold), chart of accounts and the historical
+    mappings sent with the prompt, so the same vendor is only sent to the
+    model once per tenant, band and history. The prompt asks for review of
+    large amounts, so a decision made for a small amount is never reused
+    for a large one (or the reverse); and one tenant's history never
+    decides another tenant's categorization.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(
+        payload: Dict[str, Any],
+        chart_of_accounts: List[str],
+        historical_mappings: Optional[List[Dict[str, Any]]] = None,
+        namespace: Optional[str] = None
+    ) -> str:
+        """Cache key for a transaction payload and the prompt context sent with it."""
+        amount = payload.get("amount") or 0.0
+        sign = "credit" if amount > 0 else "debit" if amount < 0 else "zero"
+        band = "large" if abs(amount) > settings.large_amount_threshold else "normal"
+        chart = hashlib.sha256("\n".join(chart_of_accounts).encode()).hexdigest()[:16]
+        mappings = hashlib.sha256(
+            json.dumps(historical_mappings or [], sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        content = "|".join([
+            namespace or "",
+            _normalize_text(payload.get("counterparty")),
+            _normalize_text(payload.get("description")),
+            sign,
+            band,
+            chart,
+            mappings,
+        ])
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        decision = self._entries.get(key)
+        if decision is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decision
+    
+    def put(self, key: str, decision: Dict[str, Any]) -> None:
+        self._entries[key] = decision
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class OpenAIBatchProvider:
+    """Categorizes a batch of transactions with one OpenAI function call."""
+    
+    def __init__(self, api_key: str, model: str):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+    
+    async def categorize(
+        self,
+        payloads: List[Dict[str, Any]],
+        chart_of_accounts: List[str],
+        historical_mappings: List[List[Dict[str, str]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns:
+            One decision dict (account, confidence, needs_review, rationale)
+            or None per payload, in input order
+        """
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(api_key=self.api_key)
+        
+        response = await self._client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": format_batch_categorization_prompt(
+                    payloads, chart_of_accounts, historical_mappings
+                )}
+            ],
+            functions=[BATCH_CATEGORIZATION_FUNCTION],
+            function_call={"name": "categorize_batch"},
+            temperature=0.3
+        )
+        
+        message = response.choices[0].message
+        if not message.function_call:
+            logger.warning("No function call in batched LLM response")
+            return [None] * len(payloads)
+        
+        decisions: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        for item in json.loads(message.function_call.arguments).get("results", []):
+            index = item.get("index")
+            if isinstance(index, int) and 0 <= index < len(payloads) and item.get("account"):
+                decisions[index] = item
+        return decisions
+
+
+class StubLLMProvider:
+    """
+    Deterministic offline provider for tests and local development.
+    
+    Uses the first historical mapping if given, then keyword matches
+    against the chart of accounts, then the amount sign. Counts calls so
+    tests can assert batching and caching.
+    """
+    
+    KEYWORDS = {
+        "Travel": ("uber", "lyft", "airline", "delta", "hotel", "taxi"),
+        "Software": ("github", "aws", "zoom", "slack", "google", "adobe"),
+        "Office Supplies": ("amazon", "staples", "office"),
+        "Payroll": ("payroll", "adp", "gusto"),
+        "Rent": ("rent", "lease"),
+        "Utilities": ("electric", "water", "comcast", "verizon"),
+    }
+    
+    def __init__(self):
+        self.calls = 0
+        self.transactions_seen = 0
+    
+    async def categorize(
+        self,
+        payloads: List[Dict[str, Any]],
+        chart_of_accounts: List[str],
+        historical_mappings: List[List[Dict[str, str]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        self.calls += 1
+        self.transactions_seen += len(payloads)
+        await asyncio.sleep(0)
+        return [
+            self._decide(payload, chart_of_accounts, mappings)
+            for payload, mappings in zip(payloads, historical_mappings)
+        ]
+    
+    def _decide(self, payload, chart_of_accounts, mappings) -> Dict[str, Any]:
+        if mappings and mappings[0].get("account"):
+            return {"account": mappings[0]["account"], "confidence": 0.9,
+                    "needs_review": False, "rationale": "Stub: historical mapping"}
+        
+        text = f"{payload['counterparty']} {payload['description']}".lower()
+        for label, words in self.KEYWORDS.items():
+            if any(word in text for word in words):
+                account = next((a for a in chart_of_accounts if label.lower() in a.lower()), None)
+                if account:
+                    return {"account": account, "confidence": 0.8,
+                            "needs_review": False, "rationale": f"Stub: keyword match ({label})"}
+        
+        account = "8000 Sales Revenue" if payload["amount"] > 0 else "6999 Miscellaneous Expense"
+        return {"account": account, "confidence": 0.5,
+                "needs_review": True, "rationale": "Stub: amount sign"}
+
 
 class LLMCategorizer:
     """LLM-powered transaction categorizer."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, provider=None):
         """
         Initialize the LLM categorizer.
         
         Args:
             api_key: OpenAI API key (uses settings if not provided)
+            provider: Batch provider (default: StubLLMProvider if
+                LLM_PROVIDER is "stub", else OpenAI when a key is set)
         """
         self.api_key = api_key or settings.openai_api_key
         if self.api_key:
             openai.api_key = self.api_key
         self.model = settings.llm_model
+        self.provider = provider or self._default_provider()
+        self.cache = CategorizationCache(settings.LLM_CACHE_SIZE)
+    
+    def _default_provider(self):
+        if settings.LLM_PROVIDER == "stub":
+            return StubLLMProvider()
+        if self.api_key:
+            return OpenAIBatchProvider(self.api_key, self.model)
+        return None
+    
+    async def categorize_batch_async(
+        self,
+        transactions: List[Any],
+        chart_of_accounts: List[str],
+        historical_mappings: Optional[List[List[Dict[str, str]]]] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        namespace: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Categorize many transactions with batched, concurrent LLM calls.
+        
+        Cached vendors are answered without a model call; identical cache
+        keys in the batch (same tenant, vendor and historical mappings)
+        are sent once. The rest are packed batch_size
+        per prompt and sent with at most max_concurrency requests in
+        flight. Failed or missing answers use the fallback categorization.
+        
+        Args:
+            transactions: Transactions (models, ORM rows or dicts)
+            chart_of_accounts: List of available accounts
+            historical_mappings: Optional per-transaction mappings
+            batch_size: Transactions per prompt (default LLM_BATCH_SIZE)
+            max_concurrency: Concurrent requests (default LLM_MAX_CONCURRENCY)
+            namespace: Tenant namespace the mappings came from (part of the cache key)
+            
+        Returns:
+            One result per transaction, in input order, shaped like
+            categorize_transaction's result
+        """
+        batch_size = batch_size or settings.LLM_BATCH_SIZE
+        max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        historical_mappings = historical_mappings or [[] for _ in transactions]
+        
+        payloads = [_transaction_payload(t) for t in transactions]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        
+        # Serve cache hits; group misses by key so each is asked once
+        pending: Dict[str, List[int]] = {}
+        for i, payload in enumerate(payloads):
+            key = self.cache.key(payload, chart_of_accounts, historical_mappings[i], namespace)
+            decision = self.cache.get(key)
+            if decision is not None:
+                results[i] = self._result_from_decision(payload, decision)
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if pending and self.provider is None:
+            logger.warning("No LLM provider configured, using fallback")
+            for indexes in pending.values():
+                for i in indexes:
+                    results[i] = self._result_from_decision(payloads[i], self._fallback_decision(payloads[i]))
+            return results
+        
+        keys = list(pending)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(chunk_keys: List[str]):
+            first = [pending[key][0] for key in chunk_keys]
+            async with semaphore:
+                try:
+                    decisions = await self.provider.categorize(
+                        [payloads[i] for i in first],
+                        chart_of_accounts,
+                        [historical_mappings[i] for i in first]
+                    )
+                except Exception as e:
+                    logger.error(f"Batched LLM categorization failed: {e}")
+                    decisions = [None] * len(chunk_keys)
+            
+            for key, decision in zip(chunk_keys, decisions):
+                if decision is not None:
+                    decision = {field: decision.get(field) for field in DECISION_FIELDS}
+                    self.cache.put(key, decision)
+                for i in pending[key]:
+                    if decision is not None:
+                        results[i] = self._result_from_decision(payloads[i], decision)
+                    else:
+                        results[i] = self._result_from_decision(payloads[i], self._fallback_decision(payloads[i]))
+        
+        await asyncio.gather(*(
+            run(keys[start:start + batch_size])
+            for start in range(0, len(keys), batch_size)
+        ))
+        
+        return results
+    
+    @staticmethod
+    def _fallback_decision(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Decision matching _fallback_categorization (amount sign only)."""
+        return {
+            "account": "8000 Sales Revenue" if payload["amount"] > 0 else "6999 Miscellaneous Expense",
+            "confidence": 0.3,
+            "needs_review": True,
+            "rationale": "Fallback: LLM unavailable or failed"
+        }
+    
+    def _result_from_decision(self, payload: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
+        # Decisions are shared by every transaction with the same cache key;
+        # large amounts always need review whatever the shared decision says
+        if abs(payload.get("amount") or 0.0) > settings.large_amount_threshold and not decision.get("needs_review"):
+            decision = dict(decision, needs_review=True)
+        return build_categorization_result(payload, decision)
     
     def categorize_transaction(
         self,
@@ -110,3 +110,93 @@ Remember:
     
     return prompt
 
+
+
+BATCH_CATEGORIZATION_FUNCTION = {
+    "name": "categorize_batch",
+    "description": "Categorize several bank transactions at once",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "description": "One result per transaction, in any order",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {
+                            "type": "integer",
+                            "description": "Index of the transaction in the request"
+                        },
+                        "account": {
+                            "type": "string",
+                            "description": "The primary expense/revenue account to post to (from Chart of Accounts)"
+                        },
+                        "confidence": {
+                            "type": "number",
+                            "description": "Confidence score from 0.0 to 1.0"
+                        },
+                        "needs_review": {
+                            "type": "boolean",
+                            "description": "Whether this entry needs human review"
+                        },
+                        "rationale": {
+                            "type": "string",
+                            "description": "Brief explanation of the categorization decision"
+                        }
+                    },
+                    "required": ["index", "account", "confidence", "needs_review", "rationale"]
+                }
+            }
+        },
+        "required": ["results"]
+    }
+}
+
+
+def format_batch_categorization_prompt(
+    transactions: list,
+    chart_of_accounts: list,
+    historical_mappings: list
+) -> str:
+    """
+    Format the user prompt for categorizing several transactions at once.
+    
+    Args:
+        transactions: Transaction dicts (date, amount, description, counterparty)
+        chart_of_accounts: List of account names
+        historical_mappings: Per-transaction lists of historical mappings
+        
+    Returns:
+        Formatted prompt string
+    """
+    items = []
+    for i, (transaction, mappings) in enumerate(zip(transactions, historical_mappings)):
+        item = (
+            f"[{i}] Amount: ${transaction.get('amount')} | "
+            f"Description: {transaction.get('description')} | "
+            f"Counterparty: {transaction.get('counterparty') or 'Unknown'}"
+        )
+        if mappings:
+            hints = ", ".join(
+                f"{m.get('counterparty', 'Unknown')}: {m.get('account', 'Unknown')}"
+                for m in mappings[:3]
+            )
+            item += f" | Similar vendors: {hints}"
+        items.append(item)
+    
+    prompt = f"""Categorize each of these bank transactions.
+
+Transactions:
+{chr(10).join(items)}
+
+Chart of Accounts (use these exact names):
+{chr(10).join(f"- {acc}" for acc in chart_of_accounts)}
+
+Remember:
+- Negative amounts are expenses, positive amounts are revenue
+- Return exactly one result per transaction, using its [index]
+- Set needs_review=true if amount > $5000 or if uncertain
+"""
+    
+    return prompt
@@ -1,5 +1,8 @@
 """ML classifier inference service."""
 import logging
+import os
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
@@ -8,32 +11,138 @@ import joblib
 import scipy.sparse as sp
 from datetime import datetime
 
+from app.ml.registry import ModelRegistry
+from config.settings import settings
+
 logger = logging.getLogger(__name__)
 
-# Global model cache
-_model_cache = None
+# Global model cache: source (registry root or model path) -> (version, artifacts)
+_model_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+
+def build_features(frame: pd.DataFrame, artifacts: Dict[str, Any]) -> sp.csr_matrix:
+    """
+    Feature matrix for a DataFrame of transactions.
+    
+    Text columns go through the artifacts' vectorizers; numeric and date
+    features are computed with NumPy. Shared by inference and training.
+    
+    Args:
+        frame: DataFrame with description, counterparty, amount, date
+        artifacts: Model artifacts (desc_vectorizer, counterparty_vectorizer)
+        
+    Returns:
+        Feature matrix (one row per frame row)
+    """
+    descriptions = frame['description'].fillna('').astype(str).tolist()
+    counterparties = frame['counterparty'].fillna('').astype(str).tolist()
+    
+    # Text features
+    desc_features = artifacts['desc_vectorizer'].transform(descriptions)
+    counterparty_features = artifacts['counterparty_vectorizer'].transform(counterparties)
+    
+    # Numeric features
+    amounts = frame['amount'].to_numpy(dtype=float)
+    amount_abs = np.abs(amounts)
+    is_positive = (amounts > 0).astype(float)
+    amount_bucket = np.where(
+        amount_abs > 0,
+        np.minimum(np.floor(np.log10(amount_abs + 1)), 9),
+        0
+    )
+    
+    # Date features
+    dates = pd.to_datetime(frame['date'])
+    day_of_week = dates.dt.weekday.to_numpy(dtype=float)
+    month = dates.dt.month.to_numpy(dtype=float)
+    
+    numeric_features = np.column_stack([amount_abs, is_positive, amount_bucket, day_of_week, month])
+    
+    # Combine
+    return sp.hstack([
+        desc_features,
+        counterparty_features,
+        sp.csr_matrix(numeric_features)
+    ], format='csr')
 
 
 class MLClassifier:
-    """ML-based transaction classifier."""
+    """
+    ML-based transaction classifier.
+    
+    Serves the version promoted in a ModelRegistry (or a plain model file
+    when no version has been promoted). ``maybe_refresh`` polls the source
+    at most every ``poll_interval`` seconds; a new version is loaded in a
+    background thread and swapped in atomically, so predictions keep using
+    the old artifacts until the new ones are ready.
+    """
     
-    def __init__(self, model_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        registry: Optional[ModelRegistry] = None,
+        poll_interval: Optional[float] = None,
+        mmap: Optional[bool] = None
+    ):
         """
         Initialize classifier.
         
         Args:
-            model_path: Path to trained model pickle file
+            model_path: Path to trained model pickle file (fallback source)
+            registry: Model registry to serve the current version from
+            poll_interval: Seconds between checks for a new version
+            mmap: Memory-map model arrays (default MODEL_MMAP)
         """
         if model_path is None:
             model_path = Path(__file__).parent.parent.parent / "models" / "classifier.pkl"
         
         self.model_path = model_path
+        self.registry = registry
+        self.poll_interval = settings.MODEL_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.mmap = settings.MODEL_MMAP if mmap is None else mmap
         self.artifacts = None
         self.is_loaded = False
+        self.version: Optional[str] = None
+        
+        self._swap_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._last_poll = time.monotonic()
         
         # Try to load model
         self.load_model()
     
+    def _source_key(self) -> str:
+        if self.registry is not None and self.registry.current_version():
+            return f"registry:{self.registry.root}"
+        return f"path:{self.model_path}"
+    
+    def _source_version(self) -> Optional[str]:
+        """Version available at the source (None if there is no model)."""
+        if self.registry is not None:
+            version = self.registry.current_version()
+            if version:
+                return version
+        
+        # Plain file: identify the version by its stat
+        try:
+            st = os.stat(self.model_path)
+        except (FileNotFoundError, TypeError):
+            return None
+        return f"file-{st.st_mtime_ns}-{st.st_size}"
+    
+    def _load_artifacts(self, version: str) -> Dict[str, Any]:
+        if self.registry is not None and not version.startswith("file-"):
+            return self.registry.load(version, mmap=self.mmap)
+        return joblib.load(self.model_path, mmap_mode="r" if self.mmap else None)
+    
+    def _swap(self, version: str, artifacts: Dict[str, Any], source_key: str) -> None:
+        """Atomically replace the served artifacts."""
+        with self._swap_lock:
+            self.artifacts = artifacts
+            self.version = version
+            self.is_loaded = True
+            _model_cache[source_key] = (version, artifacts)
+    
     def load_model(self) -> bool:
         """
         Load model from disk.
@@ -41,28 +150,27 @@ class MLClassifier:
         Returns:
             True if loaded successfully, False otherwise
         """
-        global _model_cache
+        version = self._source_version()
+        if version is None:
+            logger.warning(f"Model not found at {self.model_path}")
+            return False
+        
+        source_key = self._source_key()
         
         # Check cache first
-        if _model_cache is not None:
-            self.artifacts = _model_cache
-            self.is_loaded = True
+        cached = _model_cache.get(source_key)
+        if cached is not None and cached[0] == version:
+            self._swap(version, cached[1], source_key)
             logger.info("Loaded model from cache")
             return True
         
-        # Load from disk
-        if not self.model_path.exists():
-            logger.warning(f"Model not found at {self.model_path}")
-            return False
-        
         try:
-            self.artifacts = joblib.load(self.model_path)
-            _model_cache = self.artifacts  # Cache it
-            self.is_loaded = True
+            artifacts = self._load_artifacts(version)
+            self._swap(version, artifacts, source_key)
             
-            logger.info(f"Loaded {self.artifacts['model_type']} model")
-            logger.info(f"  Trained: {self.artifacts['trained_at']}")
-            logger.info(f"  Accuracy: {self.artifacts['test_accuracy']:.2%}")
+            logger.info(f"Loaded {artifacts['model_type']} model (version {version})")
+            logger.info(f"  Trained: {artifacts['trained_at']}")
+            logger.info(f"  Accuracy: {artifacts['test_accuracy']:.2%}")
             
             return True
             
@@ -70,12 +178,53 @@ class MLClassifier:
             logger.error(f"Error loading model: {e}")
             return False
     
+    def refresh(self, wait: bool = False) -> bool:
+        """
+        Check the source for a new version and load it if there is one.
+        
+        Args:
+            wait: Load in the calling thread instead of in the background
+            
+        Returns:
+            True if a new version was found (and a load started)
+        """
+        version = self._source_version()
+        if version is None or version == self.version:
+            return False
+        
+        if wait:
+            return self.load_model()
+        
+        with self._swap_lock:
+            if self._loader is not None and self._loader.is_alive():
+                return False
+            self._loader = threading.Thread(
+                target=self.load_model, name="model-refresh", daemon=True
+            )
+            self._loader.start()
+        
+        logger.info(f"Loading model version {version} in the background")
+        return True
+    
+    def maybe_refresh(self) -> None:
+        """Poll for a new version at most once per poll_interval."""
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Model refresh check failed: {e}")
+    
     def _prepare_features(
         self,
         description: str,
         counterparty: str,
         amount: float,
-        date: datetime
+        date: datetime,
+        artifacts: Optional[Dict[str, Any]] = None
     ) -> sp.csr_matrix:
         """
         Prepare features for prediction.
@@ -85,16 +234,18 @@ class MLClassifier:
             counterparty: Counterparty name
             amount: Transaction amount
             date: Transaction date
+            artifacts: Artifacts snapshot (default: currently served)
             
         Returns:
             Feature matrix
         """
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
+        artifacts = artifacts or self.artifacts
         
         # Text features
-        desc_features = self.artifacts['desc_vectorizer'].transform([description])
-        counterparty_features = self.artifacts['counterparty_vectorizer'].transform([counterparty])
+        desc_features = artifacts['desc_vectorizer'].transform([description])
+        counterparty_features = artifacts['counterparty_vectorizer'].transform([counterparty])
         
         # Numeric features
         amount_abs = abs(amount)
@@ -118,6 +269,130 @@ class MLClassifier:
         
         return X
     
+    def _prepare_features_batch(
+        self,
+        frame: pd.DataFrame,
+        artifacts: Optional[Dict[str, Any]] = None
+    ) -> sp.csr_matrix:
+        """
+        Prepare features for many transactions at once.
+        
+        Produces the same feature layout as _prepare_features, but runs
+        each vectorizer once over the whole column and computes numeric
+        features with NumPy.
+        
+        Args:
+            frame: DataFrame with description, counterparty, amount, date
+            artifacts: Artifacts snapshot (default: currently served)
+            
+        Returns:
+            Feature matrix (one row per frame row)
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+        artifacts = artifacts or self.artifacts
+        
+        return build_features(frame, artifacts)
+    
+    def _predict_proba(self, X: sp.csr_matrix, artifacts: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Class probabilities for a feature matrix (rows x classes)."""
+        artifacts = artifacts or self.artifacts
+        model = artifacts['model']
+        model_type = artifacts['model_type']
+        
+        if model_type == 'lightgbm':
+            probas = model.predict(X, num_iteration=model.best_iteration)
+            # Reshape if needed
+            if len(probas.shape) == 1:
+                probas = probas.reshape(X.shape[0], -1)
+        else:
+            # Logistic Regression
+            probas = model.predict_proba(X)
+        
+        return probas
+    
+    def _top_k(
+        self,
+        probas: np.ndarray,
+        k: int,
+        artifacts: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Top-k accounts per row of a probability matrix."""
+        k = min(k, probas.shape[1])
+        if k <= 0:
+            return [[] for _ in range(probas.shape[0])]
+        
+        # Partition to the k best columns, then order just those
+        top_idx = np.argpartition(probas, -k, axis=1)[:, -k:]
+        top_probas = np.take_along_axis(probas, top_idx, axis=1)
+        order = np.argsort(-top_probas, axis=1, kind='stable')
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        top_probas = np.take_along_axis(top_probas, order, axis=1)
+        
+        classes = (artifacts or self.artifacts)['label_encoder'].classes_
+        accounts = classes[top_idx]
+        
+        return [
+            [
+                {
+                    'account': accounts[row, rank],
+                    'probability': float(top_probas[row, rank]),
+                    'rank': rank + 1
+                }
+                for rank in range(k)
+            ]
+            for row in range(probas.shape[0])
+        ]
+    
+    def predict_batch(
+        self,
+        frame: pd.DataFrame,
+        k: int = 3,
+        batch_size: int = 10000
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Predict top-k accounts for many transactions.
+        
+        Vectorizes descriptions and counterparties for a whole chunk at once
+        and makes a single model call per chunk, instead of one sparse
+        matrix and one model call per transaction.
+        
+        Args:
+            frame: DataFrame (or anything pd.DataFrame accepts) with
+                description, counterparty, amount and date columns
+            k: Number of top predictions per transaction
+            batch_size: Rows per model call (bounds the dense probability matrix)
+            
+        Returns:
+            One list of {'account', 'probability', 'rank'} dicts per input
+            row, in input order. Rows are empty lists if the model is not
+            loaded or prediction fails.
+        """
+        if not isinstance(frame, pd.DataFrame):
+            frame = pd.DataFrame(frame)
+        
+        self.maybe_refresh()
+        
+        if not self.is_loaded:
+            logger.warning("Model not loaded, returning empty predictions")
+            return [[] for _ in range(len(frame))]
+        
+        # One snapshot for the whole call, so a hot swap can't mix versions
+        artifacts = self.artifacts
+        results: List[List[Dict[str, Any]]] = []
+        
+        for start in range(0, len(frame), batch_size):
+            chunk = frame.iloc[start:start + batch_size]
+            try:
+                X = self._prepare_features_batch(chunk, artifacts)
+                probas = self._predict_proba(X, artifacts)
+                results.extend(self._top_k(probas, k, artifacts))
+            except Exception as e:
+                logger.error(f"Batch prediction error: {e}")
+                results.extend([] for _ in range(len(chunk)))
+        
+        return results
+    
     def predict_top_k(
         self,
         description: str,
@@ -139,42 +414,23 @@ class MLClassifier:
         Returns:
             List of dicts with 'account', 'probability', 'rank'
         """
+        self.maybe_refresh()
+        
         if not self.is_loaded:
             logger.warning("Model not loaded, returning empty predictions")
             return []
         
+        artifacts = self.artifacts
+        
         try:
             # Prepare features
-            X = self._prepare_features(description, counterparty, amount, date)
+            X = self._prepare_features(description, counterparty, amount, date, artifacts)
             
             # Get predictions
-            model = self.artifacts['model']
-            model_type = self.artifacts['model_type']
-            
-            if model_type == 'lightgbm':
-                probas = model.predict(X, num_iteration=model.best_iteration)
-                # Reshape if needed
-                if len(probas.shape) == 1:
-                    probas = probas.reshape(1, -1)
-            else:
-                # Logistic Regression
-                probas = model.predict_proba(X)
+            probas = self._predict_proba(X, artifacts)
             
             # Get top-k
-            top_k_idx = np.argsort(probas[0])[-k:][::-1]
-            
-            predictions = []
-            for rank, idx in enumerate(top_k_idx, 1):
-                account = self.artifacts['label_encoder'].classes_[idx]
-                probability = float(probas[0][idx])
-                
-                predictions.append({
-                    'account': account,
-                    'probability': probability,
-                    'rank': rank
-                })
-            
-            return predictions
+            return self._top_k(probas, k, artifacts)[0]
             
         except Exception as e:
             logger.error(f"Prediction error: {e}")
@@ -216,7 +472,7 @@ def get_classifier() -> MLClassifier:
     global _classifier_instance
     
     if _classifier_instance is None:
-        _classifier_instance = MLClassifier()
+        _classifier_instance = MLClassifier(registry=ModelRegistry(settings.MODEL_REGISTRY))
     
     return _classifier_instance
 
@@ -6,6 +6,10 @@ Detects data drift and performance drift across:
 - OCR extraction fields (confidence distributions)
 
 Emits drift decisions with reasons for auto-retraining.
+
+Transaction feature distributions come from the per-day histogram
+sketches in app/ml/drift_sketches.py, so a drift check never scans the
+transactions table (apart from a one-time backfill).
 """
 import logging
 import numpy as np
@@ -65,6 +69,54 @@ def compute_psi(expected: np.ndarray, actual: np.ndarray, bins: int = 10) -> flo
     return float(psi)
 
 
+def compute_psi_from_counts(
+    expected_counts: np.ndarray,
+    actual_counts: np.ndarray,
+    bins: Optional[int] = 10
+) -> float:
+    """
+    Compute PSI from two histograms over the same fixed bins.
+    
+    With ``bins`` set, adjacent bins are first merged into up to ``bins``
+    groups of roughly equal expected mass, approximating the quantile
+    binning of compute_psi. Use ``bins=None`` for categorical histograms.
+    
+    Args:
+        expected_counts: Baseline counts per bin
+        actual_counts: Current counts per bin
+        bins: Target number of merged bins (None keeps the original bins)
+        
+    Returns:
+        PSI score (0 = no drift, higher = more drift)
+    """
+    expected_counts = np.asarray(expected_counts, dtype=float)
+    actual_counts = np.asarray(actual_counts, dtype=float)
+    
+    expected_total = expected_counts.sum()
+    actual_total = actual_counts.sum()
+    if expected_total == 0 or actual_total == 0:
+        return 0.0
+    
+    if bins is not None:
+        # Group id per fine bin: which expected-mass quantile it falls in
+        cumulative = np.cumsum(expected_counts) / expected_total
+        groups = np.minimum((cumulative * bins).astype(int), bins - 1)
+        expected_counts = np.bincount(groups, weights=expected_counts)
+        actual_counts = np.bincount(groups, weights=actual_counts, minlength=len(expected_counts))
+    
+    # Convert to percentages
+    expected_pct = expected_counts / expected_total
+    actual_pct = actual_counts / actual_total
+    
+    # Avoid division by zero
+    expected_pct = np.where(expected_pct == 0, 0.0001, expected_pct)
+    actual_pct = np.where(actual_pct == 0, 0.0001, actual_pct)
+    
+    psi = np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct))
+    
+    return float(psi)
+
+
 def compute_js_divergence(p: np.ndarray, q: np.ndarray) -> float:
     """
     Compute Jensen-Shannon divergence between two probability distributions.
@@ -115,16 +167,18 @@ class DriftMonitor:
     - OCR pipeline: Confidence distributions, extraction rates
     """
     
-    def __init__(self, db_session: Any, settings: Any):
+    def __init__(self, db_session: Any, settings: Any, company_id: Optional[str] = None):
         """
         Initialize drift monitor.
         
         Args:
             db_session: Database session
             settings: Settings object with drift thresholds
+            company_id: Limit transaction signals to one company (default: all)
         """
         self.db = db_session
         self.settings = settings
+        self.company_id = company_id
         
         # Thresholds
         self.psi_warn = getattr(settings, 'DRIFT_PSI_WARN', 0.10)
@@ -166,10 +220,14 @@ class DriftMonitor:
     
     def _compute_txn_classifier_signals(self) -> Dict[str, Any]:
         """Compute drift signals for transaction classifier."""
-        from app.db.models import TransactionDB, ModelTrainingLogDB
+        from app.db.models import ModelTrainingLogDB
+        from app.ml import drift_sketches
         
         signals = {
             'psi_amount': 0.0,
+            'psi_vendor': 0.0,
+            'js_amount': 0.0,
+            'js_vendor': 0.0,
             'accuracy_baseline': 0.0,
             'accuracy_current': 0.0,
             'accuracy_drop': 0.0,
@@ -180,42 +238,43 @@ class DriftMonitor:
         try:
             # Get baseline model
             baseline_model = self.db.query(ModelTrainingLogDB).order_by(
-                ModelTrainingLogDB.timestamp.desc()
+                ModelTrainingLogDB.trained_at.desc()
             ).first()
             
             if not baseline_model:
                 logger.warning("No baseline model found")
                 return signals
             
-            signals['accuracy_baseline'] = baseline_model.accuracy
-            signals['days_since_train'] = (datetime.now() - baseline_model.timestamp).days
-            
-            # Get new records since training
-            new_records = self.db.query(TransactionDB).filter(
-                TransactionDB.created_at > baseline_model.timestamp
-            ).count()
+            signals['accuracy_baseline'] = baseline_model.accuracy or 0.0
+            signals['days_since_train'] = (datetime.now() - baseline_model.trained_at).days
             
-            signals['new_records_since_train'] = new_records
+            self._ensure_sketches()
             
-            # Compute PSI for amount distribution
-            # Get baseline amounts
-            baseline_txns = self.db.query(TransactionDB).filter(
-                TransactionDB.created_at <= baseline_model.timestamp
-            ).limit(5000).all()
+            # Baseline: ingestion days up to the training day; recent: after it
+            train_day = baseline_model.trained_at.date()
+            recent_start = train_day + timedelta(days=1)
             
-            recent_txns = self.db.query(TransactionDB).filter(
-                TransactionDB.created_at > baseline_model.timestamp
-            ).limit(5000).all()
+            signals['new_records_since_train'] = drift_sketches.load_total(
+                self.db, start=recent_start, company_id=self.company_id
+            )
             
-            if baseline_txns and recent_txns:
-                baseline_amounts = np.array([abs(t.amount) for t in baseline_txns])
-                recent_amounts = np.array([abs(t.amount) for t in recent_txns])
+            for feature, bins in ((drift_sketches.AMOUNT_FEATURE, 10), (drift_sketches.VENDOR_FEATURE, None)):
+                baseline_counts = drift_sketches.load_counts(
+                    self.db, feature, end=train_day, company_id=self.company_id
+                )
+                recent_counts = drift_sketches.load_counts(
+                    self.db, feature, start=recent_start, company_id=self.company_id
+                )
                 
-                signals['psi_amount'] = compute_psi(baseline_amounts, recent_amounts)
+                if baseline_counts.sum() and recent_counts.sum():
+                    signals[f'psi_{feature}'] = compute_psi_from_counts(baseline_counts, recent_counts, bins=bins)
+                    signals[f'js_{feature}'] = compute_js_divergence(
+                        baseline_counts.astype(float), recent_counts.astype(float)
+                    )
             
             # Estimate current accuracy (simplified - in production, use validation set)
             # For now, use baseline accuracy (would need labeled validation data)
-            signals['accuracy_current'] = baseline_model.accuracy
+            signals['accuracy_current'] = signals['accuracy_baseline']
             signals['accuracy_drop'] = signals['accuracy_baseline'] - signals['accuracy_current']
             
         except Exception as e:
@@ -223,6 +282,14 @@ class DriftMonitor:
         
         return signals
     
+    def _ensure_sketches(self) -> None:
+        """Backfill drift sketches from pre-sketch transactions once."""
+        from app.ml import drift_sketches
+        
+        if drift_sketches.backfill_pending(self.db):
+            logger.info("Drift sketch backfill pending - backfilling from transactions")
+            drift_sketches.backfill(self.db)
+    
     def _compute_ocr_signals(self) -> Dict[str, Any]:
         """Compute drift signals for OCR pipeline."""
         signals = {
@@ -242,7 +309,7 @@ class DriftMonitor:
     
     def _compute_system_signals(self) -> Dict[str, Any]:
         """Compute system-level signals."""
-        from app.db.models import TransactionDB
+        from app.ml import drift_sketches
         
         signals = {
             'total_records': 0,
@@ -251,17 +318,16 @@ class DriftMonitor:
         }
         
         try:
-            signals['total_records'] = self.db.query(TransactionDB).count()
+            self._ensure_sketches()
+            today = datetime.utcnow().date()
             
-            seven_days_ago = datetime.now() - timedelta(days=7)
-            signals['records_last_7d'] = self.db.query(TransactionDB).filter(
-                TransactionDB.created_at >= seven_days_ago
-            ).count()
-            
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            signals['records_last_30d'] = self.db.query(TransactionDB).filter(
-                TransactionDB.created_at >= thirty_days_ago
-            ).count()
+            signals['total_records'] = drift_sketches.load_total(self.db, company_id=self.company_id)
+            signals['records_last_7d'] = drift_sketches.load_total(
+                self.db, start=today - timedelta(days=7), company_id=self.company_id
+            )
+            signals['records_last_30d'] = drift_sketches.load_total(
+                self.db, start=today - timedelta(days=30), company_id=self.company_id
+            )
             
         except Exception as e:
             logger.error(f"Error computing system signals: {e}")
@@ -303,6 +369,13 @@ class DriftMonitor:
         elif psi_amount >= self.psi_warn:
             reasons.append(f"psi_amount={psi_amount:.3f} >= {self.psi_warn} (WARN)")
         
+        psi_vendor = txn_signals.get('psi_vendor', 0.0)
+        if psi_vendor >= self.psi_alert:
+            reasons.append(f"psi_vendor={psi_vendor:.3f} >= {self.psi_alert} (ALERT)")
+            scope.append('txn_classifier')
+        elif psi_vendor >= self.psi_warn:
+            reasons.append(f"psi_vendor={psi_vendor:.3f} >= {self.psi_warn} (WARN)")
+        
         # Accuracy drop check
         acc_drop = txn_signals.get('accuracy_drop', 0.0) * 100  # Convert to percentage points
         if acc_drop >= self.acc_drop_pct:
@@ -330,9 +403,10 @@ class DriftMonitor:
         
         # Determine severity
         severity = 'none'
-        if psi_amount >= self.psi_alert or acc_drop >= self.acc_drop_pct:
+        psi_max = max(psi_amount, psi_vendor)
+        if psi_max >= self.psi_alert or acc_drop >= self.acc_drop_pct:
             severity = 'high'
-        elif psi_amount >= self.psi_warn or new_records >= self.min_new_records:
+        elif psi_max >= self.psi_warn or new_records >= self.min_new_records:
             severity = 'medium'
         elif days_since_train >= self.min_days_since_train:
             severity = 'low'
@@ -355,7 +429,7 @@ class DriftMonitor:
         from app.db.models import ModelTrainingLogDB
         
         baseline_model = self.db.query(ModelTrainingLogDB).order_by(
-            ModelTrainingLogDB.timestamp.desc()
+            ModelTrainingLogDB.trained_at.desc()
         ).first()
         
         if not baseline_model:
@@ -364,24 +438,25 @@ class DriftMonitor:
         return {
             'model_name': baseline_model.model_name,
             'accuracy': baseline_model.accuracy,
-            'precision': baseline_model.precision_score,
-            'recall': baseline_model.recall,
+            'precision': baseline_model.precision_weighted,
+            'recall': baseline_model.recall_weighted,
             'f1': baseline_model.f1_score,
             'records_used': baseline_model.records_used,
-            'timestamp': baseline_model.timestamp.isoformat()
+            'timestamp': baseline_model.trained_at.isoformat()
         }
 
 
-def create_drift_monitor(db_session: Any, settings: Any) -> DriftMonitor:
+def create_drift_monitor(db_session: Any, settings: Any, company_id: Optional[str] = None) -> DriftMonitor:
     """
     Factory function to create drift monitor.
     
     Args:
         db_session: Database session
         settings: Settings object
+        company_id: Limit transaction signals to one company (default: all)
         
     Returns:
         DriftMonitor instance
     """
-    return DriftMonitor(db_session, settings)
+    return DriftMonitor(db_session, settings, company_id=company_id)
 
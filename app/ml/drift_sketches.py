@@ -0,0 +1,281 @@
+"""
+Mergeable per-day feature histograms for drift monitoring.
+
+Each ingested transaction increments fixed-bin counts in one
+DriftSketchDB row per (company, ingestion day, feature):
+
+- ``amount``: |amount| in log-spaced bins (4 per decade, $0.01 to $10M)
+- ``vendor``: normalized vendor hashed into VENDOR_BUCKETS buckets
+
+Because the bins are fixed, histograms for any set of days or companies
+merge by addition, so drift statistics for a window cost O(days x bins)
+instead of a scan of the transactions table.
+"""
+import logging
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import DriftSketchBackfillDB, DriftSketchDB, TransactionDB
+from app.utils.vendor_normalization import normalize_vendor
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_FEATURE = "amount"
+VENDOR_FEATURE = "vendor"
+FEATURES = (AMOUNT_FEATURE, VENDOR_FEATURE)
+
+# Lower bin edges for |amount|: 0, then 4 per decade from $0.01 to $10M (last bin open)
+AMOUNT_EDGES = np.concatenate([[0.0], np.logspace(-2, 7, 37)])
+VENDOR_BUCKETS = 256
+
+BIN_COUNTS = {AMOUNT_FEATURE: len(AMOUNT_EDGES), VENDOR_FEATURE: VENDOR_BUCKETS}
+
+BACKFILL_CHUNK_SIZE = 10000
+
+
+def amount_counts(amounts: Iterable[float]) -> np.ndarray:
+    """Histogram of |amount| over AMOUNT_EDGES."""
+    values = np.abs(np.fromiter((a or 0.0 for a in amounts), dtype=float))
+    bins = np.searchsorted(AMOUNT_EDGES, values, side='right') - 1
+    return np.bincount(bins, minlength=len(AMOUNT_EDGES))
+
+
+def vendor_bucket(vendor: str) -> int:
+    """Stable hash bucket for a vendor name."""
+    return zlib.crc32(normalize_vendor(vendor or "").encode("utf-8")) % VENDOR_BUCKETS
+
+
+def vendor_counts(vendors: Iterable[str]) -> np.ndarray:
+    """Histogram of vendors over hash buckets."""
+    buckets = np.fromiter((vendor_bucket(v) for v in vendors), dtype=np.int64)
+    return np.bincount(buckets, minlength=VENDOR_BUCKETS)
+
+
+def _vendor_of(txn: Any) -> str:
+    return getattr(txn, 'counterparty', None) or getattr(txn, 'description', None) or ""
+
+
+def record_transactions(
+    db: Session,
+    transactions: Iterable[Any],
+    day: Optional[date] = None,
+    company_id: Optional[str] = None
+) -> int:
+    """
+    Add transactions to the drift sketches (caller commits).
+
+    Args:
+        db: Database session
+        transactions: Objects with amount, counterparty/description and
+            optionally company_id (TransactionDB rows or parsed transactions)
+        day: Ingestion day (default: today, UTC)
+        company_id: Company for all rows (default: each row's company_id)
+
+    Returns:
+        Number of transactions recorded
+    """
+    day = day or datetime.utcnow().date()
+
+    by_company: Dict[str, list] = defaultdict(list)
+    for txn in transactions:
+        key = company_id if company_id is not None else getattr(txn, 'company_id', None)
+        by_company[key or ""].append(txn)
+
+    recorded = 0
+    for company, txns in by_company.items():
+        histograms = {
+            AMOUNT_FEATURE: amount_counts(t.amount for t in txns),
+            VENDOR_FEATURE: vendor_counts(_vendor_of(t) for t in txns),
+        }
+        _add_counts(db, company, day, histograms, len(txns))
+        recorded += len(txns)
+
+    return recorded
+
+
+def _add_counts(db: Session, company_id: str, day: date, histograms: Dict[str, np.ndarray], total: int) -> None:
+    existing = {
+        row.feature: row
+        for row in _sketch_rows(db, company_id, day, list(histograms))
+    }
+
+    for feature, counts in histograms.items():
+        row = existing.get(feature)
+        if row is None:
+            try:
+                with db.begin_nested():
+                    db.add(DriftSketchDB(
+                        company_id=company_id,
+                        day=day,
+                        feature=feature,
+                        counts=[int(c) for c in counts],
+                        total=total
+                    ))
+                continue
+            except IntegrityError:
+                # A concurrent ingest created the row first; add to it instead
+                [row] = _sketch_rows(db, company_id, day, [feature])
+
+        # Reassign (not mutate) so the JSON column is flagged dirty
+        row.counts = [int(c) for c in np.asarray(row.counts) + counts]
+        row.total = row.total + total
+
+    db.flush()
+
+
+def _sketch_rows(db: Session, company_id: str, day: date, features: list) -> list:
+    return db.query(DriftSketchDB).filter(
+        DriftSketchDB.company_id == company_id,
+        DriftSketchDB.day == day,
+        DriftSketchDB.feature.in_(features)
+    ).with_for_update().all()
+
+
+def _sketch_filter(query, start: Optional[date], end: Optional[date], company_id: Optional[str]):
+    if start is not None:
+        query = query.filter(DriftSketchDB.day >= start)
+    if end is not None:
+        query = query.filter(DriftSketchDB.day <= end)
+    if company_id is not None:
+        query = query.filter(DriftSketchDB.company_id == company_id)
+    return query
+
+
+def load_counts(
+    db: Session,
+    feature: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    company_id: Optional[str] = None
+) -> np.ndarray:
+    """
+    Merged histogram for a feature over a day range.
+
+    Args:
+        feature: AMOUNT_FEATURE or VENDOR_FEATURE
+        start: First ingestion day (inclusive, default: all)
+        end: Last ingestion day (inclusive, default: all)
+        company_id: Company (default: all companies)
+
+    Returns:
+        Count per bin
+    """
+    query = _sketch_filter(
+        db.query(DriftSketchDB.counts).filter(DriftSketchDB.feature == feature),
+        start, end, company_id
+    )
+
+    merged = np.zeros(BIN_COUNTS[feature], dtype=np.int64)
+    for (counts,) in query:
+        merged += np.asarray(counts, dtype=np.int64)
+    return merged
+
+
+def load_total(
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    company_id: Optional[str] = None
+) -> int:
+    """Transactions recorded over a day range."""
+    query = _sketch_filter(
+        db.query(func.coalesce(func.sum(DriftSketchDB.total), 0)).filter(
+            DriftSketchDB.feature == AMOUNT_FEATURE
+        ),
+        start, end, company_id
+    )
+    return int(query.scalar() or 0)
+
+
+def has_sketches(db: Session) -> bool:
+    """True once any sketch row exists."""
+    return db.query(DriftSketchDB.id).first() is not None
+
+
+def backfill_pending(db: Session) -> bool:
+    """True until transactions from before live sketching have been backfilled."""
+    completed_at = db.query(DriftSketchBackfillDB.completed_at).filter(
+        DriftSketchBackfillDB.id == 1
+    ).scalar()
+    return completed_at is None
+
+
+def _backfill_cutoff(db: Session) -> datetime:
+    state = db.get(DriftSketchBackfillDB, 1)
+    if state is None:
+        # Database created without migration 015: live sketching began on
+        # the first sketched day (or begins now)
+        first_day = db.query(func.min(DriftSketchDB.day)).scalar()
+        cutoff = datetime.combine(first_day, time.min) if first_day else datetime.utcnow()
+        try:
+            with db.begin_nested():
+                db.add(DriftSketchBackfillDB(id=1, cutoff=cutoff, recorded=0))
+        except IntegrityError:
+            pass
+        state = db.get(DriftSketchBackfillDB, 1)
+    return state.cutoff
+
+
+def backfill(db: Session, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Build sketches from transactions created before live sketching began
+    (one streaming scan).
+
+    Runs once: the DriftSketchBackfillDB row is marked complete in the same
+    transaction as the counts, so repeated or concurrent calls (which wait
+    on that row) record nothing.
+
+    Returns:
+        Number of transactions recorded (0 if already backfilled)
+    """
+    cutoff = _backfill_cutoff(db)
+    claimed = db.query(DriftSketchBackfillDB).filter(
+        DriftSketchBackfillDB.id == 1,
+        DriftSketchBackfillDB.completed_at.is_(None)
+    ).update({DriftSketchBackfillDB.completed_at: datetime.utcnow()}, synchronize_session=False)
+    if not claimed:
+        db.commit()
+        return 0
+
+    query = db.query(
+        TransactionDB.company_id,
+        TransactionDB.amount,
+        TransactionDB.counterparty,
+        TransactionDB.description,
+        TransactionDB.created_at,
+    ).filter(
+        or_(TransactionDB.created_at < cutoff, TransactionDB.created_at.is_(None))
+    ).yield_per(chunk_size)
+
+    pending: Dict[date, list] = defaultdict(list)
+    buffered = 0
+    recorded = 0
+
+    def flush():
+        nonlocal recorded
+        for day, rows in pending.items():
+            recorded += record_transactions(db, rows, day=day)
+        pending.clear()
+
+    for row in query:
+        created = row.created_at or cutoff
+        pending[created.date()].append(row)
+        buffered += 1
+        if buffered >= chunk_size:
+            flush()
+            buffered = 0
+    flush()
+
+    db.query(DriftSketchBackfillDB).filter(DriftSketchBackfillDB.id == 1).update(
+        {DriftSketchBackfillDB.recorded: recorded}, synchronize_session=False
+    )
+    db.commit()
+    logger.info(f"Backfilled drift sketches from {recorded} transactions created before {cutoff}")
+    return recorded
@@ -0,0 +1,355 @@
+"""
+Incremental (online) classifier training.
+
+Instead of refitting TF-IDF and the classifier on the whole history, the
+online model uses stateless hashing vectorizers and an SGD logistic
+regression, and each run only ``partial_fit``s on labelled feedback
+(approved/posted journal entries) updated since the last checkpoint.
+
+Checkpoints are OnlineTrainingCheckpointDB rows (model_name
+``classifier_online``) recording the registry version and the feedback
+watermark (updated_at, je_id of the last row trained on). They are not
+ModelTrainingLogDB rows: a checkpoint is an unpromoted candidate and must
+not become the drift baseline. One in HOLDOUT_BUCKETS feedback rows (by
+je_id) is never trained on; metrics are computed on the newest of those,
+so any two models can be compared on the same rows.
+A run rebuilds from the full history (still streamed in chunks) when there
+is no checkpoint or when feedback uses an account the model has never
+seen, since the class set of an SGD model is fixed at its first fit.
+
+The artifacts keep the MLClassifier layout, so a published candidate can
+be served by the existing inference path.
+"""
+import logging
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, MaxAbsScaler
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.db.models import JournalEntryDB, OnlineTrainingCheckpointDB, TransactionDB
+from app.ml.classifier import build_features
+from app.ml.registry import ModelRegistry
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ONLINE_MODEL_NAME = "classifier_online"
+ONLINE_MODEL_TYPE = "sgd_online"
+
+# Journal entry statuses that count as labelled feedback
+FEEDBACK_STATUSES = ("approved", "posted")
+
+# Hashing dimensions (fixed: changing them invalidates checkpoints)
+DESC_FEATURES = 2 ** 18
+COUNTERPARTY_FEATURES = 2 ** 12
+
+# One in HOLDOUT_BUCKETS feedback rows is held out from training
+HOLDOUT_BUCKETS = 10
+# Newest held-out rows used for evaluation
+HOLDOUT_MAX_ROWS = 2000
+
+# (updated_at, je_id) of the last feedback row trained on
+Watermark = Tuple[datetime, str]
+
+
+def is_holdout(je_id: str) -> bool:
+    """True if a journal entry is held out from training (stable per entry)."""
+    return zlib.crc32(je_id.encode('utf-8')) % HOLDOUT_BUCKETS == 0
+
+
+def label_from_lines(lines: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """The categorized account of a journal entry (first non-cash line)."""
+    for line in lines or []:
+        account = line.get('account', '')
+        if account and 'Cash at Bank' not in account:
+            return account
+    return None
+
+
+def new_online_artifacts(classes: List[str]) -> Dict[str, Any]:
+    """Untrained online model artifacts for a fixed set of accounts."""
+    return {
+        'desc_vectorizer': HashingVectorizer(
+            n_features=DESC_FEATURES,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            strip_accents='unicode'
+        ),
+        'counterparty_vectorizer': HashingVectorizer(
+            n_features=COUNTERPARTY_FEATURES,
+            alternate_sign=False,
+            strip_accents='unicode'
+        ),
+        'label_encoder': LabelEncoder().fit(sorted(classes)),
+        'model': Pipeline([
+            ('scale', MaxAbsScaler()),
+            ('clf', SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)),
+        ]),
+        'model_type': ONLINE_MODEL_TYPE,
+    }
+
+
+class IncrementalTrainer:
+    """Updates the online candidate model from new labelled feedback."""
+
+    def __init__(
+        self,
+        db: Session,
+        registry: ModelRegistry,
+        chunk_size: Optional[int] = None,
+        model_name: str = ONLINE_MODEL_NAME
+    ):
+        """
+        Initialize trainer.
+
+        Args:
+            db: Database session
+            registry: Registry the candidates are published to
+            chunk_size: Feedback rows per partial_fit call
+            model_name: OnlineTrainingCheckpointDB model_name for checkpoints
+        """
+        self.db = db
+        self.registry = registry
+        self.chunk_size = chunk_size or settings.ONLINE_TRAIN_CHUNK_SIZE
+        self.model_name = model_name
+
+    def last_checkpoint(self) -> Optional[OnlineTrainingCheckpointDB]:
+        """Latest checkpoint row for this model, if any."""
+        return self.db.query(OnlineTrainingCheckpointDB).filter(
+            OnlineTrainingCheckpointDB.model_name == self.model_name
+        ).order_by(OnlineTrainingCheckpointDB.id.desc()).first()
+
+    def _feedback_query(self, since: Optional[Watermark]):
+        query = self.db.query(
+            TransactionDB.description,
+            TransactionDB.counterparty,
+            TransactionDB.amount,
+            TransactionDB.date,
+            JournalEntryDB.lines,
+            JournalEntryDB.updated_at,
+            JournalEntryDB.je_id,
+        ).join(
+            TransactionDB, TransactionDB.txn_id == JournalEntryDB.source_txn_id
+        ).filter(
+            JournalEntryDB.status.in_(FEEDBACK_STATUSES)
+        )
+        if since is not None:
+            # Keyset: rows sharing the watermark's timestamp are not skipped
+            updated_at, je_id = since
+            query = query.filter(or_(
+                JournalEntryDB.updated_at > updated_at,
+                and_(JournalEntryDB.updated_at == updated_at, JournalEntryDB.je_id > je_id)
+            ))
+        return query
+
+    @staticmethod
+    def _feedback_row(row, label: str) -> Dict[str, Any]:
+        return {
+            'description': row.description or '',
+            'counterparty': row.counterparty or '',
+            'amount': row.amount,
+            'date': row.date,
+            'label': label,
+            'updated_at': row.updated_at,
+            'je_id': row.je_id,
+        }
+
+    def iter_feedback(self, since: Optional[Watermark] = None) -> Iterator[pd.DataFrame]:
+        """Labelled training feedback after the ``since`` watermark, in DataFrame chunks."""
+        query = self._feedback_query(since).order_by(
+            JournalEntryDB.updated_at, JournalEntryDB.je_id
+        ).yield_per(self.chunk_size)
+
+        rows = []
+        for row in query:
+            label = label_from_lines(row.lines)
+            if label is None or is_holdout(row.je_id):
+                continue
+            rows.append(self._feedback_row(row, label))
+            if len(rows) >= self.chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+
+        if rows:
+            yield pd.DataFrame(rows)
+
+    def holdout_feedback(self, max_rows: int = HOLDOUT_MAX_ROWS) -> pd.DataFrame:
+        """Newest held-out feedback rows (never trained on)."""
+        query = self._feedback_query(None).order_by(
+            JournalEntryDB.updated_at.desc(), JournalEntryDB.je_id.desc()
+        ).yield_per(self.chunk_size)
+
+        rows = []
+        for row in query:
+            label = label_from_lines(row.lines)
+            if label is None or not is_holdout(row.je_id):
+                continue
+            rows.append(self._feedback_row(row, label))
+            if len(rows) >= max_rows:
+                break
+        return pd.DataFrame(rows)
+
+    def holdout_metrics(self, artifacts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score a model on the held-out feedback.
+
+        Works for any artifacts with the MLClassifier layout (online or
+        full retrain), so candidates and production are compared on the
+        same rows. Accounts a model does not know count as misses.
+
+        Args:
+            artifacts: Model artifacts (vectorizers, label_encoder, model)
+
+        Returns:
+            Metrics dict (empty if there is no held-out feedback)
+        """
+        frame = self.holdout_feedback()
+        if frame.empty:
+            return {}
+
+        X = build_features(frame, artifacts)
+        predicted = artifacts['label_encoder'].inverse_transform(artifacts['model'].predict(X))
+        return self._metrics(frame['label'].to_numpy(), predicted)
+
+    def feedback_labels(self, since: Optional[Watermark] = None) -> Set[str]:
+        """Accounts used by feedback after the ``since`` watermark."""
+        query = self._feedback_query(since).with_entities(JournalEntryDB.lines)
+        labels = (label_from_lines(lines) for (lines,) in query)
+        return {label for label in labels if label is not None}
+
+    def _resume(self) -> Optional[Dict[str, Any]]:
+        """Artifacts and watermark of the last checkpoint (None to rebuild)."""
+        checkpoint = self.last_checkpoint()
+        if checkpoint is None:
+            return None
+
+        try:
+            # Writable copy: partial_fit updates the weights in place
+            artifacts = self.registry.load(checkpoint.version, mmap=False)
+        except Exception as e:
+            logger.warning(f"Cannot resume from checkpoint {checkpoint.id}: {e}")
+            return None
+
+        since = (checkpoint.watermark_at, checkpoint.watermark_id)
+        unseen = self.feedback_labels(since) - set(artifacts['label_encoder'].classes_)
+        if unseen:
+            logger.info(f"Feedback has {len(unseen)} new accounts - rebuilding online model")
+            return None
+
+        return {'artifacts': artifacts, 'since': since, 'base_version': checkpoint.version}
+
+    def train(self, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Run one training pass and publish the candidate.
+
+        Args:
+            rebuild: Ignore the checkpoint and train on the full history
+
+        Returns:
+            Result dict with success, mode, records_used, version, metrics
+        """
+        start_time = time.time()
+        resume = None if rebuild else self._resume()
+
+        if resume is not None:
+            mode = 'incremental'
+            artifacts, since, base_version = resume['artifacts'], resume['since'], resume['base_version']
+        else:
+            mode = 'rebuild'
+            since, base_version = None, None
+            classes = self.feedback_labels()
+            if not classes:
+                return {'success': False, 'mode': mode, 'records_used': 0, 'error': 'no_feedback'}
+            artifacts = new_online_artifacts(sorted(classes))
+
+        model = artifacts['model']
+        scaler, clf = model.named_steps['scale'], model.named_steps['clf']
+        label_encoder = artifacts['label_encoder']
+        class_ids = np.arange(len(label_encoder.classes_))
+
+        records = 0
+        watermark = since
+
+        for frame in self.iter_feedback(since):
+            X = build_features(frame, artifacts)
+            y = label_encoder.transform(frame['label'])
+
+            if mode == 'rebuild':
+                scaler.partial_fit(X)
+            clf.partial_fit(scaler.transform(X), y, classes=class_ids)
+
+            records += len(frame)
+            # Chunks are ordered by (updated_at, je_id): the last row is the watermark
+            last = frame.iloc[-1]
+            watermark = (last['updated_at'].to_pydatetime(), last['je_id'])
+
+        duration = time.time() - start_time
+
+        if records == 0:
+            logger.info("No new feedback since last checkpoint")
+            return {
+                'success': True, 'mode': mode, 'records_used': 0,
+                'version': base_version, 'duration': duration,
+            }
+
+        metrics = self.holdout_metrics(artifacts)
+        artifacts['trained_at'] = datetime.now().isoformat()
+        artifacts['test_accuracy'] = metrics.get('test_accuracy', 0.0)
+        artifacts['metrics'] = metrics
+
+        version = self.registry.publish(artifacts, metadata={
+            'model_name': self.model_name,
+            'mode': mode,
+            'records_used': records,
+        })
+
+        self.db.add(OnlineTrainingCheckpointDB(
+            model_name=self.model_name,
+            mode=mode,
+            version=version,
+            base_version=base_version,
+            watermark_at=watermark[0],
+            watermark_id=watermark[1],
+            records_used=records,
+            metrics=metrics,
+            training_duration_sec=duration,
+        ))
+        self.db.commit()
+
+        logger.info(
+            f"Online training ({mode}): {records} records in {duration:.2f}s -> version {version}"
+        )
+
+        return {
+            'success': True,
+            'mode': mode,
+            'records_used': records,
+            'version': version,
+            'base_version': base_version,
+            'duration': duration,
+            'metrics': metrics,
+        }
+
+    @staticmethod
+    def _metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Any]:
+        """Accuracy and weighted precision/recall/F1 of predicted accounts."""
+        precision, recall, f1, _ = precision_recall_fscore_support(
+            y_true, y_pred, average='weighted', zero_division=0
+        )
+        return {
+            'test_accuracy': float(accuracy_score(y_true, y_pred)),
+            'precision': float(precision),
+            'recall': float(recall),
+            'f1_score': float(f1),
+            'test_samples': int(len(y_true)),
+        }
@@ -0,0 +1,195 @@
+"""
+Content-addressed model registry.
+
+Layout under the registry root::
+
+    versions/<version>/model.joblib    immutable artifact (version = sha256 prefix)
+    versions/<version>/manifest.json   metadata recorded at publish time
+    CURRENT                            version serving in production
+
+Publishing writes into a temporary directory and renames it into place, and
+promotion replaces ``CURRENT`` with ``os.replace``, so readers never see a
+half-written artifact. ``current_version`` only re-reads ``CURRENT`` when its
+stat changes, which makes polling from every API/worker process cheap.
+
+Artifacts are loaded with ``joblib.load(mmap_mode='r')``: NumPy arrays in
+the pickle (model weights, IDF vectors) are memory-mapped from the page
+cache and shared by all processes serving the same version.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+ARTIFACT_FILE = "model.joblib"
+MANIFEST_FILE = "manifest.json"
+
+# Hex digits of the sha256 used as the version id
+VERSION_LENGTH = 16
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Versioned, content-addressed store for classifier artifacts."""
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize registry.
+
+        Args:
+            root: Registry directory (created on first publish)
+        """
+        self.root = Path(root)
+        self._current_stat = None
+        self._current_version: Optional[str] = None
+
+    @property
+    def versions_dir(self) -> Path:
+        return self.root / VERSIONS_DIR
+
+    def artifact_path(self, version: str) -> Path:
+        """Path of a version's artifact file."""
+        return self.versions_dir / version / ARTIFACT_FILE
+
+    def publish(
+        self,
+        artifact: Union[str, Path, Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Add an artifact to the registry (does not promote it).
+
+        Args:
+            artifact: Path to a joblib/pickle file, or an artifacts dict to dump
+            metadata: Extra manifest fields (accuracy, training run, ...)
+
+        Returns:
+            Version id (identical content always yields the same version)
+        """
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".publish-", dir=self.root))
+
+        try:
+            staged = staging / ARTIFACT_FILE
+            if isinstance(artifact, dict):
+                # Uncompressed so arrays can be memory-mapped on load
+                joblib.dump(artifact, staged)
+            else:
+                shutil.copyfile(artifact, staged)
+
+            sha256 = file_sha256(staged)
+            version = sha256[:VERSION_LENGTH]
+            target = self.versions_dir / version
+
+            if target.exists():
+                logger.info(f"Model version {version} already published")
+                return version
+
+            manifest = {
+                "version": version,
+                "sha256": sha256,
+                "size_bytes": staged.stat().st_size,
+                "published_at": datetime.utcnow().isoformat(),
+                **(metadata or {}),
+            }
+            with open(staging / MANIFEST_FILE, "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Published concurrently by another process
+                if not target.exists():
+                    raise
+
+            logger.info(f"Published model version {version}")
+            return version
+
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def promote(self, version: str) -> None:
+        """
+        Make a published version current (also used for rollback).
+
+        Raises:
+            ValueError: If the version is not in the registry
+        """
+        if not self.artifact_path(version).exists():
+            raise ValueError(f"Unknown model version: {version}")
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, self.root / CURRENT_FILE)
+
+        logger.info(f"Promoted model version {version}")
+
+    def current_version(self) -> Optional[str]:
+        """
+        Version currently promoted, or None if nothing has been promoted.
+
+        Costs one stat() unless CURRENT changed since the last call.
+        """
+        try:
+            st = os.stat(self.root / CURRENT_FILE)
+        except FileNotFoundError:
+            self._current_stat = None
+            self._current_version = None
+            return None
+
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat_key != self._current_stat:
+            self._current_version = (self.root / CURRENT_FILE).read_text().strip() or None
+            self._current_stat = stat_key
+
+        return self._current_version
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        """Manifest recorded when the version was published."""
+        with open(self.versions_dir / version / MANIFEST_FILE) as f:
+            return json.load(f)
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Manifests of all published versions, oldest first."""
+        if not self.versions_dir.exists():
+            return []
+
+        manifests = [
+            self.manifest(path.name)
+            for path in self.versions_dir.iterdir()
+            if (path / MANIFEST_FILE).exists()
+        ]
+        return sorted(manifests, key=lambda m: m.get("published_at", ""))
+
+    def load(self, version: str, mmap: bool = True) -> Dict[str, Any]:
+        """
+        Load a version's artifacts.
+
+        Args:
+            version: Version id
+            mmap: Memory-map NumPy arrays instead of copying them into memory
+
+        Returns:
+            Artifacts dict (model, vectorizers, label_encoder, ...)
+        """
+        return joblib.load(self.artifact_path(version), mmap_mode="r" if mmap else None)
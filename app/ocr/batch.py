@@ -0,0 +1,375 @@
+"""
+Batch OCR
+=========
+
+Runs Tesseract over many receipts/PDF pages at once.
+
+- Every page is an independent unit of work: images are one page, PDFs
+  are rendered page by page at config.OCR_DPI (each page exactly once,
+  inside the worker that OCRs it, so no images cross process bounds).
+- Units fan out over a shared process pool (config.OCR_WORKERS), so
+  throughput scales with cores; small batches run inline.
+- Tokens are cached by file SHA-256 (plus language, DPI and Tesseract
+  version) in an ExtractionCache under config.OCR_TOKEN_CACHE_PREFIX, so
+  reprocessing the same receipt costs a hash. Identical files in one
+  batch are OCR'd once.
+
+Usage:
+------
+```python
+docs = BatchOCR().extract(paths, on_progress=reporter.advance)
+for doc in docs:
+    doc.tokens, doc.text, doc.cache_hit, doc.error
+```
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.ingestion.config import config
+from app.ingestion.extraction_cache import ExtractionCache, file_sha256
+from app.ocr.providers.base import TokenBox
+
+logger = logging.getLogger(__name__)
+
+# Bump when page OCR output changes; cached tokens are then ignored
+OCR_CACHE_VERSION = "1"
+
+# Fewer pages than this are OCR'd inline rather than on the pool
+MIN_PARALLEL_PAGES = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+token_cache = ExtractionCache(prefix=config.OCR_TOKEN_CACHE_PREFIX)
+
+
+@dataclass
+class OCRPage:
+    """OCR output of one page."""
+    page: int
+    text: str
+    tokens: List[TokenBox]
+
+
+@dataclass
+class OCRDocument:
+    """OCR output of one receipt image or PDF."""
+    path: str
+    sha256: Optional[str] = None
+    pages: List[OCRPage] = field(default_factory=list)
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+    @property
+    def tokens(self) -> List[TokenBox]:
+        return [token for page in self.pages for token in page.tokens]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages)
+
+
+@lru_cache(maxsize=1)
+def ocr_available() -> bool:
+    """Whether pytesseract and the tesseract binary are installed."""
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=1)
+def _tesseract_version() -> str:
+    import pytesseract
+    return str(pytesseract.get_tesseract_version())
+
+
+def tokens_from_data(data: Dict[str, list], width: int, height: int, page: int = 0) -> List[TokenBox]:
+    """
+    Tokens from pytesseract.image_to_data output.
+
+    Returns normalized coordinates (0-1) for portability.
+    """
+    tokens = []
+    for i in range(len(data['text'])):
+        text = data['text'][i].strip()
+        if not text:
+            continue
+
+        # Normalize coordinates to 0-1
+        x = data['left'][i] / width
+        y = data['top'][i] / height
+        w = data['width'][i] / width
+        h = data['height'][i] / height
+
+        # Confidence is 0-100, normalize to 0-1
+        conf = float(data['conf'][i])
+        conf = conf / 100.0 if conf >= 0 else 0.0
+
+        tokens.append(TokenBox(
+            text=text,
+            x=max(0, min(x, 1)),
+            y=max(0, min(y, 1)),
+            w=max(0, min(w, 1)),
+            h=max(0, min(h, 1)),
+            confidence=max(0, min(conf, 1)),
+            page=page
+        ))
+    return tokens
+
+
+def text_from_data(data: Dict[str, list]) -> str:
+    """Page text from image_to_data output (words joined per line, blank line between blocks)."""
+    lines: List[str] = []
+    current, words, block = None, [], None
+    for i in range(len(data['text'])):
+        word = data['text'][i].strip()
+        if not word:
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != current:
+            if words:
+                lines.append(' '.join(words))
+            if block is not None and key[0] != block:
+                lines.append('')
+            current, words, block = key, [], key[0]
+        words.append(word)
+    if words:
+        lines.append(' '.join(words))
+    return '\n'.join(lines)
+
+
+def ocr_page(path: str, page: Optional[int], dpi: int, lang: str, timeout: int) -> dict:
+    """
+    OCR one image, or one page of a PDF (runs in a worker process).
+
+    Args:
+        path: Image or PDF path
+        page: Zero-based PDF page number (None for images)
+        dpi: Render resolution for PDF pages
+        lang: Tesseract language
+        timeout: Seconds before Tesseract is stopped
+
+    Returns:
+        {"page", "text", "tokens"} with tokens as dicts
+    """
+    import pytesseract
+    from PIL import Image
+
+    if page is None:
+        image = Image.open(path)
+    else:
+        from pdf2image import convert_from_path
+        image = convert_from_path(path, dpi=dpi, first_page=page + 1, last_page=page + 1)[0]
+
+    with image:
+        width, height = image.size
+        data = pytesseract.image_to_data(
+            image, lang=lang, timeout=timeout, output_type=pytesseract.Output.DICT
+        )
+
+    return {
+        "page": page or 0,
+        "text": text_from_data(data),
+        "tokens": [asdict(token) for token in tokens_from_data(data, width, height, page or 0)],
+    }
+
+
+def default_workers() -> int:
+    """Configured OCR workers (0 means one per CPU)."""
+    return config.OCR_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared OCR pool, created on first use (spawn: no inherited locks/threads)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Stop the shared OCR pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _page_numbers(path: str) -> List[Optional[int]]:
+    """Units of work for a file: each PDF page, or [None] for an image."""
+    if Path(path).suffix.lower() != '.pdf':
+        return [None]
+    from pdf2image import pdfinfo_from_path
+    return list(range(int(pdfinfo_from_path(path)["Pages"])))
+
+
+class BatchOCR:
+    """
+    OCR for batches of receipts and PDFs on a process pool, with token cache.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        dpi: Optional[int] = None,
+        lang: Optional[str] = None,
+        cache: Optional[ExtractionCache] = None
+    ):
+        """
+        Args:
+            workers: Worker processes (default: OCR_WORKERS; 1 runs inline)
+            dpi: PDF render resolution (default: OCR_DPI)
+            lang: Tesseract language (default: TESSERACT_LANG)
+            cache: Token cache (default: the shared OCR token cache)
+        """
+        self.workers = workers or default_workers()
+        self.dpi = dpi or config.OCR_DPI
+        self.lang = lang or config.TESSERACT_LANG
+        self.cache = cache or token_cache
+
+    @property
+    def cache_version(self) -> str:
+        return f"{OCR_CACHE_VERSION}+{self.lang}+{self.dpi}+{_tesseract_version()}"
+
+    def extract(
+        self,
+        paths: List[str],
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> List[OCRDocument]:
+        """
+        OCR a batch of files.
+
+        Args:
+            paths: Receipt image and/or PDF paths
+            on_progress: Called with the number of files completed (cache
+                hits immediately, others as their last page finishes)
+
+        Returns:
+            One OCRDocument per path, in order. Files that cannot be read
+            or OCR'd have ``error`` set instead of raising.
+        """
+        if not ocr_available():
+            raise ImportError("Tesseract not available. Install: pip install pytesseract pillow pdf2image")
+
+        docs = [OCRDocument(path=str(path)) for path in paths]
+        version = self.cache_version
+        pending: Dict[str, List[OCRDocument]] = {}
+
+        for doc in docs:
+            try:
+                doc.sha256 = file_sha256(doc.path)
+            except OSError as e:
+                doc.error = f"Cannot read {doc.path}: {e}"
+                self._progress(on_progress)
+                continue
+
+            if doc.sha256 in pending:
+                pending[doc.sha256].append(doc)
+                continue
+
+            cached = self.cache.get(doc.sha256, "tesseract", version)
+            if cached is not None:
+                doc.pages = [_page_from_dict(page) for page in cached]
+                doc.cache_hit = True
+                self._progress(on_progress)
+            else:
+                pending[doc.sha256] = [doc]
+
+        if pending:
+            self._run(pending, version, on_progress)
+
+        hits = sum(doc.cache_hit for doc in docs)
+        logger.info(f"Batch OCR: {len(docs)} files, {hits} from token cache, {len(pending)} OCR'd")
+        return docs
+
+    def _run(self, pending: Dict[str, List[OCRDocument]], version: str, on_progress) -> None:
+        units: List[Tuple[str, Optional[int]]] = []
+        remaining: Dict[str, int] = {}
+        pages: Dict[str, List[dict]] = {}
+
+        for sha256, group in pending.items():
+            try:
+                numbers = _page_numbers(group[0].path)
+            except Exception as e:
+                self._fail(group, f"Cannot render {group[0].path}: {e}", on_progress)
+                continue
+            remaining[sha256] = len(numbers)
+            pages[sha256] = []
+            units.extend((sha256, number) for number in numbers)
+
+        def args(sha256: str, number: Optional[int]) -> tuple:
+            return (pending[sha256][0].path, number, self.dpi, self.lang, config.OCR_PAGE_TIMEOUT)
+
+        if self.workers > 1 and len(units) >= MIN_PARALLEL_PAGES:
+            pool = _get_pool(self.workers)
+            futures = {pool.submit(ocr_page, *args(sha256, number)): sha256 for sha256, number in units}
+            results = ((futures[future], future) for future in as_completed(futures))
+        else:
+            results = ((sha256, _Inline(ocr_page, *args(sha256, number))) for sha256, number in units)
+
+        for sha256, future in results:
+            if sha256 not in remaining:
+                continue  # Document already failed on another page
+            try:
+                pages[sha256].append(future.result())
+            except Exception as e:
+                del remaining[sha256]
+                self._fail(pending[sha256], f"OCR failed for {pending[sha256][0].path}: {e}", on_progress)
+                continue
+
+            remaining[sha256] -= 1
+            if remaining[sha256] == 0:
+                del remaining[sha256]
+                result = sorted(pages.pop(sha256), key=lambda page: page["page"])
+                self.cache.put(sha256, "tesseract", version, result)
+                for doc in pending[sha256]:
+                    doc.pages = [_page_from_dict(page) for page in result]
+                    self._progress(on_progress)
+
+    def _fail(self, docs: List[OCRDocument], error: str, on_progress) -> None:
+        logger.warning(error)
+        for doc in docs:
+            doc.error = error
+            self._progress(on_progress)
+
+    @staticmethod
+    def _progress(on_progress) -> None:
+        if on_progress:
+            on_progress(1)
+
+
+class _Inline:
+    """Future-like wrapper running a call when its result is requested."""
+
+    def __init__(self, fn, *args):
+        self.fn, self.args = fn, args
+
+    def result(self):
+        return self.fn(*self.args)
+
+
+def _page_from_dict(page: dict) -> OCRPage:
+    return OCRPage(
+        page=page["page"],
+        text=page["text"],
+        tokens=[TokenBox(**token) for token in page["tokens"]],
+    )
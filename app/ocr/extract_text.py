@@ -41,7 +41,8 @@ def extract_text_with_tesseract(file_path: str) -> str:
     """
     Extract text from PDF using Tesseract OCR.
     
-    Converts PDF pages to images and runs OCR on each.
+    Pages are rendered at the configured OCR DPI and OCR'd in parallel on
+    the batch OCR pool; results are cached by file hash (app/ocr/batch.py).
     
     Args:
         file_path: Path to the PDF file
@@ -50,22 +51,15 @@ def extract_text_with_tesseract(file_path: str) -> str:
         Extracted text
     """
     try:
-        import pytesseract
-        from pdf2image import convert_from_path
+        from app.ocr.batch import BatchOCR
         
-        # Convert PDF to images
-        images = convert_from_path(file_path)
+        [doc] = BatchOCR().extract([file_path])
+        if doc.error:
+            return f"OCR failed: {doc.error}"
         
-        text = ""
-        for image in images:
-            # Run OCR on each page
-            page_text = pytesseract.image_to_string(image)
-            text += page_text + "\n"
-        
-        return text
+        return "".join(page.text + "\n" for page in doc.pages)
     except ImportError:
         # Tesseract not available, return stub message
         return "OCR not available. Install pytesseract and pdf2image: pip install pytesseract pdf2image"
     except Exception as e:
         return f"OCR failed: {e}"
-
@@ -5,7 +5,7 @@ Local Tesseract engine for token-level bounding box extraction.
 """
 import os
 import logging
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
 from .base import OCRProviderInterface, TokenBox, FieldBox
@@ -48,52 +48,34 @@ class TesseractProvider(OCRProviderInterface):
         """
         Extract token-level bounding boxes using Tesseract.
         
-        Returns normalized coordinates (0-1) for portability.
+        Returns normalized coordinates (0-1) for portability. Tokens are
+        cached by image hash (see app/ocr/batch.py).
         """
-        if not self.is_available:
-            raise RuntimeError("Tesseract not available")
-        
-        import pytesseract
-        from PIL import Image
+        [tokens] = self.extract_tokens_batch([image_path])
+        logger.info(f"Tesseract extracted {len(tokens)} tokens from {Path(image_path).name}")
+        return tokens
+    
+    def extract_tokens_batch(self, image_paths: List[str], workers: Optional[int] = None) -> List[List[TokenBox]]:
+        """
+        Extract tokens for many images (or PDFs) on the OCR process pool.
         
-        # Load image
-        img = Image.open(image_path)
-        width, height = img.size
+        Args:
+            image_paths: Receipt image/PDF paths
+            workers: Worker processes (default: OCR_WORKERS)
         
-        # Extract detailed data with bboxes
-        data = pytesseract.image_to_data(
-            img,
-            lang=self.lang,
-            output_type=pytesseract.Output.DICT
-        )
+        Returns:
+            Token lists in the order of image_paths
+        """
+        if not self.is_available:
+            raise RuntimeError("Tesseract not available")
         
-        tokens = []
-        for i in range(len(data['text'])):
-            text = data['text'][i].strip()
-            if not text:
-                continue
-            
-            # Normalize coordinates to 0-1
-            x = data['left'][i] / width
-            y = data['top'][i] / height
-            w = data['width'][i] / width
-            h = data['height'][i] / height
-            
-            # Confidence is 0-100, normalize to 0-1
-            conf = data['conf'][i] / 100.0 if data['conf'][i] >= 0 else 0.0
-            
-            tokens.append(TokenBox(
-                text=text,
-                x=max(0, min(x, 1)),
-                y=max(0, min(y, 1)),
-                w=max(0, min(w, 1)),
-                h=max(0, min(h, 1)),
-                confidence=max(0, min(conf, 1)),
-                page=0
-            ))
+        from app.ocr.batch import BatchOCR
         
-        logger.info(f"Tesseract extracted {len(tokens)} tokens from {Path(image_path).name}")
-        return tokens
+        docs = BatchOCR(workers=workers, lang=self.lang).extract(image_paths)
+        for doc in docs:
+            if doc.error:
+                raise RuntimeError(doc.error)
+        return [doc.tokens for doc in docs]
     
     def extract_fields(self, image_path: str) -> List[FieldBox]:
         """
@@ -105,9 +87,13 @@ class TesseractProvider(OCRProviderInterface):
         if not self.is_available:
             raise RuntimeError("Tesseract not available")
         
-        # Get all tokens
-        tokens = self.extract_tokens(image_path)
+        field_boxes = self.fields_from_tokens(self.extract_tokens(image_path))
         
+        logger.info(f"Extracted {len(field_boxes)} fields from {Path(image_path).name}")
+        return field_boxes
+    
+    def fields_from_tokens(self, tokens: List[TokenBox]) -> List[FieldBox]:
+        """Identify fields in already extracted tokens and aggregate their bboxes."""
         if not tokens:
             return []
         
@@ -162,10 +148,9 @@ class TesseractProvider(OCRProviderInterface):
                     w=max_x - min_x,
                     h=max_y - min_y,
                     confidence=avg_conf,
-                    page=0,
+                    page=matching_tokens[0].page,
                     tokens=matching_tokens
                 ))
         
-        logger.info(f"Extracted {len(field_boxes)} fields from {Path(image_path).name}")
         return field_boxes
 
@@ -0,0 +1,206 @@
+"""
+Receipt Index
+=============
+
+Persists receipt fields once, at ingest, into ReceiptDB (one row per
+receipt: vendor, date, amount) and ReceiptFieldDB (one row per field
+with value and bounding box). The receipts API lists from these tables
+with indexed filters instead of re-extracting receipts per request.
+
+Writers:
+- process_receipts_ocr_task (batch OCR of uploaded receipts)
+- GET /api/receipts/{id}/fields when a receipt was never indexed
+- scripts/index_receipts.py (backfill of receipt text files)
+"""
+
+import glob
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models import ReceiptDB, ReceiptFieldDB
+
+logger = logging.getLogger(__name__)
+
+# Receipts per delete/insert round trip
+INDEX_CHUNK_SIZE = 500
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%y", "%b %d, %Y", "%d %b %Y")
+
+
+def parse_receipt_date(value: Any) -> Optional[date]:
+    """Receipt date from an extracted value (None if unparseable)."""
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_receipt_amount(value: Any) -> Optional[float]:
+    """Amount from an extracted value (None if unparseable)."""
+    if value is None or value == "":
+        return None
+    try:
+        return round(float(str(value).replace("$", "").replace(",", "").strip()), 2)
+    except ValueError:
+        return None
+
+
+def field_rows_from_bboxes(result: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Field rows from extract_with_bboxes output ({field: {value, bbox, confidence}})."""
+    return [
+        {
+            "field": name,
+            "value": data.get("value"),
+            "page": data["bbox"].get("page", 0),
+            "x": data["bbox"]["x"],
+            "y": data["bbox"]["y"],
+            "w": data["bbox"]["w"],
+            "h": data["bbox"]["h"],
+            "confidence": data.get("confidence"),
+        }
+        for name, data in result.items()
+    ]
+
+
+def _summary_row(receipt: Dict[str, Any]) -> Dict[str, Any]:
+    values = {row["field"]: row.get("value") for row in receipt["fields"]}
+    confidences = [row["confidence"] for row in receipt["fields"] if row.get("confidence") is not None]
+    vendor = values.get("vendor")
+    vendor = str(vendor).strip()[:255] if vendor else None
+    amount = parse_receipt_amount(values.get("amount"))
+    total = parse_receipt_amount(values.get("total"))
+
+    return {
+        "tenant_id": receipt["tenant_id"],
+        "receipt_id": receipt["receipt_id"],
+        "filename": receipt.get("filename"),
+        "file_path": receipt.get("file_path"),
+        "vendor": vendor,
+        "vendor_key": vendor.lower() if vendor else None,
+        "receipt_date": parse_receipt_date(values.get("date")),
+        "amount": amount if amount is not None else total,
+        "total": total,
+        "confidence": (
+            receipt["confidence"] if receipt.get("confidence") is not None
+            else (sum(confidences) / len(confidences) if confidences else None)
+        ),
+        "extracted_at": datetime.utcnow(),
+    }
+
+
+def upsert_receipts(db: Session, receipts: List[Dict[str, Any]]) -> int:
+    """
+    Index receipts, replacing any earlier index rows for them.
+
+    Args:
+        db: Database session (the caller commits)
+        receipts: Dicts with tenant_id, receipt_id, filename, file_path,
+            optional confidence, and fields: [{field, value, page, x, y,
+            w, h, confidence}]
+
+    Returns:
+        Number of field rows written
+    """
+    written = 0
+    for i in range(0, len(receipts), INDEX_CHUNK_SIZE):
+        chunk = receipts[i:i + INDEX_CHUNK_SIZE]
+        # Receipt IDs are only unique per tenant (receipt_0001 exists for every tenant)
+        for tenant_id in {receipt["tenant_id"] for receipt in chunk}:
+            receipt_ids = [r["receipt_id"] for r in chunk if r["tenant_id"] == tenant_id]
+            db.query(ReceiptFieldDB).filter(
+                ReceiptFieldDB.tenant_id == tenant_id,
+                ReceiptFieldDB.receipt_id.in_(receipt_ids)
+            ).delete(synchronize_session=False)
+            db.query(ReceiptDB).filter(
+                ReceiptDB.tenant_id == tenant_id,
+                ReceiptDB.receipt_id.in_(receipt_ids)
+            ).delete(synchronize_session=False)
+
+        field_rows = [
+            {
+                "tenant_id": receipt["tenant_id"],
+                "receipt_id": receipt["receipt_id"],
+                "field": row["field"],
+                "value": str(row["value"])[:255] if row.get("value") is not None else None,
+                "page": row.get("page", 0),
+                "x": row["x"],
+                "y": row["y"],
+                "w": row["w"],
+                "h": row["h"],
+                "confidence": row.get("confidence"),
+            }
+            for receipt in chunk
+            for row in receipt["fields"]
+        ]
+        db.bulk_insert_mappings(ReceiptDB, [_summary_row(receipt) for receipt in chunk])
+        if field_rows:
+            db.bulk_insert_mappings(ReceiptFieldDB, field_rows)
+        written += len(field_rows)
+
+    return written
+
+
+def receipt_id_from_path(path: str) -> str:
+    """Receipt ID used by the receipts API ("receipt_0001.pdf" -> "0001")."""
+    return os.path.splitext(os.path.basename(path))[0].replace("receipt_", "")
+
+
+def index_receipt_texts(
+    db: Session,
+    paths: Iterable[str],
+    pdf_dir: Optional[str] = None
+) -> int:
+    """
+    Index receipts from their text files (tenant = parent directory name).
+
+    Args:
+        db: Database session (the caller commits)
+        paths: Receipt .txt paths, e.g. tests/fixtures/receipts/<tenant>/receipt_0001.txt
+        pdf_dir: Root of the matching PDFs (<pdf_dir>/<tenant>/<name>.pdf), if any
+
+    Returns:
+        Number of receipts indexed
+    """
+    from app.ocr.parser import extract_with_bboxes
+
+    receipts = []
+    for path in paths:
+        tenant_id = os.path.basename(os.path.dirname(path))
+        name = os.path.splitext(os.path.basename(path))[0]
+        pdf_path = os.path.join(pdf_dir, tenant_id, f"{name}.pdf") if pdf_dir else None
+        try:
+            result = extract_with_bboxes(path)
+        except Exception as e:
+            logger.warning(f"Could not extract receipt {path}: {e}")
+            continue
+        receipts.append({
+            "tenant_id": tenant_id,
+            "receipt_id": receipt_id_from_path(path),
+            "filename": f"{name}.pdf" if pdf_path else os.path.basename(path),
+            "file_path": pdf_path or path,
+            "fields": field_rows_from_bboxes(result),
+        })
+
+    upsert_receipts(db, receipts)
+    logger.info(f"Indexed {len(receipts)} receipts")
+    return len(receipts)
+
+
+def index_fixture_receipts(
+    db: Session,
+    text_dir: str = "tests/fixtures/receipts",
+    pdf_dir: str = "tests/fixtures/receipts_pdf"
+) -> int:
+    """Index the fixture receipts served by the receipts API (development/demo data)."""
+    return index_receipt_texts(db, sorted(glob.glob(f"{text_dir}/*/*.txt")), pdf_dir=pdf_dir)
@@ -1,16 +1,31 @@
 """Reconciliation matcher for linking transactions to journal entries."""
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from sqlalchemy import exists, func, or_, select
 from sqlalchemy.orm import Session
 from app.db.models import (
-    TransactionDB, JournalEntryDB, ReconciliationDB
+    TransactionDB, JournalEntryDB, ReconciliationDB, ReconciliationWatermarkDB
+)
+from app.recon.sweep import (
+    JERow, Match, TxnRow, as_datetime, get_cash_amount, match_rows, score_pair
 )
 from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Journal entry statuses that take part in reconciliation
+POSTED_STATUSES = ("approved", "posted")
+
+# Max ids per IN (...) clause
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(ids: List[str], size: int = IN_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
 
 @dataclass
 class ReconciliationResult:
@@ -36,57 +51,279 @@ class ReconciliationMatcher:
         self.db = db
         self.date_tolerance = date_tolerance or settings.recon_date_tolerance_days
     
-    def reconcile_all(self) -> Dict[str, Any]:
+    def reconcile_all(
+        self,
+        mode: str = "greedy",
+        company_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Reconcile all transactions with journal entries.
+        Reconcile all transactions with journal entries (full rebuild).
+        
+        Uses sort-and-sweep candidate matching (see app/recon/sweep.py):
+        JE cash amounts are extracted once, JEs are bucketed by amount and
+        swept by date, so cost grows near-linearly with ledger size.
+        
+        Args:
+            mode: "greedy" (first match wins, the historical behaviour) or
+                "optimal" (maximum matches/score for ambiguous ties)
+            company_id: Restrict the rebuild to one company. Only that
+                company's reconciliations are replaced and its incremental
+                watermark is reset to the data just processed.
         
         Returns:
             Dict with reconciliation results and statistics
         """
-        # Get all transactions
-        transactions = self.db.query(TransactionDB).all()
+        txn_query = self.db.query(
+            TransactionDB.txn_id, TransactionDB.date, TransactionDB.amount
+        )
+        je_query = self._je_columns().filter(
+            JournalEntryDB.status.in_(POSTED_STATUSES)
+        )
+        if company_id is not None:
+            txn_query = txn_query.filter(TransactionDB.company_id == company_id)
+            je_query = je_query.filter(JournalEntryDB.company_id == company_id)
+        
+        # Only the columns matching needs; JE cash amounts extracted once
+        transactions = [self._txn_row(row) for row in txn_query.all()]
+        journal_entries = [self._je_row(row) for row in je_query.all()]
+        
+        matches = match_rows(transactions, journal_entries, self.date_tolerance, mode=mode)
         
-        # Get all posted journal entries
-        journal_entries = self.db.query(JournalEntryDB).filter(
-            JournalEntryDB.status.in_(["approved", "posted"])
+        # Replace existing reconciliations with one bulk insert
+        if company_id is None:
+            self.db.query(ReconciliationDB).delete()
+        else:
+            self.db.query(ReconciliationDB).filter(or_(
+                ReconciliationDB.txn_id.in_(
+                    select(TransactionDB.txn_id).where(TransactionDB.company_id == company_id)
+                ),
+                ReconciliationDB.je_id.in_(
+                    select(JournalEntryDB.je_id).where(JournalEntryDB.company_id == company_id)
+                ),
+            )).delete(synchronize_session=False)
+        self._insert_matches(transactions, journal_entries, matches)
+        
+        if company_id is not None:
+            watermark = self._get_watermark(company_id)
+            watermark.txn_created_at = self.db.query(func.max(TransactionDB.created_at)).filter(
+                TransactionDB.company_id == company_id
+            ).scalar()
+            watermark.je_updated_at = self.db.query(func.max(JournalEntryDB.updated_at)).filter(
+                JournalEntryDB.company_id == company_id
+            ).scalar()
+            watermark.last_run_at = datetime.utcnow()
+            watermark.last_full_rebuild_at = watermark.last_run_at
+        
+        self.db.commit()
+        
+        return self._summarize(transactions, journal_entries, matches)
+    
+    def reconcile_incremental(self, company_id: str, mode: str = "greedy") -> Dict[str, Any]:
+        """
+        Reconcile only what changed for a company since its last run.
+        
+        Transactions created and journal entries updated since the
+        company's watermark are matched against each other and against
+        still-unmatched rows within the date tolerance window. Existing
+        reconciliations are kept, except those of journal entries that
+        changed (their lines, date or status may no longer match). The
+        first run for a company falls back to a scoped full rebuild.
+        
+        Args:
+            company_id: Company to reconcile
+            mode: "greedy" or "optimal" (applied to the candidate pool)
+        
+        Returns:
+            Dict with new matches, still-unmatched rows in the pool and
+            statistics for this run
+        """
+        watermark = self.db.get(ReconciliationWatermarkDB, company_id)
+        if watermark is None or watermark.txn_created_at is None or watermark.je_updated_at is None:
+            return self.reconcile_all(mode=mode, company_id=company_id)
+        
+        # Rows that changed since the last run
+        new_txns = self.db.query(
+            TransactionDB.txn_id, TransactionDB.date, TransactionDB.amount,
+            TransactionDB.created_at
+        ).filter(
+            TransactionDB.company_id == company_id,
+            TransactionDB.created_at >= watermark.txn_created_at
         ).all()
+        changed_jes = self._je_columns(
+            JournalEntryDB.status, JournalEntryDB.updated_at
+        ).filter(
+            JournalEntryDB.company_id == company_id,
+            JournalEntryDB.updated_at >= watermark.je_updated_at
+        ).all()
+        
+        # Rows stamped exactly at the watermark may have been seen already;
+        # they are re-offered below but only rows strictly newer count as
+        # changed (and lose their existing match)
+        changed_je_ids = [
+            row.je_id for row in changed_jes if row.updated_at > watermark.je_updated_at
+        ]
+        freed_txn_ids = set()
+        for chunk in _chunks(changed_je_ids):
+            freed_txn_ids.update(
+                row.txn_id for row in self.db.query(ReconciliationDB.txn_id).filter(
+                    ReconciliationDB.je_id.in_(chunk)
+                )
+            )
+            self.db.query(ReconciliationDB).filter(
+                ReconciliationDB.je_id.in_(chunk)
+            ).delete(synchronize_session=False)
+        
+        txn_pool = {row.txn_id: self._txn_row(row) for row in new_txns}
+        je_pool = {
+            row.je_id: self._je_row(row)
+            for row in changed_jes if row.status in POSTED_STATUSES
+        }
+        for chunk in _chunks(list(freed_txn_ids - txn_pool.keys())):
+            for row in self.db.query(
+                TransactionDB.txn_id, TransactionDB.date, TransactionDB.amount
+            ).filter(TransactionDB.txn_id.in_(chunk)):
+                txn_pool[row.txn_id] = self._txn_row(row)
+        
+        # Unmatched counterparts the changed rows could pair with
+        window = timedelta(days=self.date_tolerance + 1)
+        txn_unmatched = ~exists().where(ReconciliationDB.txn_id == TransactionDB.txn_id)
+        je_unmatched = ~exists().where(ReconciliationDB.je_id == JournalEntryDB.je_id)
+        
+        if je_pool:
+            dates = [as_datetime(je.date) for je in je_pool.values()]
+            linked = [je.source_txn_id for je in je_pool.values() if je.source_txn_id]
+            in_window = TransactionDB.date.between(min(dates) - window, max(dates) + window)
+            for row in self.db.query(
+                TransactionDB.txn_id, TransactionDB.date, TransactionDB.amount
+            ).filter(
+                TransactionDB.company_id == company_id,
+                txn_unmatched,
+                or_(in_window, TransactionDB.txn_id.in_(linked)) if linked else in_window
+            ):
+                txn_pool.setdefault(row.txn_id, self._txn_row(row))
+        
+        if txn_pool:
+            dates = [as_datetime(txn.date) for txn in txn_pool.values()]
+            in_window = JournalEntryDB.date.between(min(dates) - window, max(dates) + window)
+            for row in self._je_columns().filter(
+                JournalEntryDB.company_id == company_id,
+                JournalEntryDB.status.in_(POSTED_STATUSES),
+                je_unmatched,
+                or_(in_window, JournalEntryDB.source_txn_id.in_(list(txn_pool)))
+            ):
+                je_pool.setdefault(row.je_id, self._je_row(row))
+        
+        # Rows at the watermark may already be matched
+        for chunk in _chunks(list(txn_pool)):
+            for row in self.db.query(ReconciliationDB.txn_id).filter(
+                ReconciliationDB.txn_id.in_(chunk)
+            ):
+                txn_pool.pop(row.txn_id, None)
+        for chunk in _chunks(list(je_pool)):
+            for row in self.db.query(ReconciliationDB.je_id).filter(
+                ReconciliationDB.je_id.in_(chunk)
+            ):
+                je_pool.pop(row.je_id, None)
+        
+        transactions = sorted(txn_pool.values(), key=lambda t: (as_datetime(t.date), t.txn_id))
+        journal_entries = sorted(je_pool.values(), key=lambda j: (as_datetime(j.date), j.je_id))
+        
+        matches = match_rows(transactions, journal_entries, self.date_tolerance, mode=mode)
+        self._insert_matches(transactions, journal_entries, matches)
         
-        # Clear existing reconciliations
-        self.db.query(ReconciliationDB).delete()
+        # Advance the watermark to the newest rows seen in this run
+        previous_txn_mark = watermark.txn_created_at
+        if new_txns:
+            watermark.txn_created_at = max(
+                watermark.txn_created_at, max(row.created_at for row in new_txns)
+            )
+        if changed_jes:
+            watermark.je_updated_at = max(
+                watermark.je_updated_at, max(row.updated_at for row in changed_jes)
+            )
+        watermark.last_run_at = datetime.utcnow()
         
+        self.db.commit()
+        
+        result = self._summarize(transactions, journal_entries, matches)
+        result["statistics"].update({
+            "new_transactions": sum(
+                1 for row in new_txns if row.created_at > previous_txn_mark
+            ),
+            "changed_journal_entries": len(changed_je_ids),
+            "invalidated_matches": len(freed_txn_ids),
+        })
+        return result
+    
+    def _je_columns(self, *extra):
+        """Query for the journal entry columns matching needs."""
+        return self.db.query(
+            JournalEntryDB.je_id,
+            JournalEntryDB.date,
+            JournalEntryDB.source_txn_id,
+            JournalEntryDB.lines,
+            *extra
+        )
+    
+    @staticmethod
+    def _txn_row(row) -> TxnRow:
+        return TxnRow(txn_id=row.txn_id, date=row.date, amount=row.amount)
+    
+    @staticmethod
+    def _je_row(row) -> JERow:
+        return JERow(
+            je_id=row.je_id,
+            date=row.date,
+            source_txn_id=row.source_txn_id,
+            cash_amount=get_cash_amount(row.lines)
+        )
+    
+    def _get_watermark(self, company_id: str) -> ReconciliationWatermarkDB:
+        """Load or create the watermark row for a company."""
+        watermark = self.db.get(ReconciliationWatermarkDB, company_id)
+        if watermark is None:
+            watermark = ReconciliationWatermarkDB(company_id=company_id)
+            self.db.add(watermark)
+        return watermark
+    
+    def _insert_matches(
+        self,
+        transactions: List[TxnRow],
+        journal_entries: List[JERow],
+        matches: List[Match]
+    ) -> None:
+        self._bulk_insert([
+            {
+                "txn_id": transactions[m.txn_pos].txn_id,
+                "je_id": journal_entries[m.je_pos].je_id,
+                "match_confidence": m.score,
+            }
+            for m in matches
+        ])
+    
+    def _summarize(
+        self,
+        transactions: List[TxnRow],
+        journal_entries: List[JERow],
+        matches: List[Match]
+    ) -> Dict[str, Any]:
+        """Build matched/unmatched/orphan results and statistics."""
         results = []
         matched_txns = set()
         matched_jes = set()
         
-        # Try exact matching first
-        for txn in transactions:
-            for je in journal_entries:
-                if je.je_id in matched_jes:
-                    continue
-                
-                match_type, score = self._match_transaction_je(txn, je)
-                
-                if match_type:
-                    # Create reconciliation record
-                    recon = ReconciliationDB(
-                        txn_id=txn.txn_id,
-                        je_id=je.je_id,
-                        match_type=match_type,
-                        match_score=score
-                    )
-                    self.db.add(recon)
-                    
-                    results.append(ReconciliationResult(
-                        txn_id=txn.txn_id,
-                        je_id=je.je_id,
-                        match_type=match_type,
-                        match_score=score,
-                        status="matched"
-                    ))
-                    
-                    matched_txns.add(txn.txn_id)
-                    matched_jes.add(je.je_id)
-                    break
+        for m in matches:
+            txn = transactions[m.txn_pos]
+            je = journal_entries[m.je_pos]
+            results.append(ReconciliationResult(
+                txn_id=txn.txn_id,
+                je_id=je.je_id,
+                match_type=m.match_type,
+                match_score=m.score,
+                status="matched"
+            ))
+            matched_txns.add(txn.txn_id)
+            matched_jes.add(je.je_id)
         
         # Find unmatched transactions
         for txn in transactions:
@@ -110,8 +347,6 @@ class ReconciliationMatcher:
                     status="orphan"
                 ))
         
-        self.db.commit()
-        
         # Calculate statistics
         stats = {
             "total_transactions": len(transactions),
@@ -123,10 +358,15 @@ class ReconciliationMatcher:
         }
         
         return {
-            "results": [r.model_dump() for r in results],
+            "results": [asdict(r) for r in results],
             "statistics": stats
         }
     
+    def _bulk_insert(self, rows: List[Dict[str, Any]], chunk_size: int = 5000) -> None:
+        """Insert reconciliation rows in chunks without building ORM objects."""
+        for start in range(0, len(rows), chunk_size):
+            self.db.bulk_insert_mappings(ReconciliationDB, rows[start:start + chunk_size])
+    
     def _match_transaction_je(
         self,
         txn: TransactionDB,
@@ -138,31 +378,16 @@ class ReconciliationMatcher:
         Returns:
             Tuple of (match_type, score) or (None, 0.0) if no match
         """
-        # Check if JE is linked to this transaction
-        if je.source_txn_id == txn.txn_id:
-            return ("exact", 1.0)
-        
-        # Check amount and date matching
-        je_amount = self._get_je_cash_amount(je)
-        
-        if je_amount is None:
-            return (None, 0.0)
-        
-        # Amount must match (within tolerance)
-        if abs(abs(je_amount) - abs(txn.amount)) > 0.01:
-            return (None, 0.0)
-        
-        # Date must be within tolerance
-        date_diff = abs((je.date - txn.date).days)
-        
-        if date_diff <= self.date_tolerance:
-            if date_diff == 0:
-                return ("exact", 1.0)
-            else:
-                score = 1.0 - (date_diff / (self.date_tolerance * 2))
-                return ("heuristic", max(score, 0.5))
-        
-        return (None, 0.0)
+        return score_pair(
+            TxnRow(txn_id=txn.txn_id, date=txn.date, amount=txn.amount),
+            JERow(
+                je_id=je.je_id,
+                date=je.date,
+                source_txn_id=je.source_txn_id,
+                cash_amount=self._get_je_cash_amount(je)
+            ),
+            self.date_tolerance
+        )
     
     def _get_je_cash_amount(self, je: JournalEntryDB) -> float:
         """
@@ -171,14 +396,7 @@ class ReconciliationMatcher:
         Returns:
             The cash amount (positive for debit, negative for credit) or None
         """
-        for line in je.lines:
-            if "Cash at Bank" in line.get('account', ''):
-                if line.get('debit', 0) > 0:
-                    return line['debit']
-                elif line.get('credit', 0) > 0:
-                    return -line['credit']
-        
-        return None
+        return get_cash_amount(je.lines)
     
     def get_unmatched_transactions(self) -> List[TransactionDB]:
         """Get all unmatched transactions."""
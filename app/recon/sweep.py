@@ -0,0 +1,295 @@
+"""
+Sort-and-sweep candidate matching for reconciliation.
+
+Instead of comparing every transaction with every journal entry, JE cash
+amounts are extracted once and JEs are bucketed by amount in cents. Each
+bucket is sorted by date, so the candidates for a transaction are the JEs
+in a few neighbouring buckets whose dates fall inside a bisected
+``date_tolerance`` window. Every candidate is still verified with the same
+rules as ``ReconciliationMatcher._match_transaction_je``.
+
+Two assignment modes are provided:
+
+- ``greedy_match``: identical to the original nested loop. Transactions are
+  visited in order and each takes the first (lowest-position) unmatched JE
+  that matches.
+- ``optimal_match``: maximum-cardinality, maximum-score assignment within
+  each connected group of candidate pairs, so a transaction that grabs an
+  ambiguous JE early can't starve a later one with no alternative.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Amount tolerance used by the matcher (absolute, in currency units)
+AMOUNT_TOLERANCE = 0.01
+
+# Neighbouring cent buckets to probe (covers the tolerance plus rounding)
+BUCKET_SPREAD = 2
+
+# Larger candidate groups fall back to greedy in optimal mode
+OPTIMAL_MAX_GROUP = 500
+
+
+@dataclass
+class TxnRow:
+    """Minimal transaction fields needed for matching."""
+    txn_id: str
+    date: datetime
+    amount: float
+
+
+@dataclass
+class JERow:
+    """Minimal journal entry fields needed for matching."""
+    je_id: str
+    date: datetime
+    source_txn_id: Optional[str]
+    cash_amount: Optional[float]
+
+
+@dataclass
+class Match:
+    """A transaction/JE pair chosen by the matcher (positions are list indices)."""
+    txn_pos: int
+    je_pos: int
+    match_type: str
+    score: float
+
+
+def as_datetime(value) -> datetime:
+    """Normalize date/datetime values so they can be compared and sorted."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return value
+
+
+def get_cash_amount(lines: Optional[List[Dict]]) -> Optional[float]:
+    """
+    Extract the cash account amount from journal entry lines.
+
+    Returns:
+        The cash amount (positive for debit, negative for credit) or None
+    """
+    for line in lines or []:
+        if "Cash at Bank" in line.get('account', ''):
+            if line.get('debit', 0) > 0:
+                return line['debit']
+            elif line.get('credit', 0) > 0:
+                return -line['credit']
+
+    return None
+
+
+def score_pair(txn: TxnRow, je: JERow, date_tolerance: int) -> Tuple[Optional[str], float]:
+    """
+    Match a transaction to a journal entry.
+
+    Returns:
+        Tuple of (match_type, score) or (None, 0.0) if no match
+    """
+    # Check if JE is linked to this transaction
+    if je.source_txn_id == txn.txn_id:
+        return ("exact", 1.0)
+
+    if je.cash_amount is None:
+        return (None, 0.0)
+
+    # Amount must match (within tolerance)
+    if abs(abs(je.cash_amount) - abs(txn.amount)) > AMOUNT_TOLERANCE:
+        return (None, 0.0)
+
+    # Date must be within tolerance
+    date_diff = abs((as_datetime(je.date) - as_datetime(txn.date)).days)
+
+    if date_diff <= date_tolerance:
+        if date_diff == 0:
+            return ("exact", 1.0)
+        else:
+            score = 1.0 - (date_diff / (date_tolerance * 2))
+            return ("heuristic", max(score, 0.5))
+
+    return (None, 0.0)
+
+
+def _cents(amount: float) -> int:
+    return int(round(abs(amount) * 100))
+
+
+class CandidateIndex:
+    """Journal entries bucketed by cents and sorted by date within a bucket."""
+
+    def __init__(self, jes: List[JERow], date_tolerance: int):
+        self.jes = jes
+        self.date_tolerance = date_tolerance
+        # One extra day either side: timedelta.days floors partial days
+        self._window = timedelta(days=date_tolerance + 1)
+
+        by_source: Dict[str, List[int]] = defaultdict(list)
+        buckets: Dict[int, List[Tuple[datetime, int]]] = defaultdict(list)
+
+        for pos, je in enumerate(jes):
+            if je.source_txn_id:
+                by_source[je.source_txn_id].append(pos)
+            if je.cash_amount is not None:
+                buckets[_cents(je.cash_amount)].append((as_datetime(je.date), pos))
+
+        self._by_source = dict(by_source)
+        self._bucket_dates: Dict[int, List[datetime]] = {}
+        self._bucket_positions: Dict[int, List[int]] = {}
+        for cents, entries in buckets.items():
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._bucket_dates[cents] = [d for d, _ in entries]
+            self._bucket_positions[cents] = [p for _, p in entries]
+
+    def candidates(self, txn: TxnRow) -> List[int]:
+        """
+        JE positions that may match ``txn``, in ascending position order.
+
+        This is a superset of the true matches; callers verify each
+        candidate with ``score_pair``.
+        """
+        found = set(self._by_source.get(txn.txn_id, ()))
+
+        txn_date = as_datetime(txn.date)
+        lo, hi = txn_date - self._window, txn_date + self._window
+        center = _cents(txn.amount)
+
+        for cents in range(center - BUCKET_SPREAD, center + BUCKET_SPREAD + 1):
+            dates = self._bucket_dates.get(cents)
+            if not dates:
+                continue
+            positions = self._bucket_positions[cents]
+            found.update(positions[bisect_left(dates, lo):bisect_right(dates, hi)])
+
+        return sorted(found)
+
+
+def greedy_match(txns: List[TxnRow], jes: List[JERow], date_tolerance: int) -> List[Match]:
+    """
+    First-match-wins assignment, identical to the nested-loop matcher.
+
+    Each transaction, in order, takes the lowest-position unmatched JE that
+    matches it.
+    """
+    index = CandidateIndex(jes, date_tolerance)
+    matched_jes = set()
+    matches: List[Match] = []
+
+    for t_pos, txn in enumerate(txns):
+        for j_pos in index.candidates(txn):
+            if j_pos in matched_jes:
+                continue
+            match_type, score = score_pair(txn, jes[j_pos], date_tolerance)
+            if match_type:
+                matches.append(Match(t_pos, j_pos, match_type, score))
+                matched_jes.add(j_pos)
+                break
+
+    return matches
+
+
+def optimal_match(txns: List[TxnRow], jes: List[JERow], date_tolerance: int) -> List[Match]:
+    """
+    Maximum-cardinality, maximum-score assignment.
+
+    Candidate pairs are split into connected groups; each group is solved
+    with the Hungarian algorithm (``scipy.optimize.linear_sum_assignment``).
+    Groups larger than ``OPTIMAL_MAX_GROUP`` on either side fall back to
+    greedy assignment.
+    """
+    from scipy.optimize import linear_sum_assignment
+    import numpy as np
+
+    index = CandidateIndex(jes, date_tolerance)
+
+    # Candidate edges: (t_pos, j_pos) -> (match_type, score)
+    edges: Dict[Tuple[int, int], Tuple[str, float]] = {}
+    for t_pos, txn in enumerate(txns):
+        for j_pos in index.candidates(txn):
+            match_type, score = score_pair(txn, jes[j_pos], date_tolerance)
+            if match_type:
+                edges[(t_pos, j_pos)] = (match_type, score)
+
+    # Union-find over transactions (t_pos) and JEs (offset by len(txns))
+    parent: Dict[int, int] = {}
+
+    def find(x: int) -> int:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    offset = len(txns)
+    for t_pos, j_pos in edges:
+        a, b = find(t_pos), find(offset + j_pos)
+        if a != b:
+            parent[a] = b
+
+    groups: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    for t_pos, j_pos in edges:
+        groups[find(t_pos)].append((t_pos, j_pos))
+
+    matches: List[Match] = []
+    for group_edges in groups.values():
+        t_nodes = sorted({t for t, _ in group_edges})
+        j_nodes = sorted({j for _, j in group_edges})
+
+        if len(t_nodes) == 1 or len(j_nodes) == 1:
+            # Single choice on one side: best score, lowest positions first
+            t_pos, j_pos = min(group_edges, key=lambda e: (-edges[e][1], e[0], e[1]))
+            matches.append(Match(t_pos, j_pos, *edges[(t_pos, j_pos)]))
+            continue
+
+        if len(t_nodes) > OPTIMAL_MAX_GROUP or len(j_nodes) > OPTIMAL_MAX_GROUP:
+            logger.warning(
+                f"Reconciliation group too large for optimal assignment "
+                f"({len(t_nodes)} txns x {len(j_nodes)} JEs), using greedy"
+            )
+            taken = set()
+            for t_pos in t_nodes:
+                for j_pos in j_nodes:
+                    if j_pos not in taken and (t_pos, j_pos) in edges:
+                        matches.append(Match(t_pos, j_pos, *edges[(t_pos, j_pos)]))
+                        taken.add(j_pos)
+                        break
+            continue
+
+        # Cardinality dominates score: every real edge outweighs any score gain
+        big = float(len(t_nodes) + len(j_nodes) + 1)
+        t_index = {t: i for i, t in enumerate(t_nodes)}
+        j_index = {j: i for i, j in enumerate(j_nodes)}
+        weights = np.zeros((len(t_nodes), len(j_nodes)))
+        for (t_pos, j_pos), (_, score) in ((e, edges[e]) for e in group_edges):
+            weights[t_index[t_pos], j_index[j_pos]] = big + score
+
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        for r, c in zip(rows, cols):
+            if weights[r, c] > 0:
+                t_pos, j_pos = t_nodes[r], j_nodes[c]
+                matches.append(Match(t_pos, j_pos, *edges[(t_pos, j_pos)]))
+
+    matches.sort(key=lambda m: m.txn_pos)
+    return matches
+
+
+def match_rows(
+    txns: List[TxnRow],
+    jes: List[JERow],
+    date_tolerance: int,
+    mode: str = "greedy"
+) -> List[Match]:
+    """Run the matcher in ``greedy`` or ``optimal`` mode."""
+    if mode == "greedy":
+        return greedy_match(txns, jes, date_tolerance)
+    if mode == "optimal":
+        return optimal_match(txns, jes, date_tolerance)
+    raise ValueError(f"Unknown reconciliation mode: {mode}")
@@ -45,7 +45,7 @@ Rule Structure:
 
 Matching Logic:
 --------------
-1. Iterate through all rules in order
+1. Iterate through candidate rules in order (prefiltered by the index)
 2. Check if pattern matches transaction description or counterparty
 3. If match_condition is present, evaluate it
 4. Return first matching rule with account and rationale
@@ -68,9 +68,11 @@ Conditions can reference transaction fields:
 
 Performance:
 -----------
-Rules are loaded once at startup and cached in memory.
-Pattern matching is O(n) where n = number of rules.
-Typical performance: <1ms per transaction.
+Rules are loaded once at startup and compiled into a CompiledRuleIndex
+(see index.py), cached per rule version. A literal prefilter narrows each
+transaction to the few rules that can match, so matching cost stays
+roughly flat as the rule list grows. Per-rule hit/latency counters are
+available via RulesEngine.get_stats().
 
 Rule Management:
 ---------------
@@ -93,11 +95,11 @@ else:
     llm_result = llm_categorizer.categorize(transaction)
 ```
 """
-import re
 import yaml
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 from app.db.models import Transaction
+from app.rules.index import compile_condition, get_rule_index
 
 
 class RulesEngine:
@@ -114,6 +116,8 @@ class RulesEngine:
             rules_file = Path(__file__).parent / "vendor_rules.yaml"
         
         self.rules = self._load_rules(rules_file)
+        self.index = get_rule_index(self.rules.get('rules', []))
+        self.version = self.index.version
     
     def _load_rules(self, rules_file: str) -> Dict[str, Any]:
         """Load rules from YAML file."""
@@ -130,29 +134,26 @@ class RulesEngine:
         Returns:
             Dict with account, category, and rationale if matched, None otherwise
         """
-        for rule in self.rules.get('rules', []):
-            pattern = rule.get('pattern', '')
-            
-            # Check if pattern matches description or counterparty
-            match_text = f"{transaction.description} {transaction.counterparty or ''}"
-            
-            if re.search(pattern, match_text, re.IGNORECASE):
-                # Check additional match conditions if present
-                match_condition = rule.get('match_condition', '')
-                
-                if match_condition:
-                    if not self._evaluate_condition(match_condition, transaction):
-                        continue
-                
-                return {
-                    'account': rule['account'],
-                    'category': rule.get('category', 'uncategorized'),
-                    'rationale': f"Matched rule pattern: {pattern}",
-                    'confidence': 1.0,
-                    'matched': True
-                }
+        rule = self.index.match(transaction)
+        
+        if rule is not None:
+            return self._rule_result(rule)
         
         # No rule matched, use default
+        return self._default_result(transaction)
+    
+    def _rule_result(self, rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the match result for a matched rule."""
+        return {
+            'account': rule['account'],
+            'category': rule.get('category', 'uncategorized'),
+            'rationale': f"Matched rule pattern: {rule.get('pattern', '')}",
+            'confidence': 1.0,
+            'matched': True
+        }
+    
+    def _default_result(self, transaction: Transaction) -> Dict[str, Any]:
+        """Build the default (unmatched) result based on transaction sign."""
         default_rules = self.rules.get('default', {})
         
         if transaction.amount > 0:
@@ -183,22 +184,7 @@ class RulesEngine:
         Returns:
             True if condition is met, False otherwise
         """
-        try:
-            # Create a safe context with transaction attributes
-            context = {
-                'amount': transaction.amount,
-                'description': transaction.description,
-                'counterparty': transaction.counterparty,
-            }
-            
-            # Replace attribute names in condition
-            eval_condition = condition
-            for key in context:
-                eval_condition = eval_condition.replace(key, f"context['{key}']")
-            
-            return eval(eval_condition, {"context": context, "__builtins__": {}})
-        except Exception:
-            return True  # If evaluation fails, don't filter out
+        return compile_condition(condition)(transaction)
     
     def batch_match(self, transactions: List[Transaction]) -> Dict[str, Dict[str, Any]]:
         """
@@ -210,10 +196,19 @@ class RulesEngine:
         Returns:
             Dict mapping txn_id to match results
         """
+        transactions = list(transactions)
+        matches = self.index.match_many(transactions)
+        
         results = {}
         
-        for txn in transactions:
-            results[txn.txn_id] = self.match_transaction(txn)
+        for txn, rule in zip(transactions, matches):
+            if rule is not None:
+                results[txn.txn_id] = self._rule_result(rule)
+            else:
+                results[txn.txn_id] = self._default_result(txn)
         
         return results
-
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-rule hit and latency counters for the loaded rule version."""
+        return self.index.stats()
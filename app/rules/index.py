@@ -0,0 +1,429 @@
+"""
+Compiled Rule Index
+===================
+
+Pre-compiled matcher for the YAML rule list used by ``RulesEngine``.
+
+The naive matcher runs ``re.search`` for every rule and re-evaluates the
+``match_condition`` string for every transaction, so per-transaction cost
+grows linearly with the rule count. This index is built once per rule
+version and keeps the cost roughly flat as the rule list grows:
+
+1. Every pattern is compiled once (``re.IGNORECASE``, as before).
+2. Each pattern is analysed with the stdlib regex parser to find a set of
+   literals, at least one of which must appear in any match
+   (e.g. ``(?i)(uber|lyft)`` -> ``{"uber", "lyft"}``).
+3. All literals go into one Aho-Corasick automaton. A single pass over the
+   lowercased match text yields the candidate rules; rules without a usable
+   literal are always candidates.
+4. Candidates are evaluated in rule order with their compiled regex and a
+   pre-compiled condition predicate, so first-match-wins is preserved
+   exactly.
+
+Per-rule hit, evaluation and latency counters are kept on the index and are
+exposed through ``CompiledRuleIndex.stats()``.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Literals shorter than this are too unselective to be worth prefiltering on
+MIN_LITERAL_LENGTH = 2
+
+# Number of rule versions kept compiled per process
+MAX_CACHED_INDEXES = 8
+
+_index_cache: Dict[str, "CompiledRuleIndex"] = {}
+
+_REPEAT_OPS = {
+    op for op in (
+        getattr(_sre_parse, 'MAX_REPEAT', None),
+        getattr(_sre_parse, 'MIN_REPEAT', None),
+        getattr(_sre_parse, 'POSSESSIVE_REPEAT', None),
+    ) if op is not None
+}
+
+
+def rules_version_key(rules: List[Dict[str, Any]]) -> str:
+    """Content hash identifying a rule list (one compiled index per version)."""
+    payload = json.dumps(rules, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def get_rule_index(rules: List[Dict[str, Any]]) -> "CompiledRuleIndex":
+    """
+    Get the compiled index for a rule list, building it on first use.
+
+    Indexes are cached per process by content hash, so every RulesEngine
+    instance loading the same rule version shares one index (and its
+    counters).
+    """
+    key = rules_version_key(rules)
+    index = _index_cache.get(key)
+    if index is None:
+        index = CompiledRuleIndex(rules, version=key)
+        if len(_index_cache) >= MAX_CACHED_INDEXES:
+            _index_cache.pop(next(iter(_index_cache)))
+        _index_cache[key] = index
+    return index
+
+
+def compile_condition(condition: str) -> Callable[[Any], bool]:
+    """
+    Compile a ``match_condition`` expression into a predicate.
+
+    Uses the same rewriting as the original eval-based check (field names
+    are replaced with ``context[...]`` lookups), but the expression is
+    compiled once. Conditions that fail to compile or raise at evaluation
+    time never filter a transaction out.
+    """
+    eval_condition = condition
+    for key in ('amount', 'description', 'counterparty'):
+        eval_condition = eval_condition.replace(key, f"context['{key}']")
+
+    try:
+        code = compile(eval_condition, '<match_condition>', 'eval')
+    except SyntaxError:
+        logger.warning(f"Invalid rule match_condition: {condition!r}")
+        return lambda transaction: True
+
+    def predicate(transaction: Any) -> bool:
+        context = {
+            'amount': transaction.amount,
+            'description': transaction.description,
+            'counterparty': transaction.counterparty,
+        }
+        try:
+            return eval(code, {"context": context, "__builtins__": {}})
+        except Exception:
+            return True  # If evaluation fails, don't filter out
+
+    return predicate
+
+
+def required_literals(pattern: str) -> Optional[Set[str]]:
+    """
+    Find literals that any match of ``pattern`` must contain.
+
+    Returns a set of lowercased ASCII strings such that every match
+    contains at least one of them, or None if no such set can be derived
+    (the rule then has to be checked for every transaction).
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except (re.error, RecursionError):
+        return None
+
+    literals = _literals_for_sequence(parsed)
+    if not literals or min(len(lit) for lit in literals) < MIN_LITERAL_LENGTH:
+        return None
+    return literals
+
+
+def _literals_for_sequence(items: Iterable) -> Optional[Set[str]]:
+    """Pick the most selective required-literal set from a parsed sequence."""
+    candidates: List[Set[str]] = []
+    run: List[str] = []
+
+    def flush_run():
+        if run:
+            candidates.append({''.join(run)})
+            run.clear()
+
+    for op, av in items:
+        if op is _sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+
+        if op is _sre_parse.BRANCH and run:
+            # The parser factors common prefixes out of alternations
+            # ("amazon|amzn" -> "am" + (azon|zn)); glue them back together
+            prefix = ''.join(run)
+            candidates.append({prefix + lead for lead in _branch_leads(av)})
+
+        flush_run()
+        found = _literals_for_item(op, av)
+        if found:
+            candidates.append(found)
+
+    flush_run()
+
+    if not candidates:
+        return None
+
+    # Longest shortest-alternative wins, then fewest alternatives
+    return max(candidates, key=lambda s: (min(len(x) for x in s), -len(s)))
+
+
+def _branch_leads(av) -> List[str]:
+    """Leading literal run of each alternative in a parsed BRANCH."""
+    leads = []
+    for branch in av[1]:
+        lead = []
+        for op, value in branch:
+            if op is not _sre_parse.LITERAL or value >= 128:
+                break
+            lead.append(chr(value).lower())
+        leads.append(''.join(lead))
+    return leads
+
+
+def _literals_for_item(op, av) -> Optional[Set[str]]:
+    """Required literals for a single non-literal parsed node."""
+    if op is _sre_parse.SUBPATTERN:
+        return _literals_for_sequence(av[-1])
+
+    if op is _sre_parse.BRANCH:
+        union: Set[str] = set()
+        for branch in av[1]:
+            found = _literals_for_sequence(branch)
+            if not found:
+                return None
+            union |= found
+        return union
+
+    if op in _REPEAT_OPS:
+        min_count, _, item = av
+        if min_count >= 1:
+            return _literals_for_sequence(item)
+
+    return None
+
+
+class _LiteralAutomaton:
+    """Aho-Corasick automaton mapping literals to the rules that need them."""
+
+    def __init__(self, literal_rules: Dict[str, List[int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[frozenset] = [frozenset()]
+
+        for literal, rule_ids in literal_rules.items():
+            state = 0
+            for ch in literal:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                state = nxt
+            self._out[state] = self._out[state] | frozenset(rule_ids)
+
+        # Breadth-first construction of failure links
+        queue = list(self._goto[0].values())
+        while queue:
+            next_queue = []
+            for state in queue:
+                for ch, child in self._goto[state].items():
+                    fallback = self._fail[state]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    target = self._goto[fallback].get(ch, 0)
+                    self._fail[child] = target if target != child else 0
+                    self._out[child] = self._out[child] | self._out[self._fail[child]]
+                    next_queue.append(child)
+            queue = next_queue
+
+    def search(self, text: str) -> Set[int]:
+        """Return ids of all rules whose literals occur in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
+
+
+class _CompiledRule:
+    """A single rule with its pattern and condition compiled."""
+
+    __slots__ = ('rule', 'pattern', 'regex', 'error', 'condition')
+
+    def __init__(self, rule: Dict[str, Any]):
+        self.rule = rule
+        self.pattern = rule.get('pattern', '')
+        self.regex = None
+        self.error = None
+        try:
+            self.regex = re.compile(self.pattern, re.IGNORECASE)
+        except re.error as e:
+            # Surface the error when the rule is reached, like re.search did
+            logger.warning(f"Invalid rule pattern {self.pattern!r}: {e}")
+            self.error = e
+
+        match_condition = rule.get('match_condition', '')
+        self.condition = compile_condition(match_condition) if match_condition else None
+
+    def matches(self, match_text: str, transaction: Any) -> bool:
+        if self.error is not None:
+            raise self.error
+        if not self.regex.search(match_text):
+            return False
+        if self.condition is not None and not self.condition(transaction):
+            return False
+        return True
+
+
+class CompiledRuleIndex:
+    """
+    Compiled, prefiltered matcher over an ordered list of YAML rules.
+
+    Matching semantics are identical to evaluating every rule in order with
+    ``re.search(pattern, text, re.IGNORECASE)`` and returning the first
+    rule whose pattern and condition both match.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], version: Optional[str] = None):
+        """
+        Compile a rule list.
+
+        Args:
+            rules: Rule dicts in priority order (``pattern``, ``account``, ...)
+            version: Version key for this rule list (content hash if None)
+        """
+        self.rules = list(rules or [])
+        self.version = version or rules_version_key(self.rules)
+        self._compiled = [_CompiledRule(rule) for rule in self.rules]
+
+        literal_rules: Dict[str, List[int]] = {}
+        always: List[int] = []
+        for i, compiled in enumerate(self._compiled):
+            literals = None
+            if compiled.error is None:
+                literals = required_literals(compiled.pattern)
+            if literals is None:
+                always.append(i)
+                continue
+            for literal in literals:
+                literal_rules.setdefault(literal, []).append(i)
+
+        self._always = frozenset(always)
+        self._automaton = _LiteralAutomaton(literal_rules)
+
+        n = len(self._compiled)
+        self._hits = [0] * n
+        self._evaluations = [0] * n
+        self._eval_ns = [0] * n
+        self._lookups = 0
+        self._misses = 0
+        self._lookup_ns = 0
+
+        logger.info(
+            f"Compiled rule index {self.version}: {n} rules, "
+            f"{len(literal_rules)} literals, {len(always)} unfiltered"
+        )
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    @staticmethod
+    def match_text(transaction: Any) -> str:
+        """Text that rule patterns are matched against."""
+        return f"{transaction.description} {transaction.counterparty or ''}"
+
+    def candidates(self, match_text: str) -> List[int]:
+        """
+        Rule ids that could match ``match_text``, in priority order.
+
+        Non-ASCII text falls back to every rule, since case-insensitive
+        matching can pair ASCII pattern literals with non-ASCII characters.
+        """
+        if not match_text.isascii():
+            return list(range(len(self._compiled)))
+        hits = self._automaton.search(match_text.lower())
+        if self._always:
+            hits |= self._always
+        return sorted(hits)
+
+    def match(self, transaction: Any) -> Optional[Dict[str, Any]]:
+        """
+        Find the first rule matching a transaction.
+
+        Args:
+            transaction: Object with description, counterparty and amount
+
+        Returns:
+            The matching rule dict, or None if no rule matched
+        """
+        start = time.perf_counter_ns()
+        text = self.match_text(transaction)
+        matched = None
+
+        for i in self.candidates(text):
+            rule_start = time.perf_counter_ns()
+            try:
+                hit = self._compiled[i].matches(text, transaction)
+            finally:
+                self._evaluations[i] += 1
+                self._eval_ns[i] += time.perf_counter_ns() - rule_start
+            if hit:
+                self._hits[i] += 1
+                matched = self._compiled[i].rule
+                break
+
+        self._lookups += 1
+        if matched is None:
+            self._misses += 1
+        self._lookup_ns += time.perf_counter_ns() - start
+        return matched
+
+    def match_many(self, transactions: Iterable[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Match a batch of transactions; results are in input order."""
+        return [self.match(txn) for txn in transactions]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-rule hit and latency counters since the index was built.
+
+        Returns:
+            Dict with index totals and a ``rules`` list (one entry per rule,
+            in rule order).
+        """
+        rules = []
+        for i, compiled in enumerate(self._compiled):
+            evaluations = self._evaluations[i]
+            rules.append({
+                'rule_index': i,
+                'pattern': compiled.pattern,
+                'account': compiled.rule.get('account'),
+                'hits': self._hits[i],
+                'evaluations': evaluations,
+                'total_ms': round(self._eval_ns[i] / 1e6, 3),
+                'avg_us': round(self._eval_ns[i] / evaluations / 1e3, 3) if evaluations else 0.0,
+            })
+
+        return {
+            'version': self.version,
+            'rule_count': len(self._compiled),
+            'unfiltered_rules': len(self._always),
+            'lookups': self._lookups,
+            'misses': self._misses,
+            'avg_lookup_us': round(self._lookup_ns / self._lookups / 1e3, 3) if self._lookups else 0.0,
+            'rules': rules,
+        }
+
+    def reset_stats(self) -> None:
+        """Zero all counters."""
+        n = len(self._compiled)
+        self._hits = [0] * n
+        self._evaluations = [0] * n
+        self._eval_ns = [0] * n
+        self._lookups = 0
+        self._misses = 0
+        self._lookup_ns = 0
@@ -43,6 +43,9 @@ service.store_tokens(tenant_id, realm_id, access_token, refresh_token, expires_a
 # Post journal entry with idempotency
 result = await service.post_idempotent_je(tenant_id, payload)
 # Returns: { "qbo_doc_id": "123", "idempotent": False, ... }
+
+# Post many entries (one idempotency lookup, QBO batch requests)
+results = await service.post_journal_entries_batch(tenant_id, {je_id: payload, ...})
 ```
 """
 
@@ -56,10 +59,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.db.models import QBOTokenDB, JEIdempotencyDB, DecisionAuditLogDB
+from app.integrations.qbo.batch import QBOBatchClient
 from app.integrations.qbo.client import QBOClient, DEMO_MODE, QBO_ENV
 
 logger = logging.getLogger(__name__)
 
+# Hashes per idempotency lookup query (keeps IN lists bounded)
+IDEMPOTENCY_LOOKUP_CHUNK = 1000
+
 
 class QBOService:
     """Service for QuickBooks Online integration."""
@@ -509,6 +516,167 @@ class QBOService:
             # Re-raise for router to handle
             raise
     
+    def find_posted(self, tenant_id: str, payload_hashes: List[str]) -> Dict[str, str]:
+        """
+        Look up already-posted payload hashes in one query per chunk.
+        
+        Returns:
+            Dict of payload_hash -> qbo_doc_id for hashes already posted
+        """
+        posted = {}
+        unique = list(dict.fromkeys(payload_hashes))
+        for start in range(0, len(unique), IDEMPOTENCY_LOOKUP_CHUNK):
+            rows = self.db.query(JEIdempotencyDB.payload_hash, JEIdempotencyDB.qbo_doc_id).filter(
+                JEIdempotencyDB.tenant_id == tenant_id,
+                JEIdempotencyDB.payload_hash.in_(unique[start:start + IDEMPOTENCY_LOOKUP_CHUNK])
+            )
+            posted.update({payload_hash: doc_id for payload_hash, doc_id in rows})
+        return posted
+    
+    def _store_posted(self, tenant_id: str, posted: Dict[str, str]) -> None:
+        """Record newly posted hashes (bulk insert, row-by-row on conflict)."""
+        if not posted:
+            return
+        rows = [
+            {"tenant_id": tenant_id, "payload_hash": payload_hash, "qbo_doc_id": doc_id}
+            for payload_hash, doc_id in posted.items()
+        ]
+        try:
+            self.db.bulk_insert_mappings(JEIdempotencyDB, rows)
+            self.db.commit()
+        except IntegrityError:
+            # Another export stored some of these hashes concurrently
+            self.db.rollback()
+            existing = self.find_posted(tenant_id, list(posted))
+            self.db.bulk_insert_mappings(
+                JEIdempotencyDB, [row for row in rows if row["payload_hash"] not in existing]
+            )
+            self.db.commit()
+    
+    async def post_journal_entries_batch(
+        self,
+        tenant_id: str,
+        payloads: Dict[str, Dict[str, Any]],
+        batch_client: Optional[QBOBatchClient] = None,
+        on_progress=None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Post many journal entries to QBO with idempotency, in batches.
+        
+        All payload hashes are computed up front and already-posted entries
+        are filtered with one idempotency lookup; the rest go out through
+        QBOBatchClient (batched, bounded concurrency, throttle backoff).
+        Idempotency records are written as each batch completes, so an
+        interrupted export resumes where it stopped.
+        
+        Args:
+            tenant_id: Tenant identifier
+            payloads: Dict of key (e.g. je_id) -> simplified JE payload
+                (same format as post_idempotent_je)
+            batch_client: Client to use (default: pooled client on QBO_BASE)
+            on_progress: Optional callback(done, total) after each batch
+        
+        Returns:
+            Dict of key -> {"status", "qbo_doc_id", "idempotent"} or {"error"}
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        hashes: Dict[str, str] = {}
+        
+        for key, payload in payloads.items():
+            is_balanced, balance_error = self.validate_balance(payload.get("lines", []))
+            if not is_balanced:
+                results[key] = {"error": f"UNBALANCED_JE:{balance_error}"}
+            else:
+                hashes[key] = self.compute_payload_hash(tenant_id, payload)
+        
+        # One lookup for every hash instead of one per entry
+        already_posted = self.find_posted(tenant_id, list(hashes.values()))
+        
+        pending: Dict[str, str] = {}  # payload_hash -> first key with that hash
+        for key, payload_hash in hashes.items():
+            if payload_hash in already_posted:
+                results[key] = {
+                    "status": 200,
+                    "qbo_doc_id": already_posted[payload_hash],
+                    "idempotent": True
+                }
+            else:
+                pending.setdefault(payload_hash, key)
+        
+        total = len(pending)
+        newly_posted: Dict[str, str] = {}
+        
+        if DEMO_MODE:
+            import uuid
+            newly_posted = {payload_hash: f"mock_{uuid.uuid4().hex[:12]}" for payload_hash in pending}
+            self._store_posted(tenant_id, newly_posted)
+        elif pending:
+            items = [
+                (key, self.client.build_journal_entry_payload(
+                    txn_date=payloads[key].get("txnDate"),
+                    lines=payloads[key].get("lines", []),
+                    ref_number=payloads[key].get("refNumber"),
+                    private_note=payloads[key].get("privateNote", "AI Bookkeeper")
+                ))
+                for key in pending.values()
+            ]
+            hash_by_key = {key: payload_hash for payload_hash, key in pending.items()}
+            
+            def on_batch(batch_results):
+                posted = {
+                    hash_by_key[key]: outcome["qbo_doc_id"]
+                    for key, outcome in batch_results.items()
+                    if "qbo_doc_id" in outcome
+                }
+                self._store_posted(tenant_id, posted)
+                newly_posted.update(posted)
+                results.update({key: outcome for key, outcome in batch_results.items() if "error" in outcome})
+                if on_progress:
+                    on_progress(len(newly_posted), total)
+            
+            client = batch_client or QBOBatchClient()
+            try:
+                access_token, realm_id = await self.get_fresh_token(tenant_id)
+                try:
+                    await client.create_journal_entries(realm_id, access_token, items, on_batch=on_batch)
+                except Exception as e:
+                    if "QBO_UNAUTHORIZED" not in str(e):
+                        raise
+                    # Refresh once and resend the entries no batch reported on
+                    # (rejected or never sent; in-flight batches have settled)
+                    access_token, realm_id = await self.get_fresh_token(tenant_id)
+                    remaining = [
+                        (key, body) for key, body in items
+                        if hash_by_key[key] not in newly_posted and key not in results
+                    ]
+                    await client.create_journal_entries(realm_id, access_token, remaining, on_batch=on_batch)
+            finally:
+                if batch_client is None:
+                    await client.aclose()
+        
+        for payload_hash, key in pending.items():
+            if payload_hash in newly_posted:
+                results[key] = {"status": 201, "qbo_doc_id": newly_posted[payload_hash], "idempotent": False}
+        # Keys that duplicated another entry's payload in this run share its outcome
+        for key, payload_hash in hashes.items():
+            if key not in results:
+                results[key] = dict(results[pending[payload_hash]], idempotent=True)
+        
+        if newly_posted:
+            audit = DecisionAuditLogDB(
+                timestamp=datetime.utcnow(),
+                tenant_id=tenant_id,
+                action="QBO_JE_POSTED_MOCK" if DEMO_MODE else "QBO_JE_POSTED"
+            )
+            self.db.add(audit)
+            self.db.commit()
+        
+        logger.info(
+            f"QBO batch export for tenant {tenant_id}: {len(newly_posted)} posted, "
+            f"{len(already_posted)} already posted, {len(payloads) - len(hashes)} unbalanced"
+        )
+        return results
+    
     def get_connection_status(self, tenant_id: str) -> Dict[str, Any]:
         """
         Get QBO connection status for tenant.
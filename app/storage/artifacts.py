@@ -92,16 +92,31 @@ def write_artifact(path: str, content: bytes, content_type: str = "application/o
     return str(local_path.absolute())
 
 
-def read_artifact(path: str) -> Optional[bytes]:
+def artifact_location(path: str) -> str:
+    """
+    Location read_artifact() accepts for a relative path written by write_artifact().
+    
+    Args:
+        path: Relative path (e.g., "cache/extractions/csv/1/ab/ab12....json.gz")
+    
+    Returns:
+        s3:// URL when S3 is configured, otherwise the local path
+    """
+    return f"s3://{S3_BUCKET}/{path}" if USE_S3 else path
+
+
+def read_artifact(path: str, missing_ok: bool = False) -> Optional[bytes]:
     """
     Read artifact from storage (local or S3).
     
     Args:
         path: Relative path or s3:// URL
+        missing_ok: Log a missing artifact at debug level (expected for cache lookups)
     
     Returns:
         Binary content or None if not found
     """
+    log_missing = logger.debug if missing_ok else logger.warning
     if path.startswith("s3://"):
         # Read from S3
         s3_client = _get_s3_client()
@@ -116,7 +131,7 @@ def read_artifact(path: str) -> Optional[bytes]:
             return response['Body'].read()
         
         except s3_client.exceptions.NoSuchKey:
-            logger.warning(f"S3 object not found: {path}")
+            log_missing(f"S3 object not found: {path}")
             return None
         
         except Exception as e:
@@ -128,7 +143,7 @@ def read_artifact(path: str) -> Optional[bytes]:
         local_path = Path(path)
         
         if not local_path.exists():
-            logger.warning(f"Local file not found: {path}")
+            log_missing(f"Local file not found: {path}")
             return None
         
         with open(local_path, 'rb') as f:
@@ -1,8 +1,17 @@
 """Embeddings-based vendor knowledge memory."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import hashlib
+import re
+import shutil
 from pathlib import Path
 from config.settings import settings
+from app.vendor_knowledge.vector_index import IndexStore, NgramVectorIndex
+
+# Namespace used when no tenant is given
+DEFAULT_NAMESPACE = "default"
+
+# Index results below this cosine similarity are not returned
+MIN_SIMILARITY = 0.3
 
 
 class VendorKnowledgeBase:
@@ -25,7 +34,7 @@ class VendorKnowledgeBase:
         if settings.vector_backend == "chroma":
             self._init_chroma()
         else:
-            self._init_faiss()
+            self._init_index()
     
     def _init_chroma(self):
         """Initialize ChromaDB client."""
@@ -46,14 +55,62 @@ class VendorKnowledgeBase:
             
             self.backend = "chroma"
         except ImportError:
-            print("ChromaDB not available, falling back to FAISS")
-            self._init_faiss()
+            print("ChromaDB not available, falling back to in-process vector index")
+            self._init_index()
+    
+    def _init_index(self):
+        """Initialize the in-process n-gram vector index (one per namespace)."""
+        self.backend = "index"
+        self.indexes: Dict[str, NgramVectorIndex] = {}
+        self.versions: Dict[str, Optional[str]] = {}  # On-disk version each index was loaded from
+        # Documents added by this process since the last save(), per namespace
+        self.pending: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+        self.index_directory = Path(self.persist_directory) / "vector_index"
+
+    @property
+    def dirty(self) -> set:
+        """Namespaces changed since the last save()."""
+        return set(self.pending)
     
-    def _init_faiss(self):
-        """Initialize FAISS in-memory store."""
-        self.backend = "faiss"
-        self.memory = []  # Simple in-memory list as fallback
-        print("Using in-memory FAISS fallback")
+    def _namespace_dir(self, namespace: str) -> Path:
+        """Directory for a namespace (hashed if not filesystem-safe)."""
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", namespace):
+            namespace = hashlib.sha1(namespace.encode()).hexdigest()[:16]
+        return self.index_directory / namespace
+    
+    def _get_index(self, namespace: Optional[str]) -> NgramVectorIndex:
+        """
+        Get the index for a namespace, loading it (memory-mapped) if persisted.
+
+        Reloads when another process has published a newer version, then
+        replays this process's unsaved documents on top.
+        """
+        namespace = namespace or DEFAULT_NAMESPACE
+        store = IndexStore(self._namespace_dir(namespace))
+        index = self.indexes.get(namespace)
+        if index is None or store.current_version() != self.versions.get(namespace):
+            self.versions[namespace], index = store.load(mmap=True)
+            index.add_many(self.pending.get(namespace, []))
+            self.indexes[namespace] = index
+        return index
+    
+    def save(self):
+        """
+        Persist namespaces of the in-process index changed since the last save.
+
+        Each namespace is merged with the newest on-disk version under a file
+        lock, so concurrent API and worker processes keep each other's history.
+        """
+        if self.backend != "index":
+            return
+        for namespace in sorted(self.pending):
+            store = IndexStore(self._namespace_dir(namespace))
+            with store.locked():
+                _, index = store.load(mmap=True)
+                index.add_many(self.pending[namespace])
+                self.versions[namespace] = store.publish(index)
+                self.indexes[namespace] = index
+        self.pending.clear()
     
     def add_categorization(
         self,
@@ -61,7 +118,8 @@ class VendorKnowledgeBase:
         description: str,
         account: str,
         category: str,
-        txn_id: Optional[str] = None
+        txn_id: Optional[str] = None,
+        namespace: Optional[str] = None
     ):
         """
         Add a categorization to the knowledge base.
@@ -72,6 +130,7 @@ class VendorKnowledgeBase:
             account: Assigned account
             category: Category
             txn_id: Optional transaction ID
+            namespace: Tenant namespace (index backend only)
         """
         # Create a document from the transaction
         doc_text = f"{counterparty} {description}"
@@ -99,26 +158,30 @@ class VendorKnowledgeBase:
             except Exception as e:
                 print(f"Failed to add to ChromaDB: {e}")
         else:
-            # FAISS fallback
-            self.memory.append({
-                "id": doc_id,
-                "text": doc_text,
-                "metadata": metadata
-            })
+            if self._get_index(namespace).add(doc_id, doc_text, metadata):
+                self.pending.setdefault(namespace or DEFAULT_NAMESPACE, []).append(
+                    (doc_id, doc_text, metadata)
+                )
     
     def find_similar(
         self,
         counterparty: str,
         description: str,
-        n_results: int = 3
+        n_results: int = 3,
+        namespace: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Find similar past categorizations.
         
+        With the index backend, categorizations of the same counterparty
+        come first (dictionary lookup), then nearest neighbours by n-gram
+        cosine similarity.
+        
         Args:
             counterparty: Vendor/counterparty name
             description: Transaction description
             n_results: Number of similar results to return
+            namespace: Tenant namespace (index backend only)
             
         Returns:
             List of similar categorizations with metadata
@@ -150,30 +213,47 @@ class VendorKnowledgeBase:
                 print(f"Failed to query ChromaDB: {e}")
                 return []
         else:
-            # FAISS fallback - simple string matching
+            index = self._get_index(namespace)
             matches = []
-            query_lower = query_text.lower()
+            seen_rows = set()
             
-            for item in self.memory:
-                if counterparty.lower() in item['text'].lower():
+            def take(row, distance):
+                seen_rows.add(row)
+                for doc in reversed(index.documents[row]):  # newest first
+                    if len(matches) >= n_results:
+                        return
                     matches.append({
-                        'counterparty': item['metadata']['counterparty'],
-                        'account': item['metadata']['account'],
-                        'category': item['metadata']['category'],
-                        'distance': 0.0
+                        'counterparty': doc['counterparty'],
+                        'account': doc['account'],
+                        'category': doc['category'],
+                        'distance': distance
                     })
             
-            return matches[:n_results]
+            if counterparty:
+                for row in reversed(index.rows_for_counterparty(counterparty)):
+                    if len(matches) >= n_results:
+                        return matches
+                    take(row, 0.0)
+            
+            for row, similarity in index.search(query_text, k=n_results + len(seen_rows)):
+                if len(matches) >= n_results or similarity < MIN_SIMILARITY:
+                    break
+                if row not in seen_rows:
+                    take(row, 1.0 - similarity)
+            
+            return matches
     
     def get_historical_mappings(
         self,
-        counterparty: Optional[str] = None
+        counterparty: Optional[str] = None,
+        namespace: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
         Get historical counterparty -> account mappings.
         
         Args:
             counterparty: Optional filter by counterparty
+            namespace: Tenant namespace (index backend only)
             
         Returns:
             List of mappings
@@ -201,22 +281,29 @@ class VendorKnowledgeBase:
                 print(f"Failed to get mappings from ChromaDB: {e}")
                 return []
         else:
-            # FAISS fallback
-            mappings = []
-            for item in self.memory:
-                meta = item['metadata']
-                if counterparty and meta['counterparty'].lower() != counterparty.lower():
-                    continue
-                
-                mappings.append({
-                    'counterparty': meta['counterparty'],
-                    'account': meta['account']
-                })
+            index = self._get_index(namespace)
+            if counterparty:
+                rows = index.rows_for_counterparty(counterparty)
+            else:
+                rows = range(len(index.documents))
             
-            return mappings
+            return [
+                {
+                    'counterparty': doc['counterparty'],
+                    'account': doc['account']
+                }
+                for row in rows
+                for doc in index.documents[row]
+                if not counterparty or doc['counterparty'].lower() == counterparty.lower()
+            ]
     
-    def clear(self):
-        """Clear all data from the knowledge base."""
+    def clear(self, namespace: Optional[str] = None):
+        """
+        Clear all data from the knowledge base, including persisted indexes.
+        
+        Args:
+            namespace: Only clear this tenant namespace (index backend only)
+        """
         if self.backend == "chroma":
             try:
                 self.client.delete_collection(self.collection_name)
@@ -226,8 +313,14 @@ class VendorKnowledgeBase:
                 )
             except Exception as e:
                 print(f"Failed to clear ChromaDB: {e}")
+        elif namespace:
+            self.indexes.pop(namespace, None)
+            self.pending.pop(namespace, None)
+            shutil.rmtree(self._namespace_dir(namespace), ignore_errors=True)
         else:
-            self.memory = []
+            self.indexes = {}
+            self.pending.clear()
+            shutil.rmtree(self.index_directory, ignore_errors=True)
 
 
 # Global instance
@@ -0,0 +1,325 @@
+"""
+In-process vector index for vendor categorization history.
+
+Texts are embedded with hashed character n-grams (signed feature hashing
+into a fixed number of dimensions, L2-normalized), stored row-wise in a
+float32 NumPy matrix and searched with one matrix-vector product plus
+``argpartition`` for the top-k. Identical texts share a row, so repeat
+categorizations of the same vendor don't grow the matrix.
+
+Indexes persist to a directory (``vectors.npy`` + ``rows.json``) and are
+loaded memory-mapped, so a large index opens instantly and pages in on
+first search. IndexStore keeps those directories versioned: each save
+writes a new version directory and then atomically swaps the ``CURRENT``
+pointer, so readers always see the vectors and rows of one save.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are not serialized across processes
+    fcntl = None
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 256
+DEFAULT_NGRAM = 3
+
+# Initial row capacity; grows by doubling
+_MIN_CAPACITY = 1024
+
+VECTORS_FILE = "vectors.npy"
+ROWS_FILE = "rows.json"
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+
+# Versions kept on disk (older ones may still be memory-mapped by readers)
+KEEP_VERSIONS = 2
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return " ".join((text or "").lower().split())
+
+
+class NgramVectorIndex:
+    """Hashed character n-gram embeddings with brute-force cosine top-k."""
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram: int = DEFAULT_NGRAM):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim: Embedding dimensions (hash buckets)
+            ngram: Character n-gram length
+        """
+        self.dim = dim
+        self.ngram = ngram
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+
+        # Row-aligned data: normalized text and the documents stored under it
+        self.texts: List[str] = []
+        self.documents: List[List[Dict[str, Any]]] = []
+
+        self._row_by_text: Dict[str, int] = {}
+        self._doc_ids = set()
+        self._rows_by_counterparty: Dict[str, Dict[int, None]] = {}
+
+    def __len__(self) -> int:
+        """Number of stored documents."""
+        return len(self._doc_ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Embedding matrix (one row per distinct text)."""
+        return self._vectors[:self._size]
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text.
+
+        Returns:
+            L2-normalized float32 vector of length dim (all zeros for empty text)
+        """
+        padded = f" {normalize_text(text)} "
+        vector = np.zeros(self.dim, dtype=np.float32)
+
+        grams = [padded[i:i + self.ngram] for i in range(len(padded) - self.ngram + 1)]
+        if not grams:
+            return vector
+
+        # crc32 is stable across processes (unlike hash())
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32, count=len(grams)
+        )
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dim, signs)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def add(self, doc_id: str, text: str, metadata: Dict[str, Any]) -> bool:
+        """
+        Add a document.
+
+        Args:
+            doc_id: Unique document ID (duplicates are ignored)
+            text: Text to embed
+            metadata: Metadata returned by search (should include counterparty)
+
+        Returns:
+            True if added, False if doc_id was already present
+        """
+        if doc_id in self._doc_ids:
+            return False
+        self._doc_ids.add(doc_id)
+
+        key = normalize_text(text)
+        row = self._row_by_text.get(key)
+        if row is None:
+            row = self._append_row(key, self.embed(text))
+
+        self.documents[row].append({"id": doc_id, **metadata})
+
+        counterparty = (metadata.get("counterparty") or "").lower()
+        self._rows_by_counterparty.setdefault(counterparty, {})[row] = None
+
+        return True
+
+    def add_many(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Add many (doc_id, text, metadata) documents.
+
+        Returns:
+            Number of documents added
+        """
+        return sum(1 for doc_id, text, metadata in items if self.add(doc_id, text, metadata))
+
+    def _append_row(self, key: str, vector: np.ndarray) -> int:
+        capacity = self._vectors.shape[0]
+        if self._size == capacity or not self._vectors.flags.writeable:
+            # Grow by doubling; also copies a read-only memory-mapped matrix
+            grown = np.zeros((max(capacity * 2, _MIN_CAPACITY), self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+        row = self._size
+        self._vectors[row] = vector
+        self._size += 1
+
+        self.texts.append(key)
+        self.documents.append([])
+        self._row_by_text[key] = row
+        return row
+
+    def search(self, text: str, k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the k most similar rows.
+
+        Args:
+            text: Query text
+            k: Number of rows to return
+
+        Returns:
+            List of (row, cosine_similarity), most similar first
+        """
+        if self._size == 0 or k <= 0:
+            return []
+
+        query = self.embed(text)
+        scores = self.vectors @ query
+
+        k = min(k, self._size)
+        if k < self._size:
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(self._size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(int(row), float(scores[row])) for row in top]
+
+    def rows_for_counterparty(self, counterparty: str) -> List[int]:
+        """Rows holding documents for a counterparty (case-insensitive)."""
+        return list(self._rows_by_counterparty.get(counterparty.lower(), ()))
+
+    def save(self, directory: Path) -> None:
+        """
+        Persist the index to a new directory.
+
+        Never overwrites a saved index in place (a process may be memory-
+        mapping it); use IndexStore.publish() to replace one.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with open(directory / VECTORS_FILE, "wb") as f:
+            np.save(f, self.vectors)
+        with open(directory / ROWS_FILE, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "ngram": self.ngram,
+                "texts": self.texts,
+                "documents": self.documents,
+            }, f)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "NgramVectorIndex":
+        """
+        Load an index saved with save().
+
+        Args:
+            directory: Index directory
+            mmap: Memory-map the embedding matrix instead of reading it
+
+        Returns:
+            Loaded index (adds copy the matrix into memory on first write)
+        """
+        directory = Path(directory)
+        with open(directory / ROWS_FILE) as f:
+            data = json.load(f)
+
+        index = cls(dim=data["dim"], ngram=data["ngram"])
+        index._vectors = np.load(directory / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        index._size = index._vectors.shape[0]
+        index.texts = data["texts"]
+        index.documents = data["documents"]
+
+        for row, (text, docs) in enumerate(zip(index.texts, index.documents)):
+            index._row_by_text[text] = row
+            for doc in docs:
+                index._doc_ids.add(doc["id"])
+                counterparty = (doc.get("counterparty") or "").lower()
+                index._rows_by_counterparty.setdefault(counterparty, {})[row] = None
+
+        return index
+
+
+class IndexStore:
+    """
+    Versioned on-disk home of one index.
+
+    Layout: ``<directory>/v00000001/`` (one saved index per version) and
+    ``<directory>/CURRENT`` naming the live version. publish() writes a new
+    version and replaces CURRENT with one atomic rename; writers serialize
+    on ``<directory>/.lock`` (see locked()).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def current_version(self) -> Optional[str]:
+        """Live version name, or None if nothing was published."""
+        try:
+            return (self.directory / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, mmap: bool = True) -> Tuple[Optional[str], NgramVectorIndex]:
+        """
+        Load the live version.
+
+        Returns:
+            (version, index); (None, empty index) if nothing was published
+        """
+        for _ in range(3):
+            version = self.current_version()
+            if version is None:
+                return None, NgramVectorIndex()
+            try:
+                return version, NgramVectorIndex.load(self.directory / version, mmap=mmap)
+            except FileNotFoundError:
+                # Pruned by a concurrent publish; follow the new pointer
+                continue
+        raise FileNotFoundError(f"Index version keeps changing under {self.directory}")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclusive lock for read-merge-publish across processes."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, index: NgramVectorIndex) -> str:
+        """
+        Save an index as the next version and make it live (call under locked()).
+
+        Returns:
+            The new version name
+        """
+        versions = self._versions()
+        number = int(versions[-1][1:]) + 1 if versions else 1
+        version = f"v{number:08d}"
+        index.save(self.directory / version)
+
+        pointer = self.directory / f"{CURRENT_FILE}.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.directory / CURRENT_FILE)
+
+        for old in self._versions()[:-KEEP_VERSIONS]:
+            shutil.rmtree(self.directory / old, ignore_errors=True)
+        return version
+
+    def _versions(self) -> List[str]:
+        if not self.directory.exists():
+            return []
+        return sorted(p.name for p in self.directory.iterdir() if re.fullmatch(r"v\d{8}", p.name))
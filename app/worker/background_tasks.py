@@ -8,74 +8,326 @@ Tasks:
 -----
 1. categorize_transactions_task - AI categorization of bank transactions
 2. process_receipt_ocr_task - OCR extraction from receipt images
+   process_receipts_ocr_task - Batch OCR of many receipts on the OCR process pool
 3. export_to_quickbooks_task - Export journal entries to QuickBooks
 4. export_to_xero_task - Export journal entries to Xero
 5. bulk_approve_transactions_task - Bulk approval workflow
 
 All tasks update progress and can be monitored via job status endpoints.
 """
+import asyncio
 import logging
+import multiprocessing
+import os
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+
+from config.settings import settings
+
 logger = logging.getLogger(__name__)
 
-# Try simple queue first, fall back to Redis queue
+# Durable queue when configured, else simple queue, falling back to Redis queue
 try:
-    from app.worker.simple_queue import update_job_progress
-    QUEUE_TYPE = "simple"
+    if settings.JOB_QUEUE_BACKEND == "durable":
+        from app.worker.durable_queue import update_job_progress
+        QUEUE_TYPE = "durable"
+    else:
+        from app.worker.simple_queue import update_job_progress
+        QUEUE_TYPE = "simple"
 except ImportError:
     try:
         from app.worker.queue import update_job_progress
         QUEUE_TYPE = "redis"
     except ImportError:
         # Fallback: no-op progress updates
-        def update_job_progress(job_id: str, progress: int, message: str = ""):
+        def update_job_progress(job_id: str, progress: int, message: str = "", details=None):
             pass
         QUEUE_TYPE = "none"
 
+from app.db import journal_lines
 from app.db.session import get_db_context
 from app.db.models import TransactionDB, JournalEntryDB
+from app.worker.checkpoints import clear_checkpoints, load_checkpoint, load_checkpoints, save_checkpoint
+from app.worker.progress import ProgressReporter
+
+
+def _current_job_id() -> Optional[str]:
+    """ID of the queue job executing this task (None when called directly)."""
+    try:
+        if QUEUE_TYPE == "redis":
+            from rq import get_current_job
+            job = get_current_job()
+            return job.id if job else None
+        if QUEUE_TYPE == "durable":
+            from app.worker.durable_queue import get_current_job_id
+            return get_current_job_id()
+        if QUEUE_TYPE == "simple":
+            from app.worker.simple_queue import get_current_job_id
+            return get_current_job_id()
+    except Exception:
+        pass
+    return None
+
+
+# Chunk summary counters merged into the parent job result
+_CHUNK_COUNTERS = ("transactions_processed", "journal_entries_created", "high_confidence", "needs_review")
+
+
+@lru_cache(maxsize=1)
+def _rules_engine():
+    """Rules engine loaded once per worker process."""
+    from app.rules.engine import RulesEngine
+    return RulesEngine()
+
+
+def _proposal_row(company_id: str, txn: TransactionDB, rules_engine) -> Dict[str, Any]:
+    """Journal entry insert mapping for one transaction (rules, else LLM placeholder)."""
+    from app.db.models import Transaction
+    txn_model = Transaction(
+        txn_id=txn.txn_id,
+        date=txn.date.strftime("%Y-%m-%d"),
+        amount=float(txn.amount),
+        currency=txn.currency,
+        description=txn.description or "",
+        counterparty=txn.counterparty or "",
+        raw=txn.raw or "",
+        doc_ids=[]
+    )
+    
+    # Try rules engine first
+    rule_match = rules_engine.match_transaction(txn_model)
+    
+    if rule_match and rule_match.get('matched') and rule_match.get('confidence', 0) >= 0.9:
+        # High confidence rule match
+        account = rule_match['account']
+        confidence = rule_match['confidence']
+        rationale = rule_match['rationale']
+        needs_review = False
+    else:
+        # Fall back to LLM (or mock for now)
+        # In production, this would call actual LLM
+        account = "6999 Miscellaneous Expense"
+        confidence = 0.7
+        rationale = "LLM categorization (mock)"
+        needs_review = True
+    
+    amount_abs = abs(float(txn.amount))
+    
+    if txn.amount > 0:
+        # Income
+        lines = [
+            {"account": "1000 Cash at Bank", "debit": amount_abs, "credit": 0.0},
+            {"account": account, "debit": 0.0, "credit": amount_abs}
+        ]
+    else:
+        # Expense
+        lines = [
+            {"account": account, "debit": amount_abs, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": amount_abs}
+        ]
+    
+    return {
+        "je_id": f"je_{company_id}_{txn.txn_id[:16]}",
+        "company_id": company_id,
+        "date": txn.date,
+        "lines": lines,
+        "source_txn_id": txn.txn_id,
+        "memo": rationale,
+        "confidence": confidence,
+        "status": 'approved' if confidence >= 0.9 and not needs_review else 'proposed',
+        "needs_review": 1 if needs_review else 0
+    }
+
+
+def categorize_transactions_chunk(
+    company_id: str,
+    transaction_ids: List[str],
+    job_id: Optional[str] = None,
+    checkpoint_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Categorize one chunk of transactions and commit it as a unit.
+    
+    Journal entries are written with one bulk insert; when ``job_id`` is
+    given the chunk summary is checkpointed in the same transaction, so a
+    retried job skips the chunk. Transactions that already have a journal
+    entry are skipped, which makes re-running a chunk harmless.
+    
+    Runs in a worker process, so it opens its own session.
+    
+    Args:
+        company_id: Company identifier
+        transaction_ids: Transactions in this chunk
+        job_id: Parent job (enables checkpointing)
+        checkpoint_key: Checkpoint key of this chunk, e.g. 'chunk:00003'
+        
+    Returns:
+        Chunk summary (counters and errors)
+    """
+    summary = {counter: 0 for counter in _CHUNK_COUNTERS}
+    summary["errors"] = []
+    
+    try:
+        with get_db_context() as db:
+            if job_id:
+                done = load_checkpoint(db, job_id, checkpoint_key)
+                if done is not None:
+                    return done
+            
+            transactions = db.query(TransactionDB).filter(
+                TransactionDB.company_id == company_id,
+                TransactionDB.txn_id.in_(transaction_ids),
+                ~exists().where(JournalEntryDB.source_txn_id == TransactionDB.txn_id)
+            ).order_by(TransactionDB.txn_id).all()
+            
+            rules_engine = _rules_engine()
+            rows = []
+            for txn in transactions:
+                try:
+                    row = _proposal_row(company_id, txn, rules_engine)
+                except Exception as e:
+                    error_msg = f"Error processing txn {txn.txn_id}: {str(e)}"
+                    logger.error(error_msg)
+                    summary['errors'].append(error_msg)
+                    continue
+                
+                rows.append(row)
+                summary['transactions_processed'] += 1
+                if row['confidence'] >= 0.9:
+                    summary['high_confidence'] += 1
+                if row['needs_review']:
+                    summary['needs_review'] += 1
+            
+            if rows:
+                db.bulk_insert_mappings(JournalEntryDB, rows)
+                journal_lines.insert_lines_for_mappings(db, rows)
+            summary['journal_entries_created'] = len(rows)
+            
+            if job_id:
+                save_checkpoint(db, job_id, checkpoint_key, summary)
+    except IntegrityError:
+        # Another attempt committed this chunk first; report its summary
+        if job_id:
+            with get_db_context() as db:
+                done = load_checkpoint(db, job_id, checkpoint_key)
+            if done is not None:
+                return done
+        raise
+    
+    return summary
+
+
+def _plan_chunks(
+    db,
+    company_id: str,
+    transaction_ids: Optional[List[str]],
+    limit: Optional[int],
+    chunk_size: int
+) -> List[List[str]]:
+    """Split the transactions to categorize into fixed-size chunks (txn_id order)."""
+    query = db.query(TransactionDB.txn_id).filter(TransactionDB.company_id == company_id)
+    
+    # Filter by specific IDs if provided
+    if transaction_ids:
+        query = query.filter(TransactionDB.txn_id.in_(transaction_ids))
+    else:
+        # Get uncategorized only
+        query = query.filter(
+            ~exists().where(JournalEntryDB.source_txn_id == TransactionDB.txn_id)
+        )
+    
+    query = query.order_by(TransactionDB.txn_id)
+    if limit:
+        query = query.limit(limit)
+    
+    ids = [txn_id for (txn_id,) in query]
+    return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+
+def _run_chunks(
+    company_id: str,
+    job_id: Optional[str],
+    pending: List[tuple],
+    workers: int,
+    on_done: Callable[[List[str], Dict[str, Any]], None]
+) -> List[str]:
+    """
+    Run chunks inline (workers <= 1) or in a process pool.
+    
+    Returns:
+        Errors of chunks that failed (their work was rolled back)
+    """
+    failures = []
+    
+    if workers <= 1 or len(pending) <= 1:
+        for key, chunk in pending:
+            try:
+                on_done(chunk, categorize_transactions_chunk(company_id, chunk, job_id, key))
+            except Exception as e:
+                logger.error(f"Categorization {key} failed: {e}", exc_info=True)
+                failures.append(f"{key} failed: {e}")
+        return failures
+    
+    # spawn: workers must not inherit the parent's DB connections or threads
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(pending)),
+        mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        futures = {
+            pool.submit(categorize_transactions_chunk, company_id, chunk, job_id, key): (key, chunk)
+            for key, chunk in pending
+        }
+        for future in as_completed(futures):
+            key, chunk = futures[future]
+            try:
+                on_done(chunk, future.result())
+            except Exception as e:
+                logger.error(f"Categorization {key} failed: {e}")
+                failures.append(f"{key} failed: {e}")
+    
+    return failures
 
 
 def categorize_transactions_task(
     company_id: str,
     tenant_id: str,
     transaction_ids: Optional[List[str]] = None,
-    limit: int = 100
+    limit: Optional[int] = 100,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     AI categorization of transactions in background.
     
     This task:
-    1. Fetches uncategorized transactions
-    2. Runs AI categorization (rules → embeddings → LLM)
-    3. Creates proposed journal entries
-    4. Returns summary statistics
+    1. Plans the uncategorized transactions as fixed-size chunks
+    2. Categorizes chunks in parallel worker processes (rules → LLM),
+       each committing its journal entries with one bulk insert
+    3. Checkpoints every committed chunk, so a retry resumes where it stopped
+    4. Merges the chunk summaries into the job result
     
     Args:
         company_id: Company identifier
         tenant_id: Tenant identifier
         transaction_ids: Optional list of specific transaction IDs
-        limit: Maximum transactions to process
+        limit: Maximum transactions to process (None: all)
+        chunk_size: Transactions per chunk (default: CATEGORIZE_CHUNK_SIZE)
+        workers: Parallel worker processes (default: CATEGORIZE_WORKERS)
         
     Returns:
         Dict with categorization results
     """
     # Get current job for progress updates
-    job_id = None
-    try:
-        if QUEUE_TYPE == "redis":
-            from rq import get_current_job
-            job = get_current_job()
-            job_id = job.id if job else None
-        elif QUEUE_TYPE == "simple":
-            import threading
-            job_id = threading.current_thread().name.replace("worker-", "job_")
-    except:
-        pass
+    job_id = _current_job_id()
+    chunk_size = chunk_size or settings.CATEGORIZE_CHUNK_SIZE
+    workers = settings.CATEGORIZE_WORKERS if workers is None else workers
     
     logger.info(f"Starting categorization for company {company_id} (job: {job_id})")
     
@@ -87,6 +339,8 @@ def categorize_transactions_task(
         "journal_entries_created": 0,
         "high_confidence": 0,
         "needs_review": 0,
+        "chunks": 0,
+        "chunks_resumed": 0,
         "errors": [],
         "started_at": datetime.utcnow().isoformat()
     }
@@ -94,131 +348,59 @@ def categorize_transactions_task(
     try:
         # Update progress
         if job_id:
-            update_job_progress(job_id, 5, "Initializing AI categorization...")
+            update_job_progress(job_id, 5, "Planning categorization chunks...")
+        
+        # The plan is checkpointed too: a retry must see the same chunks even
+        # though the transactions committed so far are no longer uncategorized
+        with get_db_context() as db:
+            plan = load_checkpoint(db, job_id, "plan") if job_id else None
+            if plan is None:
+                chunks = _plan_chunks(db, company_id, transaction_ids, limit, chunk_size)
+                if job_id:
+                    save_checkpoint(db, job_id, "plan", {"chunks": chunks})
+            else:
+                chunks = plan["chunks"]
+            done = load_checkpoints(db, job_id, prefix="chunk:") if job_id else {}
         
-        # Import categorization components
-        from app.rules.engine import RulesEngine
-        from app.llm.categorize_post import llm_categorizer
+        total = sum(len(chunk) for chunk in chunks)
+        result['chunks'] = len(chunks)
         
-        rules_engine = RulesEngine()
+        if total == 0:
+            result["message"] = "No transactions to process"
+            return result
         
-        with get_db_context() as db:
-            # Fetch transactions
-            if job_id:
-                update_job_progress(job_id, 10, "Fetching transactions...")
-            
-            query = db.query(TransactionDB).filter(
-                TransactionDB.company_id == company_id
-            )
-            
-            # Filter by specific IDs if provided
-            if transaction_ids:
-                query = query.filter(TransactionDB.txn_id.in_(transaction_ids))
+        logger.info(f"Processing {total} transactions in {len(chunks)} chunks ({workers} workers)")
+        
+        progress = ProgressReporter(job_id, update_job_progress, start=10, end=90, total=total)
+        
+        def merge(chunk: List[str], summary: Dict[str, Any]):
+            for counter in _CHUNK_COUNTERS:
+                result[counter] += summary.get(counter, 0)
+            result['errors'].extend(summary.get('errors', []))
+            progress.advance(len(chunk), f"Categorized {progress.processed + len(chunk)}/{total} transactions...")
+        
+        pending = []
+        for idx, chunk in enumerate(chunks):
+            key = f"chunk:{idx:05d}"
+            if key in done:
+                result['chunks_resumed'] += 1
+                merge(chunk, done[key])
             else:
-                # Get uncategorized only
-                query = query.filter(
-                    ~TransactionDB.txn_id.in_(
-                        db.query(JournalEntryDB.source_txn_id).filter(
-                            JournalEntryDB.source_txn_id.isnot(None)
-                        )
-                    )
-                )
-            
-            transactions = query.limit(limit).all()
-            total = len(transactions)
-            
-            if total == 0:
-                result["message"] = "No transactions to process"
-                return result
-            
-            logger.info(f"Processing {total} transactions")
-            
-            # Process each transaction
-            for idx, txn in enumerate(transactions):
-                try:
-                    # Update progress
-                    progress = 10 + int((idx / total) * 80)
-                    if job_id:
-                        update_job_progress(
-                            job_id,
-                            progress,
-                            f"Categorizing transaction {idx + 1}/{total}..."
-                        )
-                    
-                    # Convert to Pydantic model for categorization
-                    from app.db.models import Transaction
-                    txn_model = Transaction(
-                        txn_id=txn.txn_id,
-                        date=txn.date.strftime("%Y-%m-%d"),
-                        amount=float(txn.amount),
-                        currency=txn.currency,
-                        description=txn.description or "",
-                        counterparty=txn.counterparty or "",
-                        raw=txn.raw or "",
-                        doc_ids=[]
-                    )
-                    
-                    # Try rules engine first
-                    rule_match = rules_engine.match_transaction(txn_model)
-                    
-                    if rule_match and rule_match.get('matched') and rule_match.get('confidence', 0) >= 0.9:
-                        # High confidence rule match
-                        account = rule_match['account']
-                        confidence = rule_match['confidence']
-                        rationale = rule_match['rationale']
-                        needs_review = False
-                    else:
-                        # Fall back to LLM (or mock for now)
-                        # In production, this would call actual LLM
-                        account = "6999 Miscellaneous Expense"
-                        confidence = 0.7
-                        rationale = "LLM categorization (mock)"
-                        needs_review = True
-                    
-                    # Create journal entry
-                    amount_abs = abs(float(txn.amount))
-                    
-                    if txn.amount > 0:
-                        # Income
-                        lines = [
-                            {"account": "1000 Cash at Bank", "debit": amount_abs, "credit": 0.0},
-                            {"account": account, "debit": 0.0, "credit": amount_abs}
-                        ]
-                    else:
-                        # Expense
-                        lines = [
-                            {"account": account, "debit": amount_abs, "credit": 0.0},
-                            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": amount_abs}
-                        ]
-                    
-                    je = JournalEntryDB(
-                        je_id=f"je_{company_id}_{txn.txn_id[:16]}",
-                        date=txn.date,
-                        lines=lines,
-                        source_txn_id=txn.txn_id,
-                        memo=rationale,
-                        confidence=confidence,
-                        status='approved' if confidence >= 0.9 and not needs_review else 'proposed',
-                        needs_review=1 if needs_review else 0
-                    )
-                    
-                    db.add(je)
-                    result['journal_entries_created'] += 1
-                    
-                    if confidence >= 0.9:
-                        result['high_confidence'] += 1
-                    if needs_review:
-                        result['needs_review'] += 1
-                    
-                    result['transactions_processed'] += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error processing txn {txn.txn_id}: {str(e)}"
-                    logger.error(error_msg)
-                    result['errors'].append(error_msg)
-            
-            # Commit all changes
-            db.commit()
+                pending.append((key, chunk))
+        
+        try:
+            failures = _run_chunks(company_id, job_id, pending, workers, merge)
+        finally:
+            progress.close()
+        
+        if failures:
+            # Committed chunks are checkpointed; a retry only redoes these
+            result['errors'].extend(failures)
+            raise RuntimeError(f"{len(failures)} of {len(chunks)} categorization chunks failed")
+        
+        if job_id:
+            with get_db_context() as db:
+                clear_checkpoints(db, job_id)
         
         # Final progress
         if job_id:
@@ -261,17 +443,7 @@ def process_receipt_ocr_task(
     Returns:
         Dict with OCR results
     """
-    job_id = None
-    try:
-        if QUEUE_TYPE == "redis":
-            from rq import get_current_job
-            job = get_current_job()
-            job_id = job.id if job else None
-        elif QUEUE_TYPE == "simple":
-            import threading
-            job_id = threading.current_thread().name.replace("worker-", "job_")
-    except:
-        pass
+    job_id = _current_job_id()
     
     logger.info(f"Starting OCR for receipt {receipt_id} (job: {job_id})")
     
@@ -332,6 +504,7 @@ def process_receipt_ocr_task(
             for field_name, field_value in result['extracted_fields'].items():
                 if field_value:
                     field_record = ReceiptFieldDB(
+                        tenant_id=company_id,
                         receipt_id=receipt_id,
                         field=field_name,
                         page=0,
@@ -362,6 +535,137 @@ def process_receipt_ocr_task(
         raise
 
 
+def process_receipts_ocr_task(
+    company_id: str,
+    receipts: List[Dict[str, str]],
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    OCR a batch of receipts in background.
+    
+    All receipts go to the batch OCR service at once (app/ocr/batch.py):
+    pages fan out over the OCR process pool and receipts seen before are
+    served from the token cache. Each receipt is then indexed
+    (app/ocr/receipt_index.py): its fields with values and bounding boxes,
+    and a summary row (vendor, date, amount) that the receipts list reads,
+    replacing anything indexed for that receipt earlier.
+    
+    Args:
+        company_id: Company identifier (tenant of receipts without tenant_id)
+        receipts: [{"receipt_id": ..., "file_path": ..., "tenant_id": ...}, ...]
+        workers: OCR worker processes (default: OCR_WORKERS)
+        
+    Returns:
+        Dict with per-receipt results and batch counters
+    """
+    from app.ocr.batch import BatchOCR
+    from app.ocr.receipt_index import upsert_receipts
+    from app.ocr.providers.tesseract import TesseractProvider
+    
+    job_id = _current_job_id()
+    total = len(receipts)
+    
+    logger.info(f"Starting batch OCR for {total} receipts (job: {job_id})")
+    
+    start_time = time.time()
+    result = {
+        "company_id": company_id,
+        "receipts": total,
+        "processed": 0,
+        "failed": 0,
+        "cache_hits": 0,
+        "fields_stored": 0,
+        "results": [],
+        "errors": [],
+        "started_at": datetime.utcnow().isoformat()
+    }
+    
+    try:
+        with ProgressReporter(job_id, update_job_progress, start=5, end=85, total=total) as progress:
+            docs = BatchOCR(workers=workers).extract(
+                [receipt["file_path"] for receipt in receipts],
+                on_progress=lambda n: progress.advance(n, f"OCR {progress.processed + n}/{total} receipts...")
+            )
+        
+        provider = TesseractProvider()
+        indexed = []
+        
+        for receipt, doc in zip(receipts, docs):
+            receipt_id = receipt["receipt_id"]
+            entry = {"receipt_id": receipt_id, "cache_hit": doc.cache_hit, "fields": {}}
+            result['cache_hits'] += doc.cache_hit
+            
+            if doc.error:
+                entry["error"] = doc.error
+                result['failed'] += 1
+                result['errors'].append(f"{receipt_id}: {doc.error}")
+            else:
+                fields = []
+                for box in provider.fields_from_tokens(doc.tokens):
+                    entry["fields"][box.field] = box.value
+                    fields.append({
+                        "field": box.field,
+                        "value": box.value,
+                        "page": box.page,
+                        "x": box.x,
+                        "y": box.y,
+                        "w": box.w,
+                        "h": box.h,
+                        "confidence": box.confidence,
+                    })
+                indexed.append({
+                    "tenant_id": receipt.get("tenant_id") or company_id,
+                    "receipt_id": receipt_id,
+                    "filename": os.path.basename(receipt["file_path"]),
+                    "file_path": receipt["file_path"],
+                    "fields": fields,
+                })
+                result['processed'] += 1
+            
+            result['results'].append(entry)
+        
+        if job_id:
+            update_job_progress(job_id, 90, f"Indexing {len(indexed)} receipts...")
+        
+        with get_db_context() as db:
+            result['fields_stored'] = upsert_receipts(db, indexed)
+        
+        if job_id:
+            update_job_progress(job_id, 100, f"OCR complete: {result['processed']}/{total} receipts")
+        
+        result['finished_at'] = datetime.utcnow().isoformat()
+        result['duration_seconds'] = time.time() - start_time
+        
+        logger.info(
+            f"Batch OCR complete: {result['processed']}/{total} receipts, "
+            f"{result['cache_hits']} from token cache, {result['failed']} failed"
+        )
+        return result
+        
+    except Exception as e:
+        error_msg = f"Batch OCR failed: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        result['errors'].append(error_msg)
+        result['finished_at'] = datetime.utcnow().isoformat()
+        raise
+
+
+def _qbo_payload(entry) -> Dict[str, Any]:
+    """Simplified QBO journal entry payload (see QBOService.post_idempotent_je)."""
+    return {
+        "txnDate": entry.date.strftime("%Y-%m-%d"),
+        "privateNote": entry.memo,
+        "lines": [
+            {
+                "amount": line['debit'] if line['debit'] > 0 else line['credit'],
+                "postingType": "Debit" if line['debit'] > 0 else "Credit",
+                "accountRef": {"value": line['account'].split()[0]}  # Extract account code
+            }
+            for line in entry.lines
+        ]
+    }
+
+
 def export_to_quickbooks_task(
     company_id: str,
     tenant_id: str,
@@ -380,14 +684,7 @@ def export_to_quickbooks_task(
     Returns:
         Dict with export results
     """
-    job_id = None
-    try:
-        if QUEUE_TYPE == "redis":
-            from rq import get_current_job
-            job = get_current_job()
-            job_id = job.id if job else None
-    except:
-        pass
+    job_id = _current_job_id()
     
     logger.info(f"Starting QBO export for company {company_id} (job: {job_id})")
     
@@ -419,53 +716,48 @@ def export_to_quickbooks_task(
             start_dt = dt.strptime(start_date, "%Y-%m-%d").date()
             end_dt = dt.strptime(end_date, "%Y-%m-%d").date()
             
-            entries = db.query(JournalEntryDB).filter(
+            entries = db.query(
+                JournalEntryDB.je_id,
+                JournalEntryDB.date,
+                JournalEntryDB.memo,
+                JournalEntryDB.lines
+            ).filter(
                 JournalEntryDB.status.in_(['approved', 'posted']),
                 JournalEntryDB.date >= start_dt,
                 JournalEntryDB.date <= end_dt
             ).all()
             
-            total = len(entries)
+            # Convert to QBO format
+            payloads = {entry.je_id: _qbo_payload(entry) for entry in entries}
             
-            # Export each entry
-            for idx, entry in enumerate(entries):
-                try:
-                    progress = 20 + int((idx / total) * 70)
-                    if job_id:
-                        update_job_progress(
-                            job_id,
-                            progress,
-                            f"Exporting entry {idx + 1}/{total}..."
-                        )
-                    
-                    # Convert to QBO format
-                    qbo_payload = {
-                        "txnDate": entry.date.strftime("%Y-%m-%d"),
-                        "privateNote": entry.memo,
-                        "lines": [
-                            {
-                                "amount": line['debit'] if line['debit'] > 0 else line['credit'],
-                                "postingType": "Debit" if line['debit'] > 0 else "Credit",
-                                "accountRef": {"value": line['account'].split()[0]}  # Extract account code
-                            }
-                            for line in entry.lines
-                        ]
-                    }
-                    
-                    # Post with idempotency
-                    # Note: If post_idempotent_je is async, this task needs to be async too
-                    # For now, using synchronous call
-                    export_result = qbo_service.post_idempotent_je_sync(tenant_id, qbo_payload)
-                    
-                    if export_result.get('idempotent'):
-                        result['entries_skipped'] += 1
-                    else:
-                        result['entries_exported'] += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error exporting entry {entry.je_id}: {str(e)}"
+            if job_id:
+                update_job_progress(job_id, 30, f"Exporting {len(payloads)} entries...")
+            
+            progress = ProgressReporter(job_id, update_job_progress, start=30, end=90)
+            
+            def on_progress(done: int, total: int):
+                if total:
+                    progress.total = total
+                    progress.advance(done - progress.processed, f"Exported {done}/{total} new entries...")
+            
+            # Hash everything, skip already-exported entries with one lookup,
+            # then post the rest in concurrent QBO batch requests
+            try:
+                outcomes = asyncio.run(
+                    qbo_service.post_journal_entries_batch(tenant_id, payloads, on_progress=on_progress)
+                )
+            finally:
+                progress.close()
+            
+            for je_id, outcome in outcomes.items():
+                if 'error' in outcome:
+                    error_msg = f"Error exporting entry {je_id}: {outcome['error']}"
                     logger.error(error_msg)
                     result['errors'].append(error_msg)
+                elif outcome.get('idempotent'):
+                    result['entries_skipped'] += 1
+                else:
+                    result['entries_exported'] += 1
             
             db.commit()
         
@@ -502,14 +794,7 @@ def bulk_approve_transactions_task(
     Returns:
         Dict with approval results
     """
-    job_id = None
-    try:
-        if QUEUE_TYPE == "redis":
-            from rq import get_current_job
-            job = get_current_job()
-            job_id = job.id if job else None
-    except:
-        pass
+    job_id = _current_job_id()
     
     logger.info(f"Starting bulk approval for company {company_id} (job: {job_id})")
     
@@ -527,35 +812,30 @@ def bulk_approve_transactions_task(
         with get_db_context() as db:
             total = len(transaction_ids)
             
-            for idx, txn_id in enumerate(transaction_ids):
-                try:
-                    progress = int((idx / total) * 100)
-                    if job_id:
-                        update_job_progress(
-                            job_id,
-                            progress,
-                            f"Approving transaction {idx + 1}/{total}..."
-                        )
+            with ProgressReporter(job_id, update_job_progress, total=total) as progress:
+                for idx, txn_id in enumerate(transaction_ids):
+                    try:
+                        # Find journal entry for this transaction
+                        je = db.query(JournalEntryDB).filter(
+                            JournalEntryDB.source_txn_id == txn_id,
+                            JournalEntryDB.status == 'proposed'
+                        ).first()
                     
-                    # Find journal entry for this transaction
-                    je = db.query(JournalEntryDB).filter(
-                        JournalEntryDB.source_txn_id == txn_id,
-                        JournalEntryDB.status == 'proposed'
-                    ).first()
+                        if je:
+                            je.status = 'approved'
+                            je.needs_review = 0
+                            result['approved'] += 1
+                        else:
+                            result['failed'] += 1
+                            result['errors'].append(f"No proposed entry found for txn {txn_id}")
                     
-                    if je:
-                        je.status = 'approved'
-                        je.needs_review = 0
-                        result['approved'] += 1
-                    else:
+                    except Exception as e:
+                        error_msg = f"Error approving txn {txn_id}: {str(e)}"
+                        logger.error(error_msg)
+                        result['errors'].append(error_msg)
                         result['failed'] += 1
-                        result['errors'].append(f"No proposed entry found for txn {txn_id}")
                     
-                except Exception as e:
-                    error_msg = f"Error approving txn {txn_id}: {str(e)}"
-                    logger.error(error_msg)
-                    result['errors'].append(error_msg)
-                    result['failed'] += 1
+                    progress.advance(message=f"Approved {idx + 1}/{total} transactions...")
             
             db.commit()
         
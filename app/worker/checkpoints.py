@@ -0,0 +1,49 @@
+"""
+Job Checkpoints - Resume Chunked Jobs After a Retry
+===================================================
+
+A chunked job stores its plan and each finished chunk's summary in
+``job_checkpoints``. The chunk summary is added in the same transaction
+as the chunk's writes, so after a crash or retry the job knows exactly
+which chunks are committed and skips them.
+
+Checkpoints are keyed by job ID, which every queue backend keeps stable
+across retries of the same job.
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models import JobCheckpointDB
+
+
+def load_checkpoint(db: Session, job_id: str, key: str) -> Optional[Any]:
+    """Data stored under ``key`` for the job, or None."""
+    return db.query(JobCheckpointDB.data).filter(
+        JobCheckpointDB.job_id == job_id,
+        JobCheckpointDB.key == key
+    ).scalar()
+
+
+def load_checkpoints(db: Session, job_id: str, prefix: str = "") -> Dict[str, Any]:
+    """All of the job's checkpoints whose key starts with ``prefix``."""
+    query = db.query(JobCheckpointDB.key, JobCheckpointDB.data).filter(JobCheckpointDB.job_id == job_id)
+    if prefix:
+        query = query.filter(JobCheckpointDB.key.startswith(prefix))
+    return {key: data for key, data in query}
+
+
+def save_checkpoint(db: Session, job_id: str, key: str, data: Any) -> None:
+    """
+    Add a checkpoint to the session (committed with the caller's work).
+
+    A second writer for the same key fails with IntegrityError on commit.
+    """
+    db.add(JobCheckpointDB(job_id=job_id, key=key, data=data))
+
+
+def clear_checkpoints(db: Session, job_id: str) -> int:
+    """Delete the job's checkpoints once it has finished."""
+    return db.query(JobCheckpointDB).filter(
+        JobCheckpointDB.job_id == job_id
+    ).delete(synchronize_session=False)
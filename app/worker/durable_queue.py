@@ -0,0 +1,564 @@
+"""
+Durable Database Job Queue (No Redis Required)
+==============================================
+
+Jobs live in the ``background_jobs`` table, so they survive restarts and
+deploys, and are executed by a pool of worker *processes* (real parallelism
+for CPU-bound categorization and OCR).
+
+Select it with ``JOB_QUEUE_BACKEND=durable``; the API matches
+simple_queue.py (plus ``priority``/``timeout`` from queue.py).
+
+How it works:
+------------
+- Claiming: a worker picks the best pending row (priority high → low, then
+  oldest) and takes it with a conditional UPDATE, so two workers never run
+  the same job. PostgreSQL additionally uses ``FOR UPDATE SKIP LOCKED`` so
+  concurrent workers do not contend on the same row; SQLite runs in WAL
+  mode.
+- Visibility timeout: a claimed job holds a lease of ``timeout`` seconds,
+  renewed by a heartbeat while it runs. If the worker dies, the lease
+  expires and another worker picks the job up again (or marks it failed
+  if that was its last attempt).
+- Retries: a failed attempt is re-queued with exponential backoff until
+  ``max_attempts`` is reached, then marked failed.
+- Company index: ``get_company_jobs`` is an indexed query on
+  (company_id, created_at).
+
+Usage:
+------
+```python
+from app.worker.durable_queue import enqueue_job, get_job_status
+
+job_id = enqueue_job(my_function, kwargs={'key': 'value'}, priority='high',
+                     meta={'company_id': 'acme'})
+status = get_job_status(job_id)
+```
+
+Run workers:
+    python -m app.worker.durable_queue --processes 4
+"""
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import or_, and_
+
+from app.db.models import BackgroundJobDB
+from app.db.session import SessionLocal, engine
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Same priority names as queue.py; lower value is claimed first
+PRIORITIES = {'high': 0, 'default': 1, 'low': 2}
+
+RETRY_BACKOFF_SECONDS = 5
+RETRY_BACKOFF_MAX_SECONDS = 300
+
+# Job being executed by this process (read by tasks via get_current_job_id)
+_current = threading.local()
+
+
+class JobStatus:
+    """Job status constants."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED = (JobStatus.COMPLETE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+def _func_path(func: Callable) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def _resolve(path: str) -> Callable:
+    module_name, _, qualname = path.partition(':')
+    target = importlib.import_module(module_name)
+    for part in qualname.split('.'):
+        target = getattr(target, part)
+    return target
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _as_dict(job: BackgroundJobDB) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message or "",
+        "details": (job.meta or {}).get("details"),
+        "result": job.result,
+        "error": job.error,
+        "priority": next((name for name, value in PRIORITIES.items() if value == job.priority), 'default'),
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+        "meta": job.meta or {}
+    }
+
+
+def enqueue_job(
+    func: Callable,
+    args: tuple = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    job_id: Optional[str] = None,
+    meta: Optional[Dict[str, Any]] = None,
+    priority: str = 'default',
+    timeout: Optional[int] = None,
+    max_attempts: Optional[int] = None
+) -> str:
+    """
+    Enqueue a job for background processing.
+
+    Args:
+        func: Module-level function to execute (imported by the worker)
+        args: Positional arguments (JSON-serializable)
+        kwargs: Keyword arguments (JSON-serializable)
+        job_id: Optional custom job ID (an existing ID is returned unchanged)
+        meta: Additional metadata (``company_id`` is indexed)
+        priority: 'high', 'default', or 'low'
+        timeout: Visibility timeout in seconds (default: JOB_VISIBILITY_TIMEOUT)
+        max_attempts: Attempts before failing (default: JOB_MAX_ATTEMPTS)
+
+    Returns:
+        job_id: Unique job identifier
+    """
+    meta = meta or {}
+    job_id = job_id or f"job_{uuid.uuid4().hex[:16]}"
+
+    db = SessionLocal()
+    try:
+        if job_id and db.get(BackgroundJobDB, job_id) is not None:
+            return job_id
+
+        db.add(BackgroundJobDB(
+            id=job_id,
+            task=_func_path(func),
+            args=_jsonable(list(args)),
+            kwargs=_jsonable(kwargs or {}),
+            meta=_jsonable(meta),
+            company_id=meta.get('company_id'),
+            priority=PRIORITIES.get(priority, PRIORITIES['default']),
+            status=JobStatus.PENDING,
+            message="Job queued",
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            timeout=timeout or settings.JOB_VISIBILITY_TIMEOUT,
+            available_at=datetime.utcnow(),
+            created_at=datetime.utcnow()
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info(f"Enqueued durable job {job_id} ({priority} priority)")
+    return job_id
+
+
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Get status of a job.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Dict with job status information
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(BackgroundJobDB, job_id)
+        if job is None:
+            return {
+                "id": job_id,
+                "status": "not_found",
+                "error": "Job not found"
+            }
+        return _as_dict(job)
+    finally:
+        db.close()
+
+
+def get_current_job_id() -> Optional[str]:
+    """ID of the job running in this worker thread (None outside a job)."""
+    return getattr(_current, 'job_id', None)
+
+
+def update_job_progress(
+    job_id: str,
+    progress: int,
+    message: str = "",
+    details: Optional[Dict[str, Any]] = None
+):
+    """
+    Update job progress (called from within job function).
+
+    Args:
+        job_id: Job identifier
+        progress: Progress percentage (0-100)
+        message: Status message
+        details: Optional counts/throughput/ETA, stored in meta['details']
+    """
+    db = SessionLocal()
+    try:
+        updates = {
+            "progress": min(max(progress, 0), 100),
+            "message": message
+        }
+        if details is not None:
+            # Only the running job writes its own meta, so read-modify-write is safe
+            meta = db.query(BackgroundJobDB.meta).filter(BackgroundJobDB.id == job_id).scalar()
+            updates["meta"] = {**(meta or {}), "details": _jsonable(details)}
+        db.query(BackgroundJobDB).filter(
+            BackgroundJobDB.id == job_id,
+            BackgroundJobDB.status == JobStatus.RUNNING
+        ).update(updates, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Cancel a job.
+
+    Pending jobs never run; a running job finishes its current attempt but
+    its result is discarded and it is not retried.
+
+    Returns:
+        True if job was found and marked as cancelled
+    """
+    db = SessionLocal()
+    try:
+        updated = db.query(BackgroundJobDB).filter(
+            BackgroundJobDB.id == job_id,
+            BackgroundJobDB.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).update({
+            "status": JobStatus.CANCELLED,
+            "message": "Job cancelled",
+            "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return updated == 1
+    finally:
+        db.close()
+
+
+def get_recent_jobs(limit: int = 50) -> List[Dict[str, Any]]:
+    """Get recent jobs, newest first."""
+    db = SessionLocal()
+    try:
+        jobs = db.query(BackgroundJobDB).order_by(BackgroundJobDB.created_at.desc()).limit(limit)
+        return [_as_dict(job) for job in jobs]
+    finally:
+        db.close()
+
+
+def get_company_jobs(company_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Get recent jobs for a company (indexed by company_id, created_at).
+
+    Args:
+        company_id: Company identifier
+        limit: Maximum number of jobs to return
+
+    Returns:
+        List of job status dicts, newest first
+    """
+    db = SessionLocal()
+    try:
+        jobs = db.query(BackgroundJobDB).filter(
+            BackgroundJobDB.company_id == company_id
+        ).order_by(BackgroundJobDB.created_at.desc()).limit(limit)
+        return [_as_dict(job) for job in jobs]
+    finally:
+        db.close()
+
+
+def cleanup_old_jobs(max_age_hours: int = 24) -> int:
+    """
+    Delete finished jobs older than max_age_hours.
+
+    Returns:
+        Number of jobs removed
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    db = SessionLocal()
+    try:
+        removed = db.query(BackgroundJobDB).filter(
+            BackgroundJobDB.status.in_(FINISHED),
+            BackgroundJobDB.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+    if removed:
+        logger.info(f"Cleaned up {removed} old jobs")
+    return removed
+
+
+# ============================================================================
+# Worker
+# ============================================================================
+
+def claim_job(worker_id: str) -> Optional[BackgroundJobDB]:
+    """
+    Claim the next runnable job (pending and due, or running with an expired lease).
+
+    Jobs whose lease expired on their last attempt are marked failed
+    instead of being run again.
+
+    Returns:
+        The claimed job (detached), or None when nothing is runnable
+    """
+    now = datetime.utcnow()
+    expired = and_(BackgroundJobDB.status == JobStatus.RUNNING, BackgroundJobDB.lease_expires_at < now)
+    runnable = or_(
+        and_(BackgroundJobDB.status == JobStatus.PENDING, BackgroundJobDB.available_at <= now),
+        and_(expired, BackgroundJobDB.attempts < BackgroundJobDB.max_attempts)
+    )
+
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        exhausted = db.query(BackgroundJobDB).filter(
+            expired, BackgroundJobDB.attempts >= BackgroundJobDB.max_attempts
+        ).update({
+            "status": JobStatus.FAILED,
+            "message": "Job failed",
+            "error": "Lease expired on the last attempt (worker lost or timed out)",
+            "lease_expires_at": None,
+            "finished_at": now
+        }, synchronize_session=False)
+        db.commit()
+        if exhausted:
+            logger.warning(f"Marked {exhausted} job(s) failed after their last lease expired")
+
+        for _ in range(3):  # lost races retry with the next candidate
+            candidate = db.query(BackgroundJobDB.id, BackgroundJobDB.timeout).filter(runnable).order_by(
+                BackgroundJobDB.priority, BackgroundJobDB.available_at, BackgroundJobDB.created_at
+            ).limit(1).with_for_update(skip_locked=True).first()
+
+            if candidate is None:
+                db.rollback()
+                return None
+
+            # Conditional update: only one worker wins even without row locks (SQLite)
+            claimed = db.query(BackgroundJobDB).filter(
+                BackgroundJobDB.id == candidate.id, runnable
+            ).update({
+                "status": JobStatus.RUNNING,
+                "worker_id": worker_id,
+                "attempts": BackgroundJobDB.attempts + 1,
+                "lease_expires_at": now + timedelta(seconds=candidate.timeout),
+                "started_at": now,
+                "message": "Job started"
+            }, synchronize_session=False)
+            db.commit()
+
+            if claimed == 1:
+                return db.get(BackgroundJobDB, candidate.id)
+        return None
+    finally:
+        db.close()
+
+
+def _finish(job: BackgroundJobDB, worker_id: str, updates: Dict[str, Any]) -> None:
+    """Record an attempt's outcome unless the job was cancelled or re-claimed meanwhile."""
+    db = SessionLocal()
+    try:
+        db.query(BackgroundJobDB).filter(
+            BackgroundJobDB.id == job.id,
+            BackgroundJobDB.status == JobStatus.RUNNING,
+            BackgroundJobDB.worker_id == worker_id
+        ).update(updates, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _heartbeat(job: BackgroundJobDB, worker_id: str, stop: threading.Event) -> None:
+    """Renew the job's lease every third of its timeout while it runs."""
+    interval = max(job.timeout / 3.0, 1.0)
+    while not stop.wait(interval):
+        try:
+            db = SessionLocal()
+            try:
+                db.query(BackgroundJobDB).filter(
+                    BackgroundJobDB.id == job.id,
+                    BackgroundJobDB.worker_id == worker_id,
+                    BackgroundJobDB.status == JobStatus.RUNNING
+                ).update({
+                    "lease_expires_at": datetime.utcnow() + timedelta(seconds=job.timeout)
+                }, synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {job.id} failed: {e}")
+
+
+def execute_job(job: BackgroundJobDB, worker_id: str) -> None:
+    """Run one claimed job and record its result, retry or failure."""
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, worker_id, stop), daemon=True)
+    heartbeat.start()
+    _current.job_id = job.id
+
+    try:
+        result = _resolve(job.task)(*(job.args or []), **(job.kwargs or {}))
+        _finish(job, worker_id, {
+            "status": JobStatus.COMPLETE,
+            "progress": 100,
+            "message": "Job completed successfully",
+            "result": _jsonable(result),
+            "error": None,
+            "lease_expires_at": None,
+            "finished_at": datetime.utcnow()
+        })
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"Job {job.id} attempt {job.attempts} failed: {error_msg}\n{traceback.format_exc()}")
+
+        if job.attempts < job.max_attempts:
+            delay = min(RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1)), RETRY_BACKOFF_MAX_SECONDS)
+            _finish(job, worker_id, {
+                "status": JobStatus.PENDING,
+                "message": f"Retrying after error (attempt {job.attempts}/{job.max_attempts})",
+                "error": error_msg,
+                "worker_id": None,
+                "lease_expires_at": None,
+                "available_at": datetime.utcnow() + timedelta(seconds=delay)
+            })
+        else:
+            _finish(job, worker_id, {
+                "status": JobStatus.FAILED,
+                "message": "Job failed",
+                "error": error_msg,
+                "lease_expires_at": None,
+                "finished_at": datetime.utcnow()
+            })
+    finally:
+        _current.job_id = None
+        stop.set()
+        heartbeat.join(timeout=1)
+
+
+def work(
+    worker_id: Optional[str] = None,
+    poll_interval: Optional[float] = None,
+    stop_event=None,
+    burst: bool = False
+) -> int:
+    """
+    Claim and execute jobs until stopped.
+
+    Args:
+        worker_id: Identifier recorded on claimed jobs (default: host:pid)
+        poll_interval: Idle wait between claims (default: JOB_POLL_INTERVAL)
+        stop_event: Event that ends the loop when set
+        burst: Return as soon as no job is runnable
+
+    Returns:
+        Number of jobs executed
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    executed = 0
+
+    while stop_event is None or not stop_event.is_set():
+        job = claim_job(worker_id)
+        if job is None:
+            if burst:
+                break
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+
+        execute_job(job, worker_id)
+        executed += 1
+
+    return executed
+
+
+def _worker_process(index: int, stop_event) -> None:
+    # Connections must not be shared with the parent process
+    engine.dispose()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logger.info(f"Durable worker {index} started (pid {os.getpid()})")
+    work(worker_id=f"{socket.gethostname()}:{os.getpid()}", stop_event=stop_event)
+
+
+def run_workers(processes: Optional[int] = None) -> None:
+    """
+    Run a pool of worker processes until SIGINT/SIGTERM.
+
+    Each process claims jobs independently; a stopped process finishes
+    its current job first.
+
+    Args:
+        processes: Number of processes (default: JOB_WORKER_PROCESSES or CPU count)
+    """
+    processes = processes or settings.JOB_WORKER_PROCESSES or multiprocessing.cpu_count()
+    ctx = multiprocessing.get_context('spawn')
+    stop_event = ctx.Event()
+
+    workers = [
+        ctx.Process(target=_worker_process, args=(i, stop_event), name=f"durable-worker-{i}")
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    logger.info(f"Started {processes} durable worker processes")
+
+    def shutdown(signum, frame):
+        logger.info("Stopping durable workers after their current jobs...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for process in workers:
+        process.join()
+
+
+def main():
+    """Run durable queue workers."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Run durable job queue workers")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    run_workers(args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Job Progress Reporting - Throttled, Coalesced Updates
+=====================================================
+
+Tasks that report progress per row used to make one backend call per row:
+a Redis round trip (queue.py), a database write (durable_queue.py) or a
+global lock (simple_queue.py). ProgressReporter keeps the latest state in
+memory and a background thread writes it at most every ``min_interval``
+seconds, and only when the percentage moved by ``min_step`` points.
+Milestones (``report``) and ``close`` are always written.
+
+Each update also carries ``details``: processed/total counts, throughput
+(items per second), elapsed seconds and an ETA.
+
+``job_events`` turns any backend's get_job_status into a server-sent
+events stream (used by GET /api/jobs/{job_id}/events).
+
+Usage:
+------
+```python
+with ProgressReporter(job_id, update_job_progress, start=10, end=90, total=len(rows)) as progress:
+    for row in rows:
+        process(row)
+        progress.advance(message="Categorizing transactions...")
+```
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job's state no longer changes (simple/durable and RQ names)
+TERMINAL_STATUSES = {"complete", "failed", "cancelled", "not_found", "finished", "stopped", "canceled"}
+
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MIN_STEP = 1
+
+
+class ProgressReporter:
+    """
+    Coalesces job progress updates and writes them from a background thread.
+
+    Args:
+        job_id: Job identifier (None disables reporting, e.g. when a task is called directly)
+        update: Backend update function, ``update(job_id, progress, message, details=...)``
+        start: Progress percentage at 0 items processed
+        end: Progress percentage at ``total`` items processed
+        total: Number of items this reporter counts (enables throughput/ETA)
+        min_interval: Minimum seconds between backend writes
+        min_step: Minimum percentage change that triggers a write
+    """
+
+    def __init__(
+        self,
+        job_id: Optional[str],
+        update: Callable[..., Any],
+        start: int = 0,
+        end: int = 100,
+        total: Optional[int] = None,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        min_step: int = DEFAULT_MIN_STEP
+    ):
+        self.job_id = job_id
+        self.update = update
+        self.start = start
+        self.end = end
+        self.total = total
+        self.min_interval = min_interval
+        self.min_step = min_step
+
+        self.processed = 0
+        self.writes = 0
+        self._started = time.monotonic()
+        self._progress = start
+        self._message = ""
+        self._dirty = False
+        self._force = False
+        self._last_written: Optional[int] = None
+        self._last_write_at = 0.0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Task-facing API
+    # ------------------------------------------------------------------
+
+    def advance(self, count: int = 1, message: Optional[str] = None) -> None:
+        """Record ``count`` more processed items (coalesced)."""
+        with self._cond:
+            self.processed += count
+            if self.total:
+                done = min(self.processed, self.total)
+                self._progress = self.start + int((done / self.total) * (self.end - self.start))
+            if message is not None:
+                self._message = message
+            self._mark(force=False)
+
+    def report(self, progress: int, message: str = "") -> None:
+        """Record a milestone; it is written even if the percentage did not move."""
+        with self._cond:
+            self._progress = progress
+            self._message = message
+            self._mark(force=True)
+
+    def close(self, progress: Optional[int] = None, message: Optional[str] = None) -> None:
+        """Stop the flusher and write the final state synchronously."""
+        with self._cond:
+            if progress is not None:
+                self._progress = progress
+            if message is not None:
+                self._message = message
+            if progress is not None or message is not None:
+                self._dirty = self._force = True
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        with self._cond:
+            state = self._take()
+        if state:
+            self._write(*state)
+
+    def __enter__(self) -> "ProgressReporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def details(self) -> Dict[str, Any]:
+        """Processed/total counts with throughput and ETA."""
+        elapsed = time.monotonic() - self._started
+        throughput = self.processed / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total and throughput > 0:
+            eta = max(self.total - self.processed, 0) / throughput
+        return {
+            "processed": self.processed,
+            "total": self.total,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput": round(throughput, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        }
+
+    # ------------------------------------------------------------------
+    # Internals (callers hold self._cond unless noted)
+    # ------------------------------------------------------------------
+
+    def _mark(self, force: bool) -> None:
+        if self.job_id is None or self._closed:
+            return
+        self._dirty = True
+        self._force = self._force or force
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"progress-{self.job_id}", daemon=True
+            )
+            self._thread.start()
+        self._cond.notify()
+
+    def _due(self) -> bool:
+        if not self._dirty:
+            return False
+        if self._force:
+            return True
+        moved = self._last_written is None or abs(self._progress - self._last_written) >= self.min_step
+        return moved and time.monotonic() - self._last_write_at >= self.min_interval
+
+    def _take(self):
+        if not self._dirty or self.job_id is None:
+            return None
+        self._dirty = self._force = False
+        self._last_written = self._progress
+        self._last_write_at = time.monotonic()
+        return min(max(self._progress, 0), 100), self._message, self.details()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._due():
+                    # Wake up when the interval elapses so a trailing update is not lost;
+                    # otherwise sleep until the next advance/report/close
+                    remaining = self.min_interval - (time.monotonic() - self._last_write_at)
+                    self._cond.wait(remaining if self._dirty and remaining > 0 else None)
+                if self._closed:
+                    return
+                state = self._take()
+            if state:
+                self._write(*state)
+
+    def _write(self, progress: int, message: str, details: Dict[str, Any]) -> None:
+        # Called without the lock: backend writes may block on network/DB
+        try:
+            self.update(self.job_id, progress, message, details=details)
+            self.writes += 1
+        except Exception as e:
+            logger.warning(f"Progress update for job {self.job_id} failed: {e}")
+
+
+async def job_events(
+    get_status: Callable[[str], Dict[str, Any]],
+    job_id: str,
+    poll_interval: float = 0.5,
+    keepalive: float = 15.0
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for a job: one ``progress`` event per status change.
+
+    Reads the backend's status off the event loop and emits only when it
+    changed; ends with a ``done`` event once the job reaches a terminal
+    status. A comment line is sent every ``keepalive`` seconds so proxies
+    keep the connection open.
+
+    Args:
+        get_status: Backend get_job_status function
+        job_id: Job identifier
+        poll_interval: Seconds between status reads
+        keepalive: Seconds of silence before a keepalive comment
+
+    Yields:
+        SSE-formatted text frames
+    """
+    loop = asyncio.get_running_loop()
+    last = None
+    last_sent = loop.time()
+
+    while True:
+        status = await loop.run_in_executor(None, get_status, job_id)
+        payload = json.dumps(status, default=str, sort_keys=True)
+        finished = status.get("status") in TERMINAL_STATUSES
+
+        if payload != last:
+            last = payload
+            last_sent = loop.time()
+            yield f"event: {'done' if finished else 'progress'}\ndata: {payload}\n\n"
+        elif loop.time() - last_sent >= keepalive:
+            last_sent = loop.time()
+            yield ": keepalive\n\n"
+
+        if finished:
+            return
+        await asyncio.sleep(poll_interval)
@@ -93,6 +93,7 @@ def get_job_status(job_id: str) -> Dict[str, Any]:
             "ended_at": job.ended_at.isoformat() if job.ended_at else None,
             "progress": job.meta.get('progress', 0),
             "message": job.meta.get('message', ''),
+            "details": job.meta.get('details'),
             "result": None,
             "error": None
         }
@@ -187,7 +188,7 @@ def generate_idempotency_key(company_id: str, operation: str, data_hash: str) ->
     return hashlib.sha256(combined.encode()).hexdigest()
 
 
-def update_job_progress(job_id: str, progress: int, message: str = ''):
+def update_job_progress(job_id: str, progress: int, message: str = '', details: Optional[Dict[str, Any]] = None):
     """
     Update job progress.
     
@@ -195,11 +196,14 @@ def update_job_progress(job_id: str, progress: int, message: str = ''):
         job_id: Job identifier
         progress: Progress percentage (0-100)
         message: Optional status message
+        details: Optional counts/throughput/ETA (see app/worker/progress.py)
     """
     try:
         job = Job.fetch(job_id, connection=redis_conn)
         job.meta['progress'] = progress
         job.meta['message'] = message
+        if details is not None:
+            job.meta['details'] = details
         job.save_meta()
     except Exception as e:
         logger.error(f"Error updating job progress: {e}")
@@ -55,6 +55,9 @@ _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="worker")
 # Cleanup thread
 _cleanup_thread: Optional[threading.Thread] = None
 
+# Job being executed by the current worker thread (see get_current_job_id)
+_current = threading.local()
+
 
 class JobStatus:
     """Job status constants."""
@@ -115,6 +118,7 @@ def enqueue_job(
     # Submit to thread pool
     def job_wrapper():
         """Wrapper that tracks job execution."""
+        _current.job_id = job_id
         try:
             # Update to running
             _update_job(job_id, {
@@ -148,6 +152,8 @@ def enqueue_job(
                 "error": error_msg,
                 "finished_at": datetime.utcnow().isoformat()
             })
+        finally:
+            _current.job_id = None
     
     # Submit to executor
     _executor.submit(job_wrapper)
@@ -186,7 +192,17 @@ def get_job_status(job_id: str) -> Dict[str, Any]:
         }
 
 
-def update_job_progress(job_id: str, progress: int, message: str = ""):
+def get_current_job_id() -> Optional[str]:
+    """ID of the job running in the current worker thread (None outside a job)."""
+    return getattr(_current, 'job_id', None)
+
+
+def update_job_progress(
+    job_id: str,
+    progress: int,
+    message: str = "",
+    details: Optional[Dict[str, Any]] = None
+):
     """
     Update job progress (called from within job function).
     
@@ -194,11 +210,15 @@ def update_job_progress(job_id: str, progress: int, message: str = ""):
         job_id: Job identifier
         progress: Progress percentage (0-100)
         message: Status message
+        details: Optional counts/throughput/ETA (see app/worker/progress.py)
     """
-    _update_job(job_id, {
+    updates = {
         "progress": min(max(progress, 0), 100),  # Clamp to 0-100
         "message": message
-    })
+    }
+    if details is not None:
+        updates["details"] = details
+    _update_job(job_id, updates)
 
 
 def cancel_job(job_id: str) -> bool:
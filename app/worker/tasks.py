@@ -13,7 +13,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from app.db.session import get_db_context
 from app.db.models import TransactionDB, JournalEntryDB, CompanyDB
 from app.ingest.csv_parser import parse_csv_statement
+from app.ml import drift_sketches
 from app.worker.queue import update_job_progress
+from app.worker.progress import ProgressReporter
 from rq import get_current_job
 
 logger = logging.getLogger(__name__)
@@ -71,6 +73,7 @@ def ingest_batch(
                 progress = 10 + int((idx / len(chunks)) * 80)
                 update_job_progress(job.id, progress, f"Ingesting chunk {idx+1}/{len(chunks)}...")
                 
+                ingested = []
                 for txn in chunk:
                     try:
                         # Convert date
@@ -99,6 +102,7 @@ def ingest_batch(
                                 raw=txn.raw or {}
                             )
                             db.add(txn_db)
+                            ingested.append(txn_db)
                             result['transactions_ingested'] += 1
                             
                     except Exception as e:
@@ -106,6 +110,7 @@ def ingest_batch(
                         logger.error(error_msg)
                         result['errors'].append(error_msg)
                 
+                drift_sketches.record_transactions(db, ingested)
                 db.commit()
         
         # Cleanup
@@ -173,27 +178,30 @@ def post_propose_batch(
             
             total = len(transactions)
             
-            # Process each transaction
-            for idx, txn in enumerate(transactions):
-                progress = 10 + int((idx / total) * 80)
-                update_job_progress(job.id, progress, f"Processing {idx+1}/{total}...")
-                
-                # Check if already has JE
-                existing_je = db.query(JournalEntryDB).filter(
-                    JournalEntryDB.source_txn_id == txn.txn_id
-                ).first()
-                
-                if existing_je:
-                    continue
-                
-                # Get decision
-                decision = engine.categorize(
-                    amount=txn.amount,
-                    description=txn.description,
-                    counterparty=txn.counterparty or "",
-                    date=txn.date
-                )
-                
+            # Skip transactions that already have a JE (one query for the batch)
+            txn_ids = [txn.txn_id for txn in transactions]
+            existing = {
+                row[0] for row in db.query(JournalEntryDB.source_txn_id).filter(
+                    JournalEntryDB.source_txn_id.in_(txn_ids)
+                ).all()
+            } if txn_ids else set()
+            transactions = [txn for txn in transactions if txn.txn_id not in existing]
+            
+            # Categorize the whole batch (rules + one vectorized ML call)
+            update_job_progress(job.id, 20, f"Categorizing {len(transactions)} transactions...")
+            decisions = engine.categorize_batch([
+                {
+                    "amount": txn.amount,
+                    "description": txn.description,
+                    "counterparty": txn.counterparty or "",
+                    "date": txn.date,
+                }
+                for txn in transactions
+            ])
+            
+            # Process each transaction (progress coalesced: not one Redis write per row)
+            progress = ProgressReporter(job.id, update_job_progress, start=20, end=90, total=len(transactions))
+            for idx, (txn, decision) in enumerate(zip(transactions, decisions)):
                 # Create JE
                 lines = [
                     {"account": decision['account'], "debit": abs(txn.amount) if txn.amount < 0 else 0, "credit": txn.amount if txn.amount > 0 else 0},
@@ -221,7 +229,9 @@ def post_propose_batch(
                     result['needs_review'] += 1
                 
                 result['transactions_processed'] += 1
+                progress.advance(message=f"Processed {idx+1}/{len(transactions)}...")
             
+            progress.close()
             db.commit()
         
         # Final progress
@@ -240,13 +250,15 @@ def post_propose_batch(
 
 
 def reconcile_batch(
-    company_id: str
+    company_id: str,
+    full_rebuild: bool = False
 ) -> Dict[str, Any]:
     """
     Run reconciliation for a company.
     
     Args:
         company_id: Company identifier
+        full_rebuild: Rebuild all matches instead of only new/changed rows
         
     Returns:
         Dict with reconciliation results
@@ -271,10 +283,11 @@ def reconcile_batch(
             
             update_job_progress(job.id, 50, "Running reconciliation...")
             
-            matches = matcher.reconcile_all(company_id)
-            result['matches_created'] = len(matches)
-            
-            db.commit()
+            if full_rebuild:
+                recon = matcher.reconcile_all(company_id=company_id)
+            else:
+                recon = matcher.reconcile_incremental(company_id)
+            result['matches_created'] = recon['statistics']['matched']
         
         # Final progress
         update_job_progress(job.id, 100, "Reconciliation complete")
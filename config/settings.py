@@ -25,6 +25,13 @@ class Settings(BaseSettings):
     # Redis & Queue (Sprint 4)
     REDIS_URL: str = "redis://localhost:6379/0"
     QUEUE_CONCURRENCY: int = 4
+    JOB_QUEUE_BACKEND: str = "simple"  # "simple" (in-memory), "durable" (database), "redis" (RQ)
+    JOB_VISIBILITY_TIMEOUT: int = 600  # Seconds a claimed durable job stays leased without a heartbeat
+    JOB_MAX_ATTEMPTS: int = 3  # Durable job attempts before it is marked failed
+    JOB_WORKER_PROCESSES: int = 0  # Durable worker processes (0 = one per CPU)
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds an idle durable worker waits between claims
+    CATEGORIZE_CHUNK_SIZE: int = 500  # Transactions per categorization chunk (one bulk insert + checkpoint)
+    CATEGORIZE_WORKERS: int = 4  # Processes categorizing chunks in parallel (1 = inline)
     
     # ML Model (Sprint 4/5)
     ML_MODEL_PATH: str = "models/classifier_open.pkl"
@@ -34,6 +41,9 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     llm_model: str = "gpt-4"
     confidence_threshold: float = 0.85
+    LLM_BATCH_SIZE: int = 20  # Transactions per batched categorization prompt
+    LLM_MAX_CONCURRENCY: int = 4  # Concurrent batched LLM requests
+    LLM_CACHE_SIZE: int = 10000  # Cached categorizations (per process)
     
     # OCR & Document Processing (Sprint 6)
     LLM_VALIDATION_ENABLED: bool = False
@@ -61,10 +71,14 @@ class Settings(BaseSettings):
     RETRAIN_GUARD_MIN_IMPROVEMENT: float = -0.01
     RETRAIN_DRY_RUN: bool = False
     RETRAIN_WATCH_INTERVAL: int = 1800
+    RETRAIN_MODE: str = "incremental"  # "incremental" (online model) or "full" (subprocess refit)
+    ONLINE_TRAIN_CHUNK_SIZE: int = 5000  # Feedback rows per partial_fit call
     
     # Model Paths
     MODEL_CANDIDATE: str = "models/candidate_classifier.pkl"
     MODEL_REGISTRY: str = "models/"
+    MODEL_POLL_INTERVAL: float = 30.0  # Seconds between checks for a newly promoted model
+    MODEL_MMAP: bool = True  # Memory-map model arrays (shared across worker processes)
     
     # Vector Backend (for vendor knowledge base)
     vector_backend: str = "none"  # Options: "chroma", "none"
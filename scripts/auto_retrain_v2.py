@@ -14,6 +14,7 @@ Usage:
     python scripts/auto_retrain_v2.py --mode watch --interval 1800
     python scripts/auto_retrain_v2.py --dry-run
 """
+import os
 import sys
 import argparse
 import logging
@@ -29,6 +30,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.db.session import get_db_context, engine
 from app.db.models import Base, ModelTrainingLogDB
 from app.ml.drift_monitor import create_drift_monitor
+from app.ml.online_trainer import IncrementalTrainer
+from app.ml.registry import ModelRegistry
 from config.settings import settings
 
 # Configure logging
@@ -64,6 +67,7 @@ class AutoRetrainerV2:
         self.min_records = getattr(settings_obj, 'RETRAIN_GUARD_MIN_RECORDS', 2000)
         self.max_runtime = getattr(settings_obj, 'RETRAIN_GUARD_MAX_RUNTIME', 900)
         self.min_improvement = getattr(settings_obj, 'RETRAIN_GUARD_MIN_IMPROVEMENT', -0.01)
+        self.retrain_mode = getattr(settings_obj, 'RETRAIN_MODE', 'incremental')
         
         logger.info(
             f"AutoRetrainerV2 initialized: "
@@ -203,6 +207,57 @@ class AutoRetrainerV2:
         """
         Train a candidate model in shadow mode.
         
+        Uses the incremental online trainer unless RETRAIN_MODE is "full".
+        
+        Returns:
+            Training result dict
+        """
+        if self.retrain_mode == 'incremental':
+            return self._incremental_train()
+        
+        return self._full_train()
+    
+    def _incremental_train(self) -> Dict[str, Any]:
+        """
+        Update the online candidate from feedback since the last checkpoint.
+        
+        Returns:
+            Training result dict
+        """
+        result = {
+            'success': False,
+            'duration': 0.0,
+            'error': None
+        }
+        
+        try:
+            with get_db_context() as db:
+                trainer = IncrementalTrainer(db, ModelRegistry(self.model_registry))
+                train_result = trainer.train()
+            
+            result.update(train_result)
+            
+            if train_result.get('success') and train_result.get('version'):
+                # Candidate file is what _evaluate_candidate compares against production
+                registry = ModelRegistry(self.model_registry)
+                shutil.copyfile(registry.artifact_path(train_result['version']), self.model_candidate)
+                logger.info(
+                    f"✅ Incremental training ({train_result['mode']}) completed in "
+                    f"{train_result['duration']:.1f}s on {train_result['records_used']} records"
+                )
+            elif not train_result.get('success'):
+                logger.error(f"Incremental training failed: {train_result.get('error')}")
+            
+        except Exception as e:
+            result['error'] = str(e)
+            logger.error(f"Incremental training error: {e}")
+        
+        return result
+    
+    def _full_train(self) -> Dict[str, Any]:
+        """
+        Retrain from scratch with the open-data training script.
+        
         Returns:
             Training result dict
         """
@@ -299,6 +354,18 @@ class AutoRetrainerV2:
             candidate_bundle = joblib.load(self.model_candidate)
             result['candidate_metrics'] = candidate_bundle.get('metrics', {})
             
+            if self.retrain_mode == 'incremental':
+                # The online candidate never saw the held-out feedback; score
+                # production on the same rows instead of its own test split
+                with get_db_context() as db:
+                    trainer = IncrementalTrainer(db, ModelRegistry(self.model_registry))
+                    result['prod_metrics'] = trainer.holdout_metrics(prod_bundle)
+                    result['candidate_metrics'] = trainer.holdout_metrics(candidate_bundle)
+                
+                if not result['candidate_metrics']:
+                    result['reason'] = 'no_holdout_feedback'
+                    return result
+            
             prod_acc = result['prod_metrics'].get('test_accuracy', 0.0)
             cand_acc = result['candidate_metrics'].get('test_accuracy', 0.0)
             
@@ -336,20 +403,30 @@ class AutoRetrainerV2:
         """
         Atomically promote candidate to production.
         
-        Creates backup of current model before replacing.
+        Publishes the candidate to the model registry and makes it the
+        current version; running API and worker processes pick it up on
+        their next poll. Previous versions stay in the registry for rollback.
         """
         try:
-            # Create backup
-            if self.model_current.exists():
-                backup_name = f"classifier_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
-                backup_path = self.model_registry / backup_name
-                shutil.copy(self.model_current, backup_path)
-                logger.info(f"Created backup: {backup_name}")
+            registry = ModelRegistry(self.model_registry)
+
+            # First promotion: record the pre-registry model for rollback
+            if registry.current_version() is None and self.model_current.exists():
+                registry.publish(self.model_current, metadata={'source': str(self.model_current)})
+
+            version = registry.publish(
+                self.model_candidate,
+                metadata={'source': str(self.model_candidate)}
+            )
+            registry.promote(version)
             
-            # Atomic swap (copy candidate to production)
-            shutil.copy(self.model_candidate, self.model_current)
+            # Keep the plain model path in sync (copy, then atomic rename)
+            self.model_current.parent.mkdir(parents=True, exist_ok=True)
+            staged = self.model_current.with_name(f".{self.model_current.name}.tmp")
+            shutil.copyfile(registry.artifact_path(version), staged)
+            os.replace(staged, self.model_current)
             
-            logger.info(f"✅ Promoted {self.model_candidate.name} to {self.model_current.name}")
+            logger.info(f"✅ Promoted {self.model_candidate.name} as version {version}")
             
             # Log promotion event
             self._log_promotion_event()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Standards parser throughput benchmark.
+
+Writes large synthetic CAMT.053, MT940, BAI2 and OFX (XML and SGML)
+statements and measures, per format, the streaming parsers (iter_*)
+against the list API (parse_*): transactions/second, MB/second and
+peak traced memory.
+
+Usage:
+    python scripts/bench_standards_parsers.py --entries 200000
+    python scripts/bench_standards_parsers.py --formats camt,mt940 --json out/bench.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ingestion.standards import (
+    iter_bai2, iter_camt, iter_mt940, iter_ofx,
+    parse_bai2, parse_camt, parse_mt940, parse_ofx,
+)
+
+START = date(2024, 1, 1)
+
+
+def _entries(count: int):
+    """(index, date, signed amount in cents, description) of synthetic entries."""
+    for i in range(count):
+        cents = 1000 + (i * 7919) % 500000
+        yield i, START + timedelta(days=i % 365), (cents if i % 3 == 0 else -cents), f"Synthetic payment {i}"
+
+
+def write_camt(path: Path, count: int) -> None:
+    """camt.053.001.02 statement with ``count`` entries."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">\n')
+        f.write('<BkToCstmrStmt><Stmt><Id>BENCH</Id>\n')
+        for i, day, cents, text in _entries(count):
+            f.write(
+                f'<Ntry><Amt Ccy="EUR">{abs(cents) / 100:.2f}</Amt>'
+                f'<CdtDbtInd>{"CRDT" if cents > 0 else "DBIT"}</CdtDbtInd>'
+                f'<BookgDt><Dt>{day.isoformat()}</Dt></BookgDt>'
+                f'<AcctSvcrRef>REF{i:08d}</AcctSvcrRef>'
+                f'<NtryDtls><TxDtls><RmtInf><Ustrd>{text}</Ustrd></RmtInf></TxDtls></NtryDtls>'
+                f'</Ntry>\n'
+            )
+        f.write('</Stmt></BkToCstmrStmt></Document>\n')
+
+
+def write_mt940(path: Path, count: int, per_statement: int = 1000) -> None:
+    """MT940 file with ``count`` statement lines split into statements."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, day, cents, text in _entries(count):
+            if i % per_statement == 0:
+                if i:
+                    f.write(':62F:C240101EUR0,00\n')
+                f.write(f':20:STMT{i // per_statement:06d}\n:25:NL91ABNA0417164300\n')
+                f.write(f':28C:{i // per_statement + 1:05d}/001\n:60F:C240101EUR0,00\n')
+            amount = f'{abs(cents) // 100},{abs(cents) % 100:02d}'
+            f.write(f':61:{day:%y%m%d}{"C" if cents > 0 else "D"}{amount}NTRFNONREF//REF{i:08d}\n')
+            f.write(f':86:{text}\n')
+        f.write(':62F:C240101EUR0,00\n')
+
+
+def write_bai2(path: Path, count: int) -> None:
+    """BAI2 file with one account and ``count`` detail records."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('01,SENDER,RECEIVER,240101,1200,1,80,1/\n')
+        f.write('02,SENDER,RECEIVER,1,240101,1200,USD,2/\n')
+        f.write('03,1234567890,USD,010,0,,,/\n')
+        for i, _, cents, text in _entries(count):
+            f.write(f'16,{475 if cents > 0 else 275},{abs(cents)},S,REF{i:08d},,{text}/\n')
+        f.write(f'49,0,{count + 2}/\n98,0,1,{count + 4}/\n99,0,1,{count + 6}/\n')
+
+
+def write_ofx(path: Path, count: int, sgml: bool = False) -> None:
+    """OFX 2.x XML (or 1.x SGML with unclosed tags) with ``count`` transactions."""
+    with open(path, 'w', encoding='utf-8') as f:
+        if sgml:
+            f.write('OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\n\n')
+        else:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<OFX>\n<BANKMSGSRSV1>\n<STMTTRNRS>\n<STMTRS>\n<CURDEF>USD\n' if sgml else
+                '<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>USD</CURDEF>\n')
+        f.write('<BANKTRANLIST>\n')
+        for i, day, cents, text in _entries(count):
+            fields = [
+                ('TRNTYPE', 'CREDIT' if cents > 0 else 'DEBIT'),
+                ('DTPOSTED', f'{day:%Y%m%d}120000'),
+                ('TRNAMT', f'{cents / 100:.2f}'),
+                ('FITID', f'TXN{i:08d}'),
+                ('NAME', text),
+            ]
+            if sgml:
+                f.write('<STMTTRN>\n' + ''.join(f'<{k}>{v}\n' for k, v in fields) + '</STMTTRN>\n')
+            else:
+                f.write('<STMTTRN>' + ''.join(f'<{k}>{v}</{k}>' for k, v in fields) + '</STMTTRN>\n')
+        f.write('</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n')
+
+
+FORMATS = {
+    "camt": ("camt053.xml", write_camt, iter_camt, parse_camt),
+    "mt940": ("statement.sta", write_mt940, iter_mt940, parse_mt940),
+    "bai2": ("statement.bai", write_bai2, iter_bai2, parse_bai2),
+    "ofx": ("statement.ofx", write_ofx, iter_ofx, parse_ofx),
+    "ofx_sgml": ("statement_sgml.ofx", lambda p, n: write_ofx(p, n, sgml=True), iter_ofx, parse_ofx),
+}
+
+
+def _measure(run) -> dict:
+    """Time an untraced run, then trace a second run for peak memory (tracing slows parsing)."""
+    start = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"transactions": count, "seconds": round(elapsed, 3), "peak_mb": round(peak / 1e6, 1)}
+
+
+def bench(fmt: str, entries: int, workdir: Path) -> dict:
+    """Benchmark streaming vs list parsing of one synthetic file."""
+    filename, write, iter_parser, list_parser = FORMATS[fmt]
+    path = workdir / filename
+    write(path, entries)
+    size_mb = path.stat().st_size / 1e6
+
+    stream = _measure(lambda: sum(1 for _ in iter_parser(path)))
+    listed = _measure(lambda: len(list_parser(path)))
+
+    for result in (stream, listed):
+        result["txn_per_sec"] = round(result["transactions"] / result["seconds"]) if result["seconds"] else None
+        result["mb_per_sec"] = round(size_mb / result["seconds"], 1) if result["seconds"] else None
+
+    return {"format": fmt, "file_mb": round(size_mb, 1), "stream": stream, "list": listed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark standards parsers on synthetic files")
+    parser.add_argument("--entries", type=int, default=100000, help="Transactions per file")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated formats")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats.split(","):
+            result = bench(fmt.strip(), args.entries, Path(tmp))
+            results.append(result)
+            s, l = result["stream"], result["list"]
+            print(
+                f"{result['format']:<9} {result['file_mb']:>7.1f} MB  "
+                f"stream {s['txn_per_sec']:>8} txn/s {s['mb_per_sec']:>6} MB/s peak {s['peak_mb']:>7} MB  |  "
+                f"list {l['txn_per_sec']:>8} txn/s peak {l['peak_mb']:>7} MB"
+            )
+
+    if args.json_path:
+        Path(args.json_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
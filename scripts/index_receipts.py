@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Backfill the receipts index from receipt text files.
+
+Receipts are indexed when they are OCR'd; run this once for receipts
+ingested before the index existed (the receipts list reads only the
+index). Each <text-dir>/<tenant>/<name>.txt is indexed for <tenant>.
+
+Usage: python scripts/index_receipts.py [--text-dir DIR] [--pdf-dir DIR] [--tenant-id TENANT]
+"""
+import argparse
+import glob
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.db.session import get_db_context
+from app.ocr.receipt_index import index_receipt_texts
+
+
+def main():
+    """Index receipt text files"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--text-dir", default="tests/fixtures/receipts", help="Root of <tenant>/<name>.txt files")
+    parser.add_argument("--pdf-dir", default="tests/fixtures/receipts_pdf", help="Root of matching <tenant>/<name>.pdf files")
+    parser.add_argument("--tenant-id", help="Only index this tenant's receipts")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(f"{args.text_dir}/{args.tenant_id or '*'}/*.txt"))
+
+    try:
+        with get_db_context() as db:
+            indexed = index_receipt_texts(db, paths, pdf_dir=args.pdf_dir)
+        print(f"✅ Indexed {indexed} receipts")
+        sys.exit(0)
+
+    except Exception as e:
+        print(f"\n❌ Error indexing receipts: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
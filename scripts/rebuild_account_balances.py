@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rebuild daily account balance snapshots from journal_entry_lines.
+
+Snapshots are maintained on every journal entry write; run this after
+manual data fixes or bulk writes that bypassed the ORM.
+
+Usage: python scripts/rebuild_account_balances.py [--company-id COMPANY] [--lines]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.db.account_balances import rebuild_balances
+from app.db.journal_lines import rebuild_lines
+from app.db.session import get_db_context
+
+
+def main():
+    """Rebuild balance snapshots (optionally journal lines first)"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--company-id", help="Only rebuild this company's snapshots")
+    parser.add_argument("--lines", action="store_true",
+                        help="Also rebuild journal_entry_lines from journal_entries (all companies)")
+    args = parser.parse_args()
+
+    try:
+        with get_db_context() as db:
+            if args.lines:
+                written = rebuild_lines(db)
+                print(f"✅ Rebuilt {written} journal entry lines")
+            if not args.lines or args.company_id:
+                written = rebuild_balances(db, company_id=args.company_id)
+                print(f"✅ Rebuilt {written} account balance snapshots")
+            sys.exit(0)
+
+    except Exception as e:
+        print(f"\n❌ Error rebuilding balances: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.db.session import get_db_context, engine
-from app.db.models import Base, TransactionDB, JournalEntryDB
+from app.db.models import Base, TransactionDB, JournalEntryDB, JournalEntryLineDB, AccountBalanceDailyDB
 from app.ingest.csv_parser import parse_csv_statement
 from datetime import datetime
 import logging
@@ -38,6 +38,8 @@ def seed_sample_transactions():
     # Save to database
     with get_db_context() as db:
         # Clear existing data
+        db.query(AccountBalanceDailyDB).delete()
+        db.query(JournalEntryLineDB).delete()
         db.query(JournalEntryDB).delete()
         db.query(TransactionDB).delete()
         
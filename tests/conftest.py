@@ -6,3 +6,12 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+
+@pytest.fixture(autouse=True)
+def isolated_extraction_caches(tmp_path, monkeypatch):
+    """Keep the global extraction and OCR token caches out of the repo (cache/)."""
+    from app.ingestion.extraction_cache import extraction_cache
+    from app.ocr.batch import token_cache
+
+    monkeypatch.setattr(extraction_cache, "prefix", str(tmp_path / "cache" / "extractions"))
+    monkeypatch.setattr(token_cache, "prefix", str(tmp_path / "cache" / "ocr_tokens"))
@@ -65,7 +65,7 @@ class TestCAMTParsing:
         # Expected closing: 12250
         
         net_change = sum(t.amount for t in transactions)
-        assert abs(net_change - 2250.00) < 0.01, f"Net change should be 2250, got {net_change}"
+        assert abs(net_change - Decimal("2250.00")) < Decimal("0.01"), f"Net change should be 2250, got {net_change}"
     
     def test_camt054_parses(self):
         """Test CAMT.054 parsing."""
@@ -104,7 +104,7 @@ class TestMT940Parsing:
         
         # Should match CAMT test: net change of 2250
         net_change = sum(t.amount for t in transactions)
-        assert abs(net_change - 2250.00) < 0.01, f"Net change should be 2250, got {net_change}"
+        assert abs(net_change - Decimal("2250.00")) < Decimal("0.01"), f"Net change should be 2250, got {net_change}"
 
 
 class TestBAI2Parsing:
@@ -0,0 +1,127 @@
+"""
+Test Standards Parsers - Streaming
+==================================
+
+The iter_* parsers must yield the same transactions as the list API,
+lazily and with bounded memory.
+"""
+
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from app.ingestion.standards import (
+    iter_bai2, iter_camt, iter_mt940, iter_ofx, iter_standard_chunks,
+    parse_bai2, parse_camt, parse_mt940, parse_ofx,
+)
+from scripts.bench_standards_parsers import write_camt, write_ofx
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "standards"
+
+
+@pytest.mark.parametrize("filename,iter_parser,list_parser", [
+    ("camt053_min.xml", iter_camt, parse_camt),
+    ("camt054_min.xml", iter_camt, parse_camt),
+    ("mt940_min.txt", iter_mt940, parse_mt940),
+    ("bai2_min.txt", iter_bai2, parse_bai2),
+    ("ofx_min.ofx", iter_ofx, parse_ofx),
+])
+def test_stream_matches_list(filename, iter_parser, list_parser):
+    """Streaming yields the same transactions, in order."""
+    streamed = list(iter_parser(FIXTURES_DIR / filename))
+
+    assert streamed, f"No transactions parsed from {filename}"
+    assert streamed == list_parser(FIXTURES_DIR / filename)
+    assert all(t.account_id != "unknown" for t in streamed)
+
+
+def test_camt_memory_is_bounded(tmp_path):
+    """Entries are detached after parsing, so large files do not accumulate."""
+    path = tmp_path / "camt053_large.xml"
+    write_camt(path, 20000)
+
+    tracemalloc.start()
+    count = sum(1 for _ in iter_camt(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == 20000
+    assert peak < 5_000_000, f"Peak {peak / 1e6:.1f} MB while streaming"
+
+
+def test_mt940_information_follows_its_statement_line(tmp_path):
+    """Each :86: describes the :61: before it; currency comes from :60F:."""
+    path = tmp_path / "statement.sta"
+    path.write_text(
+        ":20:STMT1\n:25:NL91ABNA0417164300\n:28C:00001/001\n:60F:C240101EUR1000,00\n"
+        ":61:240102D25,00NTRFNONREF//A1\n:86:Coffee beans\nwholesale order\n"
+        ":61:240103C100,00NTRFNONREF//A2\n"
+        ":61:240104D10,00NTRFNONREF//A3\n:86:Bank fee\n"
+        ":62F:C240104EUR1065,00\n-}\n",
+        encoding="utf-8"
+    )
+
+    transactions = list(iter_mt940(path))
+
+    assert [t.description for t in transactions] == [
+        "Coffee beans wholesale order", "MT940 Transaction", "Bank fee"
+    ]
+    assert [t.reference for t in transactions] == ["A1", "A2", "A3"]
+    assert {t.currency for t in transactions} == {"EUR"}
+
+
+def test_bai2_continuation_records(tmp_path):
+    """88 records extend the preceding 16 record."""
+    path = tmp_path / "statement.bai"
+    path.write_text(
+        "01,SENDER,RECEIVER,240101,1200,1,80,1/\n"
+        "02,SENDER,RECEIVER,1,240101,1200,USD,2/\n"
+        "03,1234567890,USD,010,0,,,/\n"
+        "16,475,120000,BANKREF\n"
+        "88,CUSTREF,Customer Deposit/\n"
+        "16,275,15000,S,,,Fee/\n"
+        "49,0,4/\n",
+        encoding="utf-8"
+    )
+
+    transactions = list(iter_bai2(path))
+
+    assert [t.amount for t in transactions] == [1200.00, -150.00]
+    assert transactions[0].reference == "CUSTREF"
+    assert transactions[0].description == "Customer Deposit"
+
+
+def test_ofx_sgml_stream(tmp_path):
+    """SGML headers are skipped, bare ampersands escaped, CURDEF applied."""
+    path = tmp_path / "statement.ofx"
+    path.write_text(
+        "OFXHEADER:100\nDATA:OFXSGML\n\n"
+        "<OFX>\n<BANKMSGSRSV1>\n<STMTTRNRS>\n<STMTRS>\n<CURDEF>CAD\n<BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20240102\n<TRNAMT>-45.10\n<FITID>F1\n<NAME>AT&T\n</STMTTRN>\n"
+        "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20240103\n<TRNAMT>100.00\n<FITID>F2\n<NAME>Refund\n</STMTTRN>\n"
+        "</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n",
+        encoding="utf-8"
+    )
+
+    transactions = list(iter_ofx(path))
+
+    assert [t.description for t in transactions] == ["AT&T", "Refund"]
+    assert [t.currency for t in transactions] == ["CAD", "CAD"]
+
+
+def test_standard_chunks(tmp_path):
+    """Chunks split the stream without losing transactions."""
+    path = tmp_path / "statement.ofx"
+    write_ofx(path, 23)
+
+    chunks = list(iter_standard_chunks(path, "ofx", chunk_size=10))
+
+    assert [len(c) for c in chunks] == [10, 10, 3]
+    assert [t.reference for c in chunks for t in c] == [f"TXN{i:08d}" for i in range(23)]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        iter_standard_chunks(FIXTURES_DIR / "bai2_min.txt", "qif").__next__()
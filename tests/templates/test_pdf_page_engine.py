@@ -0,0 +1,82 @@
+"""
+PDF Page Engine Tests
+=====================
+
+Single-open, page-parallel table extraction on synthetic statements.
+"""
+
+import pytest
+
+try:
+    from reportlab.lib.pagesizes import letter
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+try:
+    import pdfplumber
+    HAS_PDFPLUMBER = True
+except ImportError:
+    HAS_PDFPLUMBER = False
+
+from scripts.generate_synthetic_statement import SyntheticStatementGenerator
+from app.ingestion.extract.base import ExtractionContext
+from app.ingestion.extract.pdf_pages import PDFPageEngine
+from app.ingestion.extract.pdf_template import PDFTemplateExtractor
+
+
+pytestmark = pytest.mark.skipif(
+    not (HAS_REPORTLAB and HAS_PDFPLUMBER),
+    reason="reportlab and pdfplumber required for PDF page engine tests"
+)
+
+
+@pytest.fixture
+def long_statement(tmp_path):
+    """A multi-page synthetic Chase statement."""
+    output_path = tmp_path / "chase_long.pdf"
+    SyntheticStatementGenerator('chase').generate(
+        output_path=str(output_path),
+        transaction_count=200
+    )
+    return output_path
+
+
+def test_parallel_tables_match_serial(long_statement):
+    """Pool extraction should return the same tables, in page order."""
+    with PDFPageEngine(long_statement, workers=1) as doc:
+        serial = doc.all_page_tables()
+
+    with PDFPageEngine(long_statement, workers=2, min_parallel_pages=1) as doc:
+        parallel = doc.all_page_tables()
+        timings = doc.timings()
+        workers = doc.parallel_workers
+
+    assert len(serial) > 1
+    assert parallel == serial
+    assert len(timings) == len(serial)
+    assert workers == 2
+
+
+def test_first_page_tables_are_extracted_once(long_statement):
+    """Feature extraction and parsing should share the first page's tables."""
+    with PDFPageEngine(long_statement, workers=1) as doc:
+        features = doc.features()
+        first = doc.page_tables(0)
+        assert doc.all_page_tables()[0] is first
+        assert features['page_count'] == len(doc.timings())
+
+
+def test_extractor_reports_page_timings(long_statement):
+    """ExtractionResult.metadata should carry per-page timings."""
+    context = ExtractionContext(
+        file_path=long_statement,
+        mime_type='application/pdf',
+        file_size=long_statement.stat().st_size,
+        tenant_id="test_tenant"
+    )
+
+    result = PDFTemplateExtractor().extract(context)
+
+    assert result.success
+    assert len(result.metadata['page_timings_ms']) == result.metadata['page_count']
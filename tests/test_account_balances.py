@@ -0,0 +1,140 @@
+"""Tests for daily account balance snapshots behind the financial reports."""
+import threading
+from datetime import date, datetime
+
+from app.api.financial_reports.cashflow import _get_cash_balance
+from app.api.financial_reports.pnl import generate_pnl
+from app.db import account_balances
+from app.db.models import AccountBalanceDailyDB, JournalEntryDB
+
+CASH = "1000 Cash at Bank"
+SUPPLIES = "6100 Office Supplies"
+SALES = "8000 Sales Revenue"
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _je(je_id, day, debit_account, credit_account, amount, status="posted"):
+    return JournalEntryDB(
+        je_id=je_id,
+        date=datetime(2025, 9, day, 14, 30),
+        lines=[
+            {"account": debit_account, "debit": amount, "credit": 0.0},
+            {"account": credit_account, "debit": 0.0, "credit": amount},
+        ],
+        status=status,
+        company_id="company_001",
+    )
+
+
+def _snapshots(db):
+    return {
+        (row.account, row.day): (row.debit_cents, row.credit_cents)
+        for row in db.query(AccountBalanceDailyDB)
+    }
+
+
+def test_snapshots_follow_posting_and_backdating():
+    db = _session()
+    db.add_all([
+        _je("je_001", 1, CASH, SALES, 1000.0),
+        _je("je_002", 20, SUPPLIES, CASH, 250.0),
+        _je("je_003", 25, SUPPLIES, CASH, 99.0, status="proposed"),
+    ])
+    db.commit()
+
+    assert account_balances.balances_as_of(db, "company_001", date(2025, 9, 30))[CASH] == (100000, 25000)
+    assert (SUPPLIES, date(2025, 9, 25)) not in _snapshots(db)
+
+    # Posting later shifts the balance; a backdated entry shifts every later snapshot
+    je = db.query(JournalEntryDB).filter_by(je_id="je_003").one()
+    je.status = "posted"
+    db.add(_je("je_004", 10, SUPPLIES, CASH, 10.0))
+    db.commit()
+
+    snapshots = _snapshots(db)
+    assert snapshots[(CASH, date(2025, 9, 10))] == (100000, 1000)
+    assert snapshots[(CASH, date(2025, 9, 20))] == (100000, 26000)
+    assert snapshots[(CASH, date(2025, 9, 25))] == (100000, 35900)
+
+    db.delete(je)
+    db.commit()
+    assert account_balances.balances_as_of(db, "company_001", date(2025, 9, 30))[CASH] == (100000, 26000)
+
+
+def test_rebuild_matches_incremental():
+    db = _session()
+    db.add_all([
+        _je("je_001", 1, CASH, SALES, 1000.0),
+        _je("je_002", 20, SUPPLIES, CASH, 250.0),
+        _je("je_003", 20, SUPPLIES, CASH, 5.0),
+    ])
+    db.commit()
+    incremental = _snapshots(db)
+
+    assert account_balances.rebuild_balances(db) == len(incremental)
+    assert _snapshots(db) == incremental
+
+
+def test_reports_combine_snapshots():
+    db = _session()
+    db.add_all([
+        _je("je_001", 1, CASH, SALES, 1000.0),
+        _je("je_002", 20, SUPPLIES, CASH, 250.0),
+    ])
+    db.commit()
+
+    pnl = generate_pnl(db, "company_001", date(2025, 9, 2), date(2025, 9, 30))
+    assert pnl["revenue"]["total"] == 0.0
+    assert pnl["expenses"]["total"] == 250.0
+
+    assert _get_cash_balance(db, "company_001", date(2025, 9, 20), before=True) == 1000.0
+    assert _get_cash_balance(db, "company_001", date(2025, 9, 20)) == 750.0
+
+
+def test_backdated_posting_committed_mid_insert_is_not_lost(tmp_path):
+    """A backdated posting that commits while a later day's snapshot is inserted still shifts it."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'balances.db'}", connect_args={"timeout": 10})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        account_balances.apply_deltas(db, {("company_001", CASH, date(2025, 9, 1)): (100000, 0)})
+        db.commit()
+
+    def backdate():
+        with Session() as db:
+            account_balances.apply_deltas(db, {("company_001", CASH, date(2025, 9, 5)): (0, 500)})
+            db.commit()
+
+    backdating = threading.Thread(target=backdate)
+    writer = threading.current_thread()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def interleave(conn, cursor, statement, *args):
+        # Post the backdated entry just before the day-10 snapshot is inserted
+        if threading.current_thread() is writer and statement.startswith("INSERT INTO account_balances_daily"):
+            if backdating.ident is None:
+                backdating.start()
+                backdating.join(timeout=0.5)  # Blocks until commit once writers are serialized
+
+    with Session() as db:
+        account_balances.apply_deltas(db, {("company_001", CASH, date(2025, 9, 10)): (0, 2000)})
+        db.commit()
+    backdating.join()
+
+    with Session() as db:
+        snapshots = _snapshots(db)
+    assert snapshots[(CASH, date(2025, 9, 5))] == (100000, 500)
+    assert snapshots[(CASH, date(2025, 9, 10))] == (100000, 2500)
@@ -0,0 +1,105 @@
+"""Tests for batch OCR with the token cache."""
+import pytest
+
+from app.ingestion.extraction_cache import ExtractionCache
+from app.ocr import batch
+from app.ocr.batch import BatchOCR, text_from_data, tokens_from_data
+
+DATA = {
+    "text": ["ACME", "Store", "", "Total", "$12.50"],
+    "left": [10, 60, 0, 10, 60],
+    "top": [10, 10, 0, 40, 40],
+    "width": [40, 40, 0, 40, 40],
+    "height": [10, 10, 0, 10, 10],
+    "conf": [96, 90, -1, 88, "93"],
+    "block_num": [1, 1, 1, 2, 2],
+    "par_num": [1, 1, 1, 1, 1],
+    "line_num": [1, 1, 1, 1, 1],
+}
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch, tmp_path):
+    """Inline OCR that records calls; PDFs have two pages, "bad" files fail."""
+    calls = []
+
+    def ocr_page(path, page, dpi, lang, timeout):
+        calls.append((path, page))
+        if "bad" in path:
+            raise RuntimeError("tesseract crashed")
+        tokens = tokens_from_data(DATA, 100, 100, page or 0)
+        return {"page": page or 0, "text": f"{path}#{page}", "tokens": [vars(t) for t in tokens]}
+
+    monkeypatch.setattr(batch, "ocr_page", ocr_page)
+    monkeypatch.setattr(batch, "ocr_available", lambda: True)
+    monkeypatch.setattr(batch, "_tesseract_version", lambda: "5.3.0")
+    monkeypatch.setattr(batch, "_page_numbers", lambda path: [0, 1] if path.endswith(".pdf") else [None])
+
+    cache = ExtractionCache(prefix=str(tmp_path / "tokens"), enabled=True)
+    return calls, BatchOCR(workers=1, dpi=200, lang="eng", cache=cache)
+
+
+def _receipt(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_tokens_and_text_from_tesseract_data():
+    tokens = tokens_from_data(DATA, 100, 100, page=1)
+
+    assert [t.text for t in tokens] == ["ACME", "Store", "Total", "$12.50"]
+    assert tokens[0].x == 0.1 and tokens[0].confidence == 0.96
+    assert tokens[3].confidence == 0.93
+    assert {t.page for t in tokens} == {1}
+    assert text_from_data(DATA) == "ACME Store\n\nTotal $12.50"
+
+
+def test_reprocessing_is_served_from_cache(fake_ocr, tmp_path):
+    calls, ocr = fake_ocr
+    a = _receipt(tmp_path, "a.png", b"receipt a")
+    b = _receipt(tmp_path, "b.png", b"receipt b")
+    copy_of_a = _receipt(tmp_path, "a_copy.png", b"receipt a")
+
+    first = ocr.extract([a, b, copy_of_a])
+    assert len(calls) == 2  # Identical files are OCR'd once
+    assert [doc.cache_hit for doc in first] == [False, False, False]
+    assert [len(doc.tokens) for doc in first] == [4, 4, 4]
+
+    second = ocr.extract([b, a])
+    assert len(calls) == 2
+    assert [doc.cache_hit for doc in second] == [True, True]
+    assert second[1].tokens == first[0].tokens
+
+
+def test_pdf_pages_in_order_and_failures_isolated(fake_ocr, tmp_path):
+    calls, ocr = fake_ocr
+    pdf = _receipt(tmp_path, "statement.pdf", b"%PDF two pages")
+    bad = _receipt(tmp_path, "bad.png", b"unreadable")
+    missing = str(tmp_path / "missing.png")
+    progress = []
+
+    docs = ocr.extract([pdf, bad, missing], on_progress=progress.append)
+
+    assert [page.page for page in docs[0].pages] == [0, 1]
+    assert docs[0].text == f"{pdf}#0\n{pdf}#1"
+    assert {t.page for t in docs[0].tokens} == {0, 1}
+    assert "tesseract crashed" in docs[1].error
+    assert "Cannot read" in docs[2].error
+    assert sum(progress) == 3
+
+    # Failed files are not cached
+    ocr.extract([bad])
+    assert calls.count((bad, None)) == 2
+
+
+def test_cache_key_includes_render_settings(fake_ocr, tmp_path):
+    calls, ocr = fake_ocr
+    path = _receipt(tmp_path, "a.png", b"receipt a")
+
+    ocr.extract([path])
+    ocr.dpi = 300
+    [doc] = ocr.extract([path])
+
+    assert doc.cache_hit is False
+    assert len(calls) == 2
@@ -0,0 +1,113 @@
+"""Tests for the chunked bulk proposal pipeline."""
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db.models import JournalEntryDB, TransactionDB
+from app.decision.bulk_propose import BulkProposer
+from app.llm.categorize_post import LLMCategorizer, StubLLMProvider
+from app.rules.engine import RulesEngine
+
+CHART = [
+    "1000 Cash at Bank",
+    "6100 Office Supplies",
+    "6500 Travel & Transport",
+    "6999 Miscellaneous Expense",
+    "8000 Sales Revenue",
+]
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _txn(i, description, amount=-42.0):
+    return TransactionDB(
+        txn_id=f"txn_{i:04d}",
+        date=datetime(2025, 10, 1),
+        amount=amount,
+        currency="USD",
+        description=description,
+        counterparty=description.split()[0],
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_propose_tiers_and_progress():
+    """Rules, ML and LLM each take their share; every txn gets one balanced JE."""
+    db = _session()
+    db.add_all(
+        [_txn(i, "UBER *TRIP") for i in range(5)]
+        + [_txn(i, f"ML VENDOR {i}") for i in range(5, 10)]
+        + [_txn(i, f"UNKNOWN SHOP {i}") for i in range(10, 15)]
+        + [_txn(15, "UNKNOWN WIRE", amount=-9000.0)]
+    )
+    db.add(JournalEntryDB(je_id="je_existing", date=datetime(2025, 10, 1), lines=[],
+                          source_txn_id="txn_0000", status="posted"))
+    db.commit()
+
+    classifier = MagicMock(is_loaded=True)
+    classifier.predict_batch.side_effect = lambda rows, k: [
+        [{"account": "6100 Office Supplies", "probability": 0.95, "rank": 1}]
+        if row["description"].startswith("ML") else
+        [{"account": "6100 Office Supplies", "probability": 0.2, "rank": 1}]
+        for row in rows
+    ]
+    provider = StubLLMProvider()
+
+    proposer = BulkProposer(
+        db, CHART,
+        rules_engine=RulesEngine(),
+        classifier=classifier,
+        llm_categorizer=LLMCategorizer(provider=provider),
+        chunk_size=4,
+    )
+    events = [event async for event in proposer.run()]
+    summary = events[-1]
+
+    assert summary["event"] == "done"
+    assert summary["proposed"] == 15  # txn_0000 already has a JE
+    assert summary["by_method"] == {"rules": 4, "ml": 5, "llm": 6}
+    assert [e["processed"] for e in events if e.get("stage") == "write"] == [4, 8, 12, 15]
+    assert all(e["total"] == 15 for e in events[:-1])
+
+    # One ML call per chunk with rows rules did not take (chunk 1 is all rules)
+    assert classifier.predict_batch.call_count == 3
+    # Residue only; "UNKNOWN SHOP n" rows share one cache key
+    assert provider.transactions_seen == 2
+
+    jes = db.query(JournalEntryDB).filter(JournalEntryDB.je_id != "je_existing").all()
+    assert len(jes) == 15
+    for je in jes:
+        assert sum(l["debit"] for l in je.lines) == pytest.approx(sum(l["credit"] for l in je.lines))
+
+    large = db.query(JournalEntryDB).filter(JournalEntryDB.source_txn_id == "txn_0015").one()
+    assert large.needs_review == 1
+    assert large.memo.startswith("LARGE AMOUNT")
+
+    # Nothing left to process
+    assert proposer.count_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_propose_explicit_ids_without_ml():
+    """Explicit txn_ids are processed even without a classifier or LLM."""
+    db = _session()
+    db.add_all([_txn(i, f"SOMEWHERE {i}", amount=120.0) for i in range(3)])
+    db.commit()
+
+    proposer = BulkProposer(db, CHART)
+    events = [event async for event in proposer.run(["txn_0001", "txn_0002"])]
+
+    assert events[-1]["proposed"] == 2
+    assert events[-1]["by_method"]["llm"] == 2
+    je = db.query(JournalEntryDB).filter(JournalEntryDB.source_txn_id == "txn_0001").one()
+    assert je.lines[0] == {"account": "1000 Cash at Bank", "debit": 120.0, "credit": 0.0}
+    assert je.needs_review == 1
@@ -0,0 +1,101 @@
+"""Tests for chunked, checkpointed bulk categorization."""
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+from app.db.models import JobCheckpointDB, JournalEntryDB, JournalEntryLineDB, TransactionDB
+from app.worker import background_tasks
+
+COMPANY = "acme"
+JOB_ID = "job_categorize"
+
+
+class NoRules:
+    def match_transaction(self, txn):
+        return None
+
+
+@pytest.fixture
+def db_factory(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.db.models import Base
+
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    @contextmanager
+    def db_context():
+        db = factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    monkeypatch.setattr(background_tasks, "get_db_context", db_context)
+    monkeypatch.setattr(background_tasks, "_rules_engine", lambda: NoRules())
+    monkeypatch.setattr(background_tasks, "_current_job_id", lambda: JOB_ID)
+    monkeypatch.setattr(background_tasks, "update_job_progress", lambda *args, **kwargs: None)
+
+    db = factory()
+    for i in range(7):
+        db.add(TransactionDB(
+            txn_id=f"txn_{i:03d}",
+            date=datetime(2025, 1, i + 1),
+            amount=-10.0 - i,
+            description=f"Purchase {i}",
+            company_id=COMPANY,
+        ))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_chunks_are_merged_into_job_result(db_factory):
+    result = background_tasks.categorize_transactions_task(COMPANY, "tenant", chunk_size=3, workers=1)
+
+    assert result["chunks"] == 3
+    assert result["transactions_processed"] == result["journal_entries_created"] == 7
+    assert result["needs_review"] == 7
+
+    db = db_factory()
+    assert db.query(JournalEntryDB).filter_by(company_id=COMPANY).count() == 7
+    assert db.query(JournalEntryLineDB).count() == 14
+    assert db.query(JobCheckpointDB).count() == 0
+
+
+def test_retry_resumes_after_failed_chunk(db_factory, monkeypatch):
+    real_chunk = background_tasks.categorize_transactions_chunk
+
+    def flaky_chunk(company_id, transaction_ids, job_id=None, checkpoint_key=None):
+        if checkpoint_key == "chunk:00001":
+            raise RuntimeError("worker died")
+        return real_chunk(company_id, transaction_ids, job_id, checkpoint_key)
+
+    monkeypatch.setattr(background_tasks, "categorize_transactions_chunk", flaky_chunk)
+    with pytest.raises(RuntimeError):
+        background_tasks.categorize_transactions_task(COMPANY, "tenant", chunk_size=3, workers=1)
+
+    db = db_factory()
+    assert db.query(JournalEntryDB).count() == 4
+    assert {key for (key,) in db.query(JobCheckpointDB.key)} == {"plan", "chunk:00000", "chunk:00002"}
+    db.close()
+
+    monkeypatch.setattr(background_tasks, "categorize_transactions_chunk", real_chunk)
+    result = background_tasks.categorize_transactions_task(COMPANY, "tenant", chunk_size=3, workers=1)
+
+    assert result["chunks_resumed"] == 2
+    assert result["journal_entries_created"] == 7
+    db = db_factory()
+    assert db.query(JournalEntryDB).count() == 7
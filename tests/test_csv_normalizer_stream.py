@@ -0,0 +1,85 @@
+"""Tests for streaming CSV normalization."""
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.ingestion import dedupe
+from app.ingestion.normalize.csv_normalizer import CSVNormalizer, normalize_csv_chunks
+
+
+def _write_csv(tmp_path, rows, delimiter=";"):
+    path = tmp_path / "statement.csv"
+    lines = [delimiter.join(["Date", "Description", "Amount"])]
+    lines += [delimiter.join(r) for r in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_iter_chunks_matches_normalize(tmp_path):
+    """Chunked streaming yields the same transactions as normalize()."""
+    rows = [("2025-10-%02d" % (1 + i % 28), f"Vendor {i}", f"-{10 + i}.25") for i in range(23)]
+    path = _write_csv(tmp_path, rows)
+
+    normalizer = CSVNormalizer(path, encoding="utf-8")
+    chunks = list(normalizer.iter_chunks(chunk_size=5))
+
+    assert normalizer.delimiter == ";"
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    streamed = [t for c in chunks for t in c]
+    assert streamed == CSVNormalizer(path, encoding="utf-8").normalize()
+
+
+def test_row_errors_do_not_abort_stream(tmp_path):
+    """Unparseable rows are reported and the stream continues."""
+    rows = [
+        ("2025-10-01", "Coffee", "-4.50"),
+        ("2025-10-02", "Broken", "abc"),
+        ("2025-10-03", "Zero", "0"),
+        ("2025-10-04", "Rent", "-1500.00"),
+    ]
+    path = _write_csv(tmp_path, rows, delimiter=",")
+
+    normalizer = CSVNormalizer(path, encoding="utf-8")
+    txns = list(normalizer.iter_transactions())
+
+    assert [t.description for t in txns] == ["Coffee", "Rent"]
+    assert [e["row"] for e in normalizer.row_errors] == [2, 3]
+
+
+def test_deduplicate_stream_keeps_seen_fingerprints_across_chunks(tmp_path, monkeypatch):
+    """A repeat in a later chunk is still a batch duplicate."""
+    rows = [("2025-10-01", "Coffee", "-4.50"), ("2025-10-02", "Rent", "-900")] * 3
+    path = _write_csv(tmp_path, rows, delimiter=",")
+    monkeypatch.setattr(dedupe, "find_existing_fingerprints", lambda db, tenant_id, fps: {})
+
+    results = list(dedupe.deduplicate_stream(
+        MagicMock(), uuid4(), normalize_csv_chunks(path, encoding="utf-8", chunk_size=2)
+    ))
+
+    assert [len(unique) for unique, _, _ in results] == [2, 0, 0]
+    assert [len(dups) for _, dups, _ in results] == [0, 2, 2]
+
+
+def test_over_limit_file_yields_no_chunks(tmp_path, monkeypatch):
+    """The row limit is enforced before the first chunk, not midway through the stream."""
+    from app.ingestion.config import config
+    from app.ingestion.errors import TooManyRowsError
+
+    rows = [("2025-10-%02d" % (1 + i % 28), f"Vendor {i}", f"-{10 + i}.25") for i in range(12)]
+    path = _write_csv(tmp_path, rows, delimiter=",")
+    monkeypatch.setattr(config, "MAX_CSV_STREAM_ROWS", 10)
+
+    chunks = []
+    with pytest.raises(TooManyRowsError):
+        for chunk in CSVNormalizer(path, encoding="utf-8").iter_chunks(chunk_size=5):
+            chunks.append(chunk)
+    assert chunks == []
+
+    # Quoted line breaks inflate the line count but are not extra rows
+    path = tmp_path / "quoted.csv"
+    path.write_text(
+        "Date,Description,Amount\n" + "".join(f'2025-10-01,"Vendor\n{i}",-1.00\n' for i in range(10)),
+        encoding="utf-8",
+    )
+    assert len([t for c in normalize_csv_chunks(str(path), encoding="utf-8") for t in c]) == 10
@@ -12,7 +12,7 @@ import pytest
 import sys
 import numpy as np
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from unittest.mock import Mock, MagicMock
 
 # Add parent to path
@@ -20,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.ml.drift_monitor import (
     compute_psi,
+    compute_psi_from_counts,
     compute_js_divergence,
     DriftMonitor
 )
@@ -328,6 +329,166 @@ class TestEdgeCases:
         assert decision['needs_retrain'] == False  # Conservative
 
 
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+    
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _drift_settings():
+    settings = Mock()
+    settings.DRIFT_PSI_WARN = 0.10
+    settings.DRIFT_PSI_ALERT = 0.25
+    settings.DRIFT_ACC_DROP_PCT = 3.0
+    settings.DRIFT_OCR_CONF_Z = 2.0
+    settings.DRIFT_MIN_NEW_RECORDS = 1000
+    settings.DRIFT_MIN_DAYS_SINCE_TRAIN = 7
+    return settings
+
+
+class TestDriftSketches:
+    """Test histogram sketches and sketch-based signals."""
+    
+    def test_psi_from_counts_tracks_compute_psi(self):
+        """Fixed-bin PSI agrees with sample PSI on no-drift vs drift."""
+        from app.ml.drift_sketches import amount_counts
+        
+        rng = np.random.RandomState(0)
+        baseline = rng.lognormal(4, 1, 5000)
+        same = rng.lognormal(4, 1, 5000)
+        shifted = rng.lognormal(5, 1, 5000)
+        
+        assert compute_psi_from_counts(amount_counts(baseline), amount_counts(same)) < 0.10
+        sketch_psi = compute_psi_from_counts(amount_counts(baseline), amount_counts(shifted))
+        assert sketch_psi > 0.25
+        assert sketch_psi == pytest.approx(compute_psi(baseline, shifted), rel=0.35)
+    
+    def test_monitor_uses_sketches_per_company(self):
+        """Signals come from merged daily sketches, scoped by company."""
+        from types import SimpleNamespace
+        from app.db.models import ModelTrainingLogDB
+        from app.ml import drift_sketches
+        
+        db = _session()
+        trained_at = datetime(2025, 10, 1, 12, 0)
+        db.add(ModelTrainingLogDB(model_name="m", records_used=10, accuracy=0.9, trained_at=trained_at))
+        
+        def txns(vendors, company):
+            return [SimpleNamespace(amount=-50.0 - i % 7, counterparty=v, company_id=company)
+                    for i, v in enumerate(vendors)]
+        
+        old_mix = ["Uber", "Staples", "Adobe"] * 100
+        new_mix = ["Lyft", "Office Depot", "Figma"] * 100
+        drift_sketches.record_transactions(db, txns(old_mix, "c1"), day=date(2025, 9, 30))
+        drift_sketches.record_transactions(db, txns(old_mix, "c1"), day=date(2025, 10, 1))
+        drift_sketches.record_transactions(db, txns(new_mix, "c1"), day=date(2025, 10, 5))
+        drift_sketches.record_transactions(db, txns(old_mix, "c2"), day=date(2025, 9, 30))
+        drift_sketches.record_transactions(db, txns(old_mix, "c2"), day=date(2025, 10, 5))
+        db.commit()
+        
+        signals = DriftMonitor(db, _drift_settings(), company_id="c1").compute_signals()
+        txn_signals = signals['transaction_classifier']
+        assert txn_signals['new_records_since_train'] == 300
+        assert txn_signals['psi_vendor'] > 0.25
+        assert txn_signals['psi_amount'] < 0.10
+        assert signals['system']['total_records'] == 900
+        
+        decision = DriftMonitor(db, _drift_settings(), company_id="c1").decide(signals)
+        assert any('psi_vendor' in r for r in decision['reasons'])
+        
+        other = DriftMonitor(db, _drift_settings(), company_id="c2").compute_signals()
+        assert other['transaction_classifier']['psi_vendor'] < 0.10
+    
+    def test_backfill_from_transactions(self):
+        """First drift check builds sketches from existing transactions once."""
+        from app.db.models import TransactionDB
+        from app.ml import drift_sketches
+        
+        db = _session()
+        for i in range(25):
+            db.add(TransactionDB(
+                txn_id=f"t{i}", company_id="c1", date=datetime(2025, 10, 1), amount=-12.5,
+                currency="USD", description="COFFEE", counterparty="Cafe",
+                created_at=datetime(2025, 10, 1 + i % 3)
+            ))
+        db.commit()
+        
+        # Ingestion sketched a transaction before the first drift check
+        live = TransactionDB(
+            txn_id="live", company_id="c1", date=datetime(2025, 10, 5), amount=-3.0,
+            currency="USD", description="TEA", counterparty="Tea Shop", created_at=datetime(2025, 10, 5)
+        )
+        db.add(live)
+        drift_sketches.record_transactions(db, [live], day=date(2025, 10, 5))
+        db.commit()
+        
+        DriftMonitor(db, _drift_settings()).compute_signals()
+        DriftMonitor(db, _drift_settings()).compute_signals()
+        
+        assert not drift_sketches.backfill_pending(db)
+        assert drift_sketches.load_total(db) == 26
+        assert drift_sketches.load_total(db, start=date(2025, 10, 3)) == 9
+        assert drift_sketches.backfill(db) == 0
+    
+    def test_reupload_records_only_new_transactions(self):
+        """Uploading the same statement again does not re-add it to the sketches."""
+        from types import SimpleNamespace
+        from app.api.main import _store_uploaded_transactions
+        from app.db.models import TransactionDB
+        from app.ml import drift_sketches
+        
+        db = _session()
+        statement = [
+            SimpleNamespace(
+                txn_id=f"t{i}", date="2025-10-01", amount=-12.5, currency="USD",
+                description="COFFEE", counterparty="Cafe", raw="2025-10-01,-12.50,COFFEE", doc_ids=[]
+            )
+            for i in range(5)
+        ]
+        
+        assert _store_uploaded_transactions(db, statement, "acme") == 5
+        db.commit()
+        assert _store_uploaded_transactions(db, statement + [
+            SimpleNamespace(**dict(vars(statement[0]), txn_id="t5"))
+        ], "acme") == 1
+        db.commit()
+        
+        assert db.query(TransactionDB).count() == 6
+        assert drift_sketches.load_total(db) == 6
+        assert drift_sketches.load_total(db, company_id="acme") == 6
+        assert db.query(TransactionDB).filter_by(company_id="acme").count() == 6
+    
+    def test_add_counts_retries_when_row_created_concurrently(self, monkeypatch):
+        """A sketch row inserted by another writer is added to, not duplicated."""
+        from app.ml import drift_sketches
+        
+        db = _session()
+        txn = Mock(amount=-12.5, counterparty="Cafe", description="COFFEE", company_id="c1")
+        drift_sketches.record_transactions(db, [txn], day=date(2025, 10, 1))
+        db.commit()
+        
+        # The first lookup misses the row (as if it was committed just after)
+        lookup = drift_sketches._sketch_rows
+        missed = []
+        
+        def stale_lookup(*args):
+            if not missed:
+                missed.append(args)
+                return []
+            return lookup(*args)
+        
+        monkeypatch.setattr(drift_sketches, "_sketch_rows", stale_lookup)
+        drift_sketches.record_transactions(db, [txn, txn], day=date(2025, 10, 1))
+        db.commit()
+        
+        assert drift_sketches.load_total(db) == 3
+        assert drift_sketches.load_counts(db, drift_sketches.VENDOR_FEATURE).sum() == 3
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
 
@@ -0,0 +1,110 @@
+"""Tests for chunked, streaming CSV/IIF/Xero exports."""
+import gzip
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app.db.models import JournalEntryDB
+from app.exporters.csv_export import iter_journal_entries_csv
+from app.exporters.quickbooks_export import QuickBooksExporter, XeroExporter
+from app.exporters.streaming import ChunkWriter, gzip_chunks, session_chunks
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db, count):
+    db.add_all([
+        JournalEntryDB(
+            je_id=f"je_{i:05d}",
+            date=datetime(2025, 9, 1 + i % 28),
+            lines=[
+                {"account": "6100 Office Supplies", "debit": 10.0 + i, "credit": 0.0},
+                {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 10.0 + i},
+            ],
+            status="posted",
+            memo=f"entry {i}",
+            confidence=0.9,
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def test_journal_entries_stream_in_chunks():
+    db = _session()
+    _seed(db, 1200)
+
+    chunks = list(iter_journal_entries_csv(db, status="posted"))
+    lines = "".join(chunks).splitlines()
+
+    assert len(chunks) > 2
+    assert lines[0].startswith("JE ID,Date,Account")
+    assert len(lines) == 1 + 2 * 1200
+
+
+def test_iif_and_xero_stream():
+    db = _session()
+    assert "".join(QuickBooksExporter.iter_iif(db)) == ""
+
+    _seed(db, 3)
+    iif = "".join(QuickBooksExporter.iter_iif(db)).splitlines()
+    assert iif[0].startswith("!TRNS")
+    assert iif.count("ENDTRNS") == 3
+    assert iif[3] == "TRNS\tje_00000\tGENERAL JOURNAL\t09/01/2025\tOffice Supplies\t10.00\tentry 0"
+
+    xero = "".join(XeroExporter.iter_csv(db)).splitlines()
+    assert len(xero) == 1 + 6
+
+
+def test_gzip_chunks_round_trip():
+    writer = ChunkWriter(rows_per_chunk=2)
+    chunks = []
+    for i in range(5):
+        writer.writerow([i, "row"])
+        if writer.ready():
+            chunks.append(writer.drain())
+    chunks.append(writer.drain())
+
+    assert len(chunks) == 3
+    assert gzip.decompress(b"".join(gzip_chunks(chunks))).decode() == "".join(chunks)
+
+
+def test_session_chunks_owns_its_session():
+    """The stream opens its own session and closes it when done or abandoned."""
+    db = _session()
+    _seed(db, 3)
+    opened = []
+
+    def factory():
+        session = type(db)(bind=db.get_bind())
+        opened.append(session)
+        return session
+
+    stream = session_chunks(lambda session: iter_journal_entries_csv(session), session_factory=factory)
+    assert opened == []  # Nothing runs until the response body is iterated
+    assert len("".join(stream).splitlines()) == 1 + 2 * 3
+    assert not opened[0].in_transaction()
+
+    abandoned = session_chunks(lambda session: iter_journal_entries_csv(session), session_factory=factory)
+    next(abandoned)
+    opened[1].close = closed = MagicMock()
+    abandoned.close()  # Client disconnected mid-download
+    closed.assert_called_once()
+
+
+def test_export_rejects_bad_dates_before_streaming():
+    from fastapi.testclient import TestClient
+    from app.api.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/export/general-ledger", params={"start_date": "2025-13-01"})
+    assert response.status_code == 400
+    assert "start_date" in response.json()["detail"]
+    assert client.get("/api/export/trial-balance", params={"as_of_date": "yesterday"}).status_code == 400
@@ -0,0 +1,67 @@
+"""Tests for the content-addressed extraction cache."""
+from app.ingestion.extraction_cache import ExtractionCache, content_sha256
+
+CONTENT = b"date,amount,description\n2025-01-02,-12.50,COFFEE\n"
+ROWS = [{"txn_id": "t1", "date": "2025-01-02", "amount": -12.5, "description": "COFFEE"}]
+
+
+def _cache(tmp_path):
+    return ExtractionCache(prefix=str(tmp_path / "extractions"), enabled=True)
+
+
+def test_reupload_skips_extraction(tmp_path):
+    cache = _cache(tmp_path)
+    calls = []
+
+    def extract():
+        calls.append(1)
+        return ROWS
+
+    first, first_hit = cache.get_or_extract(CONTENT, "csv", "1", extract)
+    second, second_hit = cache.get_or_extract(CONTENT, "csv", "1", extract)
+
+    assert (first_hit, second_hit) == (False, True)
+    assert second == first == ROWS
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["parsers"]["csv"]["hits"] == 1
+
+
+def test_entries_are_compressed_and_versioned(tmp_path):
+    cache = _cache(tmp_path)
+    sha = content_sha256(CONTENT)
+    cache.put(sha, "csv", "1", ROWS)
+
+    path = tmp_path / "extractions" / "csv" / "1" / sha[:2] / f"{sha}.json.gz"
+    assert path.read_bytes()[:2] == b"\x1f\x8b"
+
+    # A parser upgrade changes the key, so the old entry is not used
+    assert cache.get(sha, "csv", "2") is None
+    assert cache.get(sha, "csv", "1") == ROWS
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = _cache(tmp_path)
+    sha = content_sha256(CONTENT)
+    path = tmp_path / "extractions" / "csv" / "1" / sha[:2] / f"{sha}.json.gz"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not gzip")
+
+    rows, hit = cache.get_or_extract(CONTENT, "csv", "1", lambda: ROWS)
+
+    assert hit is False and rows == ROWS
+    assert cache.stats()["errors"] == 1
+    assert cache.get(sha, "csv", "1") == ROWS
+
+
+def test_disabled_cache_always_extracts(tmp_path):
+    cache = ExtractionCache(prefix=str(tmp_path), enabled=False)
+
+    cache.get_or_extract(CONTENT, "csv", "1", lambda: ROWS)
+    _, hit = cache.get_or_extract(CONTENT, "csv", "1", lambda: ROWS)
+
+    assert hit is False
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+"""Tests for batch fingerprint deduplication."""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from app.ingestion import dedupe
+from app.ingestion.schemas import CanonicalTransaction
+
+
+def _txn(description, amount="-12.50", day=1):
+    return CanonicalTransaction(
+        account_id="ACC-1",
+        post_date=date(2025, 10, day),
+        description=description,
+        amount=Decimal(amount),
+        source="csv",
+        source_confidence=Decimal("0.99"),
+    )
+
+
+def test_deduplicate_batch_resolves_fingerprints_in_one_lookup(monkeypatch):
+    """Existing fingerprints are resolved once for the whole batch."""
+    txns = [
+        _txn("COFFEE SHOP"),
+        _txn("coffee  shop"),  # same fingerprint as above
+        _txn("RENT", "-1500.00"),
+        _txn("RENT", "-1500.00"),  # also already in the database
+        _txn("PAYROLL", "2000.00", day=2),
+    ]
+    rent_fp = dedupe.generate_fingerprint("ACC-1", date(2025, 10, 1), Decimal("-1500.00"), "RENT")
+    existing_id = uuid4()
+
+    calls = []
+
+    def fake_lookup(db, tenant_id, fingerprints):
+        calls.append(list(fingerprints))
+        return {rent_fp: existing_id}
+
+    monkeypatch.setattr(dedupe, "find_existing_fingerprints", fake_lookup)
+
+    unique, duplicates, existing_count = dedupe.deduplicate_batch(MagicMock(), uuid4(), txns)
+
+    assert len(calls) == 1 and len(calls[0]) == len(txns)
+    assert [t.description for t in unique] == ["COFFEE SHOP", "PAYROLL"]
+    assert [t.description for t in duplicates] == ["coffee  shop", "RENT", "RENT"]
+    assert existing_count == 2
+
+
+def test_find_existing_fingerprints_empty_input_skips_query():
+    """No fingerprints means no database round trip."""
+    db = MagicMock()
+
+    assert dedupe.find_existing_fingerprints(db, uuid4(), []) == {}
+    db.query.assert_not_called()
@@ -0,0 +1,58 @@
+"""Tests for ingestion reconciliation guards."""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.ingestion.reconcile import (
+    TransactionColumns,
+    check_running_balance,
+    reconcile_transactions,
+)
+from app.ingestion.schemas import CanonicalTransaction
+
+
+def _txn(day, amount, balance=None, account_id="ACC-1"):
+    return CanonicalTransaction(
+        account_id=account_id,
+        post_date=date(2025, 1, 1) + timedelta(days=day),
+        description="Test",
+        amount=Decimal(amount),
+        balance=Decimal(balance) if balance is not None else None,
+        source="csv",
+        source_confidence=Decimal("0.9"),
+    )
+
+
+def test_running_balance_sorts_by_date_and_reports_mismatches():
+    """Balances are checked in date order; mismatches keep their message format."""
+    txns = [
+        _txn(2, "-20.00", "70.00"),
+        _txn(0, "100.00", "100.00"),
+        _txn(1, "-10.00", "90.00"),
+        _txn(3, "5.00", "80.00"),  # expected 75.00
+        _txn(4, "1.00"),  # no balance, skipped
+    ]
+
+    passed, details = check_running_balance(txns)
+
+    assert not passed
+    assert details["validated_count"] == 2
+    assert details["total_with_balance"] == 4
+    assert details["errors"] == [
+        "Balance mismatch on 2025-01-04: expected 75.00, got 80.00 (diff: 5.00)"
+    ]
+
+
+def test_columns_and_list_give_identical_results():
+    """The columnar path produces the same result as the list path."""
+    txns = [_txn(0, "500.00", "500.00", "A")]
+    txns += [_txn(i * 45, "-12.34", None, "B") for i in range(1, 6)]
+    txns.append(_txn(-4000, "3.21"))
+
+    from_list = reconcile_transactions(txns)
+    from_columns = reconcile_transactions(TransactionColumns.from_transactions(txns))
+
+    assert from_list.model_dump() == from_columns.model_dump()
+    assert any("Multiple accounts" in w for w in from_list.warnings)
+    dates = next(c for c in from_list.checks if c["name"] == "date_sequence")["details"]
+    assert any("older than 10 years" in w for w in dates["warnings"])
+    assert dates["large_gaps"][0]["gap_days"] > 90
@@ -0,0 +1,67 @@
+"""Tests for coalesced job progress reporting and the job events stream."""
+import json
+
+import pytest
+
+from app.worker.progress import ProgressReporter, job_events
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, job_id, progress, message="", details=None):
+        self.calls.append((job_id, progress, message, details))
+
+
+def test_per_row_updates_are_coalesced():
+    update = Recorder()
+    with ProgressReporter("job_1", update, start=10, end=90, total=10_000, min_interval=60) as progress:
+        for i in range(10_000):
+            progress.advance(message=f"Row {i + 1}")
+
+    # First change is written right away, the rest collapse into the final write
+    assert len(update.calls) <= 2
+    job_id, last_progress, message, details = update.calls[-1]
+    assert (job_id, last_progress, message) == ("job_1", 90, "Row 10000")
+    assert details["processed"] == details["total"] == 10_000
+    assert details["eta_seconds"] == 0
+    assert details["throughput"] > 0
+
+
+def test_milestones_are_always_written():
+    update = Recorder()
+    progress = ProgressReporter("job_2", update, min_interval=60)
+    progress.report(10, "Fetching")
+    progress.report(10, "Still fetching")
+    progress.close(100, "Done")
+
+    # Forced writes bypass the interval; a pending milestone may still be
+    # superseded by a newer one before the flusher runs
+    assert 1 <= len(update.calls) <= 3
+    assert update.calls[-1][1:3] == (100, "Done")
+
+
+def test_reporter_without_job_is_silent():
+    update = Recorder()
+    with ProgressReporter(None, update, total=5) as progress:
+        for _ in range(5):
+            progress.advance()
+
+    assert update.calls == []
+    assert progress.details()["processed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_job_events_emit_changes_until_done():
+    statuses = iter([
+        {"status": "running", "progress": 10},
+        {"status": "running", "progress": 10},
+        {"status": "running", "progress": 60},
+        {"status": "complete", "progress": 100},
+    ])
+
+    frames = [frame async for frame in job_events(lambda _: next(statuses), "job_3", poll_interval=0)]
+
+    assert [frame.split("\n")[0] for frame in frames] == ["event: progress", "event: progress", "event: done"]
+    assert json.loads(frames[-1].split("data: ")[1])["progress"] == 100
@@ -0,0 +1,127 @@
+"""Tests for the journal entry lines projection and SQL-side report aggregation."""
+import io
+from datetime import date, datetime
+
+from app.api.financial_reports.balance_sheet import generate_balance_sheet
+from app.api.financial_reports.pnl import generate_pnl
+from app.db import journal_lines
+from app.db.models import JournalEntryDB, JournalEntryLineDB
+from app.exporters.csv_export import export_general_ledger_csv, export_trial_balance_csv
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _je(je_id, day, lines, status="posted", company_id="company_001"):
+    return JournalEntryDB(
+        je_id=je_id,
+        date=datetime(2025, 9, day),
+        lines=lines,
+        status=status,
+        company_id=company_id,
+        memo=f"memo {je_id}",
+    )
+
+
+def _seed(db):
+    db.add_all([
+        _je("je_001", 1, [
+            {"account": "1000 Cash at Bank", "debit": 1000.10, "credit": 0.0},
+            {"account": "8000 Sales Revenue", "debit": 0.0, "credit": 1000.10},
+        ]),
+        _je("je_002", 15, [
+            {"account": "6100 Office Supplies", "debit": 250.0, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 250.0},
+        ]),
+        _je("je_003", 20, [
+            {"account": "6100 Office Supplies", "debit": 99.0, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 99.0},
+        ], status="proposed"),
+        _je("je_004", 20, [
+            {"account": "6100 Office Supplies", "debit": 5.0, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 5.0},
+        ], company_id="company_002"),
+    ])
+    db.commit()
+
+
+def test_lines_follow_entry_writes():
+    """Insert, update and delete of an entry keep its line rows in sync."""
+    db = _session()
+    _seed(db)
+    assert db.query(JournalEntryLineDB).count() == 8
+
+    je = db.query(JournalEntryDB).filter_by(je_id="je_003").one()
+    je.status = "posted"
+    je.lines = [{"account": "6100 Office Supplies", "debit": 12.34, "credit": 12.34}]
+    db.commit()
+    rows = db.query(JournalEntryLineDB).filter_by(je_id="je_003").all()
+    assert [(r.status, r.debit_cents, r.credit_cents) for r in rows] == [("posted", 1234, 1234)]
+
+    db.delete(je)
+    db.commit()
+    assert db.query(JournalEntryLineDB).filter_by(je_id="je_003").count() == 0
+
+
+def test_account_totals_groups_in_cents():
+    db = _session()
+    _seed(db)
+
+    totals = journal_lines.account_totals(db, company_id="company_001")
+
+    assert totals == {
+        "1000 Cash at Bank": (100010, 25000),
+        "6100 Office Supplies": (25000, 0),
+        "8000 Sales Revenue": (0, 100010),
+    }
+    assert journal_lines.account_totals(db, company_id="company_001", before=date(2025, 9, 2)) == {
+        "1000 Cash at Bank": (100010, 0),
+        "8000 Sales Revenue": (0, 100010),
+    }
+
+
+def test_rebuild_and_bulk_mappings():
+    db = _session()
+    _seed(db)
+    db.query(JournalEntryLineDB).delete()
+    db.commit()
+
+    assert journal_lines.rebuild_lines(db) == 8
+
+    mappings = [{"je_id": "je_bulk", "date": datetime(2025, 9, 3), "status": "posted",
+                 "company_id": "company_001",
+                 "lines": [{"account": "6100 Office Supplies", "debit": 1.0, "credit": 0.0},
+                           {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 1.0}]}]
+    db.bulk_insert_mappings(JournalEntryDB, mappings)
+    assert journal_lines.insert_lines_for_mappings(db, mappings) == 2
+    db.commit()
+    assert db.query(JournalEntryLineDB).count() == 10
+
+
+def test_reports_use_line_aggregates():
+    db = _session()
+    _seed(db)
+
+    pnl = generate_pnl(db, "company_001", date(2025, 9, 1), date(2025, 9, 30))
+    assert pnl["revenue"]["total"] == 1000.10
+    assert pnl["expenses"]["total"] == 250.0
+
+    bs = generate_balance_sheet(db, "company_001", date(2025, 9, 30))
+    assert bs["assets"]["total"] == 750.10
+
+    tb = io.StringIO()
+    export_trial_balance_csv(db, tb)
+    assert "TOTALS,1255.10,1255.10,0.00" in tb.getvalue()
+
+    gl = io.StringIO()
+    export_general_ledger_csv(db, gl, start_date="2025-09-15")
+    ledger = gl.getvalue().strip().splitlines()
+    assert len(ledger) == 1 + 4
+    assert ledger[1].startswith("2025-09-15,je_002,6100 Office Supplies,250.00,0.00,memo je_002")
@@ -0,0 +1,164 @@
+"""Tests for batched, cached LLM categorization."""
+import asyncio
+
+import pytest
+
+from app.llm.categorize_post import CategorizationCache, LLMCategorizer, StubLLMProvider
+
+CHART = [
+    "1000 Cash at Bank",
+    "6100 Office Supplies",
+    "6300 Software Subscriptions",
+    "6500 Travel & Transport",
+    "6999 Miscellaneous Expense",
+    "8000 Sales Revenue",
+]
+
+
+def _txn(i, description, counterparty="", amount=-25.0):
+    return {
+        "txn_id": f"t{i}",
+        "date": "2025-10-01",
+        "amount": amount,
+        "description": description,
+        "counterparty": counterparty,
+    }
+
+
+class _TrackingProvider(StubLLMProvider):
+    """Stub provider that records peak concurrency."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def categorize(self, payloads, chart_of_accounts, historical_mappings):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return await super().categorize(payloads, chart_of_accounts, historical_mappings)
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_size_and_concurrency():
+    """Distinct vendors are packed per prompt with a concurrency cap."""
+    provider = _TrackingProvider()
+    categorizer = LLMCategorizer(provider=provider)
+    txns = [_txn(i, f"VENDOR {chr(65 + i % 26)}{chr(65 + i // 26)}") for i in range(40)]
+
+    results = await categorizer.categorize_batch_async(txns, CHART, batch_size=5, max_concurrency=2)
+
+    assert len(results) == 40
+    assert provider.calls == 8
+    assert provider.peak == 2
+    for r in results:
+        lines = r["journal_entry"]["lines"]
+        assert sum(l["debit"] for l in lines) == sum(l["credit"] for l in lines) == 25.0
+
+
+@pytest.mark.asyncio
+async def test_repeated_vendors_hit_the_model_once():
+    """Same vendor/description/sign is answered from the cache."""
+    provider = StubLLMProvider()
+    categorizer = LLMCategorizer(provider=provider)
+
+    first = await categorizer.categorize_batch_async([
+        _txn(1, "UBER *TRIP 1234", "Uber"),
+        _txn(2, "uber trip 9876", "UBER"),  # same key after normalization
+        _txn(3, "GITHUB INC", "GitHub"),
+    ], CHART)
+    assert provider.transactions_seen == 2
+    assert first[0]["account"] == first[1]["account"] == "6500 Travel & Transport"
+    assert first[2]["account"] == "6300 Software Subscriptions"
+
+    again = await categorizer.categorize_batch_async([_txn(4, "UBER TRIP 5555", "Uber", amount=-80.0)], CHART)
+    assert provider.transactions_seen == 2
+    assert again[0]["journal_entry"]["lines"][0] == {
+        "account": "6500 Travel & Transport", "debit": 80.0, "credit": 0.0
+    }
+
+    # A different amount sign is a different key
+    await categorizer.categorize_batch_async([_txn(5, "UBER TRIP", "Uber", amount=80.0)], CHART)
+    assert provider.transactions_seen == 3
+
+
+@pytest.mark.asyncio
+async def test_provider_failure_falls_back_without_caching():
+    """A failed batch uses the fallback and is retried next time."""
+
+    class FailingProvider(StubLLMProvider):
+        async def categorize(self, *args):
+            self.calls += 1
+            raise RuntimeError("boom")
+
+    provider = FailingProvider()
+    categorizer = LLMCategorizer(provider=provider)
+
+    results = await categorizer.categorize_batch_async([_txn(1, "ACME")], CHART)
+
+    assert results[0]["rationale"] == "Fallback: LLM unavailable or failed"
+    assert len(categorizer.cache) == 0
+
+
+def test_cache_key_normalizes_vendor_text():
+    """Digits, punctuation and case don't change the key."""
+    a = CategorizationCache.key(_txn(1, "SQ *BLUE BOTTLE #123", "Blue Bottle"), CHART)
+    b = CategorizationCache.key(_txn(2, "sq blue bottle 987", "BLUE BOTTLE"), CHART)
+    c = CategorizationCache.key(_txn(3, "sq blue bottle 987", "BLUE BOTTLE", amount=5.0), CHART)
+
+    assert a == b != c
+
+
+@pytest.mark.asyncio
+async def test_cached_decision_does_not_skip_review_for_large_amounts():
+    """A decision cached for a small amount is not reused for a large one."""
+    provider = StubLLMProvider()
+    categorizer = LLMCategorizer(provider=provider)
+
+    small = await categorizer.categorize_batch_async([_txn(1, "DELTA AIR 0062", "Delta", amount=-300.0)], CHART)
+    assert small[0]["needs_review"] is False
+
+    large = await categorizer.categorize_batch_async([_txn(2, "DELTA AIR 0062", "Delta", amount=-7500.0)], CHART)
+    assert provider.transactions_seen == 2  # Different amount band, different key
+    assert large[0]["needs_review"] is True
+
+    # Applying any cached decision to a large amount still requires review
+    key = CategorizationCache.key(_txn(3, "DELTA AIR 0062", "Delta", amount=-9000.0), CHART)
+    categorizer.cache.put(key, {"account": "6500 Travel & Transport", "confidence": 0.95,
+                                "needs_review": False, "rationale": "cached"})
+    cached = await categorizer.categorize_batch_async([_txn(3, "DELTA AIR 0062", "Delta", amount=-9000.0)], CHART)
+    assert cached[0]["needs_review"] is True
+
+
+@pytest.mark.asyncio
+async def test_cached_decisions_follow_tenant_history():
+    """Tenants with different vendor history never share a cached decision."""
+    provider = StubLLMProvider()
+    categorizer = LLMCategorizer(provider=provider)
+    alpha_history = [{"counterparty": "Acme", "account": "6100 Office Supplies"}]
+    beta_history = [{"counterparty": "Acme", "account": "6300 Software Subscriptions"}]
+
+    alpha = await categorizer.categorize_batch_async(
+        [_txn(1, "ACME CORP", "Acme")], CHART, [alpha_history], namespace="alpha"
+    )
+    beta = await categorizer.categorize_batch_async(
+        [_txn(2, "ACME CORP", "Acme")], CHART, [beta_history], namespace="beta"
+    )
+    assert alpha[0]["account"] == "6100 Office Supplies"
+    assert beta[0]["account"] == "6300 Software Subscriptions"
+
+    # Same tenant, same history: served from the cache
+    again = await categorizer.categorize_batch_async(
+        [_txn(3, "ACME CORP", "Acme")], CHART, [alpha_history], namespace="alpha"
+    )
+    assert again[0]["account"] == "6100 Office Supplies"
+    assert provider.transactions_seen == 2
+
+    # Duplicates in one batch are only merged when their history matches
+    mixed = await categorizer.categorize_batch_async(
+        [_txn(4, "ACME LTD", "Acme"), _txn(5, "ACME LTD", "Acme")], CHART,
+        [alpha_history, beta_history], namespace="alpha"
+    )
+    assert [r["account"] for r in mixed] == ["6100 Office Supplies", "6300 Software Subscriptions"]
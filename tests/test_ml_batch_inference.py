@@ -0,0 +1,116 @@
+"""Tests for vectorized batch inference in MLClassifier and DecisionEngine."""
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from app.decision.engine import DecisionEngine
+from app.ml.classifier import MLClassifier
+
+
+VENDORS = [
+    ("AMAZON MKTPLACE", "Amazon", "6100 Office Supplies"),
+    ("UBER TRIP", "Uber", "6500 Travel & Transport"),
+    ("ADP PAYROLL", "ADP", "6400 Payroll Expenses"),
+    ("STRIPE TRANSFER", "Stripe", "8000 Sales Revenue"),
+    ("SHELL OIL", "", "6500 Travel & Transport"),
+]
+
+
+def _rows(n=400):
+    rng = np.random.RandomState(0)
+    rows = []
+    for i in range(n):
+        desc, cp, account = VENDORS[rng.randint(len(VENDORS))]
+        rows.append({
+            "description": f"{desc} {i % 17}",
+            "counterparty": cp,
+            "amount": float(rng.choice([-12.5, -250.0, 300.0, 0.0])),
+            "date": date(2025, rng.randint(1, 13), rng.randint(1, 29)),
+            "label": account,
+        })
+    return rows
+
+
+@pytest.fixture
+def classifier():
+    """Classifier with a small model trained in-process."""
+    rows = _rows()
+    clf = MLClassifier(model_path=Path("/nonexistent/classifier.pkl"))
+    label_encoder = LabelEncoder().fit([r["label"] for r in rows])
+    clf.artifacts = {
+        "desc_vectorizer": TfidfVectorizer().fit([r["description"] for r in rows]),
+        "counterparty_vectorizer": TfidfVectorizer().fit([r["counterparty"] for r in rows]),
+        "label_encoder": label_encoder,
+        "model_type": "logistic_regression",
+    }
+    clf.is_loaded = True
+
+    X = clf._prepare_features_batch(pd.DataFrame(rows))
+    y = label_encoder.transform([r["label"] for r in rows])
+    clf.artifacts["model"] = LogisticRegression(max_iter=500).fit(X, y)
+    return clf
+
+
+def test_batch_features_match_single_row_features(classifier):
+    """Batch feature matrix equals stacked per-row feature matrices."""
+    rows = _rows(20)
+    batch = classifier._prepare_features_batch(pd.DataFrame(rows)).toarray()
+
+    for i, r in enumerate(rows):
+        single = classifier._prepare_features(
+            r["description"], r["counterparty"], r["amount"],
+            datetime.combine(r["date"], datetime.min.time())
+        ).toarray()
+        np.testing.assert_allclose(batch[i], single[0])
+
+
+def test_predict_batch_matches_predict_top_k(classifier):
+    """predict_batch returns the same top-k as the per-row path."""
+    rows = _rows(100)
+    batch = classifier.predict_batch(rows, k=3, batch_size=32)
+
+    assert len(batch) == len(rows)
+    for r, preds in zip(rows, batch):
+        single = classifier.predict_top_k(
+            r["description"], r["counterparty"], r["amount"],
+            datetime.combine(r["date"], datetime.min.time()), k=3
+        )
+        assert [p["account"] for p in preds] == [p["account"] for p in single]
+        assert [p["rank"] for p in preds] == [1, 2, 3]
+        for p, q in zip(preds, single):
+            assert p["probability"] == pytest.approx(q["probability"])
+
+
+def test_predict_batch_without_model_returns_empty_rows():
+    """An unloaded classifier returns one empty list per row."""
+    clf = MLClassifier(model_path=Path("/nonexistent/classifier.pkl"))
+    clf.artifacts = None
+    clf.is_loaded = False
+
+    assert clf.predict_batch(_rows(3)) == [[], [], []]
+
+
+def test_categorize_batch_matches_categorize(classifier):
+    """DecisionEngine.categorize_batch routes exactly like categorize()."""
+    engine = DecisionEngine(use_rules=False, use_ml=True, use_llm=False, ml_threshold=0.6)
+    engine.ml_classifier = classifier
+    rows = _rows(30)
+
+    batch = engine.categorize_batch(rows)
+
+    for r, decision in zip(rows, batch):
+        single = engine.categorize(
+            amount=r["amount"],
+            description=r["description"],
+            counterparty=r["counterparty"],
+            date=r["date"],
+        )
+        assert decision["account"] == single["account"]
+        assert decision["method"] == single["method"]
+        assert decision["confidence"] == pytest.approx(single["confidence"])
@@ -0,0 +1,100 @@
+"""Tests for the model registry and classifier hot swap."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from app.ml import classifier as classifier_module
+from app.ml.classifier import MLClassifier
+from app.ml.registry import ModelRegistry
+
+
+def _artifacts(mapping):
+    """Tiny logistic regression trained on {description: account}."""
+    rows = [
+        {"description": f"{desc} {i}", "counterparty": desc.split()[0], "amount": -20.0,
+         "date": date(2025, 1, 1 + i), "label": account}
+        for desc, account in mapping.items()
+        for i in range(10)
+    ]
+    frame = pd.DataFrame(rows)
+    label_encoder = LabelEncoder().fit(frame["label"])
+    artifacts = {
+        "desc_vectorizer": TfidfVectorizer().fit(frame["description"]),
+        "counterparty_vectorizer": TfidfVectorizer().fit(frame["counterparty"]),
+        "label_encoder": label_encoder,
+        "model_type": "logistic_regression",
+        "trained_at": "2025-01-01T00:00:00",
+        "test_accuracy": 1.0,
+    }
+    clf = MLClassifier(model_path=None, poll_interval=0)
+    clf.artifacts, clf.is_loaded = artifacts, True
+    X = clf._prepare_features_batch(frame)
+    artifacts["model"] = LogisticRegression(max_iter=500).fit(X, label_encoder.transform(frame["label"]))
+    return artifacts
+
+
+V1 = {"UBER TRIP": "6500 Travel & Transport", "STAPLES STORE": "6100 Office Supplies"}
+V2 = {"UBER TRIP": "6100 Office Supplies", "STAPLES STORE": "6500 Travel & Transport"}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    classifier_module._model_cache.clear()
+    yield
+    classifier_module._model_cache.clear()
+
+
+def _predict(clf):
+    return clf.predict_batch([{"description": "UBER TRIP 3", "counterparty": "UBER",
+                               "amount": -20.0, "date": date(2025, 1, 4)}], k=1)[0][0]["account"]
+
+
+def test_publish_is_content_addressed(tmp_path):
+    """Same content -> same version; promote moves CURRENT."""
+    registry = ModelRegistry(tmp_path)
+    artifacts = _artifacts(V1)
+
+    version = registry.publish(artifacts, metadata={"note": "v1"})
+    assert registry.publish(registry.artifact_path(version)) == version
+    assert registry.current_version() is None
+
+    registry.promote(version)
+    assert registry.current_version() == version
+    assert registry.manifest(version)["note"] == "v1"
+    assert [m["version"] for m in registry.list_versions()] == [version]
+
+    with pytest.raises(ValueError):
+        registry.promote("deadbeef")
+
+
+def test_classifier_hot_swaps_promoted_version(tmp_path):
+    """A newly promoted version is loaded in the background and swapped in."""
+    registry = ModelRegistry(tmp_path)
+    v1 = registry.publish(_artifacts(V1))
+    v2 = registry.publish(_artifacts(V2))
+    registry.promote(v1)
+
+    clf = MLClassifier(model_path=tmp_path / "missing.pkl", registry=registry, poll_interval=0)
+    assert clf.version == v1
+    assert _predict(clf) == "6500 Travel & Transport"
+
+    # Weights are memory-mapped from the registry file
+    assert isinstance(clf.artifacts["model"].coef_, np.memmap)
+
+    registry.promote(v2)
+    assert clf.refresh() is True
+    clf._loader.join(timeout=10)
+
+    assert clf.version == v2
+    assert _predict(clf) == "6100 Office Supplies"
+    assert clf.refresh() is False
+
+    # Rollback is a promote of the old version
+    registry.promote(v1)
+    clf.refresh(wait=True)
+    assert clf.version == v1
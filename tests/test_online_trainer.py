@@ -0,0 +1,153 @@
+"""Tests for incremental online classifier training."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.models import JournalEntryDB, ModelTrainingLogDB, OnlineTrainingCheckpointDB, TransactionDB
+from app.ml.classifier import MLClassifier
+from app.ml.online_trainer import IncrementalTrainer, is_holdout
+from app.ml.registry import ModelRegistry
+
+VENDORS = [
+    ("UBER TRIP", "Uber", "6500 Travel & Transport"),
+    ("STAPLES STORE", "Staples", "6100 Office Supplies"),
+    ("ADOBE CREATIVE", "Adobe", "6300 Software Subscriptions"),
+]
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _feedback(db, start, n, vendors, updated_at, status="approved"):
+    for i in range(start, start + n):
+        desc, cp, account = vendors[i % len(vendors)]
+        db.add(TransactionDB(
+            txn_id=f"txn_{i:05d}", date=datetime(2025, 1, 1) + timedelta(days=i % 28),
+            amount=-(10.0 + i % 50), currency="USD", description=f"{desc} {i}", counterparty=cp,
+        ))
+        db.add(JournalEntryDB(
+            je_id=f"je_{i:05d}", date=datetime(2025, 1, 1), source_txn_id=f"txn_{i:05d}",
+            lines=[
+                {"account": account, "debit": 10.0, "credit": 0.0},
+                {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 10.0},
+            ],
+            status=status, updated_at=updated_at,
+        ))
+    db.commit()
+
+
+def _trained(start, n):
+    """Feedback rows in [start, start + n) that are not held out."""
+    return sum(not is_holdout(f"je_{i:05d}") for i in range(start, start + n))
+
+
+def test_incremental_training_uses_only_new_feedback(tmp_path):
+    """Second run trains on rows after the checkpoint; new accounts force a rebuild."""
+    db = _session()
+    registry = ModelRegistry(tmp_path)
+    trainer = IncrementalTrainer(db, registry, chunk_size=100)
+
+    _feedback(db, 0, 300, VENDORS[:2], datetime(2025, 2, 1))
+    _feedback(db, 300, 20, VENDORS[:2], datetime(2025, 2, 1), status="proposed")  # not feedback
+
+    first = trainer.train()
+    assert first["mode"] == "rebuild"
+    assert first["records_used"] == _trained(0, 300)
+    assert first["metrics"]["test_accuracy"] > 0.9
+    assert first["metrics"]["test_samples"] == 300 - _trained(0, 300)
+
+    _feedback(db, 400, 40, VENDORS[:2], datetime(2025, 2, 2))
+    second = trainer.train()
+    assert second["mode"] == "incremental"
+    assert second["records_used"] == _trained(400, 40)
+    assert second["base_version"] == first["version"]
+
+    # Nothing new: no new checkpoint
+    assert trainer.train()["records_used"] == 0
+    assert db.query(OnlineTrainingCheckpointDB).count() == 2
+    assert db.query(ModelTrainingLogDB).count() == 0
+
+    checkpoint = trainer.last_checkpoint()
+    assert checkpoint.version == second["version"]
+    assert checkpoint.watermark_at.date() == datetime(2025, 2, 2).date()
+
+    _feedback(db, 500, 30, VENDORS, datetime(2025, 2, 3))
+    third = trainer.train()
+    assert third["mode"] == "rebuild"
+    assert third["records_used"] == _trained(0, 300) + _trained(400, 40) + _trained(500, 30)
+
+
+def test_watermark_keeps_rows_sharing_the_checkpoint_timestamp(tmp_path):
+    """Feedback committed later with the checkpoint's updated_at is still trained on."""
+    db = _session()
+    trainer = IncrementalTrainer(db, ModelRegistry(tmp_path), chunk_size=100)
+    stamp = datetime(2025, 2, 1, 12, 0, 0)
+
+    _feedback(db, 0, 200, VENDORS[:2], stamp)
+    trainer.train()
+
+    # Same timestamp, ordered after the checkpoint row by je_id
+    _feedback(db, 200, 20, VENDORS[:2], stamp)
+    second = trainer.train()
+    assert second["mode"] == "incremental"
+    assert second["records_used"] == _trained(200, 20)
+    assert trainer.train()["records_used"] == 0
+
+
+def test_holdout_metrics_compare_models_on_the_same_rows(tmp_path):
+    """Any model is scored on the held-out feedback, never trained on by the candidate."""
+    db = _session()
+    registry = ModelRegistry(tmp_path)
+    trainer = IncrementalTrainer(db, registry, chunk_size=100)
+    _feedback(db, 0, 300, VENDORS, datetime(2025, 2, 1))
+
+    result = trainer.train()
+    holdout = trainer.holdout_feedback()
+    assert len(holdout) == 300 - result["records_used"]
+    assert all(is_holdout(je_id) for je_id in holdout["je_id"])
+
+    candidate = registry.load(result["version"], mmap=False)
+    assert trainer.holdout_metrics(candidate) == result["metrics"]
+
+
+def test_online_candidate_is_servable(tmp_path):
+    """Published online artifacts load and predict through MLClassifier."""
+    db = _session()
+    registry = ModelRegistry(tmp_path)
+    _feedback(db, 0, 300, VENDORS, datetime(2025, 2, 1))
+
+    result = IncrementalTrainer(db, registry, chunk_size=100).train()
+    registry.promote(result["version"])
+
+    clf = MLClassifier(model_path=tmp_path / "missing.pkl", registry=registry)
+    top = clf.predict_top_k("STAPLES STORE 999", "Staples", -25.0, datetime(2025, 3, 1), k=1)
+    assert top[0]["account"] == "6100 Office Supplies"
+
+
+def test_online_checkpoint_does_not_move_the_drift_baseline(tmp_path):
+    """Unpromoted online candidates are not the model drift is measured against."""
+    from unittest.mock import Mock
+    from app.ml.drift_monitor import DriftMonitor
+
+    db = _session()
+    db.add(ModelTrainingLogDB(
+        model_name="classifier_open", records_used=5000, accuracy=0.81,
+        trained_at=datetime.now() - timedelta(days=30)
+    ))
+    _feedback(db, 0, 300, VENDORS, datetime(2025, 2, 1))
+
+    settings = Mock(DRIFT_PSI_WARN=0.10, DRIFT_PSI_ALERT=0.25, DRIFT_ACC_DROP_PCT=3.0, DRIFT_OCR_CONF_Z=2.0)
+    before = DriftMonitor(db, settings).compute_signals()["transaction_classifier"]
+
+    IncrementalTrainer(db, ModelRegistry(tmp_path), chunk_size=100).train()
+    after = DriftMonitor(db, settings).compute_signals()["transaction_classifier"]
+
+    assert after["accuracy_baseline"] == before["accuracy_baseline"] == 0.81
+    assert after["days_since_train"] == before["days_since_train"] == 30
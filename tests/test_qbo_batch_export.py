@@ -0,0 +1,158 @@
+"""Tests for the batched QBO export pipeline against the local fake QBO server."""
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.db.models import JEIdempotencyDB, QBOTokenDB
+from app.integrations.qbo.batch import QBOBatchClient
+from app.integrations.qbo.fake_server import FakeQBOServer
+from app.services.qbo import QBOService
+
+TENANT = "tenant_batch"
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(QBOTokenDB(
+        tenant_id=TENANT,
+        realm_id="realm_123",
+        access_token="token_abc",
+        refresh_token="refresh_abc",
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        scope="com.intuit.quickbooks.accounting",
+    ))
+    db.commit()
+    return db
+
+
+def _payload(i, balanced=True):
+    return {
+        "txnDate": "2025-10-31",
+        "privateNote": f"entry {i}",
+        "lines": [
+            {"amount": 10 + i, "postingType": "Debit", "accountRef": {"value": "6100"}},
+            {"amount": 10 + i if balanced else 1, "postingType": "Credit", "accountRef": {"value": "1000"}},
+        ],
+    }
+
+
+def _client(fake, **kwargs):
+    async def no_sleep(_):
+        return None
+
+    return QBOBatchClient(
+        base_url="http://fake-qbo",
+        transport=httpx.ASGITransport(app=fake.app),
+        sleep=no_sleep,
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_export_posts_once_and_skips_exported():
+    db = _session()
+    fake = FakeQBOServer(access_token="token_abc")
+    service = QBOService(db)
+    payloads = {f"je_{i:03d}": _payload(i) for i in range(75)}
+    payloads["je_bad"] = _payload(999, balanced=False)
+
+    async with _client(fake, batch_size=30, max_concurrency=3) as client:
+        first = await service.post_journal_entries_batch(TENANT, payloads, batch_client=client)
+
+    assert sum(1 for r in first.values() if r.get("status") == 201) == 75
+    assert first["je_bad"]["error"].startswith("UNBALANCED_JE")
+    assert sorted(r["size"] for r in fake.requests) == [15, 30, 30]
+    assert db.query(JEIdempotencyDB).count() == 75
+
+    # Second run: one lookup finds everything, no HTTP calls
+    async with _client(fake) as client:
+        second = await service.post_journal_entries_batch(TENANT, payloads, batch_client=client)
+
+    assert len(fake.requests) == 3
+    assert all(r["idempotent"] for key, r in second.items() if key != "je_bad")
+    assert second["je_000"]["qbo_doc_id"] == first["je_000"]["qbo_doc_id"]
+
+
+@pytest.mark.asyncio
+async def test_batch_client_backs_off_on_throttling():
+    fake = FakeQBOServer()
+    fake.throttle_next = 2
+    fake.fail_next = 1
+
+    async with _client(fake, batch_size=5) as client:
+        results = await client.create_journal_entries(
+            "realm_123", "token", [(f"k{i}", {"TxnDate": "2025-10-31", "Line": []}) for i in range(5)]
+        )
+
+    assert len(fake.requests) == 4
+    assert all("qbo_doc_id" in r for r in results.values())
+
+
+@pytest.mark.asyncio
+async def test_batch_client_reports_exhausted_retries_per_item():
+    fake = FakeQBOServer()
+    fake.throttle_next = 10
+
+    async with _client(fake, batch_size=5, max_retries=2) as client:
+        results = await client.create_journal_entries(
+            "realm_123", "token", [(f"k{i}", {"TxnDate": "2025-10-31", "Line": []}) for i in range(3)]
+        )
+
+    assert len(fake.requests) == 3
+    assert all(r["error"].startswith("QBO_RATE_LIMITED") for r in results.values())
+
+
+@pytest.mark.asyncio
+async def test_unauthorized_stops_new_batches_after_in_flight_ones_settle():
+    fake = FakeQBOServer(access_token="new_token")
+
+    async with _client(fake, batch_size=5, max_concurrency=2) as client:
+        with pytest.raises(Exception, match="QBO_UNAUTHORIZED"):
+            await client.create_journal_entries(
+                "realm_123", "old_token", [(f"k{i}", {"TxnDate": "2025-10-31", "Line": []}) for i in range(25)]
+            )
+
+    assert 1 <= len(fake.requests) <= 2  # Only batches already in flight, not all 5
+
+
+@pytest.mark.asyncio
+async def test_batch_export_resends_only_unposted_entries_after_401():
+    db = _session()
+    fake = FakeQBOServer(access_token="token_abc")
+    fake.unauthorized_next = 1
+    fake.latency = 0.02  # Other batches are still in flight when the 401 arrives
+    service = QBOService(db)
+    payloads = {f"je_{i:03d}": _payload(i) for i in range(75)}
+
+    async with _client(fake, batch_size=10, max_concurrency=3) as client:
+        results = await service.post_journal_entries_batch(TENANT, payloads, batch_client=client)
+        await asyncio.sleep(0.1)  # Let any stray batch tasks finish
+
+    assert sum(1 for r in results.values() if r.get("status") == 201) == 75
+    assert len(fake.journal_entries) == 75  # No entry posted twice
+    assert db.query(JEIdempotencyDB).count() == 75
+
+
+@pytest.mark.asyncio
+async def test_retry_after_500_does_not_duplicate_created_entries():
+    db = _session()
+    fake = FakeQBOServer(access_token="token_abc")
+    fake.fail_after_create_next = 1  # Entries are created, then QBO answers 500
+    service = QBOService(db)
+    payloads = {f"je_{i:03d}": _payload(i) for i in range(10)}
+
+    async with _client(fake, batch_size=10) as client:
+        results = await service.post_journal_entries_batch(TENANT, payloads, batch_client=client)
+
+    assert len(fake.requests) == 2  # The 500, then the retry with the same requestid
+    assert len(fake.journal_entries) == 10  # Not 20
+    assert sum(1 for r in results.values() if r.get("status") == 201) == 10
+    assert {r["qbo_doc_id"] for r in results.values()} == set(fake.journal_entries)
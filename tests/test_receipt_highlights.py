@@ -15,6 +15,7 @@ from fastapi.testclient import TestClient
 from app.api.main import app
 from app.db.session import SessionLocal
 from app.ocr.parser import extract_with_bboxes
+from app.ocr.receipt_index import index_fixture_receipts
 
 
 client = TestClient(app)
@@ -182,8 +183,11 @@ def test_graceful_fallback_when_bboxes_missing(db):
     print("✅ Graceful fallback: missing receipts handled correctly")
 
 
-def test_receipts_list_endpoint():
-    """Test receipts listing endpoint."""
+def test_receipts_list_endpoint(db):
+    """Test receipts listing endpoint (reads the receipts index)."""
+    index_fixture_receipts(db)
+    db.commit()
+    
     response = client.get("/api/receipts")
     
     assert response.status_code == 200
@@ -191,7 +195,10 @@ def test_receipts_list_endpoint():
     
     assert "receipts" in data
     assert "count" in data
+    assert "total" in data
     assert isinstance(data["receipts"], list)
+    assert data["count"] <= data["limit"]
+    assert data["count"] <= data["total"]
     
     # Should find some receipts from fixtures
     assert data["count"] > 0, "No receipts found in fixtures"
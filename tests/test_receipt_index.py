@@ -0,0 +1,143 @@
+"""Tests for the receipts index and the paginated receipts list."""
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.api.receipts import get_receipt_fields, list_receipts
+from app.db.models import ReceiptDB, ReceiptFieldDB
+from app.ocr.receipt_index import index_receipt_texts, parse_receipt_date, upsert_receipts
+
+FIXTURES = Path(__file__).parent / "fixtures" / "receipts"
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.db.models import Base
+
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _field(name, value, confidence=0.9):
+    return {"field": name, "value": value, "page": 0, "x": 0.1, "y": 0.2, "w": 0.3, "h": 0.05,
+            "confidence": confidence}
+
+
+def _receipt(receipt_id, vendor, day, amount, tenant_id="alpha"):
+    return {
+        "tenant_id": tenant_id,
+        "receipt_id": receipt_id,
+        "filename": f"receipt_{receipt_id}.pdf",
+        "file_path": f"receipts/{tenant_id}/receipt_{receipt_id}.pdf",
+        "fields": [_field("vendor", vendor), _field("date", day), _field("total", amount)],
+    }
+
+
+def _list(db, **filters):
+    params = dict(tenant_id=None, vendor=None, date_from=None, date_to=None,
+                  min_amount=None, max_amount=None, limit=50, offset=0)
+    params.update(filters)
+    return asyncio.run(list_receipts(db=db, **params))
+
+
+def test_upsert_replaces_earlier_index_rows(db):
+    upsert_receipts(db, [_receipt("0001", "Coffee Shop", "08/28/2025", "12.50")])
+    written = upsert_receipts(db, [_receipt("0001", "Coffee Shop Downtown", "2025-08-29", "$1,012.50")])
+    db.commit()
+
+    [row] = db.query(ReceiptDB).all()
+    assert written == 3
+    assert row.vendor == "Coffee Shop Downtown" and row.vendor_key == "coffee shop downtown"
+    assert row.receipt_date == date(2025, 8, 29)
+    assert row.amount == row.total == 1012.50
+    assert row.confidence == pytest.approx(0.9)
+    assert sorted(f.field for f in db.query(ReceiptFieldDB).all()) == ["date", "total", "vendor"]
+    assert db.query(ReceiptFieldDB).filter_by(field="total").one().value == "$1,012.50"
+
+
+def test_list_filters_and_pages_newest_first(db):
+    upsert_receipts(db, [
+        _receipt("0001", "Coffee Shop", "08/01/2025", "4.50"),
+        _receipt("0002", "Hardware Store", "08/15/2025", "120.00"),
+        _receipt("0003", "coffee roasters", "08/20/2025", "32.00"),
+        _receipt("0004", "Office Supplies", "not a date", "18.00"),
+        _receipt("0001", "Coffee Shop", "08/02/2025", "7.00", tenant_id="beta"),
+    ])
+    db.commit()
+
+    page = _list(db, tenant_id="alpha", limit=2)
+    assert [r["id"] for r in page["receipts"]] == ["0003", "0002"]
+    assert (page["count"], page["total"]) == (2, 4)
+    assert page["receipts"][0]["date"] == "2025-08-20"
+
+    rest = _list(db, tenant_id="alpha", limit=2, offset=2)
+    assert {r["id"] for r in rest["receipts"]} == {"0001", "0004"}
+
+    assert [r["id"] for r in _list(db, tenant_id="alpha", vendor="COFFEE")["receipts"]] == ["0003", "0001"]
+    assert _list(db, date_from=date(2025, 8, 2), date_to=date(2025, 8, 15))["total"] == 2
+    assert [r["id"] for r in _list(db, tenant_id="alpha", min_amount=10, max_amount=50)["receipts"]] == ["0003", "0004"]
+    assert _list(db, vendor="coffee")["total"] == 3
+
+
+def test_fields_are_scoped_to_the_receipt_tenant(db):
+    upsert_receipts(db, [
+        _receipt("0001", "Coffee Shop", "08/01/2025", "4.50"),
+        _receipt("0001", "Hardware Store", "08/02/2025", "120.00", tenant_id="beta"),
+    ])
+    upsert_receipts(db, [_receipt("0001", "Coffee Roasters", "08/03/2025", "9.00")])
+    db.commit()
+
+    def vendor(tenant_id):
+        data = asyncio.run(get_receipt_fields("0001", tenant_id=tenant_id, db=db))
+        assert len(data["fields"]) == 3
+        return next(f["value"] for f in data["fields"] if f["name"] == "vendor")
+
+    # Re-indexing alpha's receipt leaves beta's fields alone
+    assert vendor("alpha") == "Coffee Roasters"
+    assert vendor("beta") == "Hardware Store"
+    assert db.query(ReceiptFieldDB).count() == 6
+
+
+def test_list_vendor_filter_escapes_wildcards(db):
+    upsert_receipts(db, [
+        _receipt("0001", "100% Juice", "08/01/2025", "4.50"),
+        _receipt("0002", "1000 Islands Deli", "08/02/2025", "12.00"),
+    ])
+    db.commit()
+
+    assert [r["id"] for r in _list(db, vendor="100%")["receipts"]] == ["0001"]
+    assert _list(db, vendor="_")["total"] == 0
+
+
+def test_index_receipt_texts_uses_tenant_directory(db, tmp_path):
+    receipt = tmp_path / "receipts" / "gamma" / "receipt_0042.txt"
+    receipt.parent.mkdir(parents=True)
+    receipt.write_text((FIXTURES / "alpha" / "receipt_0001.txt").read_text())
+
+    assert index_receipt_texts(db, [str(receipt)], pdf_dir="pdfs") == 1
+    db.commit()
+
+    row = db.query(ReceiptDB).one()
+    assert (row.tenant_id, row.receipt_id, row.filename) == ("gamma", "0042", "receipt_0042.pdf")
+    assert row.file_path == "pdfs/gamma/receipt_0042.pdf"
+    assert db.query(ReceiptFieldDB).filter_by(receipt_id="0042").count() > 0
+
+
+def test_parse_receipt_date():
+    assert parse_receipt_date("08/28/2025") == date(2025, 8, 28)
+    assert parse_receipt_date("2025-08-28") == date(2025, 8, 28)
+    assert parse_receipt_date("Aug 28, 2025") == date(2025, 8, 28)
+    assert parse_receipt_date("soon") is None
+    assert parse_receipt_date(None) is None
@@ -138,3 +138,222 @@ def test_no_match_date_out_of_tolerance():
     assert match_type is None
     assert score == 0.0
 
+
+
+def _nested_loop_match(matcher, transactions, journal_entries):
+    """Reference O(n*m) greedy matcher (the original reconcile_all loop)."""
+    matched_jes = set()
+    pairs = []
+    for txn in transactions:
+        for je in journal_entries:
+            if je.je_id in matched_jes:
+                continue
+            match_type, score = matcher._match_transaction_je(txn, je)
+            if match_type:
+                pairs.append((txn.txn_id, je.je_id, match_type, score))
+                matched_jes.add(je.je_id)
+                break
+    return pairs
+
+
+def _random_ledger(n_txns=300, n_jes=300, seed=7):
+    import random
+    rng = random.Random(seed)
+    amounts = [-100.0, -100.01, -42.5, -9.99, 250.0, 1200.0, -19.0]
+    base = datetime(2025, 10, 1)
+
+    transactions = [
+        TransactionDB(
+            txn_id=f"txn_{i:04d}",
+            date=base + timedelta(days=rng.randint(0, 40), hours=rng.choice([0, 0, 13])),
+            amount=rng.choice(amounts),
+            description="x",
+        )
+        for i in range(n_txns)
+    ]
+    journal_entries = []
+    for i in range(n_jes):
+        amount = abs(rng.choice(amounts))
+        cash_line = ({"account": "1000 Cash at Bank", "debit": amount, "credit": 0.0}
+                     if rng.random() < 0.5 else
+                     {"account": "1000 Cash at Bank", "debit": 0.0, "credit": amount})
+        lines = [{"account": "6100 Office Supplies", "debit": amount, "credit": 0.0}]
+        if rng.random() < 0.9:
+            lines.append(cash_line)
+        journal_entries.append(JournalEntryDB(
+            je_id=f"je_{i:04d}",
+            date=base + timedelta(days=rng.randint(0, 40)),
+            lines=lines,
+            source_txn_id=f"txn_{rng.randint(0, n_txns * 2):04d}",
+            status="posted",
+        ))
+    return transactions, journal_entries
+
+
+def test_sweep_greedy_matches_nested_loop():
+    """Sort-and-sweep greedy matching reproduces the nested-loop results."""
+    from app.recon.sweep import JERow, TxnRow, greedy_match, get_cash_amount
+
+    transactions, journal_entries = _random_ledger()
+    matcher = ReconciliationMatcher(MagicMock(), date_tolerance=3)
+
+    expected = _nested_loop_match(matcher, transactions, journal_entries)
+
+    txn_rows = [TxnRow(t.txn_id, t.date, t.amount) for t in transactions]
+    je_rows = [JERow(j.je_id, j.date, j.source_txn_id, get_cash_amount(j.lines)) for j in journal_entries]
+    actual = [
+        (txn_rows[m.txn_pos].txn_id, je_rows[m.je_pos].je_id, m.match_type, m.score)
+        for m in greedy_match(txn_rows, je_rows, 3)
+    ]
+
+    assert actual == expected
+
+
+def test_sweep_optimal_resolves_ties():
+    """Optimal mode matches both transactions where greedy strands one."""
+    from app.recon.sweep import JERow, TxnRow, greedy_match, optimal_match
+
+    day = datetime(2025, 10, 1)
+    txns = [
+        TxnRow("txn_a", day, -50.0),                        # fits je_1 and je_2
+        TxnRow("txn_b", day + timedelta(days=5), -50.0),    # fits only je_2
+    ]
+    jes = [
+        JERow("je_2", day + timedelta(days=3), None, -50.0),
+        JERow("je_1", day, None, -50.0),
+    ]
+
+    # Greedy gives txn_a the first JE it sees and strands txn_b
+    assert len(greedy_match(txns, jes, 3)) == 1
+    matches = optimal_match(txns, jes, 3)
+
+    assert {(txns[m.txn_pos].txn_id, jes[m.je_pos].je_id) for m in matches} == {
+        ("txn_a", "je_1"),
+        ("txn_b", "je_2"),
+    }
+
+
+def test_reconcile_all_bulk_inserts_matches():
+    """reconcile_all persists matches and reports statistics."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base, ReconciliationDB
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    transactions, journal_entries = _random_ledger(60, 60, seed=3)
+    db.add_all(transactions + journal_entries)
+    db.commit()
+
+    matcher = ReconciliationMatcher(db, date_tolerance=3)
+    expected = _nested_loop_match(matcher, transactions, journal_entries)
+
+    result = matcher.reconcile_all()
+
+    assert result["statistics"]["matched"] == len(expected)
+    assert db.query(ReconciliationDB).count() == len(expected)
+    statuses = {r["status"] for r in result["results"]}
+    assert statuses <= {"matched", "unmatched", "orphan"}
+
+    # Re-running replaces rather than duplicates
+    matcher.reconcile_all()
+    assert db.query(ReconciliationDB).count() == len(expected)
+    db.close()
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _pair(n, company_id, day, stamp, status="posted"):
+    txn = TransactionDB(
+        txn_id=f"{company_id}_txn_{n}", company_id=company_id,
+        date=datetime(2025, 10, day), amount=-(10.0 + n), currency="USD",
+        description=f"Vendor {n}", created_at=stamp
+    )
+    je = JournalEntryDB(
+        je_id=f"{company_id}_je_{n}", company_id=company_id,
+        date=datetime(2025, 10, day),
+        lines=[
+            {"account": "6100 Office Supplies", "debit": 10.0 + n, "credit": 0.0},
+            {"account": "1000 Cash at Bank", "debit": 0.0, "credit": 10.0 + n}
+        ],
+        status=status, created_at=stamp, updated_at=stamp
+    )
+    return txn, je
+
+
+def test_reconcile_incremental_keeps_existing_matches():
+    """Incremental runs only add matches for new rows of the given company."""
+    from app.db.models import ReconciliationDB, ReconciliationWatermarkDB
+
+    db = _session()
+    t0 = datetime(2025, 10, 1, 9, 0)
+    for n in range(3):
+        db.add_all(_pair(n, "c1", 1 + n, t0))
+        db.add_all(_pair(n, "c2", 1 + n, t0))
+    db.commit()
+
+    matcher = ReconciliationMatcher(db, date_tolerance=3)
+    first = matcher.reconcile_incremental("c1")  # no watermark yet: scoped rebuild
+    assert first["statistics"]["matched"] == 3
+    assert db.get(ReconciliationWatermarkDB, "c1").txn_created_at == t0
+    first_ids = {r.id for r in db.query(ReconciliationDB)}
+
+    t1 = t0 + timedelta(hours=1)
+    db.add_all(_pair(3, "c1", 20, t1))
+    db.add_all(_pair(3, "c2", 20, t1))
+    db.commit()
+
+    second = matcher.reconcile_incremental("c1")
+    assert second["statistics"]["new_transactions"] == 1
+    assert second["statistics"]["matched"] == 1
+    assert [r["txn_id"] for r in second["results"] if r["status"] == "matched"] == ["c1_txn_3"]
+
+    rows = db.query(ReconciliationDB).all()
+    assert first_ids <= {r.id for r in rows}
+    assert {r.txn_id for r in rows} == {f"c1_txn_{n}" for n in range(4)}
+    assert db.get(ReconciliationWatermarkDB, "c1").txn_created_at == t1
+
+    # Nothing changed: nothing to do
+    third = matcher.reconcile_incremental("c1")
+    assert third["statistics"]["matched"] == 0
+    assert db.query(ReconciliationDB).count() == 4
+    db.close()
+
+
+def test_reconcile_incremental_drops_matches_of_changed_entries():
+    """A JE that is no longer posted loses its match on the next run."""
+    from app.db.models import ReconciliationDB
+
+    db = _session()
+    t0 = datetime(2025, 10, 1, 9, 0)
+    for n in range(2):
+        db.add_all(_pair(n, "c1", 1 + n, t0))
+    db.commit()
+
+    matcher = ReconciliationMatcher(db, date_tolerance=3)
+    matcher.reconcile_incremental("c1")
+    assert db.query(ReconciliationDB).count() == 2
+
+    je = db.get(JournalEntryDB, "c1_je_0")
+    je.status = "proposed"
+    je.updated_at = t0 + timedelta(hours=1)
+    db.commit()
+
+    result = matcher.reconcile_incremental("c1")
+    assert result["statistics"]["invalidated_matches"] == 1
+    assert {r.txn_id for r in db.query(ReconciliationDB)} == {"c1_txn_1"}
+
+    # A full rebuild agrees with the incremental state
+    matcher.reconcile_all(company_id="c1")
+    assert {r.txn_id for r in db.query(ReconciliationDB)} == {"c1_txn_1"}
+    db.close()
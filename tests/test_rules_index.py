@@ -0,0 +1,167 @@
+"""Tests for the compiled rule index used by RulesEngine."""
+import random
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.rules.engine import RulesEngine
+from app.rules.index import CompiledRuleIndex, required_literals
+
+
+def _txn(description, counterparty=None, amount=-10.0, txn_id="txn_1"):
+    return SimpleNamespace(
+        txn_id=txn_id,
+        description=description,
+        counterparty=counterparty,
+        amount=amount,
+    )
+
+
+def _naive_match(rules, txn):
+    """Reference implementation: every rule in order, first match wins."""
+    text = f"{txn.description} {txn.counterparty or ''}"
+    for rule in rules:
+        if re.search(rule.get('pattern', ''), text, re.IGNORECASE):
+            condition = rule.get('match_condition', '')
+            if condition:
+                context = {
+                    'amount': txn.amount,
+                    'description': txn.description,
+                    'counterparty': txn.counterparty,
+                }
+                expr = condition
+                for key in context:
+                    expr = expr.replace(key, f"context['{key}']")
+                try:
+                    if not eval(expr, {"context": context, "__builtins__": {}}):
+                        continue
+                except Exception:
+                    pass
+            return rule
+    return None
+
+
+def test_required_literals():
+    """Literal extraction finds alternatives every match must contain."""
+    assert required_literals("(?i)(uber|lyft)") == {"uber", "lyft"}
+    assert required_literals("(?i)(amazon|amzn).*") == {"amazon", "amzn"}
+    assert required_literals(r"apple\.com") == {"apple.com"}
+    assert required_literals("GitHub") == {"github"}
+    # Optional alternatives and pure character classes give no literal
+    assert required_literals("(foo)?bar|[0-9]+") is None
+    assert required_literals(".*") is None
+    assert required_literals("") is None
+
+
+def test_first_match_wins():
+    """Earlier rules win even when a later rule's literal appears first."""
+    rules = [
+        {"pattern": "coffee", "account": "A"},
+        {"pattern": "starbucks", "account": "B"},
+    ]
+    index = CompiledRuleIndex(rules)
+
+    assert index.match(_txn("STARBUCKS COFFEE #123"))["account"] == "A"
+    assert index.match(_txn("STARBUCKS #123"))["account"] == "B"
+    assert index.match(_txn("DUNKIN")) is None
+
+
+def test_conditions_are_precompiled_and_respected():
+    """match_condition filters matches exactly like the eval-based check."""
+    rules = [
+        {"pattern": "uber", "account": "Travel", "match_condition": "amount < 0"},
+        {"pattern": "uber", "account": "Income"},
+        {"pattern": "broken", "account": "X", "match_condition": "amount <<< 0"},
+    ]
+    index = CompiledRuleIndex(rules)
+
+    assert index.match(_txn("UBER TRIP", amount=-25.0))["account"] == "Travel"
+    assert index.match(_txn("UBER PAYOUT", amount=300.0))["account"] == "Income"
+    # Invalid conditions never filter a transaction out
+    assert index.match(_txn("broken thing"))["account"] == "X"
+
+
+def test_index_matches_naive_engine_on_random_rules():
+    """Prefiltered matching agrees with the naive scan on random inputs."""
+    rng = random.Random(42)
+    words = ["amazon", "amzn", "uber", "lyft", "shell", "gas", "github",
+             "zoom", "ups", "usps", "fedex", "payroll", "rent", "deposit"]
+
+    rules = []
+    for i in range(200):
+        kind = rng.random()
+        if kind < 0.5:
+            pattern = "|".join(rng.sample(words, 2)) + str(i % 7)
+        elif kind < 0.8:
+            pattern = f"(?i)({rng.choice(words)}|{rng.choice(words)})"
+        else:
+            pattern = rf"\b{rng.choice(words)}\b.*[0-9]+"
+        rule = {"pattern": pattern, "account": f"acct_{i}"}
+        if rng.random() < 0.2:
+            rule["match_condition"] = "amount > 0"
+        rules.append(rule)
+
+    index = CompiledRuleIndex(rules)
+
+    for _ in range(500):
+        desc = " ".join(rng.choice(words + ["pos", "card", "1234", "4"]) for _ in range(4))
+        txn = _txn(desc.upper(), rng.choice([None, "Vendor Inc"]), amount=rng.choice([-5.0, 5.0]))
+        assert index.match(txn) is _naive_match(rules, txn)
+
+
+def test_non_ascii_text_falls_back_to_full_scan():
+    """Case folding between ASCII and non-ASCII characters is preserved."""
+    rules = [{"pattern": "kelvin", "account": "K"}]
+    index = CompiledRuleIndex(rules)
+
+    # KELVIN SIGN matches ASCII 'k' under re.IGNORECASE
+    assert index.match(_txn("Kelvin supply"))["account"] == "K"
+
+
+def test_invalid_pattern_raises_when_reached():
+    """Invalid patterns behave as they did with re.search."""
+    index = CompiledRuleIndex([{"pattern": "ok", "account": "A"}, {"pattern": "(", "account": "B"}])
+
+    assert index.match(_txn("ok"))["account"] == "A"
+    with pytest.raises(re.error):
+        index.match(_txn("nothing"))
+
+
+def test_stats_count_hits_and_evaluations():
+    """Per-rule counters track hits and evaluations."""
+    rules = [
+        {"pattern": "uber", "account": "Travel"},
+        {"pattern": "zoom", "account": "Software"},
+    ]
+    index = CompiledRuleIndex(rules)
+
+    index.match_many([_txn("UBER"), _txn("UBER"), _txn("ZOOM"), _txn("OTHER")])
+    stats = index.stats()
+
+    assert stats["lookups"] == 4
+    assert stats["misses"] == 1
+    assert [r["hits"] for r in stats["rules"]] == [2, 1]
+    # The prefilter skips rules whose literals are absent
+    assert [r["evaluations"] for r in stats["rules"]] == [2, 1]
+
+    index.reset_stats()
+    assert index.stats()["lookups"] == 0
+
+
+def test_engine_batch_match_uses_index():
+    """batch_match returns the same results as match_transaction."""
+    engine = RulesEngine()
+    txns = [
+        _txn("AMAZON MKTPLACE", txn_id="t1"),
+        _txn("UBER *TRIP", txn_id="t2"),
+        _txn("XYZZY 8812", amount=500.0, txn_id="t3"),
+    ]
+
+    results = engine.batch_match(txns)
+
+    for txn in txns:
+        assert results[txn.txn_id] == engine.match_transaction(txn)
+    assert results["t1"]["matched"] is True
+    assert results["t3"]["matched"] is False
+    assert engine.get_stats()["version"] == engine.version
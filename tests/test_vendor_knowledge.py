@@ -0,0 +1,128 @@
+"""Tests for the vendor knowledge base vector index."""
+import numpy as np
+
+from app.vendor_knowledge.embeddings import VendorKnowledgeBase
+from app.vendor_knowledge.vector_index import NgramVectorIndex
+
+
+def _kb(tmp_path):
+    kb = VendorKnowledgeBase(persist_directory=str(tmp_path))
+    assert kb.backend == "index"
+    return kb
+
+
+def test_index_top_k_and_shared_rows():
+    """Nearest texts rank first; identical texts share one row."""
+    index = NgramVectorIndex()
+    index.add("1", "Uber UBER TRIP HELP.UBER.COM", {"counterparty": "Uber"})
+    index.add("2", "Shell SHELL OIL 5743", {"counterparty": "Shell"})
+    index.add("3", "uber  uber trip help.uber.com", {"counterparty": "Uber"})
+    assert not index.add("1", "duplicate id", {"counterparty": "X"})
+
+    assert len(index) == 3
+    assert index.vectors.shape == (2, index.dim)
+
+    (row, similarity), _ = index.search("UBER TRIP", k=2)
+    assert index.texts[row].startswith("uber")
+    assert 0.0 < similarity <= 1.0
+    np.testing.assert_allclose(np.linalg.norm(index.vectors, axis=1), 1.0, rtol=1e-5)
+
+
+def test_find_similar_prefers_counterparty_then_neighbours(tmp_path):
+    """Known counterparties come first, then similar descriptions."""
+    kb = _kb(tmp_path)
+    kb.add_categorization("Amazon", "AMAZON MKTPLACE PMTS", "6100 Office Supplies", "Supplies")
+    kb.add_categorization("Amazon Web Services", "AWS EMEA", "6300 Software", "Software")
+    kb.add_categorization("Delta", "DELTA AIR 0062", "6500 Travel", "Travel")
+
+    exact = kb.find_similar("amazon", "something new", n_results=1)
+    assert exact == [{
+        "counterparty": "Amazon",
+        "account": "6100 Office Supplies",
+        "category": "Supplies",
+        "distance": 0.0,
+    }]
+
+    similar = kb.find_similar("", "AMAZON MKTPLACE", n_results=3)
+    assert similar[0]["account"] == "6100 Office Supplies"
+    assert all(s["account"] != "6500 Travel" for s in similar)
+
+
+def test_namespaces_and_persistence(tmp_path):
+    """Tenants are isolated and indexes reload from disk memory-mapped."""
+    kb = _kb(tmp_path)
+    kb.add_categorization("Zoom", "ZOOM.US", "6300 Software", "Software", namespace="tenant_a")
+    kb.add_categorization("Zoom", "ZOOM.US", "6999 Other", "Other", namespace="tenant_b")
+    kb.save()
+
+    reloaded = _kb(tmp_path)
+    index = reloaded._get_index("tenant_a")
+    assert isinstance(index.vectors, np.memmap)
+
+    assert reloaded.get_historical_mappings("zoom", namespace="tenant_a") == [
+        {"counterparty": "Zoom", "account": "6300 Software"}
+    ]
+    assert reloaded.find_similar("Zoom", "", namespace="tenant_b")[0]["account"] == "6999 Other"
+    assert reloaded.find_similar("Zoom", "") == []
+
+    # Adding after a memory-mapped load copies the matrix into memory
+    reloaded.add_categorization("Slack", "SLACK T123", "6300 Software", "Software", namespace="tenant_a")
+    assert len(reloaded.get_historical_mappings(namespace="tenant_a")) == 2
+
+
+def test_save_writes_changed_namespaces_and_clear_removes_them(tmp_path):
+    """Only changed namespaces are rewritten; clear() also deletes persisted data."""
+    kb = _kb(tmp_path)
+    kb.add_categorization("Zoom", "ZOOM.US", "6300 Software", "Software", namespace="tenant_a")
+    kb.add_categorization("Lyft", "LYFT RIDE", "6500 Travel", "Travel", namespace="tenant_b")
+    kb.save()
+    assert kb.dirty == set()
+
+    reloaded = _kb(tmp_path)
+    reloaded.find_similar("Zoom", "", namespace="tenant_a")  # Memory-mapped load
+    reloaded.add_categorization("Zoom", "ZOOM.US", "6999 Other", "Other", namespace="tenant_a")
+    assert reloaded.dirty == {"tenant_a"}
+    reloaded.save()
+    assert len(_kb(tmp_path).get_historical_mappings("zoom", namespace="tenant_a")) == 2
+
+    reloaded.clear(namespace="tenant_a")
+    assert _kb(tmp_path).get_historical_mappings(namespace="tenant_a") == []
+    assert len(_kb(tmp_path).get_historical_mappings(namespace="tenant_b")) == 1
+
+    reloaded.clear()
+    assert _kb(tmp_path).get_historical_mappings(namespace="tenant_b") == []
+
+
+def test_concurrent_saves_merge_and_readers_reload(tmp_path):
+    """Two processes saving the same namespace keep both histories and see each other's saves."""
+    api = _kb(tmp_path)
+    worker = _kb(tmp_path)
+    api.find_similar("Zoom", "", namespace="tenant_a")
+    worker.find_similar("Zoom", "", namespace="tenant_a")
+
+    api.add_categorization("Zoom", "ZOOM.US", "6300 Software", "Software", namespace="tenant_a")
+    worker.add_categorization("Lyft", "LYFT RIDE", "6500 Travel", "Travel", namespace="tenant_a")
+    api.save()
+    worker.save()  # Must not overwrite the API's Zoom mapping
+
+    assert {m["counterparty"] for m in _kb(tmp_path).get_historical_mappings(namespace="tenant_a")} == {
+        "Zoom", "Lyft"
+    }
+    # The API process picks up the worker's newer version without restarting
+    assert api.get_historical_mappings("lyft", namespace="tenant_a") == [
+        {"counterparty": "Lyft", "account": "6500 Travel"}
+    ]
+
+    # Unsaved local history survives a reload of someone else's version
+    api.add_categorization("Slack", "SLACK T123", "6300 Software", "Software", namespace="tenant_a")
+    worker.add_categorization("Delta", "DELTA AIR", "6500 Travel", "Travel", namespace="tenant_a")
+    worker.save()
+    assert {m["counterparty"] for m in api.get_historical_mappings(namespace="tenant_a")} == {
+        "Zoom", "Lyft", "Slack", "Delta"
+    }
+
+    # Old versions are pruned; the pointer names a complete version
+    directory = api._namespace_dir("tenant_a")
+    versions = sorted(p.name for p in directory.iterdir() if p.is_dir())
+    assert len(versions) == 2
+    assert (directory / "CURRENT").read_text() == versions[-1]